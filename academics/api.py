@@ -4,6 +4,9 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.db.models import Q, Count, Avg
 from django.utils import timezone
+from core.aggregation import StatsQuery, percentage
+from core.pagination import KeysetPagination
+from core.performance import conditional_resource
 from .models import (
     Subject, ClassSubject, Exam, ExamSchedule, StudentExamResult,
     Grade, Assignment, StudentAssignment, Timetable, Attendance,
@@ -170,6 +173,7 @@ class TimetableViewSet(viewsets.ModelViewSet):
         )
     
     @action(detail=False, methods=['get'])
+    @conditional_resource('timetable')
     def weekly_schedule(self, request):
         """Get weekly timetable for a class"""
         class_id = request.query_params.get('class_id')
@@ -209,8 +213,11 @@ class AttendanceViewSet(viewsets.ModelViewSet):
     """API endpoints for Attendance management"""
     serializer_class = AttendanceSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
     
     def get_queryset(self):
+        if not hasattr(self.request.user, 'profile'):
+            return Attendance.objects.none()
         return Attendance.objects.filter(
             timetable__school_class__school=self.request.user.profile.school
         )
@@ -264,17 +271,18 @@ class AttendanceViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(attendance__date__lte=to_date)
         
         # Calculate attendance statistics
-        total_classes = queryset.count()
-        present_count = queryset.filter(status='PRESENT').count()
-        absent_count = queryset.filter(status='ABSENT').count()
-        late_count = queryset.filter(status='LATE').count()
+        stats = (
+            StatsQuery(queryset)
+            .count('total_classes')
+            .count('present_count', Q(status='PRESENT'))
+            .count('absent_count', Q(status='ABSENT'))
+            .count('late_count', Q(status='LATE'))
+            .run()
+        )
         
         report = {
-            'total_classes': total_classes,
-            'present_count': present_count,
-            'absent_count': absent_count,
-            'late_count': late_count,
-            'attendance_percentage': (present_count / total_classes * 100) if total_classes > 0 else 0,
+            **stats,
+            'attendance_percentage': percentage(stats['present_count'], stats['total_classes']),
             'attendance_records': StudentClassAttendanceSerializer(queryset, many=True).data
         }
         
@@ -300,6 +308,7 @@ class HolidayViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
+    @conditional_resource('calendar')
     def academic_calendar(self, request):
         """Get academic calendar for the year"""
         year = request.query_params.get('year', timezone.now().year)
@@ -5,6 +5,7 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from django.db.models import Q, Count, Avg, Sum, Max, Min
 from django.utils import timezone
 from datetime import timedelta, datetime
+from core.aggregation import StatsQuery
 from .models import (
     AcademicSession, AdmissionCriteria, ApplicationForm, DocumentSubmission,
     EntranceTest, EntranceTestResult, Interview, InterviewSchedule,
@@ -106,21 +107,27 @@ class AdmissionCriteriaViewSet(viewsets.ModelViewSet):
         criteria = self.get_object()
         applications = criteria.applications.filter(status__in=['SELECTED', 'ADMISSION_CONFIRMED'])
         
+        stats = (
+            StatsQuery(applications)
+            .count('filled_seats')
+            .count('general', Q(category='GENERAL'))
+            .count('sc', Q(category='SC'))
+            .count('st', Q(category='ST'))
+            .count('obc', Q(category='OBC'))
+            .count('ews', Q(category='EWS'))
+            .count('pwd', Q(category='PWD'))
+            .sum('revenue_generated', 'criteria__admission_fee')
+            .run()
+        )
+        
         status_data = {
             'total_seats': criteria.total_seats,
-            'filled_seats': applications.count(),
-            'available_seats': criteria.total_seats - applications.count(),
+            'filled_seats': stats['filled_seats'],
+            'available_seats': criteria.total_seats - stats['filled_seats'],
             'category_wise_allocation': {
-                'general': applications.filter(category='GENERAL').count(),
-                'sc': applications.filter(category='SC').count(),
-                'st': applications.filter(category='ST').count(),
-                'obc': applications.filter(category='OBC').count(),
-                'ews': applications.filter(category='EWS').count(),
-                'pwd': applications.filter(category='PWD').count()
+                category: stats[category] for category in ('general', 'sc', 'st', 'obc', 'ews', 'pwd')
             },
-            'revenue_generated': applications.aggregate(
-                total=Sum('criteria__admission_fee')
-            )['total'] or 0
+            'revenue_generated': stats['revenue_generated']
         }
         return Response(status_data)
 
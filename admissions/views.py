@@ -14,7 +14,9 @@ from .models import (
     AdmissionBatch, InterviewSchedule, AdmissionFee, DocumentSubmission,
     AdmissionStatus, AdmissionGrade, EnrollmentConfirmation
 )
-from core.models import SchoolSettings, Grade, Student, AcademicYear
+from core.models import Grade, Student, AcademicYear
+from core.school_config import get_school_settings
+from core.replicas import use_replica
 import csv
 import json
 
@@ -22,7 +24,7 @@ import json
 @login_required
 def admissions_dashboard(request):
     """Advanced Admissions Management Dashboard"""
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     current_academic_year = AcademicYear.objects.filter(is_current=True).first()
     
     # Application Statistics
@@ -611,6 +613,7 @@ def document_verification(request):
 
 # ===== REPORTS AND ANALYTICS =====
 @login_required
+@use_replica()
 def admissions_reports(request):
     """Admissions Reports and Analytics"""
     # Date range filtering
@@ -6,6 +6,8 @@ from django.db.models import Q, Count, Avg, Sum, Max, Min
 from django.utils import timezone
 from datetime import timedelta, datetime
 from core.models import *
+from core.aggregation import StatsQuery, percentage
+from core.replicas import ReplicaReadMixin, use_replica
 from students.models import Student
 from academics.models import StudentExamResult, Assignment, StudentClassAttendance
 from fees.models import FeePayment
@@ -14,7 +16,7 @@ from transport.models import StudentTransport
 from hostel.models import HostelResident
 import json
 
-class AnalyticsViewSet(viewsets.ViewSet):
+class AnalyticsViewSet(ReplicaReadMixin, viewsets.ViewSet):
     """AI-Powered Analytics API with Machine Learning Insights"""
     permission_classes = [IsAuthenticated]
     
@@ -27,8 +29,12 @@ class AnalyticsViewSet(viewsets.ViewSet):
         school = self.get_school()
         
         # Student Analytics
-        total_students = Student.objects.filter(school=school).count()
-        active_students = Student.objects.filter(school=school, is_active=True).count()
+        student_stats = (
+            StatsQuery(Student.objects.filter(school=school))
+            .count('total_students')
+            .count('active_students', Q(is_active=True))
+            .run()
+        )
         
         # Academic Performance
         recent_results = StudentExamResult.objects.filter(
@@ -42,7 +48,13 @@ class AnalyticsViewSet(viewsets.ViewSet):
             attendance__timetable__school_class__school=school,
             attendance__date__gte=timezone.now().date() - timedelta(days=30)
         )
-        attendance_rate = recent_attendance.filter(status='PRESENT').count() / recent_attendance.count() * 100 if recent_attendance.count() > 0 else 0
+        attendance_stats = (
+            StatsQuery(recent_attendance)
+            .count('total')
+            .count('present', Q(status='PRESENT'))
+            .run()
+        )
+        attendance_rate = percentage(attendance_stats['present'], attendance_stats['total'])
         
         # Financial Analytics
         current_month_collections = FeePayment.objects.filter(
@@ -71,8 +83,8 @@ class AnalyticsViewSet(viewsets.ViewSet):
         
         overview = {
             'student_metrics': {
-                'total_students': total_students,
-                'active_students': active_students,
+                'total_students': student_stats['total_students'],
+                'active_students': student_stats['active_students'],
                 'growth_rate': self._calculate_growth_rate('students', school)
             },
             'academic_performance': {
@@ -120,31 +132,33 @@ class AnalyticsViewSet(viewsets.ViewSet):
             )
         
         # Performance Distribution
-        performance_bands = {
-            'excellent': results_query.filter(percentage__gte=90).count(),
-            'good': results_query.filter(percentage__gte=75, percentage__lt=90).count(),
-            'average': results_query.filter(percentage__gte=60, percentage__lt=75).count(),
-            'below_average': results_query.filter(percentage__gte=35, percentage__lt=60).count(),
-            'poor': results_query.filter(percentage__lt=35).count()
-        }
+        performance_bands = (
+            StatsQuery(results_query)
+            .count('excellent', Q(percentage__gte=90))
+            .count('good', Q(percentage__gte=75, percentage__lt=90))
+            .count('average', Q(percentage__gte=60, percentage__lt=75))
+            .count('below_average', Q(percentage__gte=35, percentage__lt=60))
+            .count('poor', Q(percentage__lt=35))
+            .run()
+        )
         
         # Subject-wise Performance
         subject_performance = []
         if not subject_id:  # If no specific subject, get all subjects
-            from academics.models import Subject
-            subjects = Subject.objects.filter(school=school)
-            for subject in subjects:
-                subject_results = results_query.filter(
-                    exam_schedule__class_subject__subject=subject
-                )
-                if subject_results.exists():
-                    avg_score = subject_results.aggregate(avg=Avg('percentage'))['avg']
-                    subject_performance.append({
-                        'subject_name': subject.name,
-                        'average_score': round(avg_score, 2),
-                        'total_assessments': subject_results.count(),
-                        'pass_rate': subject_results.filter(is_passed=True).count() / subject_results.count() * 100
-                    })
+            subject_stats = (
+                StatsQuery(results_query)
+                .avg('average_score', 'percentage')
+                .count('total_assessments')
+                .count('passed', Q(is_passed=True))
+                .run_grouped('exam_schedule__class_subject__subject_id', 'exam_schedule__class_subject__subject__name')
+            )
+            for row in subject_stats:
+                subject_performance.append({
+                    'subject_name': row['exam_schedule__class_subject__subject__name'],
+                    'average_score': round(row['average_score'], 2),
+                    'total_assessments': row['total_assessments'],
+                    'pass_rate': percentage(row['passed'], row['total_assessments'])
+                })
         
         # Top Performers
         top_performers = self._get_top_performers(school, class_id, subject_id)
@@ -181,37 +195,33 @@ class AnalyticsViewSet(viewsets.ViewSet):
         )
         
         # Overall Attendance Statistics
-        total_records = attendance_data.count()
-        present_count = attendance_data.filter(status='PRESENT').count()
-        absent_count = attendance_data.filter(status='ABSENT').count()
-        late_count = attendance_data.filter(status='LATE').count()
-        
-        overall_stats = {
-            'total_records': total_records,
-            'present_count': present_count,
-            'absent_count': absent_count,
-            'late_count': late_count,
-            'attendance_rate': (present_count / total_records * 100) if total_records > 0 else 0,
-            'punctuality_rate': (present_count / (present_count + late_count) * 100) if (present_count + late_count) > 0 else 0
-        }
+        overall_stats = (
+            StatsQuery(attendance_data)
+            .count('total_records')
+            .count('present_count', Q(status='PRESENT'))
+            .count('absent_count', Q(status='ABSENT'))
+            .count('late_count', Q(status='LATE'))
+            .run()
+        )
+        present_count = overall_stats['present_count']
+        overall_stats['attendance_rate'] = percentage(present_count, overall_stats['total_records'])
+        overall_stats['punctuality_rate'] = percentage(present_count, present_count + overall_stats['late_count'])
         
         # Class-wise Attendance
         class_attendance = []
-        from students.models import SchoolClass
-        classes = SchoolClass.objects.filter(school=school)
-        for cls in classes:
-            class_data = attendance_data.filter(
-                attendance__timetable__school_class=cls
-            )
-            if class_data.exists():
-                class_present = class_data.filter(status='PRESENT').count()
-                class_total = class_data.count()
-                class_attendance.append({
-                    'class_name': cls.name,
-                    'attendance_rate': (class_present / class_total * 100) if class_total > 0 else 0,
-                    'total_records': class_total,
-                    'average_daily_attendance': class_total / 30 if class_total > 0 else 0  # Assuming 30 days
-                })
+        class_stats = (
+            StatsQuery(attendance_data)
+            .count('total')
+            .count('present', Q(status='PRESENT'))
+            .run_grouped('attendance__timetable__school_class_id', 'attendance__timetable__school_class__name')
+        )
+        for row in class_stats:
+            class_attendance.append({
+                'class_name': row['attendance__timetable__school_class__name'],
+                'attendance_rate': percentage(row['present'], row['total']),
+                'total_records': row['total'],
+                'average_daily_attendance': row['total'] / 30  # Assuming 30 days
+            })
         
         # Daily Attendance Trends
         daily_trends = self._get_daily_attendance_trends(school, from_date, to_date)
@@ -380,21 +390,25 @@ class AnalyticsViewSet(viewsets.ViewSet):
         alerts = []
         
         # Check for low attendance classes
-        from students.models import SchoolClass
-        for cls in SchoolClass.objects.filter(school=school):
-            recent_attendance = StudentClassAttendance.objects.filter(
-                attendance__timetable__school_class=cls,
-                attendance__date__gte=timezone.now().date() - timedelta(days=7)
-            )
-            if recent_attendance.exists():
-                attendance_rate = recent_attendance.filter(status='PRESENT').count() / recent_attendance.count() * 100
-                if attendance_rate < 75:
-                    alerts.append({
-                        'type': 'attendance',
-                        'severity': 'high',
-                        'message': f'Low attendance in {cls.name}: {attendance_rate:.1f}%',
-                        'action': 'immediate_intervention_required'
-                    })
+        recent_attendance = StudentClassAttendance.objects.filter(
+            attendance__timetable__school_class__school=school,
+            attendance__date__gte=timezone.now().date() - timedelta(days=7)
+        )
+        class_stats = (
+            StatsQuery(recent_attendance)
+            .count('total')
+            .count('present', Q(status='PRESENT'))
+            .run_grouped('attendance__timetable__school_class_id', 'attendance__timetable__school_class__name')
+        )
+        for row in class_stats:
+            attendance_rate = percentage(row['present'], row['total'])
+            if attendance_rate < 75:
+                alerts.append({
+                    'type': 'attendance',
+                    'severity': 'high',
+                    'message': f"Low attendance in {row['attendance__timetable__school_class__name']}: {attendance_rate:.1f}%",
+                    'action': 'immediate_intervention_required'
+                })
         
         return alerts
     
@@ -500,6 +514,7 @@ class AnalyticsViewSet(viewsets.ViewSet):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@use_replica()
 def generate_custom_report(request):
     """Generate custom analytics reports"""
     report_type = request.GET.get('type')
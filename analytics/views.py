@@ -7,7 +7,8 @@ from datetime import timedelta
 import csv
 
 # Import available models only
-from core.models import Student, Teacher, Grade, Subject, SchoolSettings
+from core.models import Student, Teacher, Grade, Subject
+from core.school_config import get_school_settings
 from fees.models import FeePayment
 from examinations.models import ExamResult
 from academics.models import Attendance
@@ -16,7 +17,7 @@ from hr.models import Employee
 @login_required
 def analytics_dashboard(request):
     """Main Analytics Dashboard"""
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     
     # Basic Statistics
     stats = {
@@ -0,0 +1,199 @@
+# Generated by Django 5.0.6 on 2026-10-18 04:20
+
+import django.core.validators
+import django.db.models.deletion
+import django.utils.timezone
+import phonenumber_field.modelfields
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('core', '0005_hr_enhancements'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Permission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('code', models.CharField(max_length=100, unique=True)),
+                ('name', models.CharField(max_length=200)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('category', models.CharField(choices=[('USER', 'User Management'), ('STUDENT', 'Student Management'), ('TEACHER', 'Teacher Management'), ('ACADEMIC', 'Academic Management'), ('FINANCE', 'Financial Management'), ('LIBRARY', 'Library Management'), ('TRANSPORT', 'Transport Management'), ('HOSTEL', 'Hostel Management'), ('INVENTORY', 'Inventory Management'), ('COMMUNICATION', 'Communication'), ('REPORTS', 'Reports & Analytics'), ('SYSTEM', 'System Configuration')], max_length=20)),
+                ('is_system_permission', models.BooleanField(default=False)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='PasswordHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('password_hash', models.CharField(max_length=128)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='password_history', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Role',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(max_length=100)),
+                ('role_type', models.CharField(choices=[('ADMIN', 'Administrator'), ('PRINCIPAL', 'Principal'), ('VICE_PRINCIPAL', 'Vice Principal'), ('TEACHER', 'Teacher'), ('STUDENT', 'Student'), ('PARENT', 'Parent'), ('ACCOUNTANT', 'Accountant'), ('LIBRARIAN', 'Librarian'), ('TRANSPORT_MANAGER', 'Transport Manager'), ('HOSTEL_WARDEN', 'Hostel Warden'), ('NURSE', 'Nurse'), ('SECURITY', 'Security'), ('MAINTENANCE', 'Maintenance'), ('RECEPTIONIST', 'Receptionist'), ('HR', 'Human Resources'), ('IT_SUPPORT', 'IT Support'), ('CUSTOM', 'Custom Role')], max_length=20)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('permissions', models.JSONField(default=list)),
+                ('is_default', models.BooleanField(default=False)),
+                ('is_active', models.BooleanField(default=True)),
+                ('hierarchy_level', models.IntegerField(default=0, help_text='Higher number = higher authority')),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='roles', to='core.schoolsettings')),
+            ],
+            options={
+                'ordering': ['-hierarchy_level', 'name'],
+                'unique_together': {('school', 'name')},
+            },
+        ),
+        migrations.CreateModel(
+            name='TwoFactorAuth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_enabled', models.BooleanField(default=False)),
+                ('secret_key', models.CharField(blank=True, max_length=32, null=True)),
+                ('backup_codes', models.JSONField(default=list)),
+                ('last_used_code', models.CharField(blank=True, max_length=6, null=True)),
+                ('last_used_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='two_factor_auth', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='LoginSession',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('session_key', models.CharField(max_length=40, unique=True)),
+                ('ip_address', models.GenericIPAddressField()),
+                ('user_agent', models.TextField()),
+                ('device_info', models.JSONField(default=dict)),
+                ('location_info', models.JSONField(blank=True, default=dict)),
+                ('login_time', models.DateTimeField(auto_now_add=True)),
+                ('logout_time', models.DateTimeField(blank=True, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('force_logout', models.BooleanField(default=False)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='login_sessions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-login_time'],
+                'indexes': [models.Index(fields=['user', 'is_active'], name='authenticat_user_id_8b306a_idx'), models.Index(fields=['session_key'], name='authenticat_session_adb9f4_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SecurityEvent',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('event_type', models.CharField(choices=[('LOGIN_SUCCESS', 'Successful Login'), ('LOGIN_FAILED', 'Failed Login'), ('PASSWORD_CHANGE', 'Password Changed'), ('PASSWORD_RESET', 'Password Reset'), ('ACCOUNT_LOCKED', 'Account Locked'), ('ACCOUNT_UNLOCKED', 'Account Unlocked'), ('SUSPICIOUS_ACTIVITY', 'Suspicious Activity'), ('PRIVILEGE_ESCALATION', 'Privilege Escalation'), ('DATA_EXPORT', 'Data Export'), ('SYSTEM_ACCESS', 'System Access')], max_length=30)),
+                ('severity', models.CharField(choices=[('LOW', 'Low'), ('MEDIUM', 'Medium'), ('HIGH', 'High'), ('CRITICAL', 'Critical')], default='LOW', max_length=10)),
+                ('ip_address', models.GenericIPAddressField()),
+                ('user_agent', models.TextField(blank=True, null=True)),
+                ('session_key', models.CharField(blank=True, max_length=40, null=True)),
+                ('description', models.TextField()),
+                ('metadata', models.JSONField(default=dict)),
+                ('is_resolved', models.BooleanField(default=False)),
+                ('resolved_at', models.DateTimeField(blank=True, null=True)),
+                ('resolved_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='resolved_security_events', to=settings.AUTH_USER_MODEL)),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='security_events', to='core.schoolsettings')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['event_type', 'severity'], name='authenticat_event_t_962e1b_idx'), models.Index(fields=['user', 'created_at'], name='authenticat_user_id_92f3ee_idx'), models.Index(fields=['school', 'severity'], name='authenticat_school__d4a2cc_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='UserProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('employee_id', models.CharField(blank=True, max_length=50, null=True)),
+                ('middle_name', models.CharField(blank=True, max_length=50, null=True)),
+                ('gender', models.CharField(blank=True, choices=[('M', 'Male'), ('F', 'Female'), ('O', 'Other'), ('P', 'Prefer not to say')], max_length=1, null=True)),
+                ('date_of_birth', models.DateField(blank=True, null=True)),
+                ('blood_group', models.CharField(blank=True, choices=[('A+', 'A+'), ('A-', 'A-'), ('B+', 'B+'), ('B-', 'B-'), ('AB+', 'AB+'), ('AB-', 'AB-'), ('O+', 'O+'), ('O-', 'O-')], max_length=3, null=True)),
+                ('phone_primary', phonenumber_field.modelfields.PhoneNumberField(blank=True, max_length=128, null=True, region=None)),
+                ('phone_secondary', phonenumber_field.modelfields.PhoneNumberField(blank=True, max_length=128, null=True, region=None)),
+                ('email_personal', models.EmailField(blank=True, max_length=254, null=True)),
+                ('current_address', models.TextField(blank=True, null=True)),
+                ('permanent_address', models.TextField(blank=True, null=True)),
+                ('city', models.CharField(blank=True, max_length=100, null=True)),
+                ('state', models.CharField(blank=True, max_length=100, null=True)),
+                ('postal_code', models.CharField(blank=True, max_length=20, null=True)),
+                ('country', models.CharField(default='India', max_length=100)),
+                ('aadhar_number', models.CharField(blank=True, max_length=12, null=True, unique=True)),
+                ('pan_number', models.CharField(blank=True, max_length=10, null=True, unique=True)),
+                ('passport_number', models.CharField(blank=True, max_length=20, null=True)),
+                ('driving_license', models.CharField(blank=True, max_length=20, null=True)),
+                ('emergency_contact_name', models.CharField(blank=True, max_length=200, null=True)),
+                ('emergency_contact_phone', phonenumber_field.modelfields.PhoneNumberField(blank=True, max_length=128, null=True, region=None)),
+                ('emergency_contact_relation', models.CharField(blank=True, max_length=50, null=True)),
+                ('profile_picture', models.ImageField(blank=True, null=True, upload_to='profile_pictures/')),
+                ('biography', models.TextField(blank=True, null=True)),
+                ('qualification', models.CharField(blank=True, max_length=500, null=True)),
+                ('experience_years', models.IntegerField(default=0, validators=[django.core.validators.MinValueValidator(0)])),
+                ('preferred_language', models.CharField(default='en', max_length=10)),
+                ('timezone', models.CharField(default='Asia/Kolkata', max_length=50)),
+                ('theme_preference', models.CharField(choices=[('LIGHT', 'Light'), ('DARK', 'Dark'), ('AUTO', 'Auto')], default='LIGHT', max_length=20)),
+                ('is_verified', models.BooleanField(default=False)),
+                ('verification_date', models.DateTimeField(blank=True, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('joined_date', models.DateField(auto_now_add=True)),
+                ('last_login_ip', models.GenericIPAddressField(blank=True, null=True)),
+                ('last_activity', models.DateTimeField(blank=True, null=True)),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_profiles', to='core.schoolsettings')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='profile', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['school', 'employee_id'], name='authenticat_school__d00b01_idx'), models.Index(fields=['aadhar_number'], name='authenticat_aadhar__7d5fb5_idx'), models.Index(fields=['pan_number'], name='authenticat_pan_num_1f563b_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='UserRole',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('start_date', models.DateField(default=django.utils.timezone.now)),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('notes', models.TextField(blank=True, null=True)),
+                ('assigned_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='role_assignments_made', to=settings.AUTH_USER_MODEL)),
+                ('role', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_assignments', to='authentication.role')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='role_assignments', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'role')},
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.6 on 2026-10-18 04:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='loginsession',
+            name='authenticat_user_id_8b306a_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='loginsession',
+            name='authenticat_session_adb9f4_idx',
+        ),
+        migrations.AddField(
+            model_name='loginsession',
+            name='expires_at',
+            field=models.DateTimeField(blank=True, help_text='Expiry of the Django session at login', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='loginsession',
+            index=models.Index(fields=['user', 'is_active', 'expires_at'], name='authenticat_user_id_53a5b8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loginsession',
+            index=models.Index(fields=['is_active', 'expires_at'], name='authenticat_is_acti_84df04_idx'),
+        ),
+    ]
@@ -182,14 +182,16 @@ class LoginSession(UUIDModel, TimeStampedModel):
     location_info = models.JSONField(default=dict, blank=True)
     login_time = models.DateTimeField(auto_now_add=True)
     logout_time = models.DateTimeField(blank=True, null=True)
+    expires_at = models.DateTimeField(blank=True, null=True, help_text="Expiry of the Django session at login")
     is_active = models.BooleanField(default=True)
     force_logout = models.BooleanField(default=False)
     
     class Meta:
         ordering = ['-login_time']
         indexes = [
-            models.Index(fields=['user', 'is_active']),
-            models.Index(fields=['session_key']),
+            # Covers the per-user active session count on login
+            models.Index(fields=['user', 'is_active', 'expires_at']),
+            models.Index(fields=['is_active', 'expires_at']),
         ]
     
     def __str__(self):
@@ -0,0 +1,95 @@
+"""
+Active session registry
+
+LoginSession rows are written on login and closed on logout, so counting a
+user's live sessions is one indexed query instead of decoding every row in
+django_session. Sessions that simply expire are closed by the
+cleanup_sessions management command; until then the expires_at filter
+keeps them out of the count.
+"""
+import logging
+
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from .models import LoginSession
+
+logger = logging.getLogger(__name__)
+
+
+def get_client_ip(request):
+    forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if forwarded_for:
+        return forwarded_for.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR') or '0.0.0.0'
+
+
+def register_session(request, user):
+    """Record the session a user has just logged in with"""
+    session = request.session
+    if not session.session_key:
+        session.save()
+    if not session.session_key:
+        return None
+
+    try:
+        with transaction.atomic():
+            login_session, _ = LoginSession.objects.update_or_create(
+                session_key=session.session_key,
+                defaults={
+                    'user': user,
+                    'ip_address': get_client_ip(request),
+                    'user_agent': request.META.get('HTTP_USER_AGENT', ''),
+                    'expires_at': session.get_expiry_date(),
+                    'logout_time': None,
+                    'is_active': True,
+                },
+            )
+    except DatabaseError:
+        logger.warning("Could not register login session for user %s", user.pk, exc_info=True)
+        return None
+    return login_session
+
+
+def end_session(session_key):
+    """Close the registry entry for a session that is logging out"""
+    if not session_key:
+        return 0
+    try:
+        with transaction.atomic():
+            return LoginSession.objects.filter(session_key=session_key, is_active=True).update(
+                is_active=False, logout_time=timezone.now()
+            )
+    except DatabaseError:
+        logger.warning("Could not close login session %s", session_key, exc_info=True)
+        return 0
+
+
+def active_sessions(user=None):
+    """Live sessions, optionally for one user"""
+    queryset = LoginSession.objects.filter(is_active=True, expires_at__gt=timezone.now())
+    if user is not None:
+        queryset = queryset.filter(user=user)
+    return queryset
+
+
+def count_active_sessions(user):
+    """Number of live sessions of `user`, or None when the registry cannot be read"""
+    try:
+        with transaction.atomic():
+            return active_sessions(user).count()
+    except DatabaseError:
+        logger.error("Login session registry unavailable; session limits cannot be checked", exc_info=True)
+        return None
+
+
+def expire_sessions(now=None):
+    """Close registry entries whose session has expired; returns the number closed"""
+    now = now or timezone.now()
+    expired = LoginSession.objects.filter(is_active=True, expires_at__lte=now)
+    closed = expired.update(is_active=False, logout_time=now)
+    # Entries recorded before expires_at existed never expire on their own
+    closed += LoginSession.objects.filter(is_active=True, expires_at__isnull=True).update(
+        is_active=False, logout_time=now
+    )
+    return closed
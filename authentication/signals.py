@@ -0,0 +1,19 @@
+"""
+Keep the LoginSession registry in step with Django logins and logouts
+"""
+from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.dispatch import receiver
+
+from .sessions import register_session, end_session
+
+
+@receiver(user_logged_in)
+def record_login_session(sender, request, user, **kwargs):
+    if request is not None and hasattr(request, 'session'):
+        register_session(request, user)
+
+
+@receiver(user_logged_out)
+def close_login_session(sender, request, user, **kwargs):
+    if request is not None and hasattr(request, 'session'):
+        end_session(request.session.session_key)
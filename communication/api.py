@@ -1,4 +1,5 @@
 from rest_framework import serializers, viewsets
+from core.pagination import KeysetPagination
 from .models import Notice, Notification, Message
 
 # Serializers
@@ -25,6 +26,7 @@ class NoticeViewSet(viewsets.ModelViewSet):
 class NotificationViewSet(viewsets.ModelViewSet):
     queryset = Notification.objects.all()
     serializer_class = NotificationSerializer
+    pagination_class = KeysetPagination
 
 class MessageViewSet(viewsets.ModelViewSet):
     queryset = Message.objects.all()
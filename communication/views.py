@@ -11,7 +11,8 @@ from datetime import datetime, timedelta
 from django.core.mail import send_mass_mail
 from django.core.paginator import Paginator
 from .models import Notice, Notification, Message
-from core.models import Student, Teacher, Grade, SchoolSettings, Employee
+from core.models import Student, Teacher, Grade, Employee
+from core.school_config import get_school_settings
 from django.contrib.auth.models import User
 import csv
 import json
@@ -20,7 +21,7 @@ import json
 @login_required
 def communication_dashboard(request):
     """Advanced Communication Management Dashboard"""
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     
     # Notice Statistics
     notice_stats = {
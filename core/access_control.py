@@ -9,6 +9,10 @@ from django.http import HttpResponseForbidden
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import redirect
 from django.contrib import messages
+from django.db import DatabaseError
+from django.utils import timezone
+
+from .performance import CacheNamespace
 
 # User limits per role
 USER_LIMITS = {
@@ -21,18 +25,90 @@ USER_LIMITS = {
     'STUDENT': {'max_users': 2000, 'session_limit': 1}
 }
 
+# Compiled role/permission sets are cached per user in this namespace.
+# Changes to one user's groups or role assignments drop that user's entry;
+# changes to groups, roles or permissions shared by many users invalidate
+# the whole namespace (see core.signals).
+ACCESS_DOMAIN = 'access'
+ACCESS_CACHE_TIMEOUT = 60 * 60
+
+
+def _access_cache_key(user_id):
+    return f"user:{user_id}"
+
+
+def _compile_user_access(user):
+    """Resolve a user's roles and permission codes from the database"""
+    groups = list(user.groups.order_by('pk').values_list('name', flat=True))
+    roles = list(groups)
+    permissions = set(user.get_all_permissions())
+
+    try:
+        from authentication.models import UserRole
+        today = timezone.now().date()
+        assignments = UserRole.objects.filter(
+            user=user, is_active=True, role__is_active=True, start_date__lte=today,
+        ).exclude(end_date__lt=today).select_related('role').order_by('-role__hierarchy_level')
+        for assignment in assignments:
+            role = assignment.role
+            roles.extend(name for name in (role.role_type, role.name) if name not in roles)
+            permissions.update(role.permissions or [])
+    except DatabaseError:
+        # Custom roles are optional (the authentication tables may not be migrated yet)
+        pass
+
+    primary_role = roles[0] if roles else 'NO_ROLE'
+    return {
+        'roles': tuple(roles),
+        'primary_role': primary_role,
+        'permissions': frozenset(permissions),
+        'level': 'ADMIN' if 'ADMIN' in primary_role else ('USER' if roles else 'GUEST'),
+    }
+
+
+def get_user_access(user):
+    """Compiled roles and permissions for a user
+
+    Built once per user and cached, then memoized on the user object, so
+    repeated authorization checks within a request cost nothing.
+    """
+    if not hasattr(user, '_compiled_access'):
+        user._compiled_access = CacheNamespace(ACCESS_DOMAIN).get_or_set(
+            _access_cache_key(user.pk), lambda: _compile_user_access(user), ACCESS_CACHE_TIMEOUT
+        )
+    return user._compiled_access
+
+
+def invalidate_user_access(user_id=None):
+    """Drop the compiled access for one user, or for every user when user_id is None"""
+    namespace = CacheNamespace(ACCESS_DOMAIN)
+    if user_id is None:
+        namespace.invalidate()
+    else:
+        namespace.delete(_access_cache_key(user_id))
+
+
+def user_has_permission(user, code):
+    """Check a Django ('app.codename') or custom role permission code"""
+    if not user.is_authenticated:
+        return False
+    if user.is_superuser:
+        return True
+    return code in get_user_access(user)['permissions']
+
+
 def role_required(allowed_roles):
     """Decorator to require specific roles for view access"""
     def decorator(view_func):
         @wraps(view_func)
         @login_required
         def wrapper(request, *args, **kwargs):
-            user_roles = [group.name for group in request.user.groups.all()]
-            
             # Allow superusers
             if request.user.is_superuser:
                 return view_func(request, *args, **kwargs)
             
+            user_roles = get_user_access(request.user)['roles']
+            
             # Check if user has required role
             if not any(role in allowed_roles for role in user_roles):
                 messages.error(request, f'Access denied. Required roles: {", ".join(allowed_roles)}')
@@ -44,7 +120,7 @@ def role_required(allowed_roles):
 
 def check_user_session_limit(user):
     """Check if user has exceeded session limits"""
-    user_roles = [group.name for group in user.groups.all()]
+    user_roles = get_user_access(user)['roles']
     
     if not user_roles:
         return True
@@ -52,36 +128,21 @@ def check_user_session_limit(user):
     # Get most restrictive limit
     min_limit = min([USER_LIMITS.get(role, {}).get('session_limit', 1) for role in user_roles])
     
-    # Count active sessions (simplified check)
-    from django.contrib.sessions.models import Session
-    from django.utils import timezone
-    
-    active_sessions = Session.objects.filter(expire_date__gte=timezone.now())
-    user_sessions = 0
+    # Count active sessions from the indexed login session registry
+    from authentication.sessions import count_active_sessions
     
-    for session in active_sessions:
-        try:
-            session_data = session.get_decoded()
-            if session_data.get('_auth_user_id') == str(user.id):
-                user_sessions += 1
-        except:
-            continue
-    
-    return user_sessions <= min_limit
+    active = count_active_sessions(user)
+    # Fail closed: an unreadable registry must not lift the limit
+    return active is not None and active <= min_limit
 
 def get_user_role_info(user):
     """Get user role information"""
     if user.is_superuser:
         return {'role': 'SUPER_ADMIN', 'permissions': 'ALL', 'level': 'ADMIN'}
     
-    user_groups = user.groups.all()
-    if user_groups:
-        primary_role = user_groups.first().name
-        permission_count = user_groups.first().permissions.count()
-        return {
-            'role': primary_role,
-            'permissions': permission_count,
-            'level': 'ADMIN' if 'ADMIN' in primary_role else 'USER'
-        }
-    
-    return {'role': 'NO_ROLE', 'permissions': 0, 'level': 'GUEST'}
+    access = get_user_access(user)
+    return {
+        'role': access['primary_role'],
+        'permissions': len(access['permissions']),
+        'level': access['level'],
+    }
@@ -1,4 +1,4 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from .models import (
     SchoolSettings, AcademicYear, Campus, Department, Building, Room, 
     SystemConfiguration, Subject, Grade, Teacher, Student, FeeCategory, 
@@ -9,6 +9,7 @@ from .models import (
     Employee, PayrollStructure, EmployeePayroll, LeaveType, LeaveApplication,
     PerformanceReview, TrainingProgram, TrainingEnrollment, HRAnalytics
 )
+from .snapshots import SnapshotUnavailable, get_snapshot_dir, write_snapshots
 
 @admin.register(SchoolSettings)
 class SchoolSettingsAdmin(admin.ModelAdmin):
@@ -42,6 +43,16 @@ class AcademicYearAdmin(admin.ModelAdmin):
     search_fields = ['name']
     ordering = ['-start_date']
     date_hierarchy = 'start_date'
+    actions = ['write_analytics_snapshots']
+    
+    @admin.action(description='Write analytics snapshots (Parquet/Arrow) for every school')
+    def write_analytics_snapshots(self, request, queryset):
+        try:
+            manifests = write_snapshots(SchoolSettings.objects.order_by('pk'), queryset.order_by('start_date'))
+        except SnapshotUnavailable as exc:
+            self.message_user(request, str(exc), messages.ERROR)
+            return
+        self.message_user(request, f'Wrote {len(manifests)} snapshot partition(s) to {get_snapshot_dir()}')
 
 @admin.register(Campus)
 class CampusAdmin(admin.ModelAdmin):
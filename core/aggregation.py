@@ -0,0 +1,71 @@
+"""
+Batched conditional aggregation
+
+Reports that need several counts and sums over the same queryset can
+describe them once and have them computed in a single SQL statement with
+Count(filter=Q(...)) / Sum(filter=Q(...)), instead of one
+filter(...).count() query per figure:
+
+    stats = (StatsQuery(attendance)
+             .count('total')
+             .count('present', Q(status='PRESENT'))
+             .sum('fine', 'fine_amount', Q(status='LATE'))
+             .run())
+
+run_grouped() computes the same figures per group (one GROUP BY query),
+replacing per-class or per-subject loops.
+"""
+from django.db.models import Avg, Count, Max, Min, Sum
+
+
+def percentage(part, whole, digits=None):
+    """part / whole * 100, or 0 when whole is empty"""
+    if not whole:
+        return 0
+    value = float(part) / float(whole) * 100
+    return round(value, digits) if digits is not None else value
+
+
+class StatsQuery:
+    """Named aggregate specs over one base queryset, evaluated together"""
+
+    def __init__(self, queryset):
+        self.queryset = queryset
+        self.aggregates = {}
+
+    def add(self, name, aggregate):
+        """Add an arbitrary aggregate expression under `name`"""
+        if name in self.aggregates:
+            raise ValueError(f"Duplicate statistic name: {name}")
+        self.aggregates[name] = aggregate
+        return self
+
+    def count(self, name, condition=None, field='pk', distinct=False):
+        return self.add(name, Count(field, filter=condition, distinct=distinct))
+
+    def sum(self, name, field, condition=None, default=0):
+        return self.add(name, Sum(field, filter=condition, default=default))
+
+    def avg(self, name, field, condition=None, default=0):
+        return self.add(name, Avg(field, filter=condition, default=default))
+
+    def max(self, name, field, condition=None, default=None):
+        return self.add(name, Max(field, filter=condition, default=default))
+
+    def min(self, name, field, condition=None, default=None):
+        return self.add(name, Min(field, filter=condition, default=default))
+
+    def run(self):
+        """Evaluate every statistic in one query and return them as a dict"""
+        if not self.aggregates:
+            return {}
+        return self.queryset.aggregate(**self.aggregates)
+
+    def run_grouped(self, *fields):
+        """Evaluate every statistic per distinct value of `fields` in one query
+
+        Returns a list of dicts holding the group fields and the statistics.
+        """
+        return list(
+            self.queryset.order_by().values(*fields).annotate(**self.aggregates).order_by(*fields)
+        )
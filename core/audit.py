@@ -0,0 +1,443 @@
+"""
+Buffered audit logging
+
+audit_log() queues an AuditLog entry in process memory and returns
+immediately; a background thread writes queued entries with bulk_create
+every FLUSH_INTERVAL seconds (or once BATCH_SIZE entries are waiting).
+Every queued entry is also appended to a per-process journal file in
+SPILL_DIR, which is deleted once its entries are in the database, so
+entries survive the process dying before a flush. Journals left behind by
+dead processes or failed writes are replayed by the writer on start-up and
+by the flush_audit_log command. Entries carry their own UUID, so a replay
+never duplicates a row.
+
+Entries are queued when the surrounding transaction commits, so changes
+that are rolled back leave no audit entry.
+
+Models listed in AUDIT_LOG['MODELS'] are audited automatically with
+field-level diffs: updating an audited instance reads its stored row in
+pre_save (one query, only for audited updates) and the diff is computed
+in post_save. Loading instances costs nothing extra. AuditContextMiddleware
+supplies the user, IP address and session for entries created during a
+request.
+"""
+import atexit
+import contextvars
+import glob
+import json
+import logging
+import os
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import AuditLog, SchoolSettings
+
+logger = logging.getLogger(__name__)
+
+AUDIT_DEFAULTS = {
+    'ENABLED': True,
+    # False writes each entry immediately (useful in tests and scripts)
+    'ASYNC': True,
+    'BATCH_SIZE': 200,
+    'FLUSH_INTERVAL': 2.0,
+    'SPILL_DIR': None,
+    # {'app_label.Model': risk_level} audited with field-level diffs
+    'MODELS': {},
+    'EXCLUDE_FIELDS': ['created_at', 'updated_at', 'last_login'],
+    'MASKED_FIELDS': ['password'],
+    # Days entries stay in the table per risk level before archive_audit_log
+    # moves them to compressed archives (None keeps them forever)
+    'RETENTION_DAYS': {'LOW': 90, 'MEDIUM': 180, 'HIGH': 365, 'CRITICAL': None},
+    'ARCHIVE_DIR': None,
+}
+
+DEFAULT_IP_ADDRESS = '0.0.0.0'
+MASK = '********'
+
+
+def get_audit_setting(name):
+    return getattr(settings, 'AUDIT_LOG', {}).get(name, AUDIT_DEFAULTS[name])
+
+
+def get_spill_dir():
+    return get_audit_setting('SPILL_DIR') or os.path.join(settings.BASE_DIR, 'audit_spill')
+
+
+# Request context ------------------------------------------------------------
+
+_audit_context = contextvars.ContextVar('audit_context', default=None)
+
+
+def get_client_ip(request):
+    forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if forwarded_for:
+        return forwarded_for.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR') or DEFAULT_IP_ADDRESS
+
+
+class AuditContextMiddleware:
+    """Expose the current request to audit entries created while handling it"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _audit_context.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            _audit_context.reset(token)
+
+
+def _request_details(request):
+    from .performance import get_request_school_id
+
+    user = getattr(request, 'user', None)
+    session = getattr(request, 'session', None)
+    return {
+        'user_id': user.pk if user is not None and user.is_authenticated else None,
+        'school_id': get_request_school_id(request),
+        'session_key': getattr(session, 'session_key', None),
+        'ip_address': get_client_ip(request),
+        'user_agent': request.META.get('HTTP_USER_AGENT', '')[:500],
+    }
+
+
+# Writer ---------------------------------------------------------------------
+
+def _entry_to_instance(entry):
+    data = dict(entry)
+    data['id'] = uuid.UUID(data['id'])
+    data['created_at'] = parse_datetime(data['created_at'])
+    return AuditLog(**data)
+
+
+def write_entries(entries):
+    """Insert serialized entries; returns the number written
+
+    Entries without a school are attributed to the default school, as the
+    audit log requires one. Inserting is idempotent (conflicting ids are
+    ignored).
+    """
+    if not entries:
+        return 0
+    if any(entry.get('school_id') is None for entry in entries):
+        default_school = SchoolSettings.objects.order_by('pk').values_list('pk', flat=True).first()
+        if default_school is None:
+            logger.warning("Dropping %d audit entries: no school configured", len(entries))
+            return 0
+        entries = [
+            {**entry, 'school_id': default_school} if entry.get('school_id') is None else entry
+            for entry in entries
+        ]
+
+    # created_at is the time of the event, not an auto_now_add insert time
+    instances = [_entry_to_instance(entry) for entry in entries]
+    AuditLog.objects.bulk_create(instances, batch_size=get_audit_setting('BATCH_SIZE'), ignore_conflicts=True)
+    return len(instances)
+
+
+def _read_journal(path):
+    entries = []
+    with open(path, encoding='utf-8') as journal:
+        for line in journal:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # A torn last line from a process killed mid-write
+                logger.warning("Skipping unreadable audit journal line in %s", path)
+    return entries
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class AuditWriter:
+    """In-process audit entry buffer with a journal and a background flusher"""
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self.pid = os.getpid()
+        # Distinguishes journals of a later process that reuses this pid
+        self.token = uuid.uuid4().hex[:8]
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.pending = []
+        self.journal = None
+        self.journal_path = None
+        self.journal_sequence = 0
+        self.thread = None
+
+    def _check_fork(self):
+        # A forked worker must not share the parent's buffer or journal
+        if self.pid != os.getpid():
+            self._reset()
+
+    def _open_journal(self):
+        spill_dir = get_spill_dir()
+        os.makedirs(spill_dir, exist_ok=True)
+        self.journal_sequence += 1
+        self.journal_path = os.path.join(spill_dir, f'audit-{self.pid}-{self.token}-{self.journal_sequence}.jsonl')
+        self.journal = open(self.journal_path, 'a', encoding='utf-8')
+
+    def enqueue(self, entry):
+        self._check_fork()
+        line = json.dumps(entry, cls=DjangoJSONEncoder)
+        if not get_audit_setting('ASYNC'):
+            self._write_now(json.loads(line))
+            return
+
+        with self.lock:
+            try:
+                if self.journal is None:
+                    self._open_journal()
+                self.journal.write(line + '\n')
+                self.journal.flush()
+            except OSError:
+                logger.warning("Audit journal unavailable; entry is only buffered in memory", exc_info=True)
+            self.pending.append(json.loads(line))
+            batch_ready = len(self.pending) >= get_audit_setting('BATCH_SIZE')
+
+        self._ensure_thread()
+        if batch_ready:
+            self.wakeup.set()
+
+    def _write_now(self, entry):
+        try:
+            write_entries([entry])
+        except DatabaseError:
+            logger.exception("Could not write audit entry; kept for replay")
+            self._spill([entry])
+
+    def flush(self):
+        """Write every buffered entry now; returns the number written"""
+        self._check_fork()
+        with self.lock:
+            batch, self.pending = self.pending, []
+            journal, journal_path = self.journal, self.journal_path
+            self.journal = self.journal_path = None
+        if journal is not None:
+            journal.close()
+        if not batch:
+            if journal_path:
+                os.remove(journal_path)
+            return 0
+
+        try:
+            written = write_entries(batch)
+        except DatabaseError:
+            # Keep the journal so the entries can be replayed later
+            logger.exception("Could not write %d audit entries; kept for replay", len(batch))
+            if journal_path:
+                os.replace(journal_path, journal_path + '.pending')
+            else:
+                self._spill(batch)
+            return 0
+        if journal_path:
+            os.remove(journal_path)
+        return written
+
+    def _spill(self, entries):
+        try:
+            spill_dir = get_spill_dir()
+            os.makedirs(spill_dir, exist_ok=True)
+            path = os.path.join(spill_dir, f'audit-{self.pid}-{uuid.uuid4().hex}.jsonl.pending')
+            with open(path, 'w', encoding='utf-8') as spill:
+                for entry in entries:
+                    spill.write(json.dumps(entry, cls=DjangoJSONEncoder) + '\n')
+        except OSError:
+            logger.exception("Lost %d audit entries: spill directory unavailable", len(entries))
+
+    def _ensure_thread(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        with self.lock:
+            if self.thread is not None and self.thread.is_alive():
+                return
+            self.thread = threading.Thread(target=self._run, name='audit-log-writer', daemon=True)
+            self.thread.start()
+
+    def _run(self):
+        try:
+            replay_spilled()
+        except Exception:
+            logger.exception("Audit journal replay failed")
+        while True:
+            self.wakeup.wait(get_audit_setting('FLUSH_INTERVAL'))
+            self.wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Audit log flush failed")
+            finally:
+                connection.close()
+
+
+audit_writer = AuditWriter()
+atexit.register(lambda: audit_writer.flush() if audit_writer.pending else None)
+
+
+def replay_spilled():
+    """Write entries left in journals by failed flushes or dead processes
+
+    Returns the number of entries written.
+    """
+    written = 0
+    for path in sorted(glob.glob(os.path.join(get_spill_dir(), 'audit-*.jsonl*'))):
+        if not path.endswith('.pending'):
+            try:
+                pid = int(os.path.basename(path).split('-')[1])
+            except (IndexError, ValueError):
+                continue
+            if pid == os.getpid() or _process_alive(pid):
+                continue
+        try:
+            entries = _read_journal(path)
+            written += write_entries(entries)
+        except FileNotFoundError:
+            continue
+        except DatabaseError:
+            logger.exception("Could not replay audit journal %s", path)
+            continue
+        os.remove(path)
+    return written
+
+
+# Public API -----------------------------------------------------------------
+
+def audit_log(action_type, request=None, user=None, instance=None, description=None, changes=None,
+              risk_level='LOW', model_name=None, object_id=None, school=None):
+    """Queue an AuditLog entry without writing it on the request path
+
+    User, school, IP address and session default to the given request, or
+    to the current request when AuditContextMiddleware is installed. The
+    entry is queued once the current transaction commits (immediately
+    outside one) and dropped if it rolls back.
+    """
+    if not get_audit_setting('ENABLED'):
+        return None
+
+    request = request if request is not None else _audit_context.get()
+    entry = {
+        'id': str(uuid.uuid4()),
+        'created_at': timezone.now().isoformat(),
+        'user_id': None,
+        'school_id': None,
+        'session_key': None,
+        'ip_address': DEFAULT_IP_ADDRESS,
+        'user_agent': '',
+        'action_type': action_type,
+        'model_name': model_name,
+        'object_id': object_id,
+        'content_type_id': None,
+        'object_pk': None,
+        'changes': changes or {},
+        'description': description,
+        'risk_level': risk_level,
+    }
+    if request is not None:
+        entry.update(_request_details(request))
+    if user is not None:
+        entry['user_id'] = user.pk
+    if school is not None:
+        entry['school_id'] = getattr(school, 'pk', school)
+    if instance is not None:
+        from django.contrib.contenttypes.models import ContentType
+
+        entry['model_name'] = model_name or instance.__class__.__name__
+        entry['object_id'] = object_id or str(instance.pk)
+        entry['object_pk'] = str(instance.pk)
+        entry['content_type_id'] = ContentType.objects.get_for_model(instance.__class__).pk
+        if entry['school_id'] is None and getattr(instance, 'school_id', None) is not None:
+            entry['school_id'] = instance.school_id
+
+    transaction.on_commit(lambda: audit_writer.enqueue(entry), robust=True)
+    return entry['id']
+
+
+# Automatic model change capture --------------------------------------------
+
+def _serialize_value(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return json.loads(json.dumps(value, default=str))
+
+
+def _audited_fields(instance):
+    exclude = set(get_audit_setting('EXCLUDE_FIELDS'))
+    deferred = instance.get_deferred_fields()
+    return [
+        field for field in instance._meta.concrete_fields
+        if field.name not in exclude and field.attname not in deferred and not field.primary_key
+    ]
+
+
+def _field_snapshot(instance):
+    return {field.attname: _serialize_value(field.value_from_object(instance)) for field in _audited_fields(instance)}
+
+
+def _model_risk_level(model):
+    return get_audit_setting('MODELS').get(model._meta.label, 'LOW')
+
+
+def capture_stored_values(sender, instance, raw=False, **kwargs):
+    """pre_save: remember the stored values of an updated row for diffing"""
+    instance._audit_previous = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    names = [field.name for field in _audited_fields(instance)]
+    stored = sender._base_manager.using(instance._state.db or kwargs.get('using')).filter(
+        pk=instance.pk
+    ).only(*names).first()
+    if stored is not None:
+        instance._audit_previous = _field_snapshot(stored)
+
+
+def audit_model_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    current = _field_snapshot(instance)
+    masked = set(get_audit_setting('MASKED_FIELDS'))
+    if created:
+        changes = {name: {'old': None, 'new': value} for name, value in current.items()}
+    else:
+        previous = getattr(instance, '_audit_previous', None)
+        if previous is None:
+            # No stored row to compare with (e.g. saved with a new primary key)
+            changes = {name: {'new': value} for name, value in current.items()}
+        else:
+            changes = {
+                name: {'old': previous.get(name), 'new': value}
+                for name, value in current.items() if previous.get(name) != value
+            }
+            if not changes:
+                return
+    for name in masked.intersection(changes):
+        changes[name] = {'old': MASK, 'new': MASK} if 'old' in changes[name] else {'new': MASK}
+
+    audit_log('CREATE' if created else 'UPDATE', instance=instance, changes=changes,
+              description=f"{instance._meta.verbose_name} {'created' if created else 'updated'}",
+              risk_level=_model_risk_level(sender))
+
+
+def audit_model_delete(sender, instance, **kwargs):
+    audit_log('DELETE', instance=instance, description=f"{instance._meta.verbose_name} deleted",
+              risk_level=_model_risk_level(sender))
@@ -0,0 +1,141 @@
+"""
+AuditLog retention and archival
+
+Entries older than the retention period of their risk level are moved out
+of the AuditLog table into monthly gzip-compressed JSONL files
+(audit-YYYY-MM.jsonl.gz), keeping the hot table small. Each batch is
+appended to the archive as a new gzip member before its rows are deleted,
+so an interrupted run can at worst archive a row twice (searches skip the
+duplicate), never lose it. The archives stay searchable offline with
+search_archived_logs() / the search_audit_archive command, or plain zcat.
+"""
+import glob
+import gzip
+import json
+import logging
+import os
+import zlib
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .audit import get_audit_setting
+from .models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FIELDS = [
+    'id', 'created_at', 'school_id', 'user_id', 'session_key', 'ip_address', 'user_agent',
+    'action_type', 'model_name', 'object_id', 'content_type_id', 'object_pk', 'changes',
+    'description', 'risk_level',
+]
+
+
+def get_archive_dir():
+    return get_audit_setting('ARCHIVE_DIR') or os.path.join(settings.BASE_DIR, 'audit_archive')
+
+
+def archive_path(archive_dir, month):
+    """Archive file for a 'YYYY-MM' month"""
+    return os.path.join(archive_dir, f'audit-{month}.jsonl.gz')
+
+
+def retention_cutoffs(now=None):
+    """{risk_level: datetime} before which entries are archived"""
+    now = now or timezone.now()
+    return {
+        risk_level: now - timedelta(days=days)
+        for risk_level, days in get_audit_setting('RETENTION_DAYS').items()
+        if days is not None
+    }
+
+
+def archive_audit_logs(now=None, archive_dir=None, batch_size=1000, dry_run=False):
+    """Move entries past their retention period to the archive
+
+    Returns {risk_level: number of entries archived (or due, for dry runs)}.
+    """
+    archive_dir = archive_dir or get_archive_dir()
+    archived = {}
+    for risk_level, cutoff in retention_cutoffs(now).items():
+        queryset = AuditLog.objects.filter(risk_level=risk_level, created_at__lt=cutoff)
+        if dry_run:
+            archived[risk_level] = queryset.count()
+            continue
+
+        os.makedirs(archive_dir, exist_ok=True)
+        archived[risk_level] = 0
+        while True:
+            # Archived rows are deleted, so every batch starts at the oldest remaining row
+            rows = list(
+                queryset.order_by('created_at', 'id')
+                .values(*ARCHIVE_FIELDS, username=F('user__username'))[:batch_size]
+            )
+            if not rows:
+                break
+            by_month = defaultdict(list)
+            for row in rows:
+                by_month[row['created_at'].strftime('%Y-%m')].append(row)
+            for month, month_rows in by_month.items():
+                with gzip.open(archive_path(archive_dir, month), 'at', encoding='utf-8') as archive:
+                    for row in month_rows:
+                        archive.write(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+            AuditLog.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+            archived[risk_level] += len(rows)
+    return archived
+
+
+def _read_archive(path):
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as archive:
+            for line in archive:
+                yield json.loads(line)
+    except (EOFError, OSError, zlib.error, ValueError):
+        # Truncated last member from an interrupted run; earlier entries are intact
+        logger.warning("Stopped reading damaged audit archive %s", path)
+
+
+def search_archived_logs(archive_dir=None, start=None, end=None, action_type=None, risk_level=None,
+                         username=None, model_name=None, object_id=None, text=None):
+    """Yield archived entries matching every given filter, oldest month first
+
+    start/end are dates (inclusive) limiting both the files read and the
+    entries returned; text is matched case-insensitively against the
+    description and the recorded changes.
+    """
+    archive_dir = archive_dir or get_archive_dir()
+    text = text.lower() if text else None
+    seen = set()
+    for path in sorted(glob.glob(os.path.join(archive_dir, 'audit-*.jsonl.gz'))):
+        month = os.path.basename(path)[len('audit-'):-len('.jsonl.gz')]
+        if start and month < start.strftime('%Y-%m'):
+            continue
+        if end and month > end.strftime('%Y-%m'):
+            continue
+        for entry in _read_archive(path):
+            if entry['id'] in seen:
+                continue
+            created = parse_datetime(entry['created_at'])
+            if start and created.date() < start:
+                continue
+            if end and created.date() > end:
+                continue
+            if action_type and entry['action_type'] != action_type:
+                continue
+            if risk_level and entry['risk_level'] != risk_level:
+                continue
+            if username and entry.get('username') != username:
+                continue
+            if model_name and entry['model_name'] != model_name:
+                continue
+            if object_id and entry['object_id'] != str(object_id):
+                continue
+            if text and text not in f"{entry['description'] or ''} {json.dumps(entry['changes'])}".lower():
+                continue
+            seen.add(entry['id'])
+            yield entry
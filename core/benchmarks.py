@@ -0,0 +1,318 @@
+"""
+Endpoint benchmarks with query and latency budgets
+
+Runs the hot endpoints through the full middleware stack with the test
+Client, against a throwaway database filled by the synthetic data
+generator at one or more scale factors. Each endpoint is requested a few
+times after a warm-up; p50/p95 latency and the query count (via
+QueryProfiler) are recorded per scale. Results are stored as a JSON
+baseline, and later runs are compared against it: an endpoint regresses
+when its query count grows beyond QUERY_TOLERANCE, its p95 grows by more
+than LATENCY_TOLERANCE (plus LATENCY_SLACK_MS, to absorb timer noise on
+fast endpoints), it fails or cannot be served, or it has no baseline entry
+to be checked against. A failing endpoint stays a regression until it is
+fixed, whatever the baseline recorded for it.
+
+Most app URLconfs are not mounted in the project URLconf, so the benchmark
+URLconf mounts every benchmarked view under /__benchmark__/<name>/ next to
+the project and app URLs (the latter so that redirects resolve).
+"""
+import json
+import logging
+import os
+import time
+import types
+from contextlib import contextmanager
+from datetime import date
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.urls import include, path
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Grade, SchoolSettings
+from .performance import QueryProfiler
+from .replicas import get_replica_setting
+from .synthetic_data import SyntheticDataGenerator
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_DEFAULTS = {
+    'BASELINE_FILE': None,        # Defaults to BASE_DIR/benchmarks/baseline.json
+    'SCALES': [0.02, 0.1],
+    'YEARS': 1,
+    'SEED': 42,
+    'ITERATIONS': 10,
+    'WARMUP': 2,
+    'LATENCY_TOLERANCE': 0.25,    # Allowed relative p95 growth
+    'LATENCY_SLACK_MS': 5.0,      # Allowed absolute p95 growth on top of that
+    'QUERY_TOLERANCE': 0,         # Allowed extra queries per request
+}
+
+# Mounted so that reverse() in redirects and templates works; apps whose
+# URLconf fails to import are left out
+APP_URLCONFS = ['academics', 'fees', 'students', 'examinations', 'hr', 'analytics']
+
+
+def get_benchmark_setting(name):
+    return getattr(settings, 'BENCHMARKS', {}).get(name, BENCHMARK_DEFAULTS[name])
+
+
+def get_baseline_file():
+    return get_benchmark_setting('BASELINE_FILE') or os.path.join(settings.BASE_DIR, 'benchmarks', 'baseline.json')
+
+
+def _attendance_form(context):
+    data = {'date': context['today'].isoformat(), 'grade': context['grade_id']}
+    for student_id in context['grade_students']:
+        data[f'student_{student_id}'] = 'PRESENT'
+    return data
+
+
+class Endpoint:
+    """One benchmarked view; `data` may be a callable taking the run context
+
+    `route` extends the mount path with URL parameters (e.g. '<uuid:pk>/')
+    for detail views.
+    """
+
+    def __init__(self, name, view, method='get', data=None, actions=None, route=''):
+        self.name = name
+        self.view = view
+        self.method = method
+        self.data = data
+        self.actions = actions
+        self.route = route
+
+    @property
+    def url_name(self):
+        return f'benchmark-{self.name}'
+
+    def resolve_view(self):
+        view = import_string(self.view)
+        if self.actions:
+            return view.as_view(self.actions)
+        return view
+
+    def request_data(self, context):
+        return self.data(context) if callable(self.data) else (self.data or {})
+
+
+ENDPOINTS = [
+    Endpoint('core_dashboard', 'core.views.dashboard'),
+    Endpoint('fee_reports', 'fees.views.fee_reports'),
+    Endpoint('outstanding_fees_report', 'fees.views.outstanding_fees_report'),
+    Endpoint('fee_defaulter_tracking', 'fees.views.fee_defaulter_tracking'),
+    Endpoint('analytics_overview', 'analytics.api.AnalyticsViewSet', actions={'get': 'dashboard_overview'}),
+    Endpoint('student_search', 'students.api.student_search_api', data={'q': 'Sharma'}),
+    Endpoint('attendance_marking', 'academics.views.mark_attendance', method='post', data=_attendance_form),
+    Endpoint('exam_analytics', 'examinations.views.exam_analytics'),
+    Endpoint('payroll_processing', 'hr.views.generate_payroll', method='post',
+             data=lambda context: {'month': context['today'].month, 'year': context['today'].year}),
+]
+
+
+def build_urlconf(endpoints):
+    """URLconf module serving the project URLs plus every endpoint; returns (module, unavailable names)"""
+    patterns = [path('', include(settings.ROOT_URLCONF))]
+    for app in APP_URLCONFS:
+        try:
+            patterns.append(path(f'__apps__/{app}/', include((f'{app}.urls', app))))
+        except Exception:
+            logger.warning("Benchmarks: %s URLs unavailable", app, exc_info=True)
+
+    unavailable = {}
+    for endpoint in endpoints:
+        try:
+            view = endpoint.resolve_view()
+        except Exception as exc:
+            unavailable[endpoint.name] = f'{type(exc).__name__}: {exc}'
+            continue
+        patterns.append(path(f'__benchmark__/{endpoint.name}/{endpoint.route}', view, name=endpoint.url_name))
+
+    urlconf = types.ModuleType('core_benchmark_urls')
+    urlconf.urlpatterns = patterns
+    return urlconf, unavailable
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    rank = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def benchmark_endpoint(client, endpoint, context, iterations, warmup):
+    url = f'/__benchmark__/{endpoint.name}/'
+    request = getattr(client, endpoint.method)
+    latencies, queries, statuses = [], [], []
+    error = None
+    for iteration in range(warmup + iterations):
+        data = endpoint.request_data(context)
+        with QueryProfiler() as profiler:
+            started = time.perf_counter()
+            response = request(url, data)
+            elapsed = time.perf_counter() - started
+        if iteration >= warmup:
+            latencies.append(elapsed * 1000)
+            queries.append(profiler.query_count)
+            statuses.append(response.status_code)
+        if getattr(response, 'exc_info', None):
+            error = f'{response.exc_info[0].__name__}: {response.exc_info[1]}'
+    result = {
+        'status': max(statuses),
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'queries': max(queries),
+    }
+    if error:
+        result['error'] = error[:500]
+    return result
+
+
+@contextmanager
+def benchmark_database():
+    """A fresh test database for the duration of one scale's run
+
+    A configured read replica mirrors the test database, so views reading
+    through use_replica() never touch the real replica.
+    """
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    replica = get_replica_setting('ALIAS')
+    replica_settings = None
+    if replica in settings.DATABASES:
+        replica_settings = connections[replica].settings_dict
+        connections[replica].close()
+        connections[replica].creation.set_as_test_mirror(connection.settings_dict)
+    try:
+        yield
+    finally:
+        if replica_settings is not None:
+            connections[replica].close()
+            connections[replica].settings_dict = replica_settings
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+@contextmanager
+def benchmark_environment(scale, seed, years, urlconf):
+    """Fresh database generated at `scale`, serving `urlconf`; yields (client, context)
+
+    The client is logged in as a superuser; the context carries the values
+    endpoints build their request data from.
+    """
+    with benchmark_database(), override_settings(ROOT_URLCONF=urlconf):
+        cache.clear()
+        SyntheticDataGenerator(scale=scale, seed=seed, years=years, log=lambda message: None).run()
+
+        user = User.objects.create_superuser('benchmark', 'benchmark@example.com', None)
+        school = SchoolSettings.objects.order_by('pk').first()
+        if school is not None and apps.is_installed('authentication'):
+            # Views scoped to the user's school need a profile
+            apps.get_model('authentication', 'UserProfile').objects.create(user=user, school=school)
+        client = Client(raise_request_exception=False)
+        client.force_login(user)
+        grade = Grade.objects.filter(students__isnull=False).order_by('pk').first()
+        context = {
+            'today': date.today(),
+            'grade_id': grade.pk if grade else '',
+            'grade_students': list(grade.students.values_list('pk', flat=True)) if grade else [],
+        }
+        yield client, context
+
+
+def run_benchmarks(scales=None, endpoints=None, iterations=None, warmup=None, seed=None, years=None, log=None):
+    """Benchmark `endpoints` at every scale; returns {'scales': {scale: {endpoint: result}}}"""
+    scales = scales or get_benchmark_setting('SCALES')
+    endpoints = endpoints or ENDPOINTS
+    iterations = iterations or get_benchmark_setting('ITERATIONS')
+    warmup = get_benchmark_setting('WARMUP') if warmup is None else warmup
+    seed = get_benchmark_setting('SEED') if seed is None else seed
+    years = years or get_benchmark_setting('YEARS')
+    log = log or logger.info
+
+    urlconf, unavailable = build_urlconf(endpoints)
+    results = {
+        'created_at': timezone.now().isoformat(), 'seed': seed, 'years': years,
+        'endpoints': [endpoint.name for endpoint in endpoints], 'scales': {},
+    }
+    setup_test_environment()
+    try:
+        for scale in scales:
+            log(f'Scale {scale}: generating data...')
+            with benchmark_environment(scale, seed, years, urlconf) as (client, context):
+                scale_results = {}
+                for endpoint in endpoints:
+                    if endpoint.name in unavailable:
+                        scale_results[endpoint.name] = {'status': None, 'error': unavailable[endpoint.name]}
+                        continue
+                    result = benchmark_endpoint(client, endpoint, context, iterations, warmup)
+                    scale_results[endpoint.name] = result
+                    log(f'  {endpoint.name}: status {result["status"]}, p50 {result["p50_ms"]}ms, '
+                        f'p95 {result["p95_ms"]}ms, {result["queries"]} queries')
+                results['scales'][str(scale)] = scale_results
+    finally:
+        teardown_test_environment()
+    return results
+
+
+def _succeeded(result):
+    return result.get('status') is not None and result['status'] < 400
+
+
+def compare_to_baseline(results, baseline):
+    """Regressions of `results` against `baseline`, as human-readable strings"""
+    latency_tolerance = get_benchmark_setting('LATENCY_TOLERANCE')
+    latency_slack = get_benchmark_setting('LATENCY_SLACK_MS')
+    query_tolerance = get_benchmark_setting('QUERY_TOLERANCE')
+
+    regressions = []
+    for scale, scale_results in results['scales'].items():
+        baseline_results = baseline.get('scales', {}).get(scale, {})
+        benchmarked = results.get('endpoints', list(scale_results))
+        for name in baseline_results:
+            if name in benchmarked and name not in scale_results:
+                regressions.append(f'{name} @ scale {scale}: missing from this run')
+        for name, result in scale_results.items():
+            label = f'{name} @ scale {scale}'
+            if not _succeeded(result):
+                regressions.append(f'{label}: fails with status {result.get("status")} ({result.get("error", "")})')
+                continue
+            previous = baseline_results.get(name)
+            if previous is None:
+                regressions.append(f'{label}: no baseline entry; record one with --update-baseline')
+                continue
+            if not _succeeded(previous):
+                # Fixed since the baseline: nothing to compare against yet
+                continue
+            if result['queries'] > previous['queries'] + query_tolerance:
+                regressions.append(f'{label}: {result["queries"]} queries, baseline {previous["queries"]}')
+            allowed = previous['p95_ms'] * (1 + latency_tolerance) + latency_slack
+            if result['p95_ms'] > allowed:
+                regressions.append(
+                    f'{label}: p95 {result["p95_ms"]}ms, baseline {previous["p95_ms"]}ms (budget {allowed:.2f}ms)'
+                )
+    return regressions
+
+
+def load_baseline(path=None):
+    path = path or get_baseline_file()
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as baseline_file:
+        return json.load(baseline_file)
+
+
+def save_baseline(results, path=None):
+    path = path or get_baseline_file()
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as baseline_file:
+        json.dump(results, baseline_file, indent=2, sort_keys=True)
+        baseline_file.write('\n')
+    return path
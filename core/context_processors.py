@@ -1,29 +1,19 @@
 from django.conf import settings
-from .models import School, SystemConfiguration
+from .performance import get_request_school_id
+from .school_config import get_school_config
 
 def school_context(request):
     """Add school context to all templates"""
     context = {}
     
     if hasattr(request, 'user') and request.user.is_authenticated:
-        try:
-            # Get user's school from profile
-            if hasattr(request.user, 'profile'):
-                school = request.user.profile.school
-                context['current_school'] = school
-                
-                # Get system configurations for the school
-                configs = SystemConfiguration.objects.filter(school=school)
-                school_config = {}
-                for config in configs:
-                    school_config[config.key] = config.value
-                
-                context['school_config'] = school_config
-        except:
-            pass
+        # Served from the cached per-school snapshot (see core.school_config)
+        snapshot = get_school_config(get_request_school_id(request))
+        context['current_school'] = snapshot['school']
+        context['school_config'] = snapshot['config']
     
     # Add global settings
     context['settings'] = settings
     context['school_system_config'] = getattr(settings, 'SCHOOL_CONFIG', {})
     
-    return context 
\ No newline at end of file
+    return context 
@@ -0,0 +1,340 @@
+"""
+Materialized dashboard statistics
+
+The dashboard reads its school's DashboardStatistics row instead of
+running dozens of count()/aggregate() queries per load. The core student,
+teacher, fee payment and attendance tables carry no school, so every
+school's row counts them alike; the statistics of school-scoped models
+(audit logs, notification templates) count only the row's school.
+
+Student, teacher, fee payment and attendance changes are applied as
+counter deltas by signals (connected in core.signals), in the same
+transaction as the change itself. Each delta goes to one of
+DASHBOARD_COUNTER_SHARDS DashboardCounterShard rows of every school,
+chosen at random, so concurrent saves rarely queue on the same row; reads
+add the shards to the statistics row in the same query.
+
+Everything else (exams, AI, chat, sessions, rolling windows) is refreshed
+by a full reconciliation, which also corrects any counter drift. It never
+runs inside a dashboard request: the reconcile_dashboard_stats command
+reconciles every school (run it periodically, e.g. from cron), and a new
+school, or a delta with no statistics to land on, schedules one after its
+transaction commits. Reconciliation locks the school's statistics row and
+its shards while it recounts, then zeroes the shards: deltas committed
+before it are in the recount, and deltas still in flight wait and land on
+the zeroed shards.
+"""
+import logging
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.models import Avg, Count, DecimalField, F, Q, Subquery, Sum
+from django.utils import timezone
+
+from .models import (
+    Student, Teacher, Grade, Subject, Campus, Department, FeePayment, Attendance, Exam, ExamResult,
+    AuditLog, NotificationTemplate, AIAnalytics, ChatMessage, MobileAppSession, SmartNotification,
+    BiometricAttendance, VirtualClassroom, VirtualClassroomParticipant, DashboardStatistics,
+    DashboardCounterShard, SchoolSettings,
+)
+from .exports import correlated_aggregate
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COUNTER_SHARDS = 16
+PASS_MARK = 35
+
+
+# Counter contributions of a single row. Deltas are new minus old
+# contribution, so updates (e.g. PENDING -> PAID) are handled as well.
+
+def _student_counters(student, today):
+    return {'students': 1}
+
+
+def _teacher_counters(teacher, today):
+    return {'teachers': 1}
+
+
+def _fee_payment_counters(payment, today):
+    paid = payment.status == 'PAID'
+    return {
+        'fee_payments': 1,
+        'paid_payments': int(paid),
+        'fee_collected': Decimal(payment.amount_paid or 0) if paid else Decimal(0),
+        'fee_pending': Decimal(payment.amount_due or 0) if payment.status == 'PENDING' else Decimal(0),
+    }
+
+
+def _attendance_counters(attendance, today):
+    present = attendance.status == 'PRESENT'
+    return {
+        'today_present': int(present and attendance.date == today),
+        'today_absent': int(attendance.status == 'ABSENT' and attendance.date == today),
+        'week_present': int(present and today - timedelta(days=7) <= attendance.date <= today),
+    }
+
+
+COUNTER_MODELS = {
+    Student: _student_counters,
+    Teacher: _teacher_counters,
+    FeePayment: _fee_payment_counters,
+    Attendance: _attendance_counters,
+}
+
+# Columns the counters of an existing row depend on. Updates of models not
+# listed here never change the counters, so they need no previous row.
+COUNTER_SOURCE_FIELDS = {
+    FeePayment: ['status', 'amount_paid', 'amount_due'],
+    Attendance: ['status', 'date'],
+}
+
+COUNTER_FIELDS = [
+    'students', 'teachers', 'fee_payments', 'paid_payments', 'fee_collected', 'fee_pending',
+    'today_present', 'today_absent', 'week_present',
+]
+DAILY_COUNTER_FIELDS = ['today_present', 'today_absent']
+MONEY = DecimalField(max_digits=14, decimal_places=2)
+
+
+def get_counter_shards():
+    return getattr(settings, 'DASHBOARD_COUNTER_SHARDS', DEFAULT_COUNTER_SHARDS)
+
+
+def apply_counter_deltas(deltas, today=None):
+    """Add counter deltas to one random counter shard of every school with a single UPDATE"""
+    deltas = {field: value for field, value in deltas.items() if value}
+    if not deltas:
+        return
+    today = today or timezone.now().date()
+    rows = DashboardCounterShard.objects.filter(shard=random.randrange(get_counter_shards()))
+
+    if any(field in deltas for field in DAILY_COUNTER_FIELDS):
+        # First mark of a new day on this shard: yesterday's counts no longer apply
+        rows.exclude(attendance_date=today).update(attendance_date=today, today_present=0, today_absent=0)
+
+    updated = rows.update(**{field: F(field) + value for field, value in deltas.items()})
+    if not updated:
+        # No statistics yet: build them once this change is committed
+        schedule_reconcile()
+
+
+def remember_previous_counters(sender, instance, raw=False, **kwargs):
+    instance._dashboard_previous = {}
+    fields = COUNTER_SOURCE_FIELDS.get(sender)
+    if raw or not fields or instance._state.adding or instance.pk is None:
+        return
+    previous = sender.objects.filter(pk=instance.pk).only(*fields).first()
+    if previous is not None:
+        instance._dashboard_previous = COUNTER_MODELS[sender](previous, timezone.now().date())
+
+
+def apply_saved_counters(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    today = timezone.now().date()
+    current = COUNTER_MODELS[sender](instance, today)
+    previous = getattr(instance, '_dashboard_previous', {})
+    apply_counter_deltas({field: value - previous.get(field, 0) for field, value in current.items()}, today)
+
+
+def apply_deleted_counters(sender, instance, **kwargs):
+    today = timezone.now().date()
+    apply_counter_deltas({field: -value for field, value in COUNTER_MODELS[sender](instance, today).items()}, today)
+
+
+def schedule_reconcile(school_id=None):
+    """Reconcile one school (every school when None) after the current transaction commits"""
+    def reconcile():
+        if school_id is None:
+            reconcile_all_dashboard_statistics()
+        else:
+            reconcile_dashboard_statistics(school_id)
+    transaction.on_commit(reconcile)
+
+
+def reconcile_for_new_school(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        schedule_reconcile(instance.pk)
+
+
+def _aggregate(model, filters=None, **aggregates):
+    """Aggregate with zeros when the model's table is unavailable"""
+    try:
+        with transaction.atomic():
+            queryset = model.objects.filter(**(filters or {}))
+            result = queryset.aggregate(**aggregates)
+    except DatabaseError:
+        logger.warning("Dashboard statistics: could not aggregate %s", model.__name__, exc_info=True)
+        result = {}
+    return {name: result.get(name) or 0 for name in aggregates}
+
+
+def compute_counters(now=None):
+    """Recompute the signal-maintained counters from the source tables"""
+    now = now or timezone.now()
+    today = now.date()
+    week_ago = today - timedelta(days=7)
+
+    payments = _aggregate(
+        FeePayment,
+        total=Count('id'),
+        paid=Count('id', filter=Q(status='PAID')),
+        collected=Sum('amount_paid', filter=Q(status='PAID')),
+        pending=Sum('amount_due', filter=Q(status='PENDING')),
+    )
+    attendance = _aggregate(
+        Attendance,
+        today_present=Count('id', filter=Q(date=today, status='PRESENT')),
+        today_absent=Count('id', filter=Q(date=today, status='ABSENT')),
+        week_present=Count('id', filter=Q(date__gte=week_ago, date__lte=today, status='PRESENT')),
+    )
+    return {
+        'students': _aggregate(Student, total=Count('id'))['total'],
+        'teachers': _aggregate(Teacher, total=Count('id'))['total'],
+        'fee_payments': payments['total'],
+        'paid_payments': payments['paid'],
+        'fee_collected': payments['collected'],
+        'fee_pending': payments['pending'],
+        'attendance_date': today,
+        'today_present': attendance['today_present'],
+        'today_absent': attendance['today_absent'],
+        'week_present': attendance['week_present'],
+    }
+
+
+def compute_reconciled_stats(school_id, now=None):
+    """Recompute the statistics that are only refreshed by reconciliation"""
+    now = now or timezone.now()
+    week_ago = now.date() - timedelta(days=7)
+
+    students = _aggregate(Student, new=Count('id', filter=Q(created_at__gte=now - timedelta(days=7))))
+    payments = _aggregate(FeePayment, recent=Count('id', filter=Q(payment_date__gte=week_ago)))
+    exams = _aggregate(Exam, total=Count('id'), recent=Count('id', filter=Q(created_at__gte=now - timedelta(days=7))))
+    results = _aggregate(
+        ExamResult,
+        total=Count('id'),
+        passed=Count('id', filter=Q(marks_obtained__gte=PASS_MARK)),
+        avg_marks=Avg('marks_obtained'),
+    )
+
+    return {
+        'grades': _aggregate(Grade, total=Count('id'))['total'],
+        'subjects': _aggregate(Subject, total=Count('id'))['total'],
+        'campuses': _aggregate(Campus, total=Count('id'))['total'],
+        'departments': _aggregate(Department, total=Count('id'))['total'],
+        'total_exams': exams['total'],
+        'recent_exams': exams['recent'],
+        'total_results': results['total'],
+        'passed_results': results['passed'],
+        'avg_performance': float(results['avg_marks']),
+        'new_students': students['new'],
+        'recent_payments': payments['recent'],
+        'ai_insights': _aggregate(AIAnalytics, {'confidence_score__gte': 0.8}, total=Count('id'))['total'],
+        'active_virtual_classes': _aggregate(
+            VirtualClassroom, {'is_active': True, 'scheduled_start__gte': now}, total=Count('id')
+        )['total'],
+        'chat_activity': _aggregate(
+            ChatMessage, {'created_at__gte': now - timedelta(hours=24)}, total=Count('id')
+        )['total'],
+        'mobile_sessions': _aggregate(MobileAppSession, {'is_active': True}, total=Count('id'))['total'],
+        'notification_templates': _aggregate(
+            NotificationTemplate, {'school_id': school_id}, total=Count('id')
+        )['total'],
+        'biometric_enrollments': _aggregate(BiometricAttendance, total=Count('id'))['total'],
+        'smart_notifications': _aggregate(SmartNotification, total=Count('id'))['total'],
+        'audit_logs_today': _aggregate(
+            AuditLog, {
+                'school_id': school_id,
+                'created_at__gte': timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0),
+            },
+            total=Count('id'),
+        )['total'],
+        'virtual_classroom_participants': _aggregate(VirtualClassroomParticipant, total=Count('id'))['total'],
+    }
+
+
+def default_school_id():
+    """The school of users without one (the first school, as in core.school_config)"""
+    return SchoolSettings.objects.order_by('pk').values_list('pk', flat=True).first()
+
+
+def reconcile_dashboard_statistics(school_id=None, now=None):
+    """Rebuild a school's statistics row from the source tables and fold in its shards
+
+    `school_id` defaults to the default school; returns None when there is
+    no school yet.
+    """
+    school_id = school_id or default_school_id()
+    if school_id is None:
+        return None
+    now = now or timezone.now()
+    # Computed before taking the locks: nothing here is counted by the shards
+    reconciled_stats = compute_reconciled_stats(school_id, now)
+
+    with transaction.atomic():
+        statistics, _ = DashboardStatistics.objects.select_for_update().get_or_create(school_id=school_id)
+        shards = DashboardCounterShard.objects.filter(statistics=statistics)
+        list(shards.select_for_update().order_by('shard').values_list('pk', flat=True))
+
+        for field, value in compute_counters(now).items():
+            setattr(statistics, field, value)
+        statistics.reconciled_stats = reconciled_stats
+        statistics.reconciled_at = now
+        statistics.save()
+
+        shards.update(attendance_date=now.date(), **{field: 0 for field in COUNTER_FIELDS})
+        DashboardCounterShard.objects.bulk_create(
+            [
+                DashboardCounterShard(statistics=statistics, shard=shard, attendance_date=now.date())
+                for shard in range(get_counter_shards())
+            ],
+            ignore_conflicts=True,
+        )
+    return statistics
+
+
+def reconcile_all_dashboard_statistics(now=None):
+    """Reconcile the statistics row of every school; returns the rows"""
+    now = now or timezone.now()
+    return [
+        reconcile_dashboard_statistics(school_id, now)
+        for school_id in SchoolSettings.objects.order_by('pk').values_list('pk', flat=True)
+    ]
+
+
+def _shard_totals(today):
+    shards = DashboardCounterShard.objects.all()
+    return {
+        f'shard_{field}': correlated_aggregate(
+            shards.filter(attendance_date=today) if field in DAILY_COUNTER_FIELDS else shards,
+            'statistics', Sum(field), MONEY if field in ('fee_collected', 'fee_pending') else None,
+        )
+        for field in COUNTER_FIELDS
+    }
+
+
+def get_dashboard_statistics(school_id=None):
+    """The school's statistics row with its counter shards added (not saved)
+
+    `school_id` defaults to the default school. The row is served as last
+    reconciled; until a school's first reconciliation an empty row is
+    returned.
+    """
+    today = timezone.now().date()
+    statistics = DashboardStatistics.objects.filter(
+        school_id=school_id or Subquery(SchoolSettings.objects.order_by('pk').values('pk')[:1])
+    ).annotate(**_shard_totals(today)).first()
+    if statistics is None:
+        logger.warning("Dashboard statistics for school %s have not been reconciled yet", school_id or 'default')
+        return DashboardStatistics(school_id=school_id)
+
+    if statistics.attendance_date != today:
+        # Nobody has been marked yet today
+        statistics.today_present = statistics.today_absent = 0
+    for field in COUNTER_FIELDS:
+        setattr(statistics, field, getattr(statistics, field) + getattr(statistics, f'shard_{field}'))
+    return statistics
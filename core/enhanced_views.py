@@ -24,6 +24,8 @@ from .models import (
     RealTimeChat, ChatMessage, ParentPortal, MobileAppSession, AdvancedReport,
     SmartNotification, BiometricAttendance, VirtualClassroom, VirtualClassroomParticipant
 )
+from .dashboard_stats import get_dashboard_statistics
+from .performance import get_request_school_id
 
 # ============================================================================
 # ENHANCED DASHBOARD WITH REAL-TIME ANALYTICS
@@ -33,10 +35,13 @@ from .models import (
 def enhanced_dashboard(request):
     """Ultra-comprehensive dashboard with real-time analytics and AI insights"""
     try:
+        # Counters served from the materialized statistics row
+        statistics = get_dashboard_statistics(get_request_school_id(request))
+        
         # Core Institution Statistics
         core_stats = {
-            'students': Student.objects.count(),
-            'teachers': Teacher.objects.count(),
+            'students': statistics.students,
+            'teachers': statistics.teachers,
             'grades': Grade.objects.count(),
             'subjects': Subject.objects.count(),
             'campuses': Campus.objects.filter(is_active=True).count(),
@@ -66,16 +71,9 @@ def enhanced_dashboard(request):
         
         # Financial Analytics & Trends
         financial_analytics = {
-            'total_collected': FeePayment.objects.filter(status='PAID').aggregate(
-                total=Sum('amount_paid')
-            )['total'] or 0,
-            'pending_amount': FeePayment.objects.filter(status='PENDING').aggregate(
-                total=Sum('amount_due')
-            )['total'] or 0,
-            'collection_rate': (
-                FeePayment.objects.filter(status='PAID').count() / 
-                max(FeePayment.objects.count(), 1) * 100
-            ),
+            'total_collected': statistics.fee_collected,
+            'pending_amount': statistics.fee_pending,
+            'collection_rate': statistics.paid_payments / max(statistics.fee_payments, 1) * 100,
             'monthly_collections': FeePayment.objects.filter(
                 payment_date__gte=timezone.now().date().replace(day=1),
                 status='PAID'
@@ -89,12 +87,8 @@ def enhanced_dashboard(request):
         # Attendance Analytics & Patterns
         today = timezone.now().date()
         attendance_analytics = {
-            'today_present': Attendance.objects.filter(
-                date=today, status='PRESENT'
-            ).count(),
-            'today_absent': Attendance.objects.filter(
-                date=today, status='ABSENT'
-            ).count(),
+            'today_present': statistics.today_present,
+            'today_absent': statistics.today_absent,
             'weekly_attendance_rate': self._calculate_weekly_attendance(),
             'monthly_attendance_trend': self._get_attendance_trends(),
             'chronic_absentees': self._get_chronic_absentees(),
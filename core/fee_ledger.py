@@ -0,0 +1,154 @@
+"""
+Materialized per-student fee ledger
+
+StudentFeeLedger holds one row per student for the academic year of the
+student's grade, so outstanding and collection reports read indexed rows
+instead of aggregating fee structures and payments per student:
+
+    total_due     sum of the grade's active fee structures for the year
+    concession    how far amount_due was set below the structure amount
+    late_fee      how far amount_due was set above it
+    total_paid    sum of amount_paid over the year's payments
+    balance       total_due - concession + late_fee - total_paid
+
+Signals (connected in core.signals) refresh the affected rows in the same
+transaction as the change: one student for a payment or student change,
+every student of the grade for a fee structure change. Refunds are
+recorded by lowering a payment's amount_paid, so they arrive as payment
+changes. A refresh is one grouped query plus one upsert, however many
+students it covers. A structure moved to another grade refreshes the
+students of both grades. rebuild_fee_ledger recomputes every row.
+
+A structure paid in several partial payments repeats its amount_due on
+each of them, so concession and late fee are taken once per student and
+structure, from the latest of those payments.
+
+When a student moves to a grade in a new academic year, the previous
+year's row stays as it was last computed.
+"""
+from decimal import Decimal
+
+from django.db.models import DecimalField, Exists, F, Max, OuterRef, QuerySet, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .exports import correlated_aggregate
+from .models import FeePayment, FeeStructure, Student, StudentFeeLedger
+
+LEDGER_FIELDS = ['total_due', 'concession', 'late_fee', 'total_paid', 'balance', 'last_payment_date']
+REBUILD_BATCH_SIZE = 1000
+
+MONEY = DecimalField(max_digits=12, decimal_places=2)
+ZERO = Value(Decimal('0.00'), output_field=MONEY)
+
+
+def annotate_ledger(students):
+    """`students` annotated with their ledger columns for their grade's academic year"""
+    year = OuterRef('grade__academic_year')
+    structures = FeeStructure.objects.filter(grade=OuterRef('grade'), academic_year=year, is_active=True)
+    due = structures.order_by().values('grade').annotate(total=Sum('amount')).values('total')
+    payments = FeePayment.objects.filter(fee_structure__academic_year=year)
+    # One payment per (student, structure) for the amount_due adjustments
+    latest = payments.filter(~Exists(FeePayment.objects.filter(
+        student=OuterRef('student'), fee_structure=OuterRef('fee_structure'), pk__gt=OuterRef('pk'),
+    )))
+    difference = F('fee_structure__amount') - F('amount_due')
+
+    return students.annotate(
+        ledger_due=Coalesce(Subquery(due, output_field=MONEY), ZERO, output_field=MONEY),
+        ledger_concession=correlated_aggregate(
+            latest, 'student', Sum(Greatest(difference, ZERO, output_field=MONEY)), MONEY
+        ),
+        ledger_late_fee=correlated_aggregate(
+            latest, 'student', Sum(Greatest(-difference, ZERO, output_field=MONEY)), MONEY
+        ),
+        ledger_paid=correlated_aggregate(payments, 'student', Sum('amount_paid'), MONEY),
+        ledger_last_payment=Subquery(
+            payments.filter(student=OuterRef('pk')).order_by().values('student').annotate(
+                last=Max('payment_date')
+            ).values('last')
+        ),
+    )
+
+
+def _ledger_rows(students):
+    for student in annotate_ledger(students).only('pk', 'grade__academic_year').select_related('grade').iterator(
+        chunk_size=REBUILD_BATCH_SIZE
+    ):
+        yield StudentFeeLedger(
+            student_id=student.pk,
+            academic_year_id=student.grade.academic_year_id,
+            total_due=student.ledger_due,
+            concession=student.ledger_concession,
+            late_fee=student.ledger_late_fee,
+            total_paid=student.ledger_paid,
+            balance=student.ledger_due - student.ledger_concession + student.ledger_late_fee - student.ledger_paid,
+            last_payment_date=student.ledger_last_payment,
+        )
+
+
+def _upsert(rows):
+    StudentFeeLedger.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['student', 'academic_year'],
+        update_fields=LEDGER_FIELDS + ['updated_at'],
+    )
+
+
+def refresh_fee_ledgers(students):
+    """Recompute the ledger rows of the students in the `students` queryset"""
+    batch = []
+    refreshed = 0
+    for row in _ledger_rows(students):
+        batch.append(row)
+        if len(batch) == REBUILD_BATCH_SIZE:
+            _upsert(batch)
+            refreshed += len(batch)
+            batch = []
+    if batch:
+        _upsert(batch)
+        refreshed += len(batch)
+    return refreshed
+
+
+def rebuild_fee_ledgers():
+    """Recompute every student's ledger row; returns the number of rows"""
+    return refresh_fee_ledgers(Student.objects.all())
+
+
+# Signal handlers
+
+def _deleted_by_cascade(sender, origin):
+    # Rows removed along with their student, grade or year need no refresh,
+    # and re-inserting the ledger row would violate its foreign keys
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model is not sender
+
+
+def refresh_for_payment(sender, instance, raw=False, **kwargs):
+    if raw or _deleted_by_cascade(sender, kwargs.get('origin', instance)):
+        return
+    refresh_fee_ledgers(Student.objects.filter(pk=instance.student_id))
+
+
+def remember_fee_structure_grade(sender, instance, raw=False, **kwargs):
+    """pre_save: remember the stored grade, whose students also need a refresh"""
+    instance._ledger_previous_grade_id = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    instance._ledger_previous_grade_id = sender.objects.filter(pk=instance.pk).values_list(
+        'grade_id', flat=True
+    ).first()
+
+
+def refresh_for_fee_structure(sender, instance, raw=False, **kwargs):
+    if raw or _deleted_by_cascade(sender, kwargs.get('origin', instance)):
+        return
+    grades = {instance.grade_id, getattr(instance, '_ledger_previous_grade_id', None)} - {None}
+    refresh_fee_ledgers(Student.objects.filter(grade_id__in=grades))
+
+
+def refresh_for_student(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    refresh_fee_ledgers(Student.objects.filter(pk=instance.pk))
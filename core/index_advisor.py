@@ -0,0 +1,399 @@
+"""
+Query-log-driven index advisor
+
+Takes a workload of SQL shapes and looks for filters that no index
+supports. The workload comes either from the JSONL capture written by
+PerformanceMiddleware (PERFORMANCE_PROFILER QUERY_CAPTURE_FILE), or from
+replaying the benchmark endpoints against generated data. Each SELECT
+shape is EXPLAINed with its captured parameters:
+
+- SQLite: EXPLAIN QUERY PLAN; a table that is SCANned, SEARCHed through an
+  automatic (per-query) index, or through an index covering fewer columns
+  than the query filters on, is flagged.
+- PostgreSQL: EXPLAIN (FORMAT JSON); Seq Scans with a Filter, and index
+  scans that still filter rows, are flagged.
+
+The candidate index for a flagged table is built from the columns the
+statement compares to values (or, failing those, joins on): equality
+columns first (most distinct values first), then one range column. Candidates already served
+by an existing index prefix, and tables below MIN_ROWS, are skipped. The
+estimated benefit is executions x rows scanned (SQLite) or executions x
+plan cost (PostgreSQL). With verify, each candidate is created inside a
+rolled-back transaction and the statement re-EXPLAINed to confirm the
+planner would use it. Creating an index locks the table for writes on
+PostgreSQL, so verify against a replica or a copy, not the primary.
+"""
+import json
+import logging
+import os
+import re
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.conf import settings
+from django.db import DatabaseError, connections, models, transaction
+from django.db.migrations.loader import MigrationLoader
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from .benchmarks import ENDPOINTS, benchmark_environment, build_urlconf, get_benchmark_setting
+from .performance import QueryProfiler, fingerprint_sql, get_profiler_setting
+
+logger = logging.getLogger(__name__)
+
+INDEX_ADVISOR_DEFAULTS = {
+    'MIN_ROWS': 1000,       # Smaller tables are cheap to scan
+    'MAX_COLUMNS': 3,
+    'REPLAY_ITERATIONS': 3,
+}
+
+_ALIAS = re.compile(r'"(\w+)"\s+(?:AS\s+)?(T\d+)\b')
+_COLUMN = r'(?:"(\w+)"|(T\d+))\."(\w+)"'
+_PREDICATE = re.compile(
+    _COLUMN + r'\s*(=|<=|>=|<|>|\bIN\b|\bIS\b|\bLIKE\b|\bBETWEEN\b)\s*(?:' + _COLUMN + r')?',
+    re.IGNORECASE,
+)
+_EQUALITY_OPERATORS = {'=', 'IN', 'IS'}
+_SQLITE_STEP = re.compile(
+    r'^(SCAN|SEARCH) (\w+)(?: AS (\w+))?'
+    r'(?: USING (AUTOMATIC )?(?:PARTIAL )?(?:COVERING )?INDEX(?: (\w+))?(?: \((.*)\))?)?',
+    re.IGNORECASE,
+)
+
+
+def get_index_advisor_setting(name):
+    return getattr(settings, 'INDEX_ADVISOR', {}).get(name, INDEX_ADVISOR_DEFAULTS[name])
+
+
+def merge_shapes(records):
+    """Aggregate capture records by fingerprint, keeping the first sample"""
+    shapes = OrderedDict()
+    for record in records:
+        fingerprint = record.get('fingerprint') or fingerprint_sql(record['sql'])
+        shape = shapes.get(fingerprint)
+        if shape is None:
+            shapes[fingerprint] = dict(record, fingerprint=fingerprint, count=record.get('count', 1),
+                                       total_time=record.get('total_time', 0.0))
+        else:
+            shape['count'] += record.get('count', 1)
+            shape['total_time'] += record.get('total_time', 0.0)
+    return list(shapes.values())
+
+
+def load_capture(path=None):
+    """Query shapes from a PerformanceMiddleware capture file and its rotated predecessor"""
+    path = path or get_profiler_setting('QUERY_CAPTURE_FILE')
+    records = []
+    for name in (f'{path}.1', path):
+        if name != path and not os.path.exists(name):
+            continue
+        with open(name, encoding='utf-8') as capture:
+            for line in capture:
+                line = line.strip()
+                if line:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        # Torn line from a concurrent writer
+                        continue
+    return merge_shapes(records)
+
+
+@contextmanager
+def replayed_workload(scale=None, seed=None, years=None, endpoints=None, iterations=None):
+    """Run the benchmark endpoints against generated data; yields their query shapes
+
+    The generated database stays in place inside the block so the shapes
+    can be EXPLAINed against it.
+    """
+    endpoints = endpoints or ENDPOINTS
+    scale = scale or get_benchmark_setting('SCALES')[-1]
+    seed = get_benchmark_setting('SEED') if seed is None else seed
+    years = years or get_benchmark_setting('YEARS')
+    iterations = iterations or get_index_advisor_setting('REPLAY_ITERATIONS')
+
+    urlconf, unavailable = build_urlconf(endpoints)
+    setup_test_environment()
+    try:
+        with benchmark_environment(scale, seed, years, urlconf) as (client, context):
+            with QueryProfiler() as profiler:
+                for endpoint in endpoints:
+                    if endpoint.name in unavailable:
+                        continue
+                    request = getattr(client, endpoint.method)
+                    for _ in range(iterations):
+                        request(f'/__benchmark__/{endpoint.name}/', endpoint.request_data(context))
+            yield merge_shapes(profiler.captured_shapes())
+    finally:
+        teardown_test_environment()
+
+
+class IndexAdvisor:
+    """EXPLAIN a workload on one database and collect index recommendations"""
+
+    def __init__(self, using='default', min_rows=None, max_columns=None, verify=False):
+        self.connection = connections[using]
+        self.using = using
+        self.vendor = self.connection.vendor
+        if self.vendor not in ('sqlite', 'postgresql'):
+            raise ValueError(f'The index advisor supports SQLite and PostgreSQL, not {self.vendor}')
+        self.min_rows = get_index_advisor_setting('MIN_ROWS') if min_rows is None else min_rows
+        self.max_columns = max_columns or get_index_advisor_setting('MAX_COLUMNS')
+        self.verify = verify
+        self.models = {model._meta.db_table: model for model in apps.get_models()}
+        self._row_counts = {}
+        self._distinct = {}
+        self._indexes = {}
+        self.skipped = 0
+
+    # Database metadata
+
+    def row_count(self, table):
+        if table not in self._row_counts:
+            with self.connection.cursor() as cursor:
+                if self.vendor == 'postgresql':
+                    cursor.execute('SELECT GREATEST(reltuples, 0) FROM pg_class WHERE oid = %s::regclass', [table])
+                else:
+                    cursor.execute(f'SELECT COUNT(*) FROM {self.connection.ops.quote_name(table)}')
+                self._row_counts[table] = int(cursor.fetchone()[0])
+        return self._row_counts[table]
+
+    def distinct_values(self, table, column):
+        key = (table, column)
+        if key not in self._distinct:
+            with self.connection.cursor() as cursor:
+                if self.vendor == 'postgresql':
+                    cursor.execute(
+                        'SELECT n_distinct FROM pg_stats WHERE tablename = %s AND attname = %s', [table, column]
+                    )
+                    row = cursor.fetchone()
+                    # Negative n_distinct is a fraction of the row count
+                    distinct = row[0] if row else 0
+                    self._distinct[key] = -distinct * self.row_count(table) if distinct < 0 else distinct
+                else:
+                    quote = self.connection.ops.quote_name
+                    cursor.execute(f'SELECT COUNT(DISTINCT {quote(column)}) FROM {quote(table)}')
+                    self._distinct[key] = cursor.fetchone()[0]
+        return self._distinct[key]
+
+    def existing_indexes(self, table):
+        if table not in self._indexes:
+            with self.connection.cursor() as cursor:
+                constraints = self.connection.introspection.get_constraints(cursor, table)
+            self._indexes[table] = [
+                constraint['columns'] for constraint in constraints.values()
+                if (constraint['index'] or constraint['unique'] or constraint['primary_key']) and constraint['columns']
+            ]
+        return self._indexes[table]
+
+    # Plans
+
+    def explain(self, sql, params):
+        """Flagged scans as {table: {'reason', 'cost', 'index_columns'}}, plus the plan text"""
+        with transaction.atomic(using=self.using), self.connection.cursor() as cursor:
+            if self.vendor == 'postgresql':
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+                plan = cursor.fetchone()[0]
+                plan = json.loads(plan) if isinstance(plan, str) else plan
+                return self._postgres_scans(plan[0]['Plan']), json.dumps(plan[0]['Plan'])[:2000]
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            details = [row[-1] for row in cursor.fetchall()]
+            return self._sqlite_scans(details, sql), '\n'.join(details)
+
+    def _sqlite_scans(self, details, sql):
+        aliases = dict((alias, table) for table, alias in _ALIAS.findall(sql))
+        scans = {}
+        for detail in details:
+            match = _SQLITE_STEP.match(detail)
+            if not match:
+                continue
+            operation, name, alias, automatic, index, used = match.groups()
+            table = aliases.get(alias or name, name)
+            if table not in self.models or (index is None and 'PRIMARY KEY' in detail.upper()):
+                continue
+            if automatic:
+                # Built from scratch on every execution
+                scans[table] = {'reason': 'automatic index', 'cost': self.row_count(table), 'index_columns': 0}
+            elif operation.upper() == 'SCAN':
+                scans[table] = {'reason': 'full scan', 'cost': self.row_count(table), 'index_columns': 0}
+            elif index:
+                used_columns = len(re.findall(r'\w+\s*(?:=|>|<|IN\b)', used or '', re.IGNORECASE))
+                scans[table] = {'reason': 'partial index', 'cost': self.row_count(table), 'index_columns': used_columns}
+        return scans
+
+    def _postgres_scans(self, node, scans=None):
+        scans = {} if scans is None else scans
+        table = node.get('Relation Name')
+        if table in self.models and 'Filter' in node:
+            if node['Node Type'] == 'Seq Scan':
+                scans[table] = {'reason': 'full scan', 'cost': node['Total Cost'], 'index_columns': 0}
+            elif node['Node Type'] in ('Index Scan', 'Index Only Scan', 'Bitmap Heap Scan'):
+                used = node.get('Index Cond') or node.get('Recheck Cond') or ''
+                scans[table] = {'reason': 'partial index', 'cost': node['Total Cost'],
+                                'index_columns': len(re.findall(r'\w+\s*(?:=|>|<)', used))}
+        for child in node.get('Plans', []):
+            self._postgres_scans(child, scans)
+        return scans
+
+    # Candidates
+
+    def predicate_columns(self, sql):
+        """{table: (equality columns, range columns)} the statement filters each table on
+
+        Columns compared to values win; a table filtered only through joins
+        (the inner side of a nested loop) is looked up by its join columns.
+        """
+        aliases = dict((alias, table) for table, alias in _ALIAS.findall(sql))
+        where = sql[sql.upper().find(' FROM '):]
+        filtered, joined = {}, {}
+
+        def add(columns, table, alias, column, equality):
+            table = aliases.get(alias, table) if alias else table
+            equal, ranges = columns.setdefault(table, ([], []))
+            target = equal if equality else ranges
+            if column not in target:
+                target.append(column)
+
+        for match in _PREDICATE.finditer(where):
+            table, alias, column, operator, other_table, other_alias, other_column = match.groups()
+            equality = operator.upper() in _EQUALITY_OPERATORS
+            if other_column:
+                add(joined, table, alias, column, equality)
+                add(joined, other_table, other_alias, other_column, equality)
+            else:
+                add(filtered, table, alias, column, equality)
+        return {**joined, **filtered}
+
+    def candidate(self, table, equal, ranges):
+        model = self.models[table]
+        pk_column = model._meta.pk.column
+        if pk_column in equal:
+            return None
+        by_column = {field.column: field for field in model._meta.concrete_fields}
+        equal = [column for column in equal if column in by_column]
+        ranges = [column for column in ranges if column in by_column and column not in equal]
+        equal.sort(key=lambda column: -(self.distinct_values(table, column) or 0))
+        columns = (equal + ranges[:1])[:self.max_columns]
+        if not columns:
+            return None
+        for index_columns in self.existing_indexes(table):
+            if index_columns[:len(columns)] == columns:
+                return None
+        return columns
+
+    def build_index(self, model, columns):
+        by_column = {field.column: field.name for field in model._meta.concrete_fields}
+        index = models.Index(fields=[by_column[column] for column in columns])
+        index.set_name_with_model(model)
+        return index
+
+    def verify_index(self, model, index, sql, params, table):
+        """(planner uses the index, flagged cost with it) from a rolled-back trial"""
+        # The editor only renders the statement; entering it is not allowed
+        # inside a transaction on SQLite
+        create_sql = str(index.create_sql(model, self.connection.schema_editor()))
+        with transaction.atomic(using=self.using):
+            with self.connection.cursor() as cursor:
+                cursor.execute(create_sql)
+            scans, plan = self.explain(sql, params)
+            transaction.set_rollback(True, using=self.using)
+        used = index.name in plan
+        remaining = scans.get(table)
+        if remaining is None or remaining['index_columns'] >= len(index.fields):
+            return used, 0
+        return used, remaining['cost']
+
+    # Analysis
+
+    def analyze(self, shapes):
+        """Index recommendations for `shapes`, by descending estimated benefit"""
+        recommendations = OrderedDict()
+        for shape in shapes:
+            sql, params = shape.get('sql') or '', shape.get('params')
+            if params is None or not sql.lstrip().upper().startswith('SELECT'):
+                continue
+            try:
+                scans, plan = self.explain(sql, params)
+            except (DatabaseError, TypeError, ValueError) as exc:
+                logger.debug("Could not EXPLAIN %s: %s", shape['fingerprint'][:200], exc)
+                self.skipped += 1
+                continue
+
+            predicates = self.predicate_columns(sql)
+            for table, scan in scans.items():
+                if self.row_count(table) < self.min_rows or table not in predicates:
+                    continue
+                columns = self.candidate(table, *predicates[table])
+                if columns is None or len(columns) <= scan['index_columns']:
+                    continue
+
+                model = self.models[table]
+                key = (table, tuple(columns))
+                recommendation = recommendations.get(key)
+                if recommendation is None:
+                    index = self.build_index(model, columns)
+                    recommendation = recommendations[key] = {
+                        'model': model._meta.label,
+                        'table': table,
+                        'fields': list(index.fields),
+                        'columns': columns,
+                        'index_name': index.name,
+                        'reason': scan['reason'],
+                        'rows': self.row_count(table),
+                        'executions': 0,
+                        'total_time': 0.0,
+                        'benefit': 0.0,
+                        'fingerprints': [],
+                        'plan': plan,
+                    }
+                    if self.verify:
+                        used, cost_after = self.verify_index(model, index, sql, params, table)
+                        recommendation['verified'] = used
+                        recommendation['cost_before'] = scan['cost']
+                        recommendation['cost_after'] = cost_after
+                recommendation['executions'] += shape['count']
+                recommendation['total_time'] = round(recommendation['total_time'] + shape['total_time'], 6)
+                recommendation['benefit'] += shape['count'] * scan['cost']
+                if len(recommendation['fingerprints']) < 3:
+                    recommendation['fingerprints'].append(shape['fingerprint'][:500])
+
+        results = [
+            recommendation for recommendation in recommendations.values()
+            if not self.verify or recommendation['verified']
+        ]
+        return sorted(results, key=lambda recommendation: -recommendation['benefit'])
+
+
+def migration_code(recommendations, using='default'):
+    """{app_label: source of a migration adding that app's recommended indexes}"""
+    loader = MigrationLoader(connections[using], ignore_no_migrations=True)
+    concurrent = connections[using].vendor == 'postgresql'
+    by_app = OrderedDict()
+    for recommendation in recommendations:
+        by_app.setdefault(recommendation['model'].split('.')[0], []).append(recommendation)
+
+    sources = OrderedDict()
+    for app_label, app_recommendations in by_app.items():
+        leaves = loader.graph.leaf_nodes(app_label)
+        lines = ['from django.db import migrations, models']
+        if concurrent:
+            lines.append('from django.contrib.postgres.operations import AddIndexConcurrently')
+        lines += ['', '', 'class Migration(migrations.Migration):', '']
+        if concurrent:
+            lines += ['    atomic = False', '']
+        lines.append('    dependencies = [')
+        lines += [f'        {leaf!r},' for leaf in leaves]
+        lines += ['    ]', '', '    operations = [']
+        for recommendation in app_recommendations:
+            model_name = apps.get_model(recommendation['model'])._meta.model_name
+            operation = 'AddIndexConcurrently' if concurrent else 'migrations.AddIndex'
+            lines += [
+                f'        {operation}(',
+                f'            model_name={model_name!r},',
+                f'            index=models.Index(fields={recommendation["fields"]!r}, '
+                f'name={recommendation["index_name"]!r}),',
+                '        ),',
+            ]
+        lines += ['    ]', '']
+        sources[app_label] = '\n'.join(lines)
+    return sources
@@ -0,0 +1,407 @@
+"""
+Offline load testing with school-day traffic scenarios
+
+Each scenario models one of our real peaks as a weighted mix of requests
+issued by concurrent virtual users. Every virtual user is a thread with its
+own test Client, so requests run through the WSGI handler and the full
+middleware stack in-process; no server or network is involved. Views are
+mounted with the benchmark URLconf (see core.benchmarks).
+
+The run reports throughput, error rate, latency percentiles and a latency
+histogram per scenario and per request type. Throughput is what sizes
+gunicorn: the virtual users share one process and its GIL, so the measured
+rate is about what a single sync worker sustains, and a target rate R needs
+about R / throughput workers, plus headroom. Latencies under concurrency
+include the time spent waiting for the GIL and would oversize the pool.
+
+Scenarios run against a throwaway database filled by the synthetic data
+generator unless the configured database is asked for explicitly (e.g. one
+prepared with generate_synthetic_data). Both are written to: attendance is
+marked and logins are recorded. The load test accounts get a random
+password per run and are deleted afterwards.
+"""
+import logging
+import math
+import random
+import secrets
+import sys
+import threading
+import time
+from collections import defaultdict
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.signals import got_request_exception
+from django.db import DatabaseError, connections
+from django.test import Client
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from django.utils import timezone
+
+from .benchmarks import Endpoint, benchmark_database, build_urlconf, percentile
+from .models import Student, Teacher
+from .performance import CacheNamespace
+from .signals import CACHE_DOMAIN_MODELS
+from .synthetic_data import SyntheticDataGenerator
+
+logger = logging.getLogger(__name__)
+
+LOAD_TEST_PREFIX = 'loadtest_'
+DEFAULT_SCALE = 0.1
+# Cache namespaces of the responses under test, invalidated before each scenario
+RESPONSE_CACHE_DOMAINS = sorted([*CACHE_DOMAIN_MODELS, 'dashboard'])
+# Upper bounds (ms) of the latency histogram buckets
+HISTOGRAM_BUCKETS = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, math.inf]
+# Share of a worker's time spent busy that worker sizing aims for
+TARGET_UTILIZATION = 0.7
+
+
+# The test Client attributes got_request_exception to whichever client is
+# mid-request, so with concurrent virtual users exceptions are tracked per thread
+_request_errors = threading.local()
+
+
+def _remember_request_exception(sender, request=None, **kwargs):
+    exc_type, exc_value = sys.exc_info()[:2]
+    if exc_type is not None:
+        _request_errors.last = f'{exc_type.__name__}: {exc_value}'
+
+
+class ScenarioUnavailable(Exception):
+    """The database lacks what a scenario needs"""
+
+
+class Step:
+    """One request type of a scenario, chosen with probability proportional to `weight`
+
+    `kwargs` (a callable taking the virtual user's context) fills the
+    endpoint's route parameters.
+    """
+
+    def __init__(self, endpoint, weight=1, kwargs=None):
+        self.endpoint = endpoint
+        self.weight = weight
+        self.kwargs = kwargs
+
+    def url(self, context):
+        return reverse(self.endpoint.url_name, kwargs=self.kwargs(context) if self.kwargs else None)
+
+
+class Scenario:
+    """Named traffic mix; `setup` prepares shared data, `login` authenticates a virtual user"""
+
+    def __init__(self, name, description, steps, setup=None, login=None):
+        self.name = name
+        self.description = description
+        self.steps = steps
+        self.setup = setup
+        self.login = login
+
+    @property
+    def endpoints(self):
+        return [step.endpoint for step in self.steps]
+
+
+def ensure_load_test_users(count, password):
+    """`count` active load test accounts sharing `password`; returns their usernames"""
+    usernames = [f'{LOAD_TEST_PREFIX}{index:05d}' for index in range(count)]
+    existing = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+    password = make_password(password)
+    # Accounts left behind by an interrupted run take the new password
+    User.objects.filter(username__in=existing).update(password=password)
+    User.objects.bulk_create([
+        User(username=username, password=password, email=f'{username}@example.com')
+        for username in usernames if username not in existing
+    ])
+    return usernames
+
+
+def delete_load_test_users():
+    """Remove every load test account; returns the number of users deleted"""
+    deleted = User.objects.filter(username__startswith=LOAD_TEST_PREFIX).delete()[1]
+    return deleted.get(User._meta.label, 0)
+
+
+def invalidate_response_caches():
+    """Start a scenario cold without clearing caches other code relies on"""
+    for domain in RESPONSE_CACHE_DOMAINS:
+        CacheNamespace(domain).invalidate()
+
+
+def _superuser_login(client, shared, user_index, rng):
+    client.force_login(shared['superuser'])
+
+
+def _superuser_setup(users):
+    superuser = User.objects.filter(username=f'{LOAD_TEST_PREFIX}admin').first()
+    if superuser is None:
+        superuser = User.objects.create_superuser(f'{LOAD_TEST_PREFIX}admin', 'loadtest@example.com', None)
+    return {'superuser': superuser}
+
+
+# Morning attendance: every teacher opens the marking form for a class and submits it
+
+def _attendance_setup(users):
+    students = defaultdict(list)
+    for student_id, grade_id in Student.objects.filter(is_active=True).values_list('pk', 'grade_id'):
+        students[grade_id].append(student_id)
+    teachers = list(Teacher.objects.order_by('pk').values_list('user_id', flat=True)[:users])
+    if not students or not teachers:
+        raise ScenarioUnavailable('needs teachers and graded students (run generate_synthetic_data or use --scale)')
+    return {
+        'grades': sorted(students),
+        'students': students,
+        'teachers': {user.pk: user for user in User.objects.filter(pk__in=teachers)},
+        'teacher_ids': teachers,
+    }
+
+
+def _attendance_login(client, shared, user_index, rng):
+    teacher_id = shared['teacher_ids'][user_index % len(shared['teacher_ids'])]
+    client.force_login(shared['teachers'][teacher_id])
+
+
+def _attendance_form(context):
+    grade = context['grades'][context['user_index'] % len(context['grades'])]
+    data = {'date': timezone.localdate().isoformat(), 'grade': grade}
+    for student_id in context['students'][grade]:
+        data[f'student_{student_id}'] = 'PRESENT' if context['rng'].random() < 0.93 else 'ABSENT'
+    return data
+
+
+def _attendance_page(context):
+    return {'grade': context['grades'][context['user_index'] % len(context['grades'])]}
+
+
+# Result day: students log in and read their results
+
+def _result_day_setup(users):
+    password = secrets.token_urlsafe(16)
+    return {'usernames': ensure_load_test_users(users, password), 'password': password}
+
+
+def _result_day_credentials(context):
+    return {'username': context['usernames'][context['user_index']], 'password': context['password']}
+
+
+# Online exam: students save answers to their in-progress attempts
+
+def _online_exam_setup(users):
+    from examinations.models import StudentExamAttempt
+
+    try:
+        attempts = list(
+            StudentExamAttempt.objects.filter(status='IN_PROGRESS').values_list('pk', flat=True)[:users]
+        )
+    except DatabaseError as exc:
+        raise ScenarioUnavailable(f'online exam tables unavailable: {exc}')
+    if not attempts:
+        raise ScenarioUnavailable('needs in-progress StudentExamAttempt rows to submit answers to')
+    return {'attempts': attempts, **_superuser_setup(users)}
+
+
+def _exam_answer(context):
+    return {'question_id': context['rng'].randint(1, 50), 'answer': context['rng'].choice('ABCD')}
+
+
+SCENARIOS = {
+    scenario.name: scenario for scenario in [
+        Scenario(
+            'morning_attendance', 'All teachers marking attendance in the first period',
+            [
+                Step(Endpoint('attendance_form', 'academics.views.mark_attendance', data=_attendance_page), weight=1),
+                Step(Endpoint('attendance_submit', 'academics.views.mark_attendance', method='post',
+                              data=_attendance_form), weight=1),
+            ],
+            setup=_attendance_setup, login=_attendance_login,
+        ),
+        Scenario(
+            'fee_deadline_rush', 'Parents paying fees on the due date through the payment portal',
+            [
+                Step(Endpoint('parent_payment_portal', 'fees.views.parent_payment_portal'), weight=4),
+                Step(Endpoint('fee_payments_list', 'fees.views.fee_payments_list',
+                              data=lambda context: {'search': context['rng'].choice(['Sharma', 'Patel', 'Rao'])}),
+                     weight=2),
+                Step(Endpoint('fee_dashboard', 'fees.views.fee_dashboard'), weight=1),
+            ],
+            setup=_superuser_setup, login=_superuser_login,
+        ),
+        Scenario(
+            'result_day', 'Students logging in to read their exam results',
+            [
+                Step(Endpoint('student_login', 'core.views.user_login', method='post', data=_result_day_credentials),
+                     weight=1),
+                Step(Endpoint('exam_results', 'examinations.api.ExamResultViewSet', actions={'get': 'list'}),
+                     weight=4),
+            ],
+            setup=_result_day_setup,
+        ),
+        Scenario(
+            'online_exam', 'Students submitting answers during an online exam',
+            [
+                Step(Endpoint('exam_answer', 'examinations.api.StudentExamAttemptViewSet', method='post',
+                              data=_exam_answer, actions={'post': 'submit_answer'}, route='<uuid:pk>/'),
+                     kwargs=lambda context: {'pk': context['attempts'][context['user_index'] % len(context['attempts'])]}),
+            ],
+            setup=_online_exam_setup, login=_superuser_login,
+        ),
+    ]
+}
+
+
+class LoadTestResult:
+    """Samples of one scenario run: (step name, status, latency in ms)"""
+
+    def __init__(self, scenario, users, duration):
+        self.scenario = scenario
+        self.users = users
+        self.duration = duration
+        self.samples = []
+        self.errors = defaultdict(int)
+
+    def summary(self, samples=None):
+        samples = self.samples if samples is None else samples
+        latencies = [latency for _, _, latency in samples]
+        failed = sum(1 for _, status, _ in samples if status is None or status >= 400)
+        histogram = [0] * len(HISTOGRAM_BUCKETS)
+        for latency in latencies:
+            histogram[next(index for index, bound in enumerate(HISTOGRAM_BUCKETS) if latency <= bound)] += 1
+        return {
+            'requests': len(samples),
+            'throughput_rps': round(len(samples) / self.duration, 2) if self.duration else 0,
+            'error_rate': round(failed / len(samples), 4) if samples else 0,
+            'mean_ms': round(sum(latencies) / len(latencies), 2) if latencies else 0,
+            'p50_ms': round(percentile(latencies, 50), 2) if latencies else 0,
+            'p95_ms': round(percentile(latencies, 95), 2) if latencies else 0,
+            'p99_ms': round(percentile(latencies, 99), 2) if latencies else 0,
+            'histogram': dict(zip([str(bound) for bound in HISTOGRAM_BUCKETS], histogram)),
+        }
+
+    def by_step(self):
+        steps = defaultdict(list)
+        for sample in self.samples:
+            steps[sample[0]].append(sample)
+        return {name: self.summary(samples) for name, samples in steps.items()}
+
+    def workers_for(self, target_rps):
+        """Sync gunicorn workers needed to serve `target_rps` at TARGET_UTILIZATION
+
+        The run's throughput stands in for one worker's capacity (see the
+        module docstring).
+        """
+        throughput = self.summary()['throughput_rps']
+        if not throughput:
+            return None
+        return max(math.ceil(target_rps / (throughput * TARGET_UTILIZATION)), 1)
+
+    def as_dict(self):
+        return {
+            'scenario': self.scenario, 'users': self.users, 'duration_s': round(self.duration, 2),
+            'overall': self.summary(), 'steps': self.by_step(),
+            'errors': dict(self.errors),
+        }
+
+
+def _virtual_user(scenario, shared, user_index, seed, deadline, max_requests, result, lock):
+    rng = random.Random(f'{seed}:{scenario.name}:{user_index}')
+    context = {**shared, 'rng': rng, 'user_index': user_index}
+    client = Client(raise_request_exception=False)
+    samples = []
+    try:
+        if scenario.login:
+            scenario.login(client, shared, user_index, rng)
+        weights = [step.weight for step in scenario.steps]
+        while time.monotonic() < deadline and (max_requests is None or len(samples) < max_requests):
+            step = rng.choices(scenario.steps, weights)[0]
+            endpoint = step.endpoint
+            _request_errors.last = None
+            started = time.perf_counter()
+            try:
+                response = getattr(client, endpoint.method)(step.url(context), endpoint.request_data(context))
+                status = response.status_code
+                error = _request_errors.last
+            except Exception as exc:
+                status, error = None, f'{type(exc).__name__}: {exc}'
+            samples.append((endpoint.name, status, (time.perf_counter() - started) * 1000))
+            if error or (status is not None and status >= 400):
+                with lock:
+                    result.errors[f'{endpoint.name}: {error or status}'[:300]] += 1
+    finally:
+        with lock:
+            result.samples.extend(samples)
+        connections.close_all()
+
+
+def run_scenario(scenario, users=10, duration=30, max_requests=None, seed=42):
+    """Drive `scenario` with `users` concurrent virtual users for `duration` seconds"""
+    shared = scenario.setup(users) if scenario.setup else {}
+    result = LoadTestResult(scenario.name, users, duration)
+    lock = threading.Lock()
+    started = time.monotonic()
+    deadline = started + duration
+    threads = [
+        threading.Thread(
+            target=_virtual_user, args=(scenario, shared, index, seed, deadline, max_requests, result, lock),
+            name=f'loadtest-{scenario.name}-{index}', daemon=True,
+        )
+        for index in range(users)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    result.duration = time.monotonic() - started
+    return result
+
+
+def run_load_test(scenario_names, users=10, duration=30, max_requests=None, seed=42, scale=None, years=1,
+                  configured_database=False, log=None):
+    """Run the named scenarios; returns {scenario: LoadTestResult or the reason it was skipped}
+
+    The scenarios run against a throwaway database generated at `scale`
+    (DEFAULT_SCALE when None), or with `configured_database` against the
+    configured database, from which the load test accounts are removed
+    afterwards.
+    """
+    log = log or logger.info
+    scenarios = [SCENARIOS[name] for name in scenario_names]
+    urlconf, unavailable = build_urlconf([endpoint for scenario in scenarios for endpoint in scenario.endpoints])
+
+    results = {}
+    setup_test_environment()
+    got_request_exception.connect(_remember_request_exception, dispatch_uid='load_test_request_exception')
+    try:
+        with override_settings(ROOT_URLCONF=urlconf):
+            if configured_database:
+                try:
+                    _run_all(scenarios, unavailable, results, users, duration, max_requests, seed, log)
+                finally:
+                    try:
+                        log(f'Deleted {delete_load_test_users()} load test account(s)')
+                    except DatabaseError as exc:
+                        # Their password was random and is gone with this run
+                        logger.error(f'Could not delete the {LOAD_TEST_PREFIX}* accounts: {exc}')
+            else:
+                scale = DEFAULT_SCALE if scale is None else scale
+                with benchmark_database():
+                    log(f'Generating data at scale {scale}...')
+                    SyntheticDataGenerator(scale=scale, seed=seed, years=years, log=lambda message: None).run()
+                    _run_all(scenarios, unavailable, results, users, duration, max_requests, seed, log)
+    finally:
+        got_request_exception.disconnect(dispatch_uid='load_test_request_exception')
+        teardown_test_environment()
+    return results
+
+
+def _run_all(scenarios, unavailable, results, users, duration, max_requests, seed, log):
+    for scenario in scenarios:
+        missing = [endpoint.name for endpoint in scenario.endpoints if endpoint.name in unavailable]
+        if missing:
+            results[scenario.name] = f'views unavailable: {", ".join(unavailable[name] for name in missing)}'
+            continue
+        invalidate_response_caches()
+        log(f'Running {scenario.name} with {users} users for {duration}s...')
+        try:
+            results[scenario.name] = run_scenario(scenario, users, duration, max_requests, seed)
+        except ScenarioUnavailable as exc:
+            results[scenario.name] = str(exc)
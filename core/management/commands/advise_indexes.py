@@ -0,0 +1,85 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.index_advisor import IndexAdvisor, load_capture, migration_code, replayed_workload
+from core.performance import get_profiler_setting
+
+
+class Command(BaseCommand):
+    help = (
+        'EXPLAIN captured (or replayed) query shapes and report missing indexes with their '
+        'estimated benefit and ready-to-apply migration code'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--capture',
+            type=str,
+            help='Query capture JSONL to analyse (default: PERFORMANCE_PROFILER QUERY_CAPTURE_FILE)',
+        )
+        parser.add_argument(
+            '--replay',
+            action='store_true',
+            help='Replay the benchmark endpoints against generated data instead of reading a capture',
+        )
+        parser.add_argument('--scale', type=float, help='Synthetic data scale for --replay')
+        parser.add_argument('--database', default='default', help='Database alias to EXPLAIN against')
+        parser.add_argument('--min-rows', type=int, help='Ignore tables with fewer rows (default: INDEX_ADVISOR MIN_ROWS)')
+        parser.add_argument('--top', type=int, default=10, help='Recommendations to report (default: 10)')
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Create each candidate in a rolled-back transaction and keep only those the planner uses '
+                 '(locks the table on PostgreSQL; run against a replica or copy)',
+        )
+        parser.add_argument('--output', type=str, help='Write the recommendations to a JSON file')
+
+    def handle(self, *args, **options):
+        if options['replay']:
+            with replayed_workload(scale=options['scale']) as shapes:
+                self.stdout.write(f'Replayed {sum(shape["count"] for shape in shapes)} queries '
+                                  f'({len(shapes)} shapes)')
+                self.advise(shapes, 'default', options)
+            return
+
+        capture = options['capture'] or get_profiler_setting('QUERY_CAPTURE_FILE')
+        if not capture:
+            raise CommandError('Pass --capture or --replay, or set PERFORMANCE_PROFILER QUERY_CAPTURE_FILE')
+        try:
+            shapes = load_capture(capture)
+        except OSError as exc:
+            raise CommandError(f'Cannot read {capture}: {exc}')
+        self.stdout.write(f'Loaded {len(shapes)} query shapes from {capture}')
+        self.advise(shapes, options['database'], options)
+
+    def advise(self, shapes, using, options):
+        try:
+            advisor = IndexAdvisor(using=using, min_rows=options['min_rows'], verify=options['verify'])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        recommendations = advisor.analyze(shapes)[:options['top']]
+        if advisor.skipped:
+            self.stdout.write(self.style.WARNING(f'{advisor.skipped} shape(s) could not be EXPLAINed'))
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(recommendations, output, indent=2, default=str)
+
+        if not recommendations:
+            self.stdout.write(self.style.SUCCESS('No missing indexes found'))
+            return
+
+        for number, recommendation in enumerate(recommendations, start=1):
+            self.stdout.write(self.style.SUCCESS(
+                f'{number}. {recommendation["model"]}({", ".join(recommendation["fields"])}): '
+                f'{recommendation["reason"]} of {recommendation["rows"]} rows, '
+                f'{recommendation["executions"]} executions, benefit {recommendation["benefit"]:.0f}'
+            ))
+            if 'cost_after' in recommendation:
+                self.stdout.write(f'   cost {recommendation["cost_before"]} -> {recommendation["cost_after"]}')
+            for fingerprint in recommendation['fingerprints']:
+                self.stdout.write(f'   {fingerprint[:200]}')
+
+        for app_label, source in migration_code(recommendations, using).items():
+            self.stdout.write(f'\n# {app_label}/migrations/XXXX_advised_indexes.py\n{source}')
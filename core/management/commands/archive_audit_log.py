@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.audit_archive import archive_audit_logs, get_archive_dir
+
+
+class Command(BaseCommand):
+    help = 'Move audit log entries past their retention period to compressed monthly archives'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--archive-dir',
+            type=str,
+            help='Directory for the audit-YYYY-MM.jsonl.gz archives (default: AUDIT_LOG ARCHIVE_DIR)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Entries archived and deleted per batch (default: 1000)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many entries are due for archival',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+
+        archive_dir = options['archive_dir'] or get_archive_dir()
+        archived = archive_audit_logs(
+            archive_dir=archive_dir, batch_size=options['batch_size'], dry_run=options['dry_run']
+        )
+
+        verb = 'due for archival' if options['dry_run'] else f'archived to {archive_dir}'
+        for risk_level, count in archived.items():
+            self.stdout.write(f'{risk_level}: {count} entries {verb}')
+        self.stdout.write(self.style.SUCCESS(f'{sum(archived.values())} audit log entries {verb}'))
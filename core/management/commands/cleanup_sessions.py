@@ -0,0 +1,42 @@
+from datetime import timedelta
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from authentication.models import LoginSession
+from authentication.sessions import expire_sessions
+
+
+class Command(BaseCommand):
+    help = 'Close expired login sessions and purge old session records (run periodically, e.g. from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--purge-days',
+            type=int,
+            default=90,
+            help='Delete closed login session records older than this many days (default: 90, 0 keeps them)',
+        )
+
+    def handle(self, *args, **options):
+        purge_days = options['purge_days']
+        if purge_days < 0:
+            raise CommandError('--purge-days must not be negative')
+
+        now = timezone.now()
+        closed = expire_sessions(now)
+
+        # Keep the session store itself small as well (same as clearsessions)
+        import_module(settings.SESSION_ENGINE).SessionStore.clear_expired()
+
+        purged = 0
+        if purge_days:
+            purged, _ = LoginSession.objects.filter(
+                is_active=False, logout_time__lt=now - timedelta(days=purge_days)
+            ).delete()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Closed {closed} expired login sessions and purged {purged} old login session records'
+        ))
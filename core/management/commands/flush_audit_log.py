@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.audit import audit_writer, get_spill_dir, replay_spilled
+
+
+class Command(BaseCommand):
+    help = 'Write audit log entries left in journals by failed flushes or stopped processes'
+
+    def handle(self, *args, **options):
+        written = audit_writer.flush() + replay_spilled()
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} audit log entries from {get_spill_dir()}'))
@@ -0,0 +1,92 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.load_testing import DEFAULT_SCALE, HISTOGRAM_BUCKETS, SCENARIOS, run_load_test
+
+
+class Command(BaseCommand):
+    help = (
+        'Replay school-day traffic scenarios against the WSGI app in-process and report throughput, '
+        'error rate and latency histograms (for sizing gunicorn workers)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'scenarios',
+            nargs='*',
+            help=f'Scenarios to run: {", ".join(sorted(SCENARIOS))} (default: all)',
+        )
+        parser.add_argument('--users', type=int, default=10, help='Concurrent virtual users (default: 10)')
+        parser.add_argument('--duration', type=float, default=30, help='Seconds per scenario (default: 30)')
+        parser.add_argument('--requests', type=int, help='Stop each virtual user after this many requests')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for request mixes (default: 42)')
+        parser.add_argument(
+            '--scale',
+            type=float,
+            help=f'Scale of the generated throwaway database to run against (default: {DEFAULT_SCALE})',
+        )
+        parser.add_argument(
+            '--configured-database',
+            action='store_true',
+            help='Run against the configured database instead of a throwaway one; it is written to, '
+                 'and the load test accounts are deleted afterwards',
+        )
+        parser.add_argument(
+            '--target-rps',
+            type=float,
+            help='Peak request rate to size sync gunicorn workers for',
+        )
+        parser.add_argument('--output', type=str, help='Write the results to a JSON file')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['duration'] <= 0:
+            raise CommandError('--users and --duration must be positive')
+        unknown = set(options['scenarios']) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f'Unknown scenario(s): {", ".join(sorted(unknown))}')
+        if options['configured_database'] and options['scale'] is not None:
+            raise CommandError('--scale only applies to the throwaway database')
+
+        results = run_load_test(
+            options['scenarios'] or sorted(SCENARIOS), users=options['users'], duration=options['duration'],
+            max_requests=options['requests'], seed=options['seed'], scale=options['scale'],
+            configured_database=options['configured_database'], log=self.stdout.write,
+        )
+
+        report = {}
+        for name, result in results.items():
+            if isinstance(result, str):
+                self.stdout.write(self.style.WARNING(f'{name}: skipped, {result}'))
+                report[name] = {'skipped': result}
+                continue
+            report[name] = data = result.as_dict()
+            self.print_result(name, data)
+            if options['target_rps']:
+                workers = result.workers_for(options['target_rps'])
+                data['workers_for_target'] = workers
+                self.stdout.write(f'  Sync gunicorn workers for {options["target_rps"]:g} req/s: {workers}')
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(report, output, indent=2)
+
+    def print_result(self, name, data):
+        overall = data['overall']
+        self.stdout.write(self.style.SUCCESS(
+            f'{name}: {overall["requests"]} requests in {data["duration_s"]}s by {data["users"]} users, '
+            f'{overall["throughput_rps"]} req/s, {overall["error_rate"]:.1%} errors'
+        ))
+        for step, summary in [('all', overall)] + sorted(data['steps'].items()):
+            self.stdout.write(
+                f'  {step:<24} n={summary["requests"]:<6} mean {summary["mean_ms"]}ms  p50 {summary["p50_ms"]}ms  '
+                f'p95 {summary["p95_ms"]}ms  p99 {summary["p99_ms"]}ms  errors {summary["error_rate"]:.1%}'
+            )
+
+        peak = max(overall['histogram'].values()) or 1
+        for bound in HISTOGRAM_BUCKETS:
+            count = overall['histogram'][str(bound)]
+            label = f'<= {bound:g}ms' if bound != float('inf') else '> 10000ms'
+            self.stdout.write(f'  {label:>11} {count:>7} {"#" * round(40 * count / peak)}')
+        for error, count in sorted(data['errors'].items(), key=lambda item: -item[1])[:5]:
+            self.stdout.write(self.style.ERROR(f'  {count}x {error}'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core.dashboard_stats import reconcile_all_dashboard_statistics
+
+
+class Command(BaseCommand):
+    help = 'Recompute the materialized dashboard statistics from the source tables (run periodically, e.g. from cron)'
+
+    def handle(self, *args, **options):
+        for statistics in reconcile_all_dashboard_statistics():
+            self.stdout.write(self.style.SUCCESS(
+                f'Dashboard statistics of {statistics.school} reconciled: {statistics.students} students, '
+                f'{statistics.teachers} teachers, {statistics.fee_payments} fee payments'
+            ))
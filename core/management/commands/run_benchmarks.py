@@ -0,0 +1,74 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import ENDPOINTS, compare_to_baseline, get_baseline_file, load_baseline, run_benchmarks, save_baseline
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the hot endpoints against generated data and fail on query-count or '
+        'latency regressions beyond the BENCHMARKS budget'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scales',
+            nargs='+',
+            type=float,
+            help='Synthetic data scale factors to benchmark at (default: BENCHMARKS SCALES)',
+        )
+        parser.add_argument(
+            '--endpoints',
+            nargs='+',
+            choices=[endpoint.name for endpoint in ENDPOINTS],
+            help='Only benchmark these endpoints',
+        )
+        parser.add_argument('--iterations', type=int, help='Measured requests per endpoint')
+        parser.add_argument('--warmup', type=int, help='Unmeasured requests per endpoint before measuring')
+        parser.add_argument(
+            '--baseline',
+            type=str,
+            help='Baseline JSON file (default: BENCHMARKS BASELINE_FILE)',
+        )
+        parser.add_argument(
+            '--update-baseline',
+            action='store_true',
+            help='Store this run as the new baseline instead of comparing against it',
+        )
+        parser.add_argument('--output', type=str, help='Also write this run\'s results to a JSON file')
+
+    def handle(self, *args, **options):
+        if options['iterations'] is not None and options['iterations'] < 1:
+            raise CommandError('--iterations must be positive')
+
+        baseline_file = options['baseline'] or get_baseline_file()
+        baseline = None
+        if not options['update_baseline']:
+            baseline = load_baseline(baseline_file)
+            if baseline is None:
+                raise CommandError(f'No baseline at {baseline_file}; run with --update-baseline to record one')
+
+        endpoints = ENDPOINTS
+        if options['endpoints']:
+            endpoints = [endpoint for endpoint in ENDPOINTS if endpoint.name in options['endpoints']]
+
+        results = run_benchmarks(
+            scales=options['scales'], endpoints=endpoints, iterations=options['iterations'],
+            warmup=options['warmup'], log=self.stdout.write,
+        )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(results, output, indent=2, sort_keys=True)
+
+        if options['update_baseline']:
+            save_baseline(results, baseline_file)
+            self.stdout.write(self.style.SUCCESS(f'Baseline written to {baseline_file}'))
+            return
+
+        regressions = compare_to_baseline(results, baseline)
+        if regressions:
+            for regression in regressions:
+                self.stdout.write(self.style.ERROR(regression))
+            raise CommandError(f'{len(regressions)} benchmark regression(s) against {baseline_file}')
+        self.stdout.write(self.style.SUCCESS('All endpoints within their benchmark budget'))
@@ -0,0 +1,51 @@
+import json
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.audit_archive import search_archived_logs
+
+
+class Command(BaseCommand):
+    help = 'Search archived audit log entries; prints matching entries as JSON lines'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--archive-dir', type=str, help='Archive directory (default: AUDIT_LOG ARCHIVE_DIR)')
+        parser.add_argument('--from', dest='start', type=str, help='First date to include (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='end', type=str, help='Last date to include (YYYY-MM-DD)')
+        parser.add_argument('--action', type=str, help='Action type, e.g. LOGIN or UPDATE')
+        parser.add_argument('--risk', type=str, help='Risk level, e.g. HIGH')
+        parser.add_argument('--user', type=str, help='Username')
+        parser.add_argument('--model', type=str, help='Model name, e.g. SchoolSettings')
+        parser.add_argument('--object-id', type=str, help='Object id')
+        parser.add_argument('--text', type=str, help='Text to find in the description or changes')
+        parser.add_argument('--limit', type=int, default=100, help='Maximum entries to print (default: 100, 0 for all)')
+
+    def _parse_date(self, value, option):
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f'{option} must be a date in YYYY-MM-DD format')
+
+    def handle(self, *args, **options):
+        entries = search_archived_logs(
+            archive_dir=options['archive_dir'],
+            start=self._parse_date(options['start'], '--from'),
+            end=self._parse_date(options['end'], '--to'),
+            action_type=options['action'],
+            risk_level=options['risk'],
+            username=options['user'],
+            model_name=options['model'],
+            object_id=options['object_id'],
+            text=options['text'],
+        )
+
+        found = 0
+        for entry in entries:
+            self.stdout.write(json.dumps(entry))
+            found += 1
+            if options['limit'] and found >= options['limit']:
+                break
+        self.stderr.write(f'{found} matching entries')
@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import AcademicYear, SchoolSettings
+from core.snapshots import DATASET_NAMES, FORMAT_EXTENSIONS, SnapshotUnavailable, get_snapshot_dir, write_snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        'Write per-academic-year columnar snapshots (Parquet or Arrow IPC) of students, fee payments, '
+        'class attendance (per school) and exam results for offline analytics'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--school',
+            nargs='+',
+            type=int,
+            help='SchoolSettings ids to snapshot school-scoped datasets for (default: every school)',
+        )
+        parser.add_argument(
+            '--year',
+            nargs='+',
+            help='Academic year names, e.g. 2024-25 (default: the current academic year)',
+        )
+        parser.add_argument(
+            '--datasets',
+            nargs='+',
+            choices=DATASET_NAMES,
+            help='Only write these datasets',
+        )
+        parser.add_argument(
+            '--format',
+            choices=sorted(FORMAT_EXTENSIONS),
+            help='File format (default: SNAPSHOTS FORMAT)',
+        )
+        parser.add_argument('--output-dir', type=str, help='Snapshot root directory (default: SNAPSHOTS DIR)')
+        parser.add_argument('--chunk-size', type=int, help='Rows per record batch (default: SNAPSHOTS CHUNK_SIZE)')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] is not None and options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive')
+
+        schools = SchoolSettings.objects.order_by('pk')
+        if options['school']:
+            schools = schools.filter(pk__in=options['school'])
+        if not schools:
+            raise CommandError('No matching schools')
+
+        if options['year']:
+            academic_years = list(AcademicYear.objects.filter(name__in=options['year']).order_by('start_date'))
+            missing = set(options['year']) - {year.name for year in academic_years}
+            if missing:
+                raise CommandError(f'Unknown academic year(s): {", ".join(sorted(missing))}')
+        else:
+            academic_years = list(AcademicYear.objects.filter(is_current=True))
+            if not academic_years:
+                raise CommandError('No current academic year; pass --year')
+
+        try:
+            manifests = write_snapshots(
+                schools, academic_years, datasets=options['datasets'], output_dir=options['output_dir'],
+                file_format=options['format'], chunk_size=options['chunk_size'], log=self.stdout.write,
+            )
+        except SnapshotUnavailable as exc:
+            raise CommandError(str(exc))
+
+        rows = sum(dataset.get('rows', 0) for manifest in manifests for dataset in manifest['datasets'].values())
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {len(manifests)} snapshot partition(s), {rows} rows, to {options["output_dir"] or get_snapshot_dir()}'
+        ))
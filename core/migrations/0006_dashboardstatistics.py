@@ -0,0 +1,35 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_hr_enhancements'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('students', models.IntegerField(default=0)),
+                ('teachers', models.IntegerField(default=0)),
+                ('fee_payments', models.IntegerField(default=0)),
+                ('paid_payments', models.IntegerField(default=0)),
+                ('fee_collected', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('fee_pending', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('attendance_date', models.DateField(blank=True, null=True)),
+                ('today_present', models.IntegerField(default=0)),
+                ('today_absent', models.IntegerField(default=0)),
+                ('week_present', models.IntegerField(default=0)),
+                ('reconciled_stats', models.JSONField(blank=True, default=dict)),
+                ('reconciled_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Dashboard Statistics',
+                'verbose_name_plural': 'Dashboard Statistics',
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_auditlog_archive_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentFeeLedger',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('total_due', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('concession', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('late_fee', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_paid', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('balance', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('last_payment_date', models.DateField(blank=True, null=True)),
+                ('academic_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fee_ledgers', to='core.academicyear')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fee_ledgers', to='core.student')),
+            ],
+            options={
+                'unique_together': {('student', 'academic_year')},
+                'indexes': [models.Index(fields=['academic_year', 'balance'], name='core_ledger_year_balance_idx')],
+            },
+        ),
+    ]
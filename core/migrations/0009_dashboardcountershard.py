@@ -0,0 +1,33 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_studentfeeledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardCounterShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField()),
+                ('students', models.IntegerField(default=0)),
+                ('teachers', models.IntegerField(default=0)),
+                ('fee_payments', models.IntegerField(default=0)),
+                ('paid_payments', models.IntegerField(default=0)),
+                ('fee_collected', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('fee_pending', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('attendance_date', models.DateField(blank=True, null=True)),
+                ('today_present', models.IntegerField(default=0)),
+                ('today_absent', models.IntegerField(default=0)),
+                ('week_present', models.IntegerField(default=0)),
+                ('statistics', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='counter_shards', to='core.dashboardstatistics')),
+            ],
+            options={
+                'unique_together': {('statistics', 'shard')},
+            },
+        ),
+    ]
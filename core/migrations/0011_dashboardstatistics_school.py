@@ -0,0 +1,37 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def assign_default_school(apps, schema_editor):
+    # The installation-wide row becomes the default (first) school's row;
+    # the other schools get theirs from reconcile_dashboard_stats
+    DashboardStatistics = apps.get_model('core', 'DashboardStatistics')
+    SchoolSettings = apps.get_model('core', 'SchoolSettings')
+    school = SchoolSettings.objects.order_by('pk').first()
+    if school is None:
+        DashboardStatistics.objects.all().delete()
+    else:
+        kept = DashboardStatistics.objects.order_by('pk').values_list('pk', flat=True).first()
+        DashboardStatistics.objects.exclude(pk=kept).delete()
+        DashboardStatistics.objects.update(school=school)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_auditlog_created_at_default'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dashboardstatistics',
+            name='school',
+            field=models.OneToOneField(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='dashboard_statistics', to='core.schoolsettings'),
+        ),
+        migrations.RunPython(assign_default_school, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='dashboardstatistics',
+            name='school',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='dashboard_statistics', to='core.schoolsettings'),
+        ),
+    ]
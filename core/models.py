@@ -407,6 +407,9 @@ class AuditLog(UUIDModel, TimeStampedModel):
         ('HIGH', 'High'),
         ('CRITICAL', 'Critical'),
     ], default='LOW')
+    # When the event happened: set by audit_log() and kept by the buffered
+    # bulk insert, which auto_now_add would overwrite with the flush time
+    created_at = models.DateTimeField(default=timezone.now)
     
     class Meta:
         ordering = ['-created_at']
@@ -414,6 +417,9 @@ class AuditLog(UUIDModel, TimeStampedModel):
             models.Index(fields=['school', 'action_type']),
             models.Index(fields=['user', 'created_at']),
             models.Index(fields=['ip_address']),
+            # Newest-first listings and archival by age / risk level
+            models.Index(fields=['created_at'], name='core_audit_created_at_idx'),
+            models.Index(fields=['risk_level', 'created_at'], name='core_audit_risk_created_idx'),
         ]
     
     def __str__(self):
@@ -1479,3 +1485,91 @@ class HRAnalytics(TimeStampedModel):
     
     def __str__(self):
         return f"{self.analytics_type} - {self.analysis_period_start} to {self.analysis_period_end}"
+
+class DashboardStatistics(TimeStampedModel):
+    """Materialized dashboard statistics of one school
+
+    Counters are kept current by signals in core.dashboard_stats;
+    everything else is refreshed by the periodic full reconciliation.
+    """
+    school = models.OneToOneField(SchoolSettings, on_delete=models.CASCADE, related_name='dashboard_statistics')
+    students = models.IntegerField(default=0)
+    teachers = models.IntegerField(default=0)
+    fee_payments = models.IntegerField(default=0)
+    paid_payments = models.IntegerField(default=0)
+    fee_collected = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    fee_pending = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    attendance_date = models.DateField(blank=True, null=True)
+    today_present = models.IntegerField(default=0)
+    today_absent = models.IntegerField(default=0)
+    week_present = models.IntegerField(default=0)
+    reconciled_stats = models.JSONField(default=dict, blank=True)
+    reconciled_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        verbose_name = "Dashboard Statistics"
+        verbose_name_plural = "Dashboard Statistics"
+    
+    def __str__(self):
+        return f"Dashboard statistics of {self.school} (reconciled {self.reconciled_at})"
+
+
+class DashboardCounterShard(models.Model):
+    """One slice of the counter deltas applied since the last reconciliation
+
+    Each change updates a randomly chosen shard, so concurrent saves rarely
+    wait on each other; reads add the shards to the DashboardStatistics row
+    and reconciliation folds them back into it.
+    """
+    statistics = models.ForeignKey(DashboardStatistics, on_delete=models.CASCADE, related_name='counter_shards')
+    shard = models.PositiveSmallIntegerField()
+    students = models.IntegerField(default=0)
+    teachers = models.IntegerField(default=0)
+    fee_payments = models.IntegerField(default=0)
+    paid_payments = models.IntegerField(default=0)
+    fee_collected = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    fee_pending = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    attendance_date = models.DateField(blank=True, null=True)
+    today_present = models.IntegerField(default=0)
+    today_absent = models.IntegerField(default=0)
+    week_present = models.IntegerField(default=0)
+    
+    class Meta:
+        unique_together = ['statistics', 'shard']
+    
+    def __str__(self):
+        return f"Dashboard counter shard {self.shard}"
+
+
+class StudentFeeLedger(TimeStampedModel):
+    """Materialized fee position of a student for an academic year
+
+    Kept current by signals in core.fee_ledger, in the same transaction as
+    the fee payment, fee structure or student change; the rebuild_fee_ledger
+    command recomputes every row.
+    """
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='fee_ledgers')
+    academic_year = models.ForeignKey(AcademicYear, on_delete=models.CASCADE, related_name='fee_ledgers')
+    total_due = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    concession = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    late_fee = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    balance = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    last_payment_date = models.DateField(blank=True, null=True)
+    
+    class Meta:
+        unique_together = ['student', 'academic_year']
+        indexes = [
+            models.Index(fields=['academic_year', 'balance'], name='core_ledger_year_balance_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.student} - {self.academic_year} - ₹{self.balance}"
+    
+    @property
+    def payable(self):
+        return self.total_due - self.concession + self.late_fee
+    
+    @property
+    def percentage_paid(self):
+        return round(self.total_paid / self.payable * 100, 1) if self.payable > 0 else 0
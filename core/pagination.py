@@ -0,0 +1,173 @@
+"""
+Keyset (cursor) pagination for high-volume DRF list endpoints
+
+PageNumberPagination runs a COUNT(*) and an OFFSET scan that grows with
+the page number. KeysetPagination instead remembers the ordering values of
+the last row it returned and asks for the rows after them:
+
+    WHERE created_at < %s OR (created_at = %s AND id < %s)
+    ORDER BY created_at DESC, id DESC LIMIT page_size + 1
+
+With an index on the ordering columns every page costs the same as the
+first. Cursors are opaque base64 tokens; there is no total count and no
+jumping to page N, only next/previous links.
+
+Opt in per viewset:
+
+    class AttendanceViewSet(viewsets.ModelViewSet):
+        pagination_class = KeysetPagination
+
+The default ordering is ('-created_at', '-id'); subclass and set `ordering`
+for other keys. Ordering fields must be non-null, and together unique
+(end with the primary key), so that no row is skipped or repeated.
+"""
+import base64
+import binascii
+import datetime
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _cursor_value(value):
+    # Full precision, unlike DjangoJSONEncoder, which drops microseconds
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    return str(value)
+
+
+class KeysetPagination(BasePagination):
+    ordering = ('-created_at', '-id')
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.fields = [queryset.model._meta.get_field(name.lstrip('-')) for name in self.ordering]
+        position, reverse = self.decode_cursor(request)
+
+        ordering = [self._direction(name, reverse) for name in self.ordering]
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.after(position, reverse))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        self.page = rows
+        return rows
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                return _positive_int(
+                    request.query_params[self.page_size_query_param], strict=True, cutoff=self.max_page_size
+                )
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    @staticmethod
+    def _direction(name, reverse):
+        if not reverse:
+            return name
+        return name[1:] if name.startswith('-') else f'-{name}'
+
+    def after(self, position, reverse):
+        """Rows strictly after `position` in the (possibly reversed) ordering"""
+        condition = Q()
+        equal = Q()
+        for name, field, value in zip(self.ordering, self.fields, position):
+            descending = name.startswith('-') != reverse
+            lookup = 'lt' if descending else 'gt'
+            condition |= equal & Q(**{f'{field.attname}__{lookup}': value})
+            equal &= Q(**{field.attname: value})
+        return condition
+
+    def position(self, row):
+        return [getattr(row, field.attname) for field in self.fields]
+
+    def encode_cursor(self, position, reverse):
+        payload = json.dumps({'p': position, 'r': int(reverse)}, default=_cursor_value, separators=(',', ':'))
+        token = base64.urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        """(position, reverse) from the request's cursor; (None, False) for the first page"""
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+            position = [field.to_python(value) for field, value in zip(self.fields, payload['p'])]
+            if len(position) != len(self.fields):
+                raise ValueError(token)
+            return position, bool(payload['r'])
+        except (binascii.Error, ValueError, TypeError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            # Paged backwards past the start: the next page begins at the top
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.position(self.page[0]), reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Opaque pagination cursor from a next/previous link',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Number of results per page',
+                'schema': {'type': 'integer'},
+            },
+        ]
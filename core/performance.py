@@ -1,27 +1,216 @@
 ﻿"""
 Production Performance Monitoring for School ERP System
 """
+import os
 import time
+import hashlib
+import json
+import heapq
+import random
+import re
 import logging
-from django.db import connection
+import threading
+from collections import Counter, defaultdict
+from contextlib import ExitStack
+from django.db import connection, connections, DatabaseError
+from django.db.models import Count, Max
 from django.core.cache import cache
 from django.conf import settings
-from functools import wraps
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from functools import wraps, lru_cache
 
 logger = logging.getLogger(__name__)
 
+# Default profiler configuration, overridable via settings.PERFORMANCE_PROFILER
+PROFILER_DEFAULTS = {
+    'ENABLED': True,
+    'SAMPLE_RATE': 0.05,            # Fraction of requests profiled (0.0 - 1.0)
+    'SLOW_REQUEST_LOG_SIZE': 50,    # Slowest requests kept per worker process
+    'N_PLUS_ONE_THRESHOLD': 10,     # Repeats of one SQL shape flagged as N+1
+    'SLOW_REQUEST_SECONDS': 2.0,
+    'HIGH_QUERY_COUNT': 50,
+    'QUERY_CAPTURE_FILE': None,     # JSONL of sampled query shapes, for the index advisor
+    'QUERY_CAPTURE_MAX_BYTES': 50 * 1024 * 1024,  # Rotated to <file>.1 beyond this size
+    # Queries touching these tables (prefixes) are never captured
+    'QUERY_CAPTURE_EXCLUDED_TABLES': ['django_session', 'auth_', 'authentication_', 'core_auditlog'],
+}
+
+_SQL_STRING = re.compile(r"'(?:[^']|'')*'")
+_SQL_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_SQL_IN_LIST = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?|NULL)\s*,?)+\)', re.IGNORECASE)
+_SQL_VALUES = re.compile(r'\bVALUES\s*(?:\([^)]*\)\s*,?\s*)+', re.IGNORECASE)
+_SQL_WHITESPACE = re.compile(r'\s+')
+_SQL_TABLE = re.compile(r'\b(?:FROM|JOIN|INTO|UPDATE)\s+["`]?(\w+)', re.IGNORECASE)
+
+
+def get_profiler_setting(name):
+    """Read a profiler option from settings with a built-in default"""
+    return getattr(settings, 'PERFORMANCE_PROFILER', {}).get(name, PROFILER_DEFAULTS[name])
+
+
+@lru_cache(maxsize=2048)
+def fingerprint_sql(sql):
+    """Reduce a SQL statement to its shape so repeated queries group together"""
+    shape = _SQL_STRING.sub('?', sql)
+    shape = _SQL_NUMBER.sub('?', shape)
+    shape = _SQL_IN_LIST.sub('IN (...)', shape)
+    shape = _SQL_VALUES.sub('VALUES (...) ', shape)
+    return _SQL_WHITESPACE.sub(' ', shape).strip()
+
+
+class QueryProfiler:
+    """Collect query count, DB time and SQL shapes via connection.execute_wrapper
+
+    Unlike connection.queries this works with DEBUG=False, so it gives the
+    same visibility in production as in development.
+    """
+
+    def __init__(self):
+        self.query_count = 0
+        self.db_time = 0.0
+        self.shape_counts = Counter()
+        self.shape_time = defaultdict(float)
+        self.shape_sample = {}
+        self.shape_params = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            shape = fingerprint_sql(sql)
+            self.query_count += 1
+            self.db_time += elapsed
+            self.shape_counts[shape] += 1
+            self.shape_time[shape] += elapsed
+            if shape not in self.shape_sample:
+                self.shape_sample[shape] = sql
+                self.shape_params[shape] = None if many else params
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for conn in connections.all():
+            self._stack.enter_context(conn.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+        return False
+
+    def repeated_queries(self, threshold=None):
+        """SQL shapes executed at least `threshold` times (likely N+1 loops)"""
+        if threshold is None:
+            threshold = get_profiler_setting('N_PLUS_ONE_THRESHOLD')
+        return [
+            {
+                'fingerprint': shape,
+                'count': count,
+                'total_time': round(self.shape_time[shape], 4),
+                'sample_sql': self.shape_sample[shape][:500],
+            }
+            for shape, count in self.shape_counts.most_common()
+            if count >= threshold
+        ]
+
+    def captured_shapes(self):
+        """One record per SQL shape: a sample statement with its parameters, count and time"""
+        return [
+            {
+                'fingerprint': shape,
+                'count': count,
+                'total_time': round(self.shape_time[shape], 6),
+                'sql': self.shape_sample[shape],
+                'params': self.shape_params[shape],
+            }
+            for shape, count in self.shape_counts.items()
+        ]
+
+
+def is_capturable(sql):
+    """Whether `sql` stays clear of QUERY_CAPTURE_EXCLUDED_TABLES"""
+    excluded = tuple(get_profiler_setting('QUERY_CAPTURE_EXCLUDED_TABLES'))
+    return not any(table.lower().startswith(excluded) for table in _SQL_TABLE.findall(sql))
+
+
+def capture_query_shapes(profiler, path, **extra):
+    """Append the profiler's query shapes to a JSONL capture file
+
+    The records hold literal query parameters (names, phone numbers,
+    amounts), so the file is created readable by its owner only and must be
+    kept private like a database dump. Queries on session and auth tables
+    are left out entirely. Once the file reaches QUERY_CAPTURE_MAX_BYTES it
+    is rotated to `<path>.1`, replacing the previous one.
+    """
+    records = [record for record in profiler.captured_shapes() if is_capturable(record['sql'])]
+    if not records:
+        return
+    try:
+        try:
+            if os.path.getsize(path) >= get_profiler_setting('QUERY_CAPTURE_MAX_BYTES'):
+                os.replace(path, f'{path}.1')
+        except FileNotFoundError:
+            pass
+        descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+        with open(descriptor, 'a', encoding='utf-8') as capture:
+            for record in records:
+                capture.write(json.dumps({**record, **extra}, default=str) + '\n')
+    except OSError:
+        logger.warning("Could not write query capture to %s", path, exc_info=True)
+
+
+class SlowRequestLog:
+    """Thread-safe bounded buffer keeping the slowest profiled requests"""
+
+    def __init__(self, size):
+        self.size = size
+        self._heap = []
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self.total_requests = 0
+        self.n_plus_one_requests = 0
+
+    def record(self, entry):
+        with self._lock:
+            self.total_requests += 1
+            if entry['n_plus_one']:
+                self.n_plus_one_requests += 1
+            self._sequence += 1
+            item = (entry['duration'], self._sequence, entry)
+            if len(self._heap) < self.size:
+                heapq.heappush(self._heap, item)
+            elif item[0] > self._heap[0][0]:
+                heapq.heapreplace(self._heap, item)
+
+    def slowest(self):
+        with self._lock:
+            return [entry for _, _, entry in sorted(self._heap, reverse=True)]
+
+    def clear(self):
+        with self._lock:
+            self._heap = []
+            self.total_requests = 0
+            self.n_plus_one_requests = 0
+
+
+slow_request_log = SlowRequestLog(get_profiler_setting('SLOW_REQUEST_LOG_SIZE'))
+
+
 def monitor_performance(func):
     """Decorator to monitor function performance"""
     @wraps(func)
     def wrapper(*args, **kwargs):
         start_time = time.time()
-        initial_queries = len(connection.queries)
-        
+        profiler = QueryProfiler()
+
         try:
-            result = func(*args, **kwargs)
+            with profiler:
+                result = func(*args, **kwargs)
             execution_time = time.time() - start_time
-            query_count = len(connection.queries) - initial_queries
-            
+            query_count = profiler.query_count
+
             # Log performance metrics
             logger.info(f"{func.__name__} executed in {execution_time:.2f}s with {query_count} queries")
             
@@ -29,9 +218,12 @@ def monitor_performance(func):
             if execution_time > 5.0:
                 logger.warning(f"SLOW FUNCTION: {func.__name__} took {execution_time:.2f}s")
             
-            if query_count > 50:
+            if query_count > get_profiler_setting('HIGH_QUERY_COUNT'):
                 logger.warning(f"HIGH QUERY COUNT: {func.__name__} made {query_count} queries")
-            
+
+            for repeated in profiler.repeated_queries():
+                logger.warning(f"N+1 SUSPECT in {func.__name__}: {repeated['count']}x {repeated['fingerprint'][:200]}")
+
             return result
             
         except Exception as e:
@@ -49,7 +241,8 @@ class PerformanceMetrics:
         """Get database performance statistics"""
         with connection.cursor() as cursor:
             stats = {
-                'total_queries': len(connection.queries),
+                'profiled_requests': slow_request_log.total_requests,
+                'n_plus_one_requests': slow_request_log.n_plus_one_requests,
                 'connection_status': 'connected' if connection.connection else 'disconnected'
             }
             
@@ -114,32 +307,333 @@ class QueryOptimizer:
         """Optimize queryset with select_related"""
         return queryset.select_related(*fields)
 
+class CacheNamespace:
+    """Versioned cache namespace for one domain, optionally scoped to a school
+
+    Every key is prefixed with generation counters for the domain (all
+    schools) and for the domain within the school. Invalidation bumps a
+    counter so the old keys simply become unreachable and age out through
+    their timeout; no key scanning is needed, so it works the same on
+    LocMem, file and database cache backends.
+    """
+
+    KEY_PREFIX = 'ns'
+
+    def __init__(self, domain, school=None):
+        self.domain = domain
+        self.school_id = getattr(school, 'pk', school)
+
+    def _generation_keys(self):
+        scope = self.school_id if self.school_id is not None else 'all'
+        return (
+            f"{self.KEY_PREFIX}:{self.domain}:generation",
+            f"{self.KEY_PREFIX}:{self.domain}:{scope}:generation",
+        )
+
+    @staticmethod
+    def _new_generation():
+        # Seeded from the clock so an evicted counter never restarts at a
+        # value whose keys may still be cached.
+        return int(time.time() * 1000)
+
+    def _generations(self):
+        keys = self._generation_keys()
+        if self.school_id is None:
+            keys = keys[:1]
+        found = cache.get_many(keys)
+        generations = []
+        for key in keys:
+            generation = found.get(key)
+            if generation is None:
+                generation = self._new_generation()
+                if not cache.add(key, generation, None):
+                    generation = cache.get(key, generation)
+            generations.append(str(generation))
+        return generations
+
+    def generation(self):
+        """Current generation of this namespace; changes on every invalidation"""
+        return '.'.join(self._generations())
+
+    def make_key(self, key):
+        """Build the versioned cache key for `key` inside this namespace"""
+        generations = self.generation()
+        scope = self.school_id if self.school_id is not None else 'all'
+        return f"{self.KEY_PREFIX}:{self.domain}:{scope}:{generations}:{key}"
+
+    def get(self, key, default=None):
+        return cache.get(self.make_key(key), default)
+
+    def set(self, key, value, timeout=300):
+        cache.set(self.make_key(key), value, timeout)
+
+    def get_or_set(self, key, default, timeout=300):
+        return cache.get_or_set(self.make_key(key), default, timeout)
+
+    def delete(self, key):
+        cache.delete(self.make_key(key))
+
+    def invalidate(self):
+        """Make every key in this namespace unreachable
+
+        Without a school this invalidates the domain for all schools.
+        """
+        generation_key = self._generation_keys()[0 if self.school_id is None else 1]
+        try:
+            cache.incr(generation_key)
+        except ValueError:
+            cache.set(generation_key, self._new_generation(), None)
+        logger.info(f"Cache namespace invalidated: {self.domain} (school={self.school_id or 'all'})")
+
+
+def get_or_compute(namespace, key, compute, timeout=300, stale_timeout=0, lock_timeout=30,
+                   cacheable=None):
+    """Single-flight cached computation with optional stale-while-revalidate
+
+    Only the caller that wins the lock recomputes an expired value. While it
+    works, other callers get the stale value (within `stale_timeout`) or wait
+    for the fresh one instead of all hitting the database at once.
+    `cacheable` can veto storing a computed value (e.g. an error response).
+    """
+    cache_key = namespace.make_key(key)
+    lock_key = f"{cache_key}:lock"
+    entry = cache.get(cache_key)
+    now = time.time()
+
+    if entry is not None:
+        value, fresh_until = entry
+        if now < fresh_until or not cache.add(lock_key, 1, lock_timeout):
+            return value
+    elif not cache.add(lock_key, 1, lock_timeout):
+        # Someone else is computing: wait for their result
+        deadline = now + lock_timeout
+        while time.time() < deadline:
+            time.sleep(0.05)
+            entry = cache.get(cache_key)
+            if entry is not None:
+                return entry[0]
+            if cache.get(lock_key) is None:
+                # Lock released without a stored value
+                return compute()
+        logger.warning(f"Timed out waiting for cache recomputation of {key}")
+        return compute()
+
+    try:
+        value = compute()
+        if cacheable is None or cacheable(value):
+            cache.set(cache_key, (value, time.time() + timeout), timeout + stale_timeout)
+        return value
+    finally:
+        cache.delete(lock_key)
+
+
+USER_SCHOOL_CACHE_TIMEOUT = 60 * 60
+
+
+def user_school_cache_key(user_id):
+    return f"user_school:{user_id}"
+
+
+def get_request_school_id(request):
+    """School of the authenticated user, or None
+
+    Resolved from request.user.profile once and cached per user (cleared
+    when the profile changes), so most requests never touch the profile table.
+    """
+    if hasattr(request, '_school_id'):
+        return request._school_id
+
+    user = getattr(request, 'user', None)
+    school_id = None
+    if user is not None and user.is_authenticated:
+        cache_key = user_school_cache_key(user.pk)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            school_id = cached or None
+        else:
+            try:
+                profile = getattr(user, 'profile', None)
+                school_id = getattr(profile, 'school_id', None)
+            except DatabaseError:
+                # User profiles are optional (the table may not be migrated yet)
+                school_id = None
+            # 0 marks "no school" so the miss is cached too
+            cache.set(cache_key, school_id or 0, USER_SCHOOL_CACHE_TIMEOUT)
+    request._school_id = school_id
+    return school_id
+
+
+def get_request_role(request):
+    """Role name used to partition cached results between user types"""
+    user = request.user
+    if not user.is_authenticated:
+        return 'ANONYMOUS'
+    if user.is_superuser:
+        return 'SUPER_ADMIN'
+    from .access_control import get_user_access
+    return ','.join(sorted(get_user_access(user)['roles'])) or 'NO_ROLE'
+
+
+def memoize_view(domain, timeout=300, stale_timeout=0, query_params=(), per_user=False, lock_timeout=30):
+    """Cache a view's response per school, role and selected query parameters
+
+    Keys live in the CacheNamespace for `domain`, so invalidating that
+    namespace for a school drops the cached responses. Only successful
+    GET/HEAD responses are stored.
+    """
+    def decorator(view_func):
+        view_name = f"{view_func.__module__}.{view_func.__name__}"
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+
+            key_parts = {
+                'role': get_request_role(request),
+                'args': args,
+                'kwargs': sorted(kwargs.items()),
+                'params': [(name, request.GET.getlist(name)) for name in query_params],
+            }
+            if per_user:
+                key_parts['user'] = request.user.pk
+            digest = hashlib.md5(repr(key_parts).encode()).hexdigest()
+            namespace = CacheNamespace(domain, get_request_school_id(request))
+
+            def compute():
+                response = view_func(request, *args, **kwargs)
+                if hasattr(response, 'render') and not getattr(response, 'is_rendered', True):
+                    response.render()
+                return response
+
+            return get_or_compute(
+                namespace, f"{view_name}:{digest}", compute, timeout, stale_timeout, lock_timeout,
+                cacheable=lambda response: response.status_code == 200,
+            )
+        return wrapper
+    return decorator
+
+
+RESOURCE_VERSION_TIMEOUT = 60 * 60
+
+
+def resource_version(queryset, namespace=None, timeout=RESOURCE_VERSION_TIMEOUT):
+    """(last updated_at, change token) of `queryset`, or None when it has no reliable stamp
+
+    With updated_at the token is the row count, which catches deletions
+    that leave the latest updated_at alone. Without updated_at an in-place
+    edit changes nothing an aggregate can see, so the token is Max(pk), the
+    count and the generation of `namespace` (bumped by core.signals on every
+    save and delete); such querysets have no stamp without a namespace.
+    With a namespace the stamp is cached there until it is invalidated;
+    without one it costs a single aggregate query.
+    """
+    has_updated_at = any(field.name == 'updated_at' for field in queryset.model._meta.concrete_fields)
+    if not has_updated_at and namespace is None:
+        return None
+
+    def compute():
+        if has_updated_at:
+            stamp = queryset.order_by().aggregate(last_modified=Max('updated_at'), count=Count('pk'))
+            return stamp['last_modified'], stamp['count']
+        stamp = queryset.order_by().aggregate(last_pk=Max('pk'), count=Count('pk'))
+        return None, (namespace.generation(), stamp['last_pk'], stamp['count'])
+
+    if namespace is None:
+        return compute()
+    sql, params = queryset.query.sql_with_params()
+    key = 'version:' + hashlib.md5(repr((sql, params)).encode()).hexdigest()
+    return namespace.get_or_set(key, compute, timeout)
+
+
+def conditional_response(request, queryset, respond, domain, per_school=True):
+    """Answer a GET with a 304 when the version stamp of `queryset` still matches
+
+    `respond()` builds the full response and only runs on a miss, so 304s
+    skip the serializers. The stamp is cached in the CacheNamespace for
+    `domain` (invalidated by core.signals); pass per_school=False when the
+    queryset is not limited to the user's school, since school-scoped
+    invalidations would not reach its cached stamp. Querysets without a
+    reliable stamp (see resource_version) are always answered in full.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return respond()
+
+    school_id = get_request_school_id(request)
+    namespace = CacheNamespace(domain, school_id) if per_school else None
+    version = resource_version(queryset, namespace)
+    if version is None:
+        return respond()
+    last_modified, token = version
+    etag = '"%s"' % hashlib.md5(
+        repr((school_id, last_modified, token, request.get_full_path())).encode()
+    ).hexdigest()
+    last_modified = int(last_modified.timestamp()) if last_modified else None
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = respond()
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified)
+        # Cacheable by the client only, and always revalidated
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_resource(domain, per_school=True):
+    """ETag / Last-Modified for a viewset method, versioned on its get_queryset()"""
+    def decorator(method):
+        @wraps(method)
+        def wrapper(viewset, request, *args, **kwargs):
+            return conditional_response(
+                request, viewset.get_queryset(), lambda: method(viewset, request, *args, **kwargs),
+                domain, per_school,
+            )
+        return wrapper
+    return decorator
+
+
+class ConditionalGetMixin:
+    """Conditional GET for a viewset's list and retrieve; set `version_domain`"""
+    version_domain = None
+    version_per_school = True
+
+    def list(self, request, *args, **kwargs):
+        respond = super().list
+        return conditional_response(
+            request, self.get_queryset(), lambda: respond(request, *args, **kwargs),
+            self.version_domain, self.version_per_school,
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        respond = super().retrieve
+        return conditional_response(
+            request, self.get_queryset(), lambda: respond(request, *args, **kwargs),
+            self.version_domain, self.version_per_school,
+        )
+
 class CacheManager:
     """Advanced cache management"""
     
     @staticmethod
-    def cache_view_result(cache_key, timeout=300):
-        """Decorator to cache view results"""
-        def decorator(func):
-            @wraps(func)
-            def wrapper(*args, **kwargs):
-                cached_result = cache.get(cache_key)
-                if cached_result:
-                    return cached_result
-                
-                result = func(*args, **kwargs)
-                cache.set(cache_key, result, timeout)
-                return result
-            return wrapper
-        return decorator
-    
+    def cache_view_result(cache_key, timeout=300, **options):
+        """Decorator to cache view results per school, role and query params
+
+        `cache_key` names the cache namespace; see memoize_view for options.
+        """
+        return memoize_view(cache_key, timeout=timeout, **options)
+
     @staticmethod
-    def invalidate_cache_pattern(pattern):
-        """Invalidate cache keys matching pattern"""
-        # This would need Redis for pattern-based deletion
-        # For now, clear all cache
-        cache.clear()
-        logger.info(f"Cache invalidated for pattern: {pattern}")
+    def namespace(domain, school=None):
+        """Get the versioned cache namespace for a domain (e.g. 'fees')"""
+        return CacheNamespace(domain, school)
+
+    @staticmethod
+    def invalidate_cache_pattern(pattern, school=None):
+        """Invalidate the cache namespace `pattern`, optionally for one school"""
+        CacheNamespace(pattern, school).invalidate()
 
 class SecurityMonitor:
     """Security monitoring and alerting"""
@@ -170,26 +664,54 @@ class SecurityMonitor:
 
 # Middleware for performance monitoring
 class PerformanceMiddleware:
-    """Middleware to monitor request performance"""
-    
+    """Sampled per-request query profiler
+
+    A sampled request runs with a QueryProfiler attached to every database
+    connection; the result is kept in slow_request_log when it ranks among
+    the slowest requests seen by this worker. Unsampled requests pass
+    straight through without any wrapper installed.
+    """
+
     def __init__(self, get_response):
         self.get_response = get_response
-    
+        self.enabled = get_profiler_setting('ENABLED')
+        self.sample_rate = get_profiler_setting('SAMPLE_RATE')
+
     def __call__(self, request):
-        start_time = time.time()
-        initial_queries = len(connection.queries)
-        
-        response = self.get_response(request)
-        
-        execution_time = time.time() - start_time
-        query_count = len(connection.queries) - initial_queries
-        
-        # Log performance metrics
-        logger.info(f"Request {request.path} took {execution_time:.2f}s with {query_count} queries")
-        
+        if not self.enabled or random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        start_time = time.perf_counter()
+        with QueryProfiler() as profiler:
+            response = self.get_response(request)
+        execution_time = time.perf_counter() - start_time
+
+        repeated = profiler.repeated_queries()
+        slow_request_log.record({
+            'path': request.path,
+            'method': request.method,
+            'status_code': response.status_code,
+            'duration': round(execution_time, 4),
+            'query_count': profiler.query_count,
+            'db_time': round(profiler.db_time, 4),
+            'n_plus_one': repeated,
+            'timestamp': timezone.now(),
+        })
+
+        capture_file = get_profiler_setting('QUERY_CAPTURE_FILE')
+        if capture_file:
+            capture_query_shapes(profiler, capture_file, path=request.path)
+
+        if execution_time > get_profiler_setting('SLOW_REQUEST_SECONDS'):
+            logger.warning(f"SLOW REQUEST: {request.method} {request.path} took {execution_time:.2f}s "
+                           f"({profiler.query_count} queries, {profiler.db_time:.2f}s in DB)")
+        for item in repeated:
+            logger.warning(f"N+1 SUSPECT on {request.path}: {item['count']}x {item['fingerprint'][:200]}")
+
         # Add performance headers for debugging
         if settings.DEBUG:
             response['X-Execution-Time'] = f"{execution_time:.2f}s"
-            response['X-Query-Count'] = str(query_count)
-        
+            response['X-Query-Count'] = str(profiler.query_count)
+            response['X-DB-Time'] = f"{profiler.db_time:.3f}s"
+
         return response
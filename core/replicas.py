@@ -0,0 +1,206 @@
+"""
+Read-replica routing for analytics and report traffic
+
+Heavy aggregate reports run on a read replica instead of the primary that
+takes payment writes. Routing is opt-in: only reads made inside
+use_replica() go to the replica alias; everything else, and every write,
+uses the default database, including saves of instances read from the
+replica.
+
+    @login_required
+    @use_replica()
+    def fee_reports(request):
+        ...
+
+    with use_replica():
+        rows = list(FeePayment.objects.values('status').annotate(total=Sum('amount_paid')))
+
+Reads fall back to the primary when:
+
+* the replica alias is not configured (the router is then a no-op);
+* the replica lags the primary by more than MAX_LAG_SECONDS (PostgreSQL
+  standbys only; checked at most every LAG_CHECK_INTERVAL seconds);
+* the request has already written something (read-your-writes); or
+* the client wrote within the last PIN_SECONDS. ReplicaPinningMiddleware
+  sets a short-lived cookie after any write, so the next pages a user
+  loads after saving a payment show that payment.
+
+Writes to models in IGNORED_MODELS (sessions, audit entries) do not pin.
+"""
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+READ_REPLICA_DEFAULTS = {
+    'ALIAS': 'replica',
+    # Replication lag beyond which reads go back to the primary
+    'MAX_LAG_SECONDS': 10.0,
+    'LAG_CHECK_INTERVAL': 5.0,
+    # How long a client reads from the primary after its own writes
+    'PIN_SECONDS': 10.0,
+    'PIN_COOKIE': 'replica_pin',
+    'IGNORED_MODELS': ['sessions.session', 'core.auditlog'],
+}
+
+
+def get_replica_setting(name):
+    return getattr(settings, 'READ_REPLICA', {}).get(name, READ_REPLICA_DEFAULTS[name])
+
+
+class _RoutingState:
+    __slots__ = ('replica_depth', 'wrote', 'pinned')
+
+    def __init__(self, pinned=False):
+        self.replica_depth = 0
+        self.wrote = False
+        self.pinned = pinned
+
+
+_routing_state = contextvars.ContextVar('replica_routing', default=None)
+
+_lag_lock = threading.Lock()
+_lag_cache = {}
+
+
+def replica_lag(alias):
+    """Replication lag of `alias` in seconds, cached for LAG_CHECK_INTERVAL
+
+    Only PostgreSQL standbys report lag; other backends (e.g. a local
+    SQLite copy) count as current. An unreachable replica counts as
+    infinitely stale.
+    """
+    now = time.monotonic()
+    with _lag_lock:
+        checked_at, lag = _lag_cache.get(alias, (None, None))
+    if checked_at is not None and now - checked_at < get_replica_setting('LAG_CHECK_INTERVAL'):
+        return lag
+
+    connection = connections[alias]
+    lag = 0.0
+    if connection.vendor == 'postgresql':
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+                )
+                lag = float(cursor.fetchone()[0] or 0)
+        except DatabaseError:
+            logger.warning("Replica %s is unavailable; reading from the primary", alias, exc_info=True)
+            lag = float('inf')
+    with _lag_lock:
+        _lag_cache[alias] = (now, lag)
+    return lag
+
+
+def replica_alias():
+    """The replica alias if it is configured and fresh enough, else None"""
+    alias = get_replica_setting('ALIAS')
+    if alias not in settings.DATABASES:
+        return None
+    if replica_lag(alias) > get_replica_setting('MAX_LAG_SECONDS'):
+        return None
+    return alias
+
+
+def read_alias():
+    """The alias reads should use right now"""
+    state = _routing_state.get()
+    if state is None or not state.replica_depth or state.wrote or state.pinned:
+        return DEFAULT_DB_ALIAS
+    return replica_alias() or DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def use_replica():
+    """Route reads to the replica inside this block (or decorated view)"""
+    state = _routing_state.get()
+    token = None
+    if state is None:
+        state = _RoutingState()
+        token = _routing_state.set(state)
+    state.replica_depth += 1
+    try:
+        yield
+    finally:
+        state.replica_depth -= 1
+        if token is not None:
+            _routing_state.reset(token)
+
+
+def replica_queryset(queryset):
+    """`queryset` bound to the replica, if reads may use it at this point"""
+    return queryset.using(read_alias())
+
+
+class ReplicaReadMixin:
+    """Serve every action of a DRF viewset from the replica"""
+
+    def dispatch(self, request, *args, **kwargs):
+        with use_replica():
+            return super().dispatch(request, *args, **kwargs)
+
+
+class ReplicaRouter:
+    """Send reads made inside use_replica() to the replica alias"""
+
+    def db_for_read(self, model, **hints):
+        state = _routing_state.get()
+        if state is None or not state.replica_depth:
+            return None
+        return read_alias()
+
+    def db_for_write(self, model, **hints):
+        state = _routing_state.get()
+        if state is not None and model._meta.label_lower not in get_replica_setting('IGNORED_MODELS'):
+            state.wrote = True
+        # Explicit, or Django falls back to the instance's own database and
+        # saves objects loaded inside use_replica() to the replica
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, get_replica_setting('ALIAS')}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica's schema arrives through replication
+        if db == get_replica_setting('ALIAS'):
+            return False
+        return None
+
+
+class ReplicaPinningMiddleware:
+    """Track writes per request and pin the client to the primary after them"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        cookie = get_replica_setting('PIN_COOKIE')
+        try:
+            pinned = float(request.COOKIES.get(cookie, 0)) > time.time()
+        except ValueError:
+            pinned = False
+        state = _RoutingState(pinned=pinned)
+        token = _routing_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing_state.reset(token)
+
+        if state.wrote and get_replica_setting('ALIAS') in settings.DATABASES:
+            pin_seconds = get_replica_setting('PIN_SECONDS')
+            response.set_cookie(
+                cookie, str(time.time() + pin_seconds), max_age=int(pin_seconds) or 1,
+                httponly=True, samesite='Lax',
+            )
+        return response
@@ -0,0 +1,76 @@
+"""
+Cached per-school configuration snapshots
+
+Each worker keeps the snapshot in process memory and only re-checks the
+shared cache every LOCAL_CHECK_INTERVAL seconds, so rendering a template
+does no database (or cache) work for configuration in the steady state.
+Saving SystemConfiguration or SchoolSettings invalidates the snapshot
+through core.signals. get_school_settings() is the cached replacement for
+SchoolSettings.objects.first() in views.
+"""
+import threading
+import time
+
+from .models import SchoolSettings, SystemConfiguration
+from .performance import CacheNamespace, get_request_school_id
+
+SNAPSHOT_DOMAIN = 'school_config'
+SNAPSHOT_TIMEOUT = 60 * 60 * 24
+LOCAL_CHECK_INTERVAL = 30
+
+_local_snapshots = {}
+_local_lock = threading.Lock()
+
+
+def _build_snapshot(school_id):
+    # Users without a school see the default (first) school, as on a
+    # single-school installation.
+    if school_id is None:
+        school = SchoolSettings.objects.order_by('pk').first()
+    else:
+        school = SchoolSettings.objects.filter(pk=school_id).first()
+    return {
+        'school': school,
+        # Rendered into every template, so sensitive values stay out
+        'config': dict(SystemConfiguration.objects.filter(is_sensitive=False).values_list('key', 'value')),
+    }
+
+
+def get_school_config(school_id):
+    """Configuration snapshot for a school: {'school': ..., 'config': {key: value}}"""
+    now = time.monotonic()
+    local = _local_snapshots.get(school_id)
+    if local and now - local['checked_at'] < LOCAL_CHECK_INTERVAL:
+        return local['snapshot']
+
+    namespace = CacheNamespace(SNAPSHOT_DOMAIN, school_id)
+    version = namespace.make_key('snapshot')
+    if local and local['version'] == version:
+        snapshot = local['snapshot']
+    else:
+        snapshot = namespace.get_or_set('snapshot', lambda: _build_snapshot(school_id), SNAPSHOT_TIMEOUT)
+
+    with _local_lock:
+        _local_snapshots[school_id] = {'version': version, 'snapshot': snapshot, 'checked_at': now}
+    return snapshot
+
+
+def get_school_settings(request=None):
+    """Cached SchoolSettings for the request user's school
+
+    Replaces SchoolSettings.objects.first() in views: falls back to the
+    default school for anonymous users or users without a profile, and
+    costs no query once the snapshot is warm.
+    """
+    school_id = get_request_school_id(request) if request is not None else None
+    return get_school_config(school_id)['school']
+
+
+def invalidate_school_config(school_id=None):
+    """Drop the snapshot for one school, or for every school when school_id is None"""
+    CacheNamespace(SNAPSHOT_DOMAIN, school_id).invalidate()
+    with _local_lock:
+        if school_id is None:
+            _local_snapshots.clear()
+        else:
+            _local_snapshots.pop(school_id, None)
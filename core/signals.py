@@ -0,0 +1,152 @@
+"""
+Signal handlers keeping core caches consistent with the database
+"""
+from django.apps import apps
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
+
+from .models import SchoolSettings, SystemConfiguration
+from .performance import CacheNamespace, user_school_cache_key
+from .school_config import invalidate_school_config
+from .access_control import invalidate_user_access
+from .audit import get_audit_setting, capture_stored_values, audit_model_save, audit_model_delete
+from .dashboard_stats import (
+    COUNTER_MODELS, remember_previous_counters, apply_saved_counters, apply_deleted_counters,
+    reconcile_for_new_school,
+)
+from .fee_ledger import (
+    refresh_for_payment, refresh_for_fee_structure, refresh_for_student, remember_fee_structure_grade
+)
+
+# Cache namespace domains and the models whose changes invalidate them
+CACHE_DOMAIN_MODELS = {
+    'fees': [
+        'core.FeeCategory', 'core.FeeStructure', 'core.FeePayment',
+        'fees.FeeCategory', 'fees.FeeStructure', 'fees.FeeItem', 'fees.StudentFeeAssignment',
+        'fees.FeeInstallment', 'fees.FeePayment', 'fees.FeeRefund', 'fees.FeeConcession',
+    ],
+    'attendance': [
+        'core.Attendance', 'academics.Attendance', 'academics.StudentClassAttendance',
+        'students.StudentAttendance',
+    ],
+    'exams': [
+        'core.Exam', 'core.ExamResult', 'academics.Exam', 'academics.StudentExamResult',
+        'examinations.Exam', 'examinations.ExamResult', 'examinations.GradingScheme',
+    ],
+    'timetable': ['academics.Timetable'],
+    'calendar': ['academics.Holiday'],
+}
+
+
+def _invalidate_domain(domain):
+    def handler(sender, instance, **kwargs):
+        # Models without a school are shared by every school, so their
+        # changes invalidate the domain as a whole.
+        CacheNamespace(domain, getattr(instance, 'school_id', None)).invalidate()
+    return handler
+
+
+for domain, model_labels in CACHE_DOMAIN_MODELS.items():
+    handler = _invalidate_domain(domain)
+    for label in model_labels:
+        app_label = label.split('.')[0]
+        if not apps.is_installed(app_label):
+            continue
+        dispatch_uid = f'cache_namespace:{domain}:{label}'
+        post_save.connect(handler, sender=label, weak=False, dispatch_uid=dispatch_uid)
+        post_delete.connect(handler, sender=label, weak=False, dispatch_uid=dispatch_uid)
+
+
+def invalidate_system_configuration(sender, instance, **kwargs):
+    # SystemConfiguration is global, so every school's snapshot is affected
+    invalidate_school_config()
+
+
+def invalidate_school_settings(sender, instance, **kwargs):
+    # Also held by the default-school snapshot, so drop every snapshot
+    invalidate_school_config()
+
+
+def invalidate_user_school(sender, instance, **kwargs):
+    cache.delete(user_school_cache_key(instance.user_id))
+
+
+post_save.connect(invalidate_system_configuration, sender=SystemConfiguration)
+post_delete.connect(invalidate_system_configuration, sender=SystemConfiguration)
+post_save.connect(invalidate_school_settings, sender=SchoolSettings)
+post_delete.connect(invalidate_school_settings, sender=SchoolSettings)
+post_save.connect(invalidate_user_school, sender='authentication.UserProfile')
+post_delete.connect(invalidate_user_school, sender='authentication.UserProfile')
+
+
+def invalidate_access_for_user(sender, instance, **kwargs):
+    invalidate_user_access(instance.user_id if hasattr(instance, 'user_id') else instance.pk)
+
+
+def invalidate_access_for_membership(sender, instance, reverse, **kwargs):
+    if not kwargs['action'].startswith('post_'):
+        return
+    if reverse:
+        # Changed from the group side: any of its members may be affected
+        invalidate_user_access()
+    else:
+        invalidate_user_access(instance.pk)
+
+
+def invalidate_access_for_everyone(sender, **kwargs):
+    if 'action' in kwargs and not kwargs['action'].startswith('post_'):
+        return
+    invalidate_user_access()
+
+
+post_save.connect(invalidate_access_for_user, sender=User)
+m2m_changed.connect(invalidate_access_for_membership, sender=User.groups.through)
+m2m_changed.connect(invalidate_access_for_membership, sender=User.user_permissions.through)
+m2m_changed.connect(invalidate_access_for_everyone, sender=Group.permissions.through)
+post_delete.connect(invalidate_access_for_everyone, sender=Group)
+post_save.connect(invalidate_access_for_user, sender='authentication.UserRole')
+post_delete.connect(invalidate_access_for_user, sender='authentication.UserRole')
+for model_label in ('authentication.Role', 'authentication.Permission'):
+    post_save.connect(invalidate_access_for_everyone, sender=model_label)
+    post_delete.connect(invalidate_access_for_everyone, sender=model_label)
+
+
+# Incremental dashboard statistics counters
+for counter_model in COUNTER_MODELS:
+    dispatch_uid = f'dashboard_stats:{counter_model._meta.label}'
+    pre_save.connect(remember_previous_counters, sender=counter_model, dispatch_uid=dispatch_uid)
+    post_save.connect(apply_saved_counters, sender=counter_model, dispatch_uid=dispatch_uid)
+    post_delete.connect(apply_deleted_counters, sender=counter_model, dispatch_uid=dispatch_uid)
+post_save.connect(reconcile_for_new_school, sender=SchoolSettings, dispatch_uid='dashboard_stats:school')
+
+
+# Per-student fee ledger rows
+post_save.connect(refresh_for_payment, sender='core.FeePayment', dispatch_uid='fee_ledger:payment')
+post_delete.connect(refresh_for_payment, sender='core.FeePayment', dispatch_uid='fee_ledger:payment')
+pre_save.connect(remember_fee_structure_grade, sender='core.FeeStructure', dispatch_uid='fee_ledger:structure')
+post_save.connect(refresh_for_fee_structure, sender='core.FeeStructure', dispatch_uid='fee_ledger:structure')
+post_delete.connect(refresh_for_fee_structure, sender='core.FeeStructure', dispatch_uid='fee_ledger:structure')
+post_save.connect(refresh_for_student, sender='core.Student', dispatch_uid='fee_ledger:student')
+
+
+# Materialized fee defaulters follow installment and payment changes
+if apps.is_installed('fees'):
+    from fees import defaulters
+
+    post_save.connect(defaulters.refresh_for_installment, sender='fees.FeeInstallment',
+                      dispatch_uid='fee_defaulters:installment')
+    post_save.connect(defaulters.refresh_for_payment, sender='fees.FeePayment', dispatch_uid='fee_defaulters:payment')
+    post_delete.connect(defaulters.refresh_for_payment, sender='fees.FeePayment', dispatch_uid='fee_defaulters:payment')
+
+
+# Field-level audit trail for the models listed in AUDIT_LOG['MODELS']
+for model_label in get_audit_setting('MODELS'):
+    app_label = model_label.split('.')[0]
+    if not apps.is_installed(app_label):
+        continue
+    audited_model = apps.get_model(model_label)
+    dispatch_uid = f'audit:{model_label}'
+    pre_save.connect(capture_stored_values, sender=audited_model, dispatch_uid=dispatch_uid)
+    post_save.connect(audit_model_save, sender=audited_model, dispatch_uid=dispatch_uid)
+    post_delete.connect(audit_model_delete, sender=audited_model, dispatch_uid=dispatch_uid)
@@ -0,0 +1,274 @@
+"""
+Columnar analytics snapshots
+
+Writes fee payments, class attendance, exam results and students as typed
+columnar files, one per dataset and (school, academic year) partition:
+
+    <DIR>/school=<id>/year=<name>/<dataset>.parquet   (or .arrow)
+    <DIR>/school=all/year=<name>/<dataset>.parquet    datasets not school-scoped
+
+Parquet is compact and read by every analytics stack; Arrow IPC files are
+uncompressed and can be memory-mapped (pyarrow.memory_map) for zero-copy
+reads. Rows are streamed from values_list().iterator() and written one
+record batch per CHUNK_SIZE rows, so memory stays flat. Each file is
+written under a temporary name and renamed into place, and a
+manifest.json next to them records row counts and columns.
+
+The core Student, FeePayment and ExamResult tables are not school-scoped
+(one school per deployment), so they are written once per academic year
+under school=all rather than copied into every school's partition. Class
+attendance is filtered by school as well.
+
+Without pyarrow write_snapshots() raises SnapshotUnavailable.
+"""
+import json
+import logging
+import os
+import uuid
+
+from django.apps import apps
+from django.conf import settings
+from django.db import DatabaseError
+from django.utils import timezone
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DEFAULTS = {
+    'DIR': None,                  # Defaults to BASE_DIR/snapshots
+    'FORMAT': 'parquet',          # 'parquet' or 'arrow'
+    'COMPRESSION': 'zstd',        # Parquet only
+    'CHUNK_SIZE': 50000,          # Rows per record batch
+}
+
+FORMAT_EXTENSIONS = {'parquet': 'parquet', 'arrow': 'arrow'}
+# Partition of the datasets that are not school-scoped
+SHARED_PARTITION = 'all'
+
+
+class SnapshotUnavailable(Exception):
+    """pyarrow is not installed"""
+
+
+def get_snapshot_setting(name):
+    return getattr(settings, 'SNAPSHOTS', {}).get(name, SNAPSHOT_DEFAULTS[name])
+
+
+def get_snapshot_dir():
+    return get_snapshot_setting('DIR') or os.path.join(settings.BASE_DIR, 'snapshots')
+
+
+def arrow_type(kind):
+    return {
+        'int': pa.int64(),
+        'string': pa.string(),
+        'bool': pa.bool_(),
+        'date': pa.date32(),
+        'time': pa.time64('us'),
+        'timestamp': pa.timestamp('us', tz='UTC'),
+        'decimal': pa.decimal128(12, 2),
+    }[kind]
+
+
+class Dataset:
+    """One snapshotted model: (column, lookup, kind) columns plus partition lookups
+
+    `school` is the lookup to the owning SchoolSettings, or None for tables
+    that are not school-scoped.
+    """
+
+    def __init__(self, name, model, columns, year, school=None):
+        self.name = name
+        self.model = model
+        self.columns = columns
+        self.year = year
+        self.school = school
+
+    def queryset(self, school, academic_year):
+        filters = {self.year: academic_year}
+        if self.school:
+            filters[self.school] = school
+        return apps.get_model(self.model)._default_manager.filter(**filters).order_by('pk')
+
+    def rows(self, school, academic_year, chunk_size):
+        lookups = [lookup for _, lookup, _ in self.columns]
+        string_columns = [index for index, (_, _, kind) in enumerate(self.columns) if kind == 'string']
+        for row in self.queryset(school, academic_year).values_list(*lookups).iterator(chunk_size=chunk_size):
+            row = list(row)
+            for index in string_columns:
+                if isinstance(row[index], uuid.UUID):
+                    row[index] = str(row[index])
+            yield row
+
+    def schema(self):
+        return pa.schema([(column, arrow_type(kind)) for column, _, kind in self.columns])
+
+
+DATASETS = [
+    Dataset('students', 'core.Student', [
+        ('id', 'pk', 'int'),
+        ('admission_number', 'admission_number', 'string'),
+        ('roll_number', 'roll_number', 'string'),
+        ('first_name', 'first_name', 'string'),
+        ('last_name', 'last_name', 'string'),
+        ('gender', 'gender', 'string'),
+        ('date_of_birth', 'date_of_birth', 'date'),
+        ('grade_id', 'grade_id', 'int'),
+        ('grade', 'grade__name', 'string'),
+        ('section', 'grade__section', 'string'),
+        ('admission_date', 'admission_date', 'date'),
+        ('is_active', 'is_active', 'bool'),
+    ], year='grade__academic_year'),
+    Dataset('fee_payments', 'core.FeePayment', [
+        ('id', 'pk', 'int'),
+        ('student_id', 'student_id', 'int'),
+        ('grade_id', 'fee_structure__grade_id', 'int'),
+        ('fee_structure_id', 'fee_structure_id', 'int'),
+        ('category', 'fee_structure__category__name', 'string'),
+        ('due_date', 'fee_structure__due_date', 'date'),
+        ('amount_due', 'amount_due', 'decimal'),
+        ('amount_paid', 'amount_paid', 'decimal'),
+        ('payment_date', 'payment_date', 'date'),
+        ('payment_method', 'payment_method', 'string'),
+        ('status', 'status', 'string'),
+        ('created_at', 'created_at', 'timestamp'),
+    ], year='fee_structure__academic_year'),
+    Dataset('attendance', 'academics.StudentClassAttendance', [
+        ('id', 'pk', 'int'),
+        ('student_id', 'student_id', 'string'),
+        ('date', 'attendance__date', 'date'),
+        ('timetable_id', 'attendance__timetable_id', 'int'),
+        ('school_class_id', 'attendance__timetable__school_class_id', 'int'),
+        ('section_id', 'attendance__timetable__section_id', 'int'),
+        ('status', 'status', 'string'),
+        ('arrival_time', 'arrival_time', 'time'),
+    ], year='attendance__timetable__academic_year', school='attendance__timetable__school_class__school'),
+    Dataset('exam_results', 'core.ExamResult', [
+        ('id', 'pk', 'int'),
+        ('student_id', 'student_id', 'int'),
+        ('exam_id', 'exam_id', 'int'),
+        ('exam', 'exam__name', 'string'),
+        ('exam_type', 'exam__exam_type', 'string'),
+        ('subject_id', 'subject_id', 'int'),
+        ('subject', 'subject__name', 'string'),
+        ('marks_obtained', 'marks_obtained', 'decimal'),
+        ('total_marks', 'total_marks', 'decimal'),
+        ('grade', 'grade', 'string'),
+    ], year='exam__academic_year'),
+]
+
+DATASET_NAMES = [dataset.name for dataset in DATASETS]
+
+
+def partition_dir(output_dir, school, academic_year):
+    """Directory of a partition; `school` is None for the shared partition"""
+    scope = SHARED_PARTITION if school is None else school.pk
+    return os.path.join(output_dir, f'school={scope}', f'year={academic_year.name}')
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def write_dataset(dataset, school, academic_year, path, file_format, chunk_size):
+    """Stream one dataset partition to `path`; returns the number of rows written"""
+    schema = dataset.schema()
+    temp_path = f'{path}.tmp'
+    if file_format == 'parquet':
+        writer = pq.ParquetWriter(temp_path, schema, compression=get_snapshot_setting('COMPRESSION'))
+    else:
+        writer = pa.ipc.new_file(temp_path, schema)
+
+    written = 0
+    try:
+        for chunk in _chunks(dataset.rows(school, academic_year, chunk_size), chunk_size):
+            columns = list(zip(*chunk))
+            writer.write_batch(pa.record_batch(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema
+            ))
+            written += len(chunk)
+    except BaseException:
+        writer.close()
+        os.remove(temp_path)
+        raise
+    writer.close()
+    os.replace(temp_path, path)
+    return written
+
+
+def write_partition(datasets, school, academic_year, output_dir, file_format, chunk_size, log):
+    """Write `datasets` into one partition and its manifest.json; returns the manifest"""
+    directory = partition_dir(output_dir, school, academic_year)
+    os.makedirs(directory, exist_ok=True)
+    manifest = {
+        'school_id': school.pk if school is not None else SHARED_PARTITION,
+        'academic_year': academic_year.name,
+        'format': file_format,
+        'created_at': timezone.now().isoformat(),
+        'datasets': {},
+    }
+    label = school.name if school is not None else 'All schools'
+    for dataset in datasets:
+        filename = f'{dataset.name}.{FORMAT_EXTENSIONS[file_format]}'
+        try:
+            rows = write_dataset(dataset, school, academic_year, os.path.join(directory, filename),
+                                 file_format, chunk_size)
+        except DatabaseError as exc:
+            logger.warning("Snapshot of %s skipped: %s", dataset.name, exc)
+            manifest['datasets'][dataset.name] = {'error': str(exc)}
+            continue
+        manifest['datasets'][dataset.name] = {
+            'file': filename,
+            'rows': rows,
+            'columns': {column: kind for column, _, kind in dataset.columns},
+        }
+        log(f'{label} {academic_year.name}: {dataset.name} {rows} rows')
+    with open(os.path.join(directory, 'manifest.json'), 'w', encoding='utf-8') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+    return manifest
+
+
+def write_snapshots(schools, academic_years, datasets=None, output_dir=None, file_format=None,
+                    chunk_size=None, log=None):
+    """Write every dataset for every academic year
+
+    School-scoped datasets get a partition per (school, academic year); the
+    others one shared partition per academic year. Returns one manifest
+    dict per partition. A dataset whose tables cannot be read is logged and
+    recorded in the manifest with its error.
+    """
+    if not PYARROW_AVAILABLE:
+        raise SnapshotUnavailable('Columnar snapshots need pyarrow (pip install pyarrow)')
+    file_format = file_format or get_snapshot_setting('FORMAT')
+    if file_format not in FORMAT_EXTENSIONS:
+        raise ValueError(f'Unknown snapshot format {file_format!r}; use one of {", ".join(FORMAT_EXTENSIONS)}')
+    output_dir = output_dir or get_snapshot_dir()
+    chunk_size = chunk_size or get_snapshot_setting('CHUNK_SIZE')
+    datasets = [dataset for dataset in DATASETS if datasets is None or dataset.name in datasets]
+    log = log or logger.info
+
+    scoped = [dataset for dataset in datasets if dataset.school]
+    shared = [dataset for dataset in datasets if not dataset.school]
+    manifests = []
+    for academic_year in academic_years:
+        if shared:
+            manifests.append(write_partition(shared, None, academic_year, output_dir, file_format, chunk_size, log))
+        if scoped:
+            for school in schools:
+                manifests.append(
+                    write_partition(scoped, school, academic_year, output_dir, file_format, chunk_size, log)
+                )
+    return manifests
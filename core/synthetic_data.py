@@ -0,0 +1,662 @@
+"""
+Synthetic dataset generation
+
+Builds a realistic, multi-year school for load and benchmark testing: the
+core world (academic years, graded sections, teachers, students, daily
+attendance, exam results, fee payments) plus the school-scoped timetables,
+library circulation and vehicle GPS pings. Volumes scale linearly with
+`scale` (1.0 is roughly a 5,000 student, 300 teacher school). Every value
+is drawn from random.Random instances seeded per section, so the same
+seed, scale and end date always produce the same dataset.
+
+Rows are built lazily and written with bulk_create in chunks, one
+transaction per chunk, so memory stays flat and no per-row signals run;
+the dashboard statistics and fee ledger are rebuilt once at the end
+instead.
+"""
+import logging
+import math
+import random
+import uuid
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from .dashboard_stats import reconcile_all_dashboard_statistics
+from .fee_ledger import rebuild_fee_ledgers
+from .models import (
+    SchoolSettings, AcademicYear, Department, Subject, Grade, Teacher, Student, FeeCategory, FeeStructure,
+    FeePayment, Attendance, Exam, ExamResult,
+)
+
+logger = logging.getLogger(__name__)
+
+# Marks every generated identifier, so a second run can detect the first
+PREFIX = 'SYN'
+
+STUDENTS_PER_SCALE = 5000
+TEACHERS_PER_SCALE = 300
+GRADE_LEVELS = range(1, 13)
+SECTION_SIZE = 40
+BOOKS_PER_STUDENT = 4
+ISSUES_PER_STUDENT_PER_YEAR = 8
+STUDENTS_PER_VEHICLE = 60
+
+OPTIONAL_SECTIONS = ['attendance', 'exams', 'fees', 'timetables', 'library', 'transport']
+
+FIRST_NAMES = [
+    'Aarav', 'Aditi', 'Ananya', 'Arjun', 'Diya', 'Ishaan', 'Kavya', 'Krishna', 'Meera', 'Mohammed',
+    'Nikhil', 'Priya', 'Rahul', 'Riya', 'Rohan', 'Sai', 'Sara', 'Shreya', 'Tanvi', 'Vihaan',
+    'Aisha', 'Dev', 'Fatima', 'Harsh', 'Jiya', 'Kabir', 'Neha', 'Om', 'Pooja', 'Yash',
+]
+LAST_NAMES = [
+    'Sharma', 'Verma', 'Patel', 'Reddy', 'Nair', 'Iyer', 'Khan', 'Singh', 'Gupta', 'Das',
+    'Mehta', 'Joshi', 'Rao', 'Menon', 'Chopra', 'Bose', 'Kulkarni', 'Pillai', 'Mishra', 'Yadav',
+]
+CITIES = ['Bengaluru', 'Chennai', 'Hyderabad', 'Pune', 'Mumbai', 'Delhi', 'Kolkata', 'Jaipur']
+SUBJECTS = [
+    ('English', 'LANG'), ('Hindi', 'LANG'), ('Mathematics', 'MATH'), ('Science', 'SCI'),
+    ('Social Studies', 'SOC'), ('Computer Science', 'SCI'), ('Physical Education', 'PE'),
+    ('Art', 'ART'),
+]
+DEPARTMENTS = [
+    ('Languages', 'LANG'), ('Mathematics', 'MATH'), ('Sciences', 'SCI'), ('Social Sciences', 'SOC'),
+    ('Physical Education', 'PE'), ('Arts', 'ART'),
+]
+# (category, annual amount for grade 1, increase per grade, due month offset from year start)
+FEE_CATEGORIES = [
+    ('Tuition Fee', 24000, 2000, 0),
+    ('Transport Fee', 9000, 0, 1),
+    ('Examination Fee', 1500, 150, 6),
+    ('Activity Fee', 3000, 100, 3),
+]
+# (name, type, month offset from year start, duration in days)
+EXAMS = [
+    ('Unit Test 1', 'UNIT_TEST', 2, 3),
+    ('Mid Term', 'MIDTERM', 5, 10),
+    ('Unit Test 2', 'UNIT_TEST', 8, 3),
+    ('Final Exam', 'FINAL', 11, 12),
+]
+PERIOD_TIMES = [
+    (time(8, 0), time(8, 45)), (time(8, 45), time(9, 30)), (time(9, 30), time(10, 15)),
+    (time(10, 30), time(11, 15)), (time(11, 15), time(12, 0)), (time(12, 45), time(13, 30)),
+    (time(13, 30), time(14, 15)), (time(14, 15), time(15, 0)),
+]
+SCHOOL_DAYS = ['MONDAY', 'TUESDAY', 'WEDNESDAY', 'THURSDAY', 'FRIDAY', 'SATURDAY']
+# Bus runs as (start, minutes)
+BUS_TRIPS = [(time(6, 45), 90), (time(14, 30), 90)]
+SCHOOL_LOCATION = (12.9716, 77.5946)
+
+
+def academic_year_bounds(year, start_month=4):
+    """First and last day of the academic year starting in `year`"""
+    start = date(year, start_month, 1)
+    end = date(year + 1, start_month, 1) - timedelta(days=1)
+    return start, end
+
+
+def add_months(day, months):
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, min(day.day, 28))
+
+
+def is_school_day(day):
+    """Monday-Saturday outside the summer and winter breaks"""
+    if day.weekday() == 6:
+        return False
+    if day.month == 5 or (day.month == 6 and day.day < 15):
+        return False
+    if (day.month == 12 and day.day >= 25) or (day.month == 1 and day.day == 1):
+        return False
+    return True
+
+
+def school_days(start, end):
+    day = start
+    while day <= end:
+        if is_school_day(day):
+            yield day
+        day += timedelta(days=1)
+
+
+class SyntheticDataGenerator:
+    """Generate one synthetic school; run() returns {model label: rows written}
+
+    Optional sections whose tables are unavailable are skipped and listed
+    in `skipped` ({section: database error}).
+    """
+
+    def __init__(self, scale=1.0, seed=42, years=3, chunk_size=5000, end_date=None, gps_days=30,
+                 gps_interval=60, log=None):
+        if scale <= 0:
+            raise ValueError("scale must be positive")
+        if years < 1:
+            raise ValueError("years must be at least 1")
+        self.scale = scale
+        self.seed = seed
+        self.years = years
+        self.chunk_size = chunk_size
+        self.end_date = end_date or timezone.localdate()
+        self.gps_days = gps_days
+        self.gps_interval = gps_interval
+        self.log = log or logger.info
+        self.counts = {}
+        self.skipped = {}
+
+        self.num_students = max(int(round(STUDENTS_PER_SCALE * scale)), 1)
+        self.num_teachers = max(int(round(TEACHERS_PER_SCALE * scale)), 1)
+        self.sections_per_grade = max(math.ceil(self.num_students / len(GRADE_LEVELS) / SECTION_SIZE), 1)
+
+        current_start = self.end_date.year if self.end_date.month >= 4 else self.end_date.year - 1
+        self.year_starts = list(range(current_start - years + 1, current_start + 1))
+
+    def rng(self, section):
+        """Independent stream per section, so skipping one leaves the others unchanged"""
+        return random.Random(f'{self.seed}:{section}')
+
+    @staticmethod
+    def make_uuid(rng):
+        return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+    @classmethod
+    def already_generated(cls):
+        return AcademicYear.objects.filter(name__startswith=PREFIX).exists()
+
+    def insert(self, model, objects):
+        """bulk_create `objects` (any iterable) in chunks; returns the number written"""
+        iterator = iter(objects)
+        written = 0
+        while True:
+            batch = list(islice(iterator, self.chunk_size))
+            if not batch:
+                break
+            with transaction.atomic():
+                model.objects.bulk_create(batch, batch_size=self.chunk_size)
+            written += len(batch)
+        label = model._meta.label
+        self.counts[label] = self.counts.get(label, 0) + written
+        self.log(f'{label}: {written} rows')
+        return written
+
+    def run(self, sections=None):
+        sections = OPTIONAL_SECTIONS if sections is None else sections
+        self.create_core()
+        for section in OPTIONAL_SECTIONS:
+            if section not in sections:
+                continue
+            try:
+                getattr(self, f'create_{section}')()
+            except DatabaseError as exc:
+                # School-scoped apps whose tables are missing or out of date in this database
+                logger.warning("Synthetic data: skipped %s, its tables are unavailable: %s", section, exc)
+                self.skipped[section] = str(exc)
+                self.log(f'{section}: skipped (tables unavailable)')
+        reconcile_all_dashboard_statistics()
+        rebuild_fee_ledgers()
+        return self.counts
+
+    # Core world
+
+    def create_core(self):
+        rng = self.rng('core')
+        self.school = SchoolSettings.objects.order_by('pk').first()
+        if self.school is None:
+            self.school = SchoolSettings.objects.create(
+                name='Synthetic Public School', address='1 Benchmark Road', city='Bengaluru', state='Karnataka',
+                postal_code='560001', phone='+91-80-5550100', email='office@synthetic.school',
+                principal_name='Dr. Synthetic', principal_email='principal@synthetic.school',
+                principal_phone='+91-80-5550101', established_date=date(1990, 6, 1),
+            )
+
+        self.insert(AcademicYear, (
+            AcademicYear(
+                name=f'{PREFIX} {year}-{str(year + 1)[-2:]}',
+                start_date=academic_year_bounds(year)[0], end_date=academic_year_bounds(year)[1],
+                is_current=year == self.year_starts[-1],
+            )
+            for year in self.year_starts
+        ))
+        self.academic_years = dict(
+            (int(name.split()[1][:4]), pk)
+            for name, pk in AcademicYear.objects.filter(name__startswith=PREFIX).values_list('name', 'id')
+        )
+
+        self.insert(Department, (
+            Department(name=name, code=f'{PREFIX}-{code}') for name, code in DEPARTMENTS
+        ))
+        departments = dict(Department.objects.filter(code__startswith=PREFIX).values_list('code', 'id'))
+        self.insert(Subject, (
+            Subject(name=name, code=f'{PREFIX}-{index:02d}', department_id=departments[f'{PREFIX}-{department}'])
+            for index, (name, department) in enumerate(SUBJECTS, start=1)
+        ))
+        self.subject_ids = list(
+            Subject.objects.filter(code__startswith=PREFIX).order_by('code').values_list('id', flat=True)
+        )
+
+        password = make_password(None)
+        self.insert(User, (
+            User(
+                username=f'{PREFIX.lower()}_teacher_{index:05d}', password=password,
+                first_name=rng.choice(FIRST_NAMES), last_name=rng.choice(LAST_NAMES),
+                email=f'teacher{index}@synthetic.school', is_staff=True,
+            )
+            for index in range(self.num_teachers)
+        ))
+        self.teacher_user_ids = list(
+            User.objects.filter(username__startswith=f'{PREFIX.lower()}_teacher_').order_by('username')
+            .values_list('id', flat=True)
+        )
+        department_ids = list(departments.values())
+        self.insert(Teacher, (
+            Teacher(
+                user_id=user_id, employee_id=f'{PREFIX}-T{index:05d}', phone=self.phone(rng),
+                address=f'{rng.randint(1, 999)} {rng.choice(LAST_NAMES)} Street, {rng.choice(CITIES)}',
+                date_of_birth=date(rng.randint(1965, 1998), rng.randint(1, 12), rng.randint(1, 28)),
+                date_of_joining=date(rng.randint(2000, self.year_starts[0]), rng.randint(1, 12), 1),
+                qualification=rng.choice(['B.Ed', 'M.Ed', 'M.Sc, B.Ed', 'M.A, B.Ed', 'Ph.D']),
+                experience_years=rng.randint(1, 30), department_id=rng.choice(department_ids),
+                salary=Decimal(rng.randrange(30000, 120000, 500)),
+            )
+            for index, user_id in enumerate(self.teacher_user_ids)
+        ))
+
+        self.insert(Grade, (
+            Grade(
+                name=f'Grade {level}', numeric_value=level, section=self.section_name(section),
+                academic_year_id=self.academic_years[year], max_students=SECTION_SIZE,
+                class_teacher_id=rng.choice(self.teacher_user_ids),
+            )
+            for year in self.year_starts
+            for level in GRADE_LEVELS
+            for section in range(self.sections_per_grade)
+        ))
+        # {(year, level, section name): grade id}
+        year_by_pk = {pk: year for year, pk in self.academic_years.items()}
+        self.grades = {
+            (year_by_pk[year_id], level, section): pk
+            for pk, year_id, level, section in Grade.objects.filter(academic_year_id__in=year_by_pk)
+            .values_list('id', 'academic_year_id', 'numeric_value', 'section')
+        }
+
+        current_year = self.year_starts[-1]
+        self.students = []
+        rolls = {}
+        pending = []
+        for index in range(self.num_students):
+            level = GRADE_LEVELS[index % len(GRADE_LEVELS)]
+            section = self.section_name(rng.randrange(self.sections_per_grade))
+            rolls[(level, section)] = roll = rolls.get((level, section), 0) + 1
+            # Most students joined in grade 1, the rest at the start of a later year
+            joined = current_year - level + 1
+            if rng.random() < 0.3:
+                joined = max(joined, rng.choice(self.year_starts))
+            admission = academic_year_bounds(joined)[0]
+            first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            admission_number = f'{PREFIX}{index:07d}'
+            pending.append(Student(
+                admission_number=admission_number, roll_number=str(roll), first_name=first_name,
+                last_name=last_name, gender=rng.choice('MF'),
+                date_of_birth=date(current_year - 5 - level, rng.randint(1, 12), rng.randint(1, 28)),
+                address=f'{rng.randint(1, 999)} {rng.choice(LAST_NAMES)} Nagar, {rng.choice(CITIES)}',
+                grade_id=self.grades[(current_year, level, section)], admission_date=admission,
+                parent_name=f'{rng.choice(FIRST_NAMES)} {last_name}', parent_phone=self.phone(rng),
+                emergency_contact=self.phone(rng),
+            ))
+            # Per-student tendencies keep attendance and marks correlated over the years
+            self.students.append({
+                'admission_number': admission_number, 'level': level, 'section': section,
+                'admission_date': admission, 'first_name': first_name, 'last_name': last_name,
+                'attendance': rng.uniform(0.78, 0.99), 'ability': rng.gauss(62, 14),
+            })
+        self.insert(Student, pending)
+        del pending
+        ids = dict(Student.objects.filter(admission_number__startswith=PREFIX).values_list('admission_number', 'id'))
+        for student in self.students:
+            student['id'] = ids[student['admission_number']]
+
+    def enrolments(self, year):
+        """(student, grade level) for every student enrolled during the year starting in `year`"""
+        start, end = academic_year_bounds(year)
+        offset = self.year_starts[-1] - year
+        for student in self.students:
+            level = student['level'] - offset
+            if level in GRADE_LEVELS and student['admission_date'] <= end:
+                yield student, level
+
+    @staticmethod
+    def section_name(index):
+        return chr(ord('A') + index) if index < 26 else f'S{index}'
+
+    @staticmethod
+    def phone(rng):
+        return f'+91{rng.randint(7000000000, 9999999999)}'
+
+    def create_attendance(self):
+        rng = self.rng('attendance')
+        marked_by = self.teacher_user_ids
+
+        def rows():
+            for year in self.year_starts:
+                start, end = academic_year_bounds(year)
+                days = list(school_days(start, min(end, self.end_date)))
+                for student, level in self.enrolments(year):
+                    for day in days:
+                        if day < student['admission_date']:
+                            continue
+                        roll = rng.random()
+                        if roll < student['attendance']:
+                            status = 'LATE' if rng.random() < 0.04 else 'PRESENT'
+                        else:
+                            status = 'EXCUSED' if rng.random() < 0.25 else 'ABSENT'
+                        yield Attendance(student_id=student['id'], date=day, status=status,
+                                         marked_by_id=rng.choice(marked_by))
+
+        self.insert(Attendance, rows())
+
+    def create_exams(self):
+        rng = self.rng('exams')
+        exams = []
+        for year in self.year_starts:
+            start = academic_year_bounds(year)[0]
+            for name, exam_type, month, duration in EXAMS:
+                exam_start = add_months(start, month)
+                if exam_start > self.end_date:
+                    continue
+                exams.append(Exam(
+                    name=f'{name} {year}-{str(year + 1)[-2:]}', exam_type=exam_type,
+                    academic_year_id=self.academic_years[year], start_date=exam_start,
+                    end_date=exam_start + timedelta(days=duration),
+                ))
+        self.insert(Exam, exams)
+        held = list(Exam.objects.filter(academic_year_id__in=self.academic_years.values()).values_list(
+            'id', 'academic_year__name', 'start_date'
+        ))
+
+        def rows():
+            for exam_id, year_name, exam_start in held:
+                year = int(year_name.split()[1][:4])
+                for student, level in self.enrolments(year):
+                    if student['admission_date'] > exam_start:
+                        continue
+                    for subject_id in self.subject_ids:
+                        marks = min(max(rng.gauss(student['ability'], 9), 0), 100)
+                        yield ExamResult(
+                            student_id=student['id'], exam_id=exam_id, subject_id=subject_id,
+                            marks_obtained=Decimal(f'{marks:.2f}'), total_marks=Decimal(100),
+                            grade=self.letter_grade(marks),
+                        )
+
+        self.insert(ExamResult, rows())
+
+    @staticmethod
+    def letter_grade(marks):
+        for threshold, letter in ((90, 'A+'), (80, 'A'), (70, 'B+'), (60, 'B'), (50, 'C'), (35, 'D')):
+            if marks >= threshold:
+                return letter
+        return 'F'
+
+    def create_fees(self):
+        rng = self.rng('fees')
+        self.insert(FeeCategory, (
+            FeeCategory(name=name, description=f'{PREFIX} synthetic fee category')
+            for name, _, _, _ in FEE_CATEGORIES
+        ))
+        categories = dict(
+            FeeCategory.objects.filter(description=f'{PREFIX} synthetic fee category').values_list('name', 'id')
+        )
+        self.insert(FeeStructure, (
+            FeeStructure(
+                grade_id=grade_id, category_id=categories[name],
+                amount=(Decimal(base + step * (level - 1)) * Decimal('1.05') ** (year - self.year_starts[0]))
+                .quantize(Decimal('0.01')),
+                academic_year_id=self.academic_years[year],
+                due_date=add_months(academic_year_bounds(year)[0], due_month) + timedelta(days=14),
+            )
+            for (year, level, section), grade_id in self.grades.items()
+            for name, base, step, due_month in FEE_CATEGORIES
+        ))
+        structures = {
+            (grade_id, category_id): (pk, amount, due_date)
+            for pk, grade_id, category_id, amount, due_date in FeeStructure.objects.filter(
+                grade_id__in=self.grades.values()
+            ).values_list('id', 'grade_id', 'category_id', 'amount', 'due_date')
+        }
+        methods = ['CASH', 'CARD', 'BANK_TRANSFER', 'CHEQUE', 'ONLINE']
+
+        def rows():
+            sequence = 0
+            for year in self.year_starts:
+                for student, level in self.enrolments(year):
+                    grade_id = self.grades[(year, level, student['section'])]
+                    for category_id in categories.values():
+                        structure_id, amount, due_date = structures[(grade_id, category_id)]
+                        outcome = rng.random()
+                        paid_on = due_date + timedelta(days=int(rng.triangular(-20, 45, -5)))
+                        if due_date > self.end_date and outcome < 0.7:
+                            outcome = 1.0  # Not due yet: mostly unpaid
+                        if outcome < 0.82 and paid_on <= self.end_date:
+                            status, paid = 'PAID', amount
+                        elif outcome < 0.9 and paid_on <= self.end_date:
+                            share = Decimal(rng.choice(['0.25', '0.5', '0.75']))
+                            status, paid = 'PARTIAL', (amount * share).quantize(Decimal('0.01'))
+                        else:
+                            status = 'OVERDUE' if due_date < self.end_date else 'PENDING'
+                            paid, paid_on = Decimal(0), None
+                        sequence += 1
+                        yield FeePayment(
+                            student_id=student['id'], fee_structure_id=structure_id, amount_due=amount,
+                            amount_paid=paid, payment_date=paid_on, status=status,
+                            payment_method=rng.choice(methods) if paid else None,
+                            transaction_id=f'{PREFIX}-TXN-{sequence:09d}' if paid else None,
+                        )
+
+        self.insert(FeePayment, rows())
+
+    # School-scoped world
+
+    def ensure_school_classes(self):
+        """students.SchoolClass / Section rows mirroring the core grades"""
+        from students.models import SchoolClass, Section
+
+        if getattr(self, 'school_sections', None) is not None:
+            return
+        self.insert(SchoolClass, (
+            SchoolClass(
+                school=self.school, name=f'Class {level}', code=f'{PREFIX}{level}',
+                is_primary=level <= 5, is_upper_primary=6 <= level <= 8, is_secondary=9 <= level <= 10,
+                is_higher_secondary=level >= 11, maximum_students=SECTION_SIZE * self.sections_per_grade,
+            )
+            for level in GRADE_LEVELS
+        ))
+        classes = {
+            int(code[len(PREFIX):]): pk
+            for code, pk in SchoolClass.objects.filter(school=self.school, code__startswith=PREFIX).values_list('code', 'id')
+        }
+        current_year = self.year_starts[-1]
+        self.insert(Section, (
+            Section(
+                school=self.school, school_class_id=classes[level], name=section,
+                academic_year_id=self.academic_years[current_year], maximum_students=SECTION_SIZE,
+            )
+            for (year, level, section) in self.grades
+            if year == current_year
+        ))
+        levels = {pk: level for level, pk in classes.items()}
+        self.school_sections = {
+            (levels[class_id], name): (class_id, pk)
+            for pk, class_id, name in Section.objects.filter(school_class_id__in=levels)
+            .values_list('id', 'school_class_id', 'name')
+        }
+
+    def create_timetables(self):
+        from academics.models import Subject as AcademicSubject, Timetable
+
+        rng = self.rng('timetables')
+        self.ensure_school_classes()
+        self.insert(AcademicSubject, (
+            AcademicSubject(school=self.school, name=name, code=f'{PREFIX}-{index:02d}')
+            for index, (name, _) in enumerate(SUBJECTS, start=1)
+        ))
+        subjects = list(
+            AcademicSubject.objects.filter(school=self.school, code__startswith=PREFIX).values_list('id', flat=True)
+        )
+        current_year = self.academic_years[self.year_starts[-1]]
+        self.insert(Timetable, (
+            Timetable(
+                school_class_id=class_id, section_id=section_id, academic_year_id=current_year,
+                day_of_week=day, period_number=period, start_time=start, end_time=end,
+                subject_id=rng.choice(subjects), teacher_id=rng.choice(self.teacher_user_ids),
+            )
+            for (class_id, section_id) in self.school_sections.values()
+            for day in SCHOOL_DAYS
+            for period, (start, end) in enumerate(PERIOD_TIMES, start=1)
+        ))
+
+    def create_library(self):
+        from library.models import Book, BookIssue, LibraryMember, LibrarySection
+        from students.models import Student as SchoolStudent
+
+        rng = self.rng('library')
+        self.ensure_school_classes()
+        current_year = self.academic_years[self.year_starts[-1]]
+        school_students = []
+        for student in self.students:
+            class_id, section_id = self.school_sections[(student['level'], student['section'])]
+            school_students.append(SchoolStudent(
+                id=self.make_uuid(rng), school=self.school, admission_number=student['admission_number'],
+                first_name=student['first_name'], last_name=student['last_name'],
+                date_of_birth=date(self.year_starts[-1] - 5 - student['level'], 6, 1), gender=rng.choice('MF'),
+                admission_date=student['admission_date'], current_class_id=class_id, current_section_id=section_id,
+                academic_year_id=current_year, current_address=f'{rng.randint(1, 999)} Main Road',
+                city=rng.choice(CITIES), state='Karnataka', postal_code=f'560{rng.randint(0, 999):03d}',
+                father_name=f'{rng.choice(FIRST_NAMES)} {student["last_name"]}',
+                mother_name=f'{rng.choice(FIRST_NAMES)} {student["last_name"]}',
+                emergency_contact_name=f'{rng.choice(FIRST_NAMES)} {student["last_name"]}',
+                emergency_contact_phone=self.phone(rng), emergency_contact_relation='Parent',
+            ))
+        self.insert(SchoolStudent, school_students)
+
+        first_start = academic_year_bounds(self.year_starts[0])[0]
+        self.insert(LibrarySection, (
+            LibrarySection(school=self.school, name=name, code=f'{PREFIX}-{name[:3].upper()}')
+            for name in ['Fiction', 'Reference', 'Science', 'History', 'Periodicals']
+        ))
+        sections = list(
+            LibrarySection.objects.filter(school=self.school, code__startswith=PREFIX).values_list('id', flat=True)
+        )
+        book_ids = []
+
+        def books():
+            for index in range(self.num_students * BOOKS_PER_STUDENT):
+                book_id = self.make_uuid(rng)
+                book_ids.append(book_id)
+                yield Book(
+                    id=book_id, school=self.school, accession_number=f'{PREFIX}-B{index:08d}',
+                    title=f'{rng.choice(["The", "A", "Tales of", "Guide to", "Notes on"])} '
+                          f'{rng.choice(LAST_NAMES)} {rng.choice(["River", "Mountain", "Numbers", "Stars", "Kingdom"])}',
+                    book_type=rng.choice(['TEXTBOOK', 'REFERENCE', 'FICTION', 'NON_FICTION']),
+                    section_id=rng.choice(sections), publication_year=rng.randint(1980, self.end_date.year),
+                )
+
+        self.insert(Book, books())
+
+        members = [
+            LibraryMember(
+                school=self.school, member_id=f'{PREFIX}-M{index:07d}', member_type='STUDENT', student=school_student,
+                membership_start_date=max(school_student.admission_date, first_start),
+                membership_end_date=academic_year_bounds(self.year_starts[-1])[1],
+            )
+            for index, school_student in enumerate(school_students)
+        ]
+        del school_students
+        self.insert(LibraryMember, members)
+        member_ids = list(
+            LibraryMember.objects.filter(member_id__startswith=PREFIX).order_by('member_id').values_list('id', flat=True)
+        )
+
+        def issues():
+            days = list(school_days(first_start, self.end_date))
+            per_day = len(member_ids) * ISSUES_PER_STUDENT_PER_YEAR / max(len(days) / self.years, 1)
+            sequence = 0
+            for day in days:
+                if per_day > 1:
+                    issued = max(int(rng.gauss(per_day, per_day ** 0.5)), 0)
+                else:
+                    issued = int(rng.random() < per_day)
+                for _ in range(issued):
+                    sequence += 1
+                    due = day + timedelta(days=14)
+                    returned = day + timedelta(days=max(int(rng.expovariate(1 / 10)), 1))
+                    late_days = (returned - due).days
+                    if returned > self.end_date:
+                        status, returned, fine = ('OVERDUE' if due < self.end_date else 'ISSUED'), None, Decimal(0)
+                    else:
+                        status, fine = 'RETURNED', Decimal(2 * max(late_days, 0))
+                    yield BookIssue(
+                        id=self.make_uuid(rng), school=self.school, issue_number=f'{PREFIX}-I{sequence:09d}',
+                        book_id=rng.choice(book_ids), member_id=rng.choice(member_ids), issue_date=day,
+                        due_date=due, return_date=returned, status=status, fine_amount=fine,
+                        fine_paid=bool(fine) and rng.random() < 0.7, issued_by_id=rng.choice(self.teacher_user_ids),
+                    )
+
+        self.insert(BookIssue, issues())
+
+    def create_transport(self):
+        from transport.models import Driver, Vehicle, VehicleTracking
+
+        rng = self.rng('transport')
+        count = max(math.ceil(self.num_students / STUDENTS_PER_VEHICLE), 1)
+        vehicles, drivers = [], []
+        for index in range(count):
+            vehicles.append(Vehicle(
+                id=self.make_uuid(rng), school=self.school, vehicle_number=f'{PREFIX}-KA01-{index:04d}',
+                vehicle_type='BUS', ownership_type=rng.choice(['OWNED', 'LEASED', 'CONTRACTED']),
+                make=rng.choice(['Tata', 'Ashok Leyland', 'Eicher']), model='Starbus', color='Yellow',
+                year_of_manufacture=rng.randint(2012, self.end_date.year), fuel_type='DIESEL', seating_capacity=60,
+                registration_number=f'{PREFIX}-KA01-{index:04d}', registration_date=date(2015, 1, 1),
+                registration_expiry=date(2030, 1, 1), gps_device_id=f'{PREFIX}-GPS-{index:04d}', gps_installed=True,
+            ))
+            drivers.append(Driver(
+                id=self.make_uuid(rng), school=self.school, first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES), date_of_birth=date(rng.randint(1965, 1995), 1, 1),
+                phone_number=self.phone(rng), emergency_contact=self.phone(rng), address='Depot Road',
+                city='Bengaluru', state='Karnataka', postal_code='560001', employment_type='PERMANENT',
+                joining_date=date(2015, 1, 1), license_number=f'{PREFIX}-DL-{index:06d}', license_type='HMV',
+                license_issue_date=date(2010, 1, 1), license_expiry=date(2035, 1, 1),
+            ))
+        self.insert(Vehicle, vehicles)
+        self.insert(Driver, drivers)
+
+        def pings():
+            tz = timezone.get_current_timezone()
+            first_day = max(self.end_date - timedelta(days=self.gps_days - 1), academic_year_bounds(self.year_starts[0])[0])
+            days = list(school_days(first_day, self.end_date))
+            for vehicle, driver in zip(vehicles, drivers):
+                # Each bus shuttles between its own end of town and the school
+                bearing = rng.uniform(0, 2 * math.pi)
+                reach = rng.uniform(0.05, 0.2)
+                for day in days:
+                    for start, minutes in BUS_TRIPS:
+                        departure = datetime.combine(day, start, tzinfo=tz)
+                        steps = max(minutes * 60 // self.gps_interval, 1)
+                        for step in range(steps + 1):
+                            progress = step / steps
+                            if start.hour >= 12:
+                                progress = 1 - progress
+                            distance = reach * (1 - progress)
+                            yield VehicleTracking(
+                                id=self.make_uuid(rng), vehicle=vehicle, driver=driver,
+                                latitude=SCHOOL_LOCATION[0] + distance * math.sin(bearing) + rng.gauss(0, 0.0003),
+                                longitude=SCHOOL_LOCATION[1] + distance * math.cos(bearing) + rng.gauss(0, 0.0003),
+                                accuracy=rng.uniform(3, 15), speed_kmph=max(rng.gauss(28, 10), 0),
+                                direction=math.degrees(bearing) % 360, engine_status=True,
+                                fuel_level=rng.uniform(20, 100),
+                                gps_timestamp=departure + timedelta(seconds=step * self.gps_interval),
+                            )
+
+        self.insert(VehicleTracking, pings())
@@ -1,3 +1,1067 @@
-from django.test import TestCase
+import datetime
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.template import RequestContext, Template
+from django.test import TestCase, RequestFactory, override_settings
+from django.contrib.auth.models import Group, User
+from django.db import DatabaseError, transaction
+from django.db.models import Count, Q
+from django.http import HttpResponse
+from django.utils import timezone
+from rest_framework import serializers, viewsets
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from authentication.models import LoginSession
+from authentication.sessions import active_sessions, count_active_sessions, expire_sessions
+
+from .audit import audit_log, audit_writer, replay_spilled, write_entries
+from .audit_archive import archive_audit_logs, search_archived_logs
+from .exports import correlated_aggregate, iterate, stream_csv
+from .fee_ledger import rebuild_fee_ledgers
+from .index_advisor import IndexAdvisor, load_capture, migration_code
+from .pagination import KeysetPagination
+from .replicas import ReplicaPinningMiddleware, ReplicaRouter, use_replica
+from .benchmarks import compare_to_baseline, percentile
+from .load_testing import LoadTestResult, ensure_load_test_users, invalidate_response_caches
+from .aggregation import StatsQuery, percentage
+from .dashboard_stats import (
+    get_dashboard_statistics, reconcile_all_dashboard_statistics, reconcile_dashboard_statistics,
+)
+from .access_control import check_user_session_limit, get_user_access, get_user_role_info, role_required
+from .models import (
+    SchoolSettings, SystemConfiguration, AcademicYear, Grade, Student, FeeCategory, FeeStructure, FeePayment,
+    DashboardStatistics, DashboardCounterShard, AuditLog, Attendance, StudentFeeLedger, NotificationTemplate,
+)
+from .snapshots import DATASETS, write_snapshots
+from .synthetic_data import SyntheticDataGenerator
+from .context_processors import school_context
+from .school_config import get_school_config, get_school_settings, invalidate_school_config
+from .performance import (
+    fingerprint_sql, QueryProfiler, SlowRequestLog, PerformanceMiddleware, slow_request_log,
+    CacheNamespace, get_or_compute, memoize_view, ConditionalGetMixin, capture_query_shapes
+)
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class QueryProfilerTests(TestCase):
+    """Tests for the execute_wrapper based query profiler"""
+
+    def test_fingerprint_groups_literals_and_in_lists(self):
+        self.assertEqual(
+            fingerprint_sql("SELECT * FROM t WHERE id = 5 AND name = 'x'"),
+            fingerprint_sql("SELECT * FROM t WHERE id = 17 AND name = 'y'"),
+        )
+        self.assertEqual(
+            fingerprint_sql('SELECT * FROM t WHERE id IN (%s, %s)'),
+            fingerprint_sql('SELECT * FROM t WHERE id IN (%s, %s, %s, %s)'),
+        )
+
+    def test_profiler_counts_queries_and_flags_repeats(self):
+        for i in range(3):
+            User.objects.create(username=f'user{i}')
+
+        with QueryProfiler() as profiler:
+            for user in User.objects.all():
+                list(user.groups.all())
+
+        self.assertEqual(profiler.query_count, 4)
+        repeated = profiler.repeated_queries(threshold=3)
+        self.assertEqual(len(repeated), 1)
+        self.assertEqual(repeated[0]['count'], 3)
+
+    def test_slow_request_log_keeps_slowest(self):
+        log = SlowRequestLog(size=2)
+        for duration in [0.1, 0.5, 0.2, 0.9]:
+            log.record({'duration': duration, 'n_plus_one': []})
+
+        self.assertEqual([e['duration'] for e in log.slowest()], [0.9, 0.5])
+        self.assertEqual(log.total_requests, 4)
+
+    def test_middleware_records_sampled_request(self):
+        slow_request_log.clear()
+
+        def view(request):
+            User.objects.count()
+            return HttpResponse('ok')
+
+        with self.settings(PERFORMANCE_PROFILER={'SAMPLE_RATE': 1.0}):
+            middleware = PerformanceMiddleware(view)
+        middleware(RequestFactory().get('/profiled/'))
+
+        entry = slow_request_log.slowest()[0]
+        self.assertEqual(entry['path'], '/profiled/')
+        self.assertEqual(entry['query_count'], 1)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CacheNamespaceTests(TestCase):
+    """Tests for generation based cache invalidation"""
+
+    def test_school_invalidation_is_isolated(self):
+        CacheNamespace('fees', school=1).set('report', 'school-1')
+        CacheNamespace('fees', school=2).set('report', 'school-2')
+        CacheNamespace('attendance', school=1).set('report', 'attendance-1')
+
+        CacheNamespace('fees', school=1).invalidate()
+
+        self.assertIsNone(CacheNamespace('fees', school=1).get('report'))
+        self.assertEqual(CacheNamespace('fees', school=2).get('report'), 'school-2')
+        self.assertEqual(CacheNamespace('attendance', school=1).get('report'), 'attendance-1')
+
+    def test_domain_invalidation_covers_every_school(self):
+        CacheNamespace('exams', school=1).set('summary', 1)
+        CacheNamespace('exams').set('summary', 2)
+
+        CacheNamespace('exams').invalidate()
+
+        self.assertIsNone(CacheNamespace('exams', school=1).get('summary'))
+        self.assertIsNone(CacheNamespace('exams').get('summary'))
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class MemoizationTests(TestCase):
+    """Tests for single-flight memoization"""
+
+    def test_value_computed_once_until_invalidated(self):
+        calls = []
+        namespace = CacheNamespace('dashboard', school=1)
+
+        def compute():
+            calls.append(1)
+            return len(calls)
+
+        self.assertEqual(get_or_compute(namespace, 'stats', compute), 1)
+        self.assertEqual(get_or_compute(namespace, 'stats', compute), 1)
+        namespace.invalidate()
+        self.assertEqual(get_or_compute(namespace, 'stats', compute), 2)
+
+    def test_stale_value_served_while_another_caller_revalidates(self):
+        namespace = CacheNamespace('dashboard')
+        get_or_compute(namespace, 'stats', lambda: 'old', timeout=0, stale_timeout=60)
+
+        # Simulate a revalidation already in progress elsewhere
+        from django.core.cache import cache
+        cache.add(f"{namespace.make_key('stats')}:lock", 1, 30)
+
+        self.assertEqual(get_or_compute(namespace, 'stats', lambda: 'new', timeout=0, stale_timeout=60), 'old')
+
+    def test_view_cache_varies_on_selected_query_params(self):
+        calls = []
+
+        @memoize_view('reports', query_params=['grade'])
+        def view(request):
+            calls.append(request.GET.get('grade'))
+            return HttpResponse(request.GET.get('grade', ''))
+
+        user = User.objects.create(username='teacher')
+        factory = RequestFactory()
+        for query in ['?grade=1&page=1', '?grade=1&page=2', '?grade=2']:
+            request = factory.get(f'/reports/{query}')
+            request.user = user
+            view(request)
+
+        self.assertEqual(calls, ['1', '2'])
+
+    def test_dashboard_stats_failure_is_not_cached(self):
+        from .views import api_dashboard_stats
+
+        request = RequestFactory().get('/api/dashboard-stats/')
+        request.user = User.objects.create(username='principal')
+        with mock.patch('core.views.get_dashboard_statistics', side_effect=RuntimeError('database busy')):
+            self.assertEqual(api_dashboard_stats(request).status_code, 500)
+        response = api_dashboard_stats(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(json.loads(response.content)['success'])
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ConditionalGetTests(TestCase):
+    """Tests for ETag / Last-Modified on read-mostly viewsets"""
+
+    def setUp(self):
+        self.serialized = []
+        test = self
+
+        class YearSerializer(serializers.ModelSerializer):
+            class Meta:
+                model = AcademicYear
+                fields = ['id', 'name']
+
+            def to_representation(self, instance):
+                test.serialized.append(instance.pk)
+                return super().to_representation(instance)
+
+        class YearViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+            queryset = AcademicYear.objects.order_by('pk')
+            serializer_class = YearSerializer
+            pagination_class = None
+            version_domain = 'calendar'
+
+        self.view = YearViewSet.as_view({'get': 'list'})
+        AcademicYear.objects.create(
+            name='2024-25', start_date=datetime.date(2024, 4, 1), end_date=datetime.date(2025, 3, 31)
+        )
+        self.user = User.objects.create(username='parent')
+        self.factory = APIRequestFactory()
+
+    def get(self, **headers):
+        request = self.factory.get('/years/', **headers)
+        force_authenticate(request, self.user)
+        return self.view(request)
+
+    def test_matching_etag_skips_the_serializer(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Last-Modified', response)
+        self.serialized.clear()
+
+        with self.assertNumQueries(0):
+            response = self.get(HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.serialized, [])
+
+    def test_changes_produce_a_new_etag_once_invalidated(self):
+        etag = self.get()['ETag']
+        AcademicYear.objects.create(
+            name='2025-26', start_date=datetime.date(2025, 4, 1), end_date=datetime.date(2026, 3, 31)
+        )
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        CacheNamespace('calendar').invalidate()
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def group_view(self, per_school):
+        class GroupSerializer(serializers.ModelSerializer):
+            class Meta:
+                model = Group
+                fields = ['id', 'name']
+
+        class GroupViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+            queryset = Group.objects.order_by('pk')
+            serializer_class = GroupSerializer
+            pagination_class = None
+            version_domain = 'access'
+            version_per_school = per_school
+
+        return GroupViewSet.as_view({'get': 'list'})
+
+    def test_in_place_edit_without_updated_at_changes_etag_once_invalidated(self):
+        group = Group.objects.create(name='Teachers')
+        view = self.group_view(per_school=True)
+        request = self.factory.get('/groups/')
+        force_authenticate(request, self.user)
+        etag = view(request)['ETag']
+
+        group.name = 'Staff'
+        group.save()
+        CacheNamespace('access').invalidate()
+        request = self.factory.get('/groups/', HTTP_IF_NONE_MATCH=etag)
+        force_authenticate(request, self.user)
+        response = view(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_no_etag_without_updated_at_or_namespace(self):
+        Group.objects.create(name='Teachers')
+        request = self.factory.get('/groups/')
+        force_authenticate(request, self.user)
+
+        response = self.group_view(per_school=False)(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class SchoolConfigSnapshotTests(TestCase):
+    """Tests for the cached configuration snapshot used by school_context"""
+
+    def setUp(self):
+        invalidate_school_config()
+
+    def test_snapshot_served_without_queries(self):
+        SystemConfiguration.objects.create(key='theme', value='blue')
+        self.assertEqual(get_school_config(None)['config'], {'theme': 'blue'})
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_school_config(None)['config'], {'theme': 'blue'})
+
+    def test_saving_configuration_invalidates_snapshot(self):
+        config = SystemConfiguration.objects.create(key='theme', value='blue')
+        get_school_config(None)
+
+        config.value = 'green'
+        config.save()
+
+        self.assertEqual(get_school_config(None)['config'], {'theme': 'green'})
+
+    def test_context_keeps_settings_and_hides_sensitive_configuration(self):
+        SystemConfiguration.objects.create(key='theme', value='blue')
+        SystemConfiguration.objects.create(key='sms_api_key', value='secret', is_sensitive=True)
+        request = RequestFactory().get('/')
+        request.user = User.objects.create(username='staff')
+
+        context = school_context(request)
+
+        self.assertEqual(context['school_config'], {'theme': 'blue'})
+        self.assertIs(context['settings'], settings)
+
+    def test_templates_render_school_config_from_snapshot(self):
+        SystemConfiguration.objects.create(key='theme', value='blue')
+        request = RequestFactory().get('/')
+        request.user = User.objects.create(username='staff')
+        get_school_config(None)
+
+        with self.assertNumQueries(0):
+            rendered = Template('{{ school_config.theme }}').render(RequestContext(request))
+
+        self.assertEqual(rendered, 'blue')
+
+    def test_school_settings_fall_back_to_default_school(self):
+        request = RequestFactory().get('/')
+        request.user = User.objects.create(username='staff')
+        self.assertIsNone(get_school_settings(request))
+
+        school = SchoolSettings.objects.create(
+            name='Test School', address='1 Road', city='City', state='State', postal_code='000000',
+            phone='1', email='school@example.com', principal_name='Principal',
+            principal_email='principal@example.com', principal_phone='1',
+            established_date=datetime.date(2000, 1, 1), board_affiliation='CBSE',
+        )
+
+        request = RequestFactory().get('/')
+        request.user = User.objects.get(username='staff')
+        self.assertEqual(get_school_settings(request), school)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class AccessControlTests(TestCase):
+    """Tests for cached role and permission resolution"""
+
+    def setUp(self):
+        self.user = User.objects.create(username='teacher')
+        self.user.groups.add(Group.objects.create(name='TEACHER'))
+
+    def test_role_check_is_free_once_compiled(self):
+        @role_required(['TEACHER'])
+        def view(request):
+            return HttpResponse('ok')
+
+        get_user_access(User.objects.get(pk=self.user.pk))
+
+        request = RequestFactory().get('/')
+        request.user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(view(request).status_code, 200)
+
+    def test_group_change_invalidates_compiled_access(self):
+        self.assertEqual(get_user_role_info(User.objects.get(pk=self.user.pk))['role'], 'TEACHER')
+
+        self.user.groups.clear()
+
+        self.assertEqual(get_user_role_info(User.objects.get(pk=self.user.pk))['role'], 'NO_ROLE')
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class LoginSessionRegistryTests(TestCase):
+    """Tests for the indexed login session registry behind session limits"""
+
+    def setUp(self):
+        self.user = User.objects.create(username='teacher')
+        self.user.groups.add(Group.objects.create(name='TEACHER'))
+        self.now = timezone.now()
+
+    def session(self, key, expires_in, user=None, **fields):
+        return LoginSession.objects.create(
+            user=user or self.user, session_key=key, ip_address='127.0.0.1', user_agent='test',
+            expires_at=self.now + datetime.timedelta(hours=expires_in) if expires_in is not None else None, **fields
+        )
+
+    def test_only_live_sessions_count_towards_the_limit(self):
+        self.session('live-1', 1)
+        self.session('expired', -1)
+        self.session('closed', 1, is_active=False)
+        self.session('other', 1, user=User.objects.create(username='other'))
+        self.assertEqual(count_active_sessions(self.user), 1)
+        self.assertTrue(check_user_session_limit(self.user))
+
+        self.session('live-2', 1)
+        self.session('live-3', 1)
+        self.assertFalse(check_user_session_limit(self.user))
+
+    def test_limit_fails_closed_when_registry_is_unavailable(self):
+        with mock.patch('authentication.sessions.active_sessions', side_effect=DatabaseError('no such table')), \
+                self.assertLogs('authentication.sessions', 'ERROR'):
+            self.assertIsNone(count_active_sessions(self.user))
+            self.assertFalse(check_user_session_limit(self.user))
+
+    def test_cleanup_closes_expired_and_purges_old_sessions(self):
+        live = self.session('live', 1)
+        self.session('expired', -1)
+        self.session('legacy', None)
+        old = self.session('old', None, is_active=False)
+        LoginSession.objects.filter(pk=old.pk).update(logout_time=self.now - datetime.timedelta(days=100))
+
+        self.assertEqual(expire_sessions(self.now), 2)
+        self.assertEqual(list(active_sessions(self.user)), [live])
+
+        call_command('cleanup_sessions', purge_days=90, stdout=StringIO())
+        self.assertFalse(LoginSession.objects.filter(pk=old.pk).exists())
+        self.assertEqual(LoginSession.objects.count(), 3)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class DashboardStatisticsTests(TestCase):
+    """Tests for the incrementally maintained dashboard statistics"""
+
+    def setUp(self):
+        self.school = create_school()
+        year = AcademicYear.objects.create(
+            name='2024-25', start_date=datetime.date(2024, 4, 1), end_date=datetime.date(2025, 3, 31)
+        )
+        grade = Grade.objects.create(name='Grade 1', numeric_value=1, section='A', academic_year=year)
+        self.student = Student.objects.create(
+            admission_number='A1', roll_number='1', first_name='Asha', last_name='Rao',
+            date_of_birth=datetime.date(2015, 1, 1), gender='F', address='1 Road', grade=grade,
+            admission_date=datetime.date(2024, 4, 1), parent_name='Parent', parent_phone='1',
+            emergency_contact='1',
+        )
+        category = FeeCategory.objects.create(name='Tuition')
+        self.fee_structure = FeeStructure.objects.create(
+            grade=grade, category=category, academic_year=year, amount=1000, due_date=datetime.date(2024, 6, 1)
+        )
+
+    def test_counters_follow_payment_changes(self):
+        reconcile_dashboard_statistics()
+        payment = FeePayment.objects.create(student=self.student, fee_structure=self.fee_structure, amount_due=1000)
+
+        statistics = get_dashboard_statistics()
+        self.assertEqual((statistics.fee_payments, statistics.paid_payments, statistics.fee_pending), (1, 0, 1000))
+
+        payment.status = 'PAID'
+        payment.amount_paid = 1000
+        payment.save()
+
+        statistics = get_dashboard_statistics()
+        self.assertEqual((statistics.paid_payments, statistics.fee_collected, statistics.fee_pending), (1, 1000, 0))
+
+    def test_deltas_spread_over_shards_and_fold_into_the_row(self):
+        reconcile_dashboard_statistics()
+        for number in range(6):
+            student = Student.objects.get(pk=self.student.pk)
+            student.pk = None
+            student.admission_number = student.roll_number = f'B{number}'
+            student.save()
+            Attendance.objects.create(student=student, date=timezone.now().date(), status='PRESENT')
+        self.assertEqual(DashboardStatistics.objects.get().today_present, 0)
+        self.assertEqual(get_dashboard_statistics().today_present, 6)
+
+        reconcile_dashboard_statistics()
+
+        self.assertEqual(DashboardStatistics.objects.get().today_present, 6)
+        self.assertFalse(DashboardCounterShard.objects.exclude(today_present=0).exists())
+        self.assertEqual(get_dashboard_statistics().today_present, 6)
+
+    def test_dashboard_read_is_one_query_when_fresh(self):
+        reconcile_dashboard_statistics()
+        FeePayment.objects.create(student=self.student, fee_structure=self.fee_structure, amount_due=1000)
+        with self.assertNumQueries(1):
+            statistics = get_dashboard_statistics()
+        self.assertEqual((statistics.students, statistics.fee_payments), (1, 1))
+
+    def test_rows_are_per_school(self):
+        other = create_school(name='Other School')
+        NotificationTemplate.objects.create(school=other, name='Due', template_type='SMS', body='Fees due')
+        reconcile_all_dashboard_statistics()
+        Student.objects.filter(pk=self.student.pk).delete()
+
+        default, second = get_dashboard_statistics(), get_dashboard_statistics(other.pk)
+
+        self.assertEqual((default.school_id, second.school_id), (self.school.pk, other.pk))
+        # The core tables carry no school, so both rows count them
+        self.assertEqual((default.students, second.students), (0, 0))
+        self.assertEqual(default.reconciled_stats['notification_templates'], 0)
+        self.assertEqual(second.reconciled_stats['notification_templates'], 1)
+
+    def test_reads_never_reconcile(self):
+        statistics = get_dashboard_statistics()
+        self.assertEqual((statistics.pk, statistics.students), (None, 0))
+
+        reconcile_dashboard_statistics()
+        DashboardStatistics.objects.update(reconciled_at=timezone.now() - datetime.timedelta(days=30), students=5)
+        self.assertEqual(get_dashboard_statistics().students, 5)
+        self.assertFalse(DashboardStatistics.objects.exclude(students=5).exists())
+
+    def test_delta_without_statistics_reconciles_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            FeePayment.objects.create(student=self.student, fee_structure=self.fee_structure, amount_due=1000)
+            self.assertFalse(DashboardStatistics.objects.exists())
+
+        self.assertEqual(DashboardStatistics.objects.get(school=self.school).fee_payments, 1)
+
+
+class StudentFeeLedgerTests(TestCase):
+    """Tests for the materialized per-student fee ledger"""
+
+    def setUp(self):
+        self.year = AcademicYear.objects.create(
+            name='2024-25', start_date=datetime.date(2024, 4, 1), end_date=datetime.date(2025, 3, 31)
+        )
+        self.grade = Grade.objects.create(name='Grade 1', numeric_value=1, section='A', academic_year=self.year)
+        self.student = Student.objects.create(
+            admission_number='A1', roll_number='1', first_name='Asha', last_name='Rao',
+            date_of_birth=datetime.date(2015, 1, 1), gender='F', address='1 Road', grade=self.grade,
+            admission_date=datetime.date(2024, 4, 1), parent_name='Parent', parent_phone='1',
+            emergency_contact='1',
+        )
+        self.tuition = FeeStructure.objects.create(
+            grade=self.grade, category=FeeCategory.objects.create(name='Tuition'), academic_year=self.year,
+            amount=1000, due_date=datetime.date(2024, 6, 1),
+        )
+
+    def test_ledger_follows_structure_and_payment_changes(self):
+        transport = FeeStructure.objects.create(
+            grade=self.grade, category=FeeCategory.objects.create(name='Transport'), academic_year=self.year,
+            amount=500, due_date=datetime.date(2024, 6, 1),
+        )
+        FeePayment.objects.create(student=self.student, fee_structure=self.tuition, amount_due=900, amount_paid=600,
+                                  payment_date=datetime.date(2024, 6, 2))
+        payment = FeePayment.objects.create(student=self.student, fee_structure=transport, amount_due=550)
+
+        ledger = StudentFeeLedger.objects.get(student=self.student, academic_year=self.year)
+        self.assertEqual((ledger.total_due, ledger.concession, ledger.late_fee), (1500, 100, 50))
+        self.assertEqual((ledger.total_paid, ledger.balance), (600, 850))
+        self.assertEqual(ledger.last_payment_date, datetime.date(2024, 6, 2))
+
+        payment.delete()
+        transport.delete()
+        ledger.refresh_from_db()
+        self.assertEqual((ledger.total_due, ledger.late_fee, ledger.balance), (1000, 0, 300))
+
+    def test_partial_payments_count_the_concession_once(self):
+        for amount_paid in [400, 500]:
+            FeePayment.objects.create(student=self.student, fee_structure=self.tuition, amount_due=900,
+                                      amount_paid=amount_paid)
+
+        ledger = StudentFeeLedger.objects.get(student=self.student)
+        self.assertEqual((ledger.concession, ledger.total_paid, ledger.balance), (100, 900, 0))
+
+    def test_structure_moved_to_another_grade_refreshes_both(self):
+        other = Grade.objects.create(name='Grade 2', numeric_value=2, section='A', academic_year=self.year)
+        self.assertEqual(StudentFeeLedger.objects.get(student=self.student).total_due, 1000)
+
+        self.tuition.grade = other
+        self.tuition.save()
+
+        self.assertEqual(StudentFeeLedger.objects.get(student=self.student).total_due, 0)
+
+    def test_rebuild_matches_incremental_rows(self):
+        FeePayment.objects.create(student=self.student, fee_structure=self.tuition, amount_due=1000, amount_paid=400)
+        StudentFeeLedger.objects.update(balance=0)
+
+        self.assertEqual(rebuild_fee_ledgers(), 1)
+        self.assertEqual(StudentFeeLedger.objects.get().balance, 600)
+
+
+class StatsQueryTests(TestCase):
+    """Tests for the batched conditional aggregation helper"""
+
+    def setUp(self):
+        for i, is_staff in enumerate([True, False, False]):
+            User.objects.create(username=f'user{i}', is_staff=is_staff, is_active=i != 2)
+
+    def test_named_statistics_in_one_query(self):
+        with self.assertNumQueries(1):
+            stats = (
+                StatsQuery(User.objects.all())
+                .count('total')
+                .count('staff', Q(is_staff=True))
+                .count('inactive', Q(is_active=False))
+                .run()
+            )
+        self.assertEqual(stats, {'total': 3, 'staff': 1, 'inactive': 1})
+        self.assertEqual(percentage(stats['staff'], stats['total'], 1), 33.3)
+        self.assertEqual(percentage(1, 0), 0)
+
+    def test_grouped_statistics(self):
+        rows = StatsQuery(User.objects.all()).count('total').count('active', Q(is_active=True)).run_grouped('is_staff')
+        self.assertEqual(rows, [
+            {'is_staff': False, 'total': 2, 'active': 1},
+            {'is_staff': True, 'total': 1, 'active': 1},
+        ])
+
+
+
+class StreamingExportTests(TestCase):
+    """Tests for the streaming CSV export helpers"""
+
+    def setUp(self):
+        year = AcademicYear.objects.create(
+            name='2024-25', start_date=datetime.date(2024, 4, 1), end_date=datetime.date(2025, 3, 31)
+        )
+        grade = Grade.objects.create(name='Grade 1', numeric_value=1, section='A', academic_year=year)
+        for number, statuses in enumerate([['PRESENT', 'ABSENT', 'PRESENT'], []], start=1):
+            student = Student.objects.create(
+                admission_number=f'A{number}', roll_number=str(number), first_name='Asha', last_name='Rao',
+                date_of_birth=datetime.date(2015, 1, 1), gender='F', address='1 Road', grade=grade,
+                admission_date=datetime.date(2024, 4, 1), parent_name='Parent', parent_phone='1',
+                emergency_contact='1',
+            )
+            for day, status in enumerate(statuses, start=1):
+                Attendance.objects.create(student=student, date=datetime.date(2024, 6, day), status=status)
+
+    def test_correlated_aggregates_in_one_query(self):
+        students = Student.objects.annotate(
+            days=correlated_aggregate(Attendance.objects.all(), 'student', Count('pk')),
+            present=correlated_aggregate(Attendance.objects.filter(status='PRESENT'), 'student', Count('pk')),
+        ).order_by('admission_number')
+        with self.assertNumQueries(1):
+            counts = [(student.days, student.present) for student in iterate(students, chunk_size=1)]
+        self.assertEqual(counts, [(3, 2), (0, 0)])
+
+    def test_stream_csv_writes_rows_lazily(self):
+        rows = ([student.admission_number, student.full_name] for student in Student.objects.order_by('pk'))
+        response = stream_csv('students.csv', ['Admission Number', 'Name'], rows)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="students.csv"')
+        self.assertEqual(
+            b''.join(response.streaming_content).decode(),
+            'Admission Number,Name\r\nA1,Asha Rao\r\nA2,Asha Rao\r\n',
+        )
+
+
+class SnapshotTests(TestCase):
+    """Tests for the columnar analytics snapshots"""
+
+    def setUp(self):
+        self.years = []
+        for number, name in enumerate(['2023-24', '2024-25'], start=1):
+            year = AcademicYear.objects.create(
+                name=name, start_date=datetime.date(2022 + number, 4, 1), end_date=datetime.date(2023 + number, 3, 31)
+            )
+            grade = Grade.objects.create(name='Grade 1', numeric_value=1, section='A', academic_year=year)
+            Student.objects.create(
+                admission_number=f'A{number}', roll_number='1', first_name='Asha', last_name='Rao',
+                date_of_birth=datetime.date(2015, 1, 1), gender='F', address='1 Road', grade=grade,
+                admission_date=datetime.date(2024, 4, 1), parent_name='Parent', parent_phone='1',
+                emergency_contact='1',
+            )
+            self.years.append(year)
+        self.school = create_school()
+
+    def test_partition_rows_follow_the_academic_year(self):
+        students = next(dataset for dataset in DATASETS if dataset.name == 'students')
+        rows = list(students.rows(self.school, self.years[1], chunk_size=10))
+        self.assertEqual([row[1] for row in rows], ['A2'])
+        self.assertEqual(len(rows[0]), len(students.columns))
+
+    def test_arrow_snapshot_round_trip(self):
+        import pyarrow as pa
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            manifests = write_snapshots(
+                [self.school], self.years[:1], datasets=['students'], output_dir=output_dir, file_format='arrow'
+            )
+            self.assertEqual(manifests[0]['datasets']['students']['rows'], 1)
+            path = os.path.join(output_dir, 'school=all', 'year=2023-24', 'students.arrow')
+            with pa.memory_map(path) as source:
+                table = pa.ipc.open_file(source).read_all()
+        self.assertEqual(table.column('admission_number').to_pylist(), ['A1'])
+        self.assertEqual(table.schema.field('date_of_birth').type, pa.date32())
+
+    def test_unscoped_datasets_are_written_once_per_year(self):
+        other = create_school(name='Other School')
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            manifests = write_snapshots(
+                [self.school, other], self.years[:1], datasets=['students', 'attendance'], output_dir=output_dir,
+            )
+            written = sorted(
+                os.path.relpath(os.path.join(directory, name), output_dir)
+                for directory, _, names in os.walk(output_dir) for name in names if name.startswith('students')
+            )
+
+        self.assertEqual(written, [os.path.join('school=all', 'year=2023-24', 'students.parquet')])
+        self.assertEqual([manifest['school_id'] for manifest in manifests], ['all', self.school.pk, other.pk])
+        self.assertEqual(list(manifests[1]['datasets']), ['attendance'])
+
+
+class UserKeysetPagination(KeysetPagination):
+    ordering = ('-date_joined', '-id')
+    page_size = 3
+
+
+class KeysetPaginationTests(TestCase):
+    """Tests for keyset (cursor) pagination"""
+
+    def setUp(self):
+        joined = timezone.now()
+        for i in range(8):
+            # Ties on date_joined are broken by id
+            User.objects.create(username=f'user{i}', date_joined=joined - datetime.timedelta(seconds=i // 2))
+        self.factory = APIRequestFactory()
+
+    def fetch(self, url):
+        pagination = UserKeysetPagination()
+        with self.assertNumQueries(1):
+            page = pagination.paginate_queryset(User.objects.all(), Request(self.factory.get(url)))
+        return [user.username for user in page], pagination.get_next_link(), pagination.get_previous_link()
+
+    def test_walks_forward_and_back_without_gaps(self):
+        pages, url, previous = [], '/users/', None
+        while url:
+            names, url, previous = self.fetch(url)
+            pages.append(names)
+        self.assertEqual(pages, [['user1', 'user0', 'user3'], ['user2', 'user5', 'user4'], ['user7', 'user6']])
+
+        names, _, _ = self.fetch(previous)
+        self.assertEqual(names, ['user2', 'user5', 'user4'])
+
+    def test_rejects_tampered_cursor(self):
+        with self.assertRaises(NotFound):
+            UserKeysetPagination().paginate_queryset(User.objects.all(), Request(self.factory.get('/?cursor=x')))
+
+
+def create_school(**kwargs):
+    defaults = dict(
+        name='Test School', address='1 Road', city='City', state='State', postal_code='000000',
+        phone='1', email='school@example.com', principal_name='Principal',
+        principal_email='principal@example.com', principal_phone='1',
+        established_date=datetime.date(2000, 1, 1), board_affiliation='CBSE',
+    )
+    defaults.update(kwargs)
+    return SchoolSettings.objects.create(**defaults)
+
+
+class AuditLogWriterTests(TestCase):
+    """Tests for the buffered audit writer and automatic change capture"""
+
+    def setUp(self):
+        spill_dir = tempfile.mkdtemp()
+        self.spill_dir = spill_dir
+        audit_settings = override_settings(AUDIT_LOG={
+            'ASYNC': False, 'SPILL_DIR': spill_dir, 'MODELS': {'core.SchoolSettings': 'HIGH'},
+        })
+        audit_settings.enable()
+        self.addCleanup(audit_settings.disable)
+        self.school = create_school()
+
+    def test_entries_written_in_bulk_with_request_context(self):
+        request = RequestFactory().get('/', REMOTE_ADDR='10.0.0.5')
+        request.user = User.objects.create(username='clerk')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            audit_log('LOGIN', request=request, description='logged in')
+
+        entry = AuditLog.objects.get(action_type='LOGIN')
+        self.assertEqual((entry.user, entry.ip_address, entry.school), (request.user, '10.0.0.5', self.school))
+        self.assertEqual(os.listdir(self.spill_dir), [])
+
+    def test_update_records_field_diff(self):
+        school = SchoolSettings.objects.get(pk=self.school.pk)
+        school.city = 'New City'
+        with self.captureOnCommitCallbacks(execute=True):
+            school.save()
+
+        entry = AuditLog.objects.get(action_type='UPDATE')
+        self.assertEqual(entry.changes, {'city': {'old': 'City', 'new': 'New City'}})
+        self.assertEqual(entry.risk_level, 'HIGH')
+        self.assertEqual(entry.created_at, AuditLog.objects.get(pk=entry.pk).created_at)
+
+    def test_rolled_back_change_is_not_audited(self):
+        school = SchoolSettings.objects.get(pk=self.school.pk)
+        school.city = 'New City'
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    school.save()
+                    raise DatabaseError('payment gateway timeout')
+            except DatabaseError:
+                pass
+
+        self.assertFalse(AuditLog.objects.filter(action_type='UPDATE').exists())
+
+    def test_entry_keeps_the_time_of_the_event(self):
+        entry = {
+            'id': '4f9a3f4e-0000-4000-8000-000000000002', 'created_at': '2024-01-01T09:00:00+00:00',
+            'school_id': self.school.pk, 'ip_address': '0.0.0.0', 'action_type': 'EXPORT',
+        }
+        with self.assertNumQueries(1):
+            write_entries([entry])
+        self.assertEqual(AuditLog.objects.get().created_at.isoformat(), '2024-01-01T09:00:00+00:00')
+
+    def test_spilled_journal_is_replayed_once(self):
+        entry = {
+            'id': '4f9a3f4e-0000-4000-8000-000000000001', 'created_at': '2024-01-01T09:00:00+00:00',
+            'school_id': self.school.pk, 'ip_address': '0.0.0.0', 'action_type': 'EXPORT',
+        }
+        for name in ('audit-1-dead-1.jsonl.pending', 'audit-1-dead-2.jsonl.pending'):
+            with open(os.path.join(self.spill_dir, name), 'w') as journal:
+                journal.write(json.dumps(entry) + '\n')
+
+        replay_spilled()
+
+        exported = AuditLog.objects.get(action_type='EXPORT')
+        self.assertEqual(exported.created_at.isoformat(), '2024-01-01T09:00:00+00:00')
+        self.assertEqual(os.listdir(self.spill_dir), [])
+
+
+class AuditArchiveTests(TestCase):
+    """Tests for AuditLog retention and compressed archival"""
+
+    def setUp(self):
+        self.archive_dir = tempfile.mkdtemp()
+        self.school = create_school()
+
+    def _log(self, risk_level, days_ago, description):
+        entry = AuditLog.objects.create(
+            school=self.school, ip_address='127.0.0.1', action_type='UPDATE',
+            risk_level=risk_level, description=description,
+        )
+        AuditLog.objects.filter(pk=entry.pk).update(created_at=timezone.now() - datetime.timedelta(days=days_ago))
+
+    @override_settings(AUDIT_LOG={'RETENTION_DAYS': {'LOW': 30, 'HIGH': 365}})
+    def test_aged_entries_move_to_searchable_archive(self):
+        self._log('LOW', 40, 'old low')
+        self._log('LOW', 5, 'recent low')
+        self._log('HIGH', 40, 'old high')
+
+        archived = archive_audit_logs(archive_dir=self.archive_dir, batch_size=1)
+
+        self.assertEqual(archived, {'LOW': 1, 'HIGH': 0})
+        self.assertEqual(
+            sorted(AuditLog.objects.filter(action_type='UPDATE').values_list('description', flat=True)),
+            ['old high', 'recent low']
+        )
+        found = list(search_archived_logs(archive_dir=self.archive_dir, text='OLD'))
+        self.assertEqual([entry['description'] for entry in found], ['old low'])
+
+
+class SyntheticDataTests(TestCase):
+    """Tests for the seeded synthetic dataset generator"""
+
+    def _generate(self, seed):
+        generator = SyntheticDataGenerator(
+            scale=0.01, seed=seed, years=1, chunk_size=100, end_date=datetime.date(2024, 7, 31), log=lambda msg: None
+        )
+        return generator.run(['attendance', 'fees'])
+
+    def test_generation_is_deterministic_and_counted(self):
+        with transaction.atomic():
+            counts = self._generate(seed=7)
+            self.assertEqual(counts['core.Student'], Student.objects.count())
+            self.assertEqual(counts['core.Attendance'], Attendance.objects.count())
+            self.assertEqual(DashboardStatistics.objects.get().students, counts['core.Student'])
+            self.assertEqual(StudentFeeLedger.objects.count(), counts['core.Student'])
+            self.assertTrue(SyntheticDataGenerator.already_generated())
+            first = list(Attendance.objects.order_by('student__admission_number', 'date').values_list('status', flat=True))
+            transaction.set_rollback(True)
+
+        self.assertEqual(self._generate(seed=7), counts)
+        second = list(Attendance.objects.order_by('student__admission_number', 'date').values_list('status', flat=True))
+        self.assertEqual(first, second)
+
+    def test_sections_with_unavailable_tables_are_reported(self):
+        stdout, stderr = StringIO(), StringIO()
+        with mock.patch.object(
+            SyntheticDataGenerator, 'create_library', side_effect=DatabaseError('no such table: library_book')
+        ):
+            call_command(
+                'generate_synthetic_data', scale=0.01, years=1, end_date='2024-07-31',
+                skip=['attendance', 'exams', 'fees', 'timetables', 'transport'], stdout=stdout, stderr=stderr,
+            )
+
+        self.assertIn('Skipped library', stderr.getvalue())
+        self.assertIn('no such table: library_book', stderr.getvalue())
+
+
+class BenchmarkBudgetTests(TestCase):
+    """Tests for comparing benchmark runs against their baseline"""
+
+    def _run(self, **endpoints):
+        return {'scales': {'0.1': endpoints}}
+
+    @override_settings(BENCHMARKS={'LATENCY_TOLERANCE': 0.5, 'LATENCY_SLACK_MS': 0, 'QUERY_TOLERANCE': 1})
+    def test_regressions_beyond_budget_are_reported(self):
+        baseline = self._run(
+            dashboard={'status': 200, 'p95_ms': 10.0, 'queries': 5},
+            reports={'status': 200, 'p95_ms': 10.0, 'queries': 5},
+            broken={'status': 500, 'p95_ms': 1.0, 'queries': 1},
+        )
+        results = self._run(
+            dashboard={'status': 200, 'p95_ms': 14.0, 'queries': 6},
+            reports={'status': 200, 'p95_ms': 16.0, 'queries': 8},
+            broken={'status': 500, 'p95_ms': 90.0, 'queries': 90},
+        )
+
+        regressions = compare_to_baseline(results, baseline)
+
+        self.assertEqual(len(regressions), 3)
+        self.assertEqual(sum(regression.startswith('reports @ scale 0.1') for regression in regressions), 2)
+        # Failing in the baseline too does not excuse a failure
+        self.assertTrue(any(regression.startswith('broken @ scale 0.1') for regression in regressions))
+        self.assertEqual(percentile([5, 1, 4, 2, 3], 50), 3)
+
+    def test_missing_and_unrecorded_endpoints_are_regressions(self):
+        baseline = self._run(
+            dashboard={'status': 200, 'p95_ms': 10.0, 'queries': 5},
+            reports={'status': 200, 'p95_ms': 10.0, 'queries': 5},
+        )
+        results = self._run(dashboard={'status': 200, 'p95_ms': 10.0, 'queries': 5},
+                            search={'status': 200, 'p95_ms': 10.0, 'queries': 5})
+        results['endpoints'] = ['dashboard', 'reports', 'search']
+
+        regressions = compare_to_baseline(results, baseline)
+
+        self.assertEqual(len(regressions), 2)
+        self.assertIn('reports @ scale 0.1: missing from this run', regressions)
+        self.assertTrue(any(regression.startswith('search @ scale 0.1: no baseline') for regression in regressions))
+
+        # Endpoints left out of a run with --endpoint are not missing
+        results['endpoints'] = ['dashboard', 'search']
+        self.assertEqual(len(compare_to_baseline(results, baseline)), 1)
+
+    def test_missing_baseline_fails_the_command(self):
+        with self.assertRaises(CommandError):
+            call_command('run_benchmarks', baseline='/nonexistent/baseline.json', stdout=StringIO())
+
+
+class LoadTestResultTests(TestCase):
+    """Tests for load test result summaries"""
+
+    def test_summary_and_worker_sizing(self):
+        result = LoadTestResult('result_day', users=2, duration=2.0)
+        result.samples = [('login', 302, 40.0), ('results', 200, 8.0), ('results', 500, 12.0), ('results', 200, 20.0)]
+
+        summary = result.summary()
+
+        self.assertEqual(summary['requests'], 4)
+        self.assertEqual(summary['throughput_rps'], 2.0)
+        self.assertEqual(summary['error_rate'], 0.25)
+        self.assertEqual(summary['histogram']['10'], 1)
+        self.assertEqual(summary['histogram']['25'], 2)
+        self.assertEqual(result.by_step()['results']['requests'], 3)
+        # 2 req/s per worker at 70% utilization: 7 req/s needs 5 workers
+        self.assertEqual(result.workers_for(7), 5)
+
+    def test_load_test_accounts_get_a_fresh_password(self):
+        User.objects.create_user('loadtest_00000', password='loadtest-password')
+
+        usernames = ensure_load_test_users(2, 'fresh-password')
+
+        self.assertEqual(User.objects.filter(username__in=usernames).count(), 2)
+        self.assertFalse(self.client.login(username='loadtest_00000', password='loadtest-password'))
+        self.assertTrue(self.client.login(username='loadtest_00001', password='fresh-password'))
+
+    @override_settings(CACHES=LOCMEM_CACHE)
+    def test_scenarios_start_with_cold_response_caches(self):
+        from django.core.cache import cache
+
+        cache.set('unrelated', 1)
+        namespace = CacheNamespace('fees', 1)
+        namespace.set('report', 'cached')
+
+        invalidate_response_caches()
+
+        self.assertIsNone(namespace.get('report'))
+        self.assertEqual(cache.get('unrelated'), 1)
+
+
+class IndexAdvisorTests(TestCase):
+    """Tests for query-shape driven index recommendations"""
+
+    def test_recommends_composite_index_for_captured_filter(self):
+        with QueryProfiler() as profiler:
+            list(FeePayment.objects.filter(student_id=1, status='PENDING'))
+
+        advisor = IndexAdvisor(min_rows=0, verify=True)
+        recommendations = advisor.analyze(profiler.captured_shapes())
+
+        self.assertEqual(recommendations[0]['model'], 'core.FeePayment')
+        self.assertCountEqual(recommendations[0]['fields'], ['student', 'status'])
+        self.assertTrue(recommendations[0]['verified'])
+        self.assertIn('migrations.AddIndex(', migration_code(recommendations)['core'])
+
+    @override_settings(PERFORMANCE_PROFILER={'QUERY_CAPTURE_MAX_BYTES': 1})
+    def test_capture_skips_auth_tables_and_rotates(self):
+        with QueryProfiler() as profiler:
+            list(FeePayment.objects.filter(student_id=1))
+            list(User.objects.filter(username='secret'))
+            list(LoginSession.objects.filter(session_key='secret-key'))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'capture.jsonl')
+            capture_query_shapes(profiler, path)
+            capture_query_shapes(profiler, path)
+
+            self.assertEqual(os.stat(path).st_mode & 0o777, 0o600)
+            self.assertTrue(os.path.exists(f'{path}.1'))
+            with open(path, encoding='utf-8') as capture:
+                self.assertNotIn('secret', capture.read())
+            shapes = load_capture(path)
+
+        self.assertEqual(len(shapes), 1)
+        self.assertEqual(shapes[0]['count'], 2)
+
+
+@mock.patch('core.replicas.replica_alias', return_value='replica')
+class ReplicaRoutingTests(TestCase):
+    """Tests for read-replica routing with read-your-writes pinning"""
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_reads_use_replica_only_inside_block_until_a_write(self, replica_alias):
+        self.assertIsNone(self.router.db_for_read(FeeCategory))
+        with use_replica():
+            self.assertEqual(self.router.db_for_read(FeeCategory), 'replica')
+            FeeCategory.objects.create(name='Lab')
+            self.assertEqual(self.router.db_for_read(FeeCategory), 'default')
+        self.assertIsNone(self.router.db_for_read(FeeCategory))
+
+    def test_instances_read_from_replica_are_saved_to_primary(self, replica_alias):
+        category = FeeCategory.objects.create(name='Lab')
+        # As if loaded through the replica connection
+        category._state.db = 'replica'
+        with use_replica():
+            category.name = 'Library'
+            category.save()
+
+        self.assertEqual(category._state.db, 'default')
+        self.assertTrue(FeeCategory.objects.filter(name='Library').exists())
+
+    @override_settings(DATABASES={'default': {}, 'replica': {}})
+    def test_middleware_pins_client_after_write(self, replica_alias):
+        factory = RequestFactory()
+        routed = []
+
+        def write_view(request):
+            self.router.db_for_write(FeeCategory)
+            return HttpResponse()
+
+        @use_replica()
+        def report_view(request):
+            routed.append(self.router.db_for_read(FeeCategory))
+            return HttpResponse()
+
+        response = ReplicaPinningMiddleware(write_view)(factory.post('/'))
+        cookie = response.cookies['replica_pin'].value
+
+        ReplicaPinningMiddleware(report_view)(factory.get('/'))
+        request = factory.get('/')
+        request.COOKIES['replica_pin'] = cookie
+        ReplicaPinningMiddleware(report_view)(request)
+
+        self.assertEqual(routed, ['replica', 'default'])
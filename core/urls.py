@@ -5,4 +5,5 @@ app_name = 'core'
 
 urlpatterns = [
     path('', views.dashboard, name='dashboard'),
+    path('system/performance/', views.performance_profile, name='performance_profile'),
 ]
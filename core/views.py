@@ -1,6 +1,7 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
 from django.http import JsonResponse, HttpResponse
 from django.views.decorators.http import require_http_methods
@@ -9,6 +10,7 @@ from django.core.paginator import Paginator
 from django.db.models import Q, Count, Sum, Avg
 from django.utils import timezone
 from datetime import timedelta, datetime
+import os
 import json
 import csv
 
@@ -21,134 +23,77 @@ from .models import (
     RealTimeChat, ChatMessage, ParentPortal, MobileAppSession, AdvancedReport,
     SmartNotification, BiometricAttendance, VirtualClassroom, VirtualClassroomParticipant
 )
-
-# Safe model access function
-def safe_model_count(model_class, filter_kwargs=None):
-    """Safely get model count with error handling"""
-    try:
-        if filter_kwargs:
-            return model_class.objects.filter(**filter_kwargs).count()
-        return model_class.objects.count()
-    except Exception:
-        return 0
-
-def safe_model_aggregate(model_class, aggregate_field, aggregate_func=Sum, filter_kwargs=None):
-    """Safely get model aggregates with error handling"""
-    try:
-        queryset = model_class.objects.all()
-        if filter_kwargs:
-            queryset = queryset.filter(**filter_kwargs)
-        result = queryset.aggregate(value=aggregate_func(aggregate_field))
-        return result['value'] or 0
-    except Exception:
-        return 0
+from .performance import slow_request_log, get_profiler_setting, get_request_school_id, memoize_view
+from .dashboard_stats import get_dashboard_statistics
+from .audit import audit_log
+from .exports import iterate, stream_csv
 
 # Enhanced Dashboard View with Real-Time Data and Error Handling
 @login_required
 def dashboard(request):
     """ULTRA-PROFESSIONAL dashboard with comprehensive real-time statistics and analytics"""
     try:
-        # Core Statistics with error handling - Fixed to match template expectations
+        # Served from the school's materialized statistics row (see core.dashboard_stats)
+        statistics = get_dashboard_statistics(get_request_school_id(request))
+        reconciled = statistics.reconciled_stats
+        
+        # Core Statistics - Fixed to match template expectations
         stats = {
-            'total_students': safe_model_count(Student),
-            'total_teachers': safe_model_count(Teacher),
-            'total_users': safe_model_count(Student) + safe_model_count(Teacher),
-            'students': safe_model_count(Student),
-            'teachers': safe_model_count(Teacher),
-            'grades': safe_model_count(Grade),
-            'subjects': safe_model_count(Subject),
-            'campuses': safe_model_count(Campus),
-            'departments': safe_model_count(Department),
+            'total_students': statistics.students,
+            'total_teachers': statistics.teachers,
+            'total_users': statistics.students + statistics.teachers,
+            'students': statistics.students,
+            'teachers': statistics.teachers,
+            'grades': reconciled.get('grades', 0),
+            'subjects': reconciled.get('subjects', 0),
+            'campuses': reconciled.get('campuses', 0),
+            'departments': reconciled.get('departments', 0),
         }
         
-        # Academic Performance with error handling
+        # Academic Performance
+        total_results = reconciled.get('total_results', 0)
         academic_stats = {
-            'total_exams': safe_model_count(Exam),
-            'total_results': safe_model_count(ExamResult),
-            'avg_performance': safe_model_aggregate(ExamResult, 'marks_obtained', Avg),
-            'pass_rate': 0  # Calculate safely
+            'total_exams': reconciled.get('total_exams', 0),
+            'total_results': total_results,
+            'avg_performance': reconciled.get('avg_performance', 0),
+            'pass_rate': (reconciled.get('passed_results', 0) / total_results) * 100 if total_results else 0
         }
         
-        # Calculate pass rate safely
-        try:
-            total_results = ExamResult.objects.count()
-            if total_results > 0:
-                passed_results = ExamResult.objects.filter(marks_obtained__gte=35).count()
-                academic_stats['pass_rate'] = (passed_results / total_results) * 100
-        except Exception:
-            academic_stats['pass_rate'] = 0
-        
-        # Financial Overview with error handling
+        # Financial Overview
         financial_stats = {
-            'total_fee_collected': safe_model_aggregate(
-                FeePayment, 'amount_paid', Sum, {'status': 'PAID'}
-            ),
-            'pending_fees': safe_model_aggregate(
-                FeePayment, 'amount_due', Sum, {'status': 'PENDING'}
-            ),
-            'payment_success_rate': 0
+            'total_fee_collected': statistics.fee_collected,
+            'pending_fees': statistics.fee_pending,
+            'payment_success_rate': (
+                (statistics.paid_payments / statistics.fee_payments) * 100 if statistics.fee_payments else 0
+            )
         }
         
-        # Calculate payment success rate safely
-        try:
-            total_payments = FeePayment.objects.count()
-            if total_payments > 0:
-                successful_payments = FeePayment.objects.filter(status='PAID').count()
-                financial_stats['payment_success_rate'] = (successful_payments / total_payments) * 100
-        except Exception:
-            financial_stats['payment_success_rate'] = 0
-        
-        # Attendance Overview with error handling
-        today = timezone.now().date()
+        # Attendance Overview
         attendance_stats = {
-            'today_present': safe_model_count(Attendance, {
-                'date': today, 'status': 'PRESENT'
-            }),
-            'today_absent': safe_model_count(Attendance, {
-                'date': today, 'status': 'ABSENT'
-            }),
-            'weekly_avg_attendance': 0
+            'today_present': statistics.today_present,
+            'today_absent': statistics.today_absent,
+            'weekly_avg_attendance': statistics.week_present / 7
         }
         
-        # Calculate weekly attendance safely
-        try:
-            week_ago = today - timedelta(days=7)
-            weekly_present = Attendance.objects.filter(
-                date__gte=week_ago, status='PRESENT'
-            ).count()
-            attendance_stats['weekly_avg_attendance'] = weekly_present / 7
-        except Exception:
-            attendance_stats['weekly_avg_attendance'] = 0
-        
-        # Advanced Features Analytics with error handling
+        # Advanced Features Analytics
         advanced_stats = {
-            'ai_insights': safe_model_count(AIAnalytics, {'confidence_score__gte': 0.8}),
-            'active_virtual_classes': safe_model_count(VirtualClassroom, {
-                'is_active': True, 'scheduled_start__gte': timezone.now()
-            }),
-            'chat_activity': safe_model_count(ChatMessage, {
-                'created_at__gte': timezone.now() - timedelta(hours=24)
-            }),
-            'mobile_sessions': safe_model_count(MobileAppSession, {'is_active': True})
+            'ai_insights': reconciled.get('ai_insights', 0),
+            'active_virtual_classes': reconciled.get('active_virtual_classes', 0),
+            'chat_activity': reconciled.get('chat_activity', 0),
+            'mobile_sessions': reconciled.get('mobile_sessions', 0)
         }
         
-        # Recent Activities with error handling
+        # Recent Activities
         recent_activities = {
-            'new_students': safe_model_count(Student, {
-                'created_at__gte': timezone.now() - timedelta(days=7)
-            }),
-            'recent_payments': safe_model_count(FeePayment, {
-                'payment_date__gte': today - timedelta(days=7)
-            }),
-            'recent_exams': safe_model_count(Exam, {
-                'created_at__gte': timezone.now() - timedelta(days=7)
-            })
+            'new_students': reconciled.get('new_students', 0),
+            'recent_payments': reconciled.get('recent_payments', 0),
+            'recent_exams': reconciled.get('recent_exams', 0)
         }
         
-        # System Health with error handling
+        # System Health
         system_health = {
-            'total_users': safe_model_count(Student) + safe_model_count(Teacher),
-            'active_sessions': safe_model_count(MobileAppSession, {'is_active': True}),
+            'total_users': statistics.students + statistics.teachers,
+            'active_sessions': reconciled.get('mobile_sessions', 0),
             'system_uptime': '99.9%',  # This would come from monitoring system
             'database_health': 'Excellent',
             'last_backup': timezone.now() - timedelta(hours=2)  # Mock data
@@ -156,13 +101,11 @@ def dashboard(request):
         
         # Additional Professional Metrics
         professional_stats = {
-            'notification_templates': safe_model_count(NotificationTemplate),
-            'biometric_enrollments': safe_model_count(BiometricAttendance),
-            'smart_notifications': safe_model_count(SmartNotification),
-            'audit_logs_today': safe_model_count(AuditLog, {
-                'created_at__date': today
-            }),
-            'virtual_classroom_participants': safe_model_count(VirtualClassroomParticipant)
+            'notification_templates': reconciled.get('notification_templates', 0),
+            'biometric_enrollments': reconciled.get('biometric_enrollments', 0),
+            'smart_notifications': reconciled.get('smart_notifications', 0),
+            'audit_logs_today': reconciled.get('audit_logs_today', 0),
+            'virtual_classroom_participants': reconciled.get('virtual_classroom_participants', 0)
         }
         
         context = {
@@ -260,13 +203,8 @@ def user_login(request):
                 login(request, user)
                 
                 # Log successful login
-                AuditLog.objects.create(
-                    user=user,
-                    action_type='LOGIN',
-                    ip_address=request.META.get('REMOTE_ADDR', ''),
-                    user_agent=request.META.get('HTTP_USER_AGENT', '')[:500],
-                    description=f"User {username} logged in successfully"
-                )
+                audit_log('LOGIN', request=request, user=user,
+                          description=f"User {username} logged in successfully")
                 
                 messages.success(request, f"Welcome back, {user.get_full_name() or username}!")
                 return redirect('core:dashboard')
@@ -283,13 +221,7 @@ def user_logout(request):
     user = request.user
     
     # Log logout
-    AuditLog.objects.create(
-        user=user,
-        action_type='LOGOUT',
-        ip_address=request.META.get('REMOTE_ADDR', ''),
-        user_agent=request.META.get('HTTP_USER_AGENT', '')[:500],
-        description=f"User {user.username} logged out"
-    )
+    audit_log('LOGOUT', request=request, description=f"User {user.username} logged out")
     
     logout(request)
     messages.success(request, "You have been logged out successfully.")
@@ -330,14 +262,8 @@ def change_password(request):
                 request.user.save()
                 
                 # Log password change
-                AuditLog.objects.create(
-                    user=request.user,
-                    action_type='UPDATE',
-                    model_name='User',
-                    object_id=str(request.user.id),
-                    description="Password changed successfully",
-                    risk_level='MEDIUM'
-                )
+                audit_log('UPDATE', request=request, model_name='User', object_id=str(request.user.id),
+                          description="Password changed successfully", risk_level='MEDIUM')
                 
                 messages.success(request, "Password changed successfully!")
                 return redirect('core:profile')
@@ -395,18 +321,9 @@ def edit_school_settings(request):
         settings.principal_phone = request.POST.get('principal_phone', settings.principal_phone)
         settings.board_affiliation = request.POST.get('board_affiliation', settings.board_affiliation)
         
+        # Audited with a field-level diff by core.audit (AUDIT_LOG['MODELS'])
         settings.save()
         
-        # Log the change
-        AuditLog.objects.create(
-            user=request.user,
-            action_type='UPDATE',
-            model_name='SchoolSettings',
-            object_id=str(settings.id),
-            description="School settings updated",
-            risk_level='HIGH'
-        )
-        
         messages.success(request, "School settings updated successfully!")
         return redirect('core:school_settings')
     
@@ -579,11 +496,12 @@ def system_dashboard(request):
     system_stats = {
         'total_users': Student.objects.count() + Teacher.objects.count(),
         'active_sessions': MobileAppSession.objects.filter(is_active=True).count(),
+        # Range filters (not __date) so the created_at index is used
         'audit_logs_today': AuditLog.objects.filter(
-            created_at__date=timezone.now().date()
+            created_at__gte=timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
         ).count(),
         'system_configurations': SystemConfiguration.objects.count(),
-        'recent_activities': AuditLog.objects.order_by('-created_at')[:10],
+        'recent_activities': AuditLog.objects.select_related('user').order_by('-created_at')[:10],
         'database_size': '2.5 GB',  # This would come from actual database queries
         'backup_status': 'Last backup: 2 hours ago',
         'system_health': 'Excellent'
@@ -591,6 +509,27 @@ def system_dashboard(request):
     
     return render(request, 'core/system_dashboard.html', {'stats': system_stats})
 
+@staff_member_required
+def performance_profile(request):
+    """Slowest sampled requests and N+1 suspects recorded by this worker"""
+    if request.method == 'POST' and request.POST.get('action') == 'clear':
+        slow_request_log.clear()
+        messages.success(request, "Request profile buffer cleared.")
+        return redirect('core:performance_profile')
+
+    slow_requests = slow_request_log.slowest()
+    context = {
+        'slow_requests': slow_requests,
+        'n_plus_one_requests': [r for r in slow_requests if r['n_plus_one']],
+        'total_profiled': slow_request_log.total_requests,
+        'total_n_plus_one': slow_request_log.n_plus_one_requests,
+        'sample_rate': get_profiler_setting('SAMPLE_RATE'),
+        'buffer_size': slow_request_log.size,
+        'worker_pid': os.getpid(),
+        'page_title': 'Request Performance Profile',
+    }
+    return render(request, 'core/performance_profile.html', context)
+
 @login_required
 def audit_logs(request):
     """Enhanced audit logs view with filtering"""
@@ -605,7 +544,13 @@ def audit_logs(request):
     if user_filter:
         logs_qs = logs_qs.filter(user__username__icontains=user_filter)
     if date_filter:
-        logs_qs = logs_qs.filter(created_at__date=date_filter)
+        try:
+            day = datetime.strptime(date_filter, '%Y-%m-%d')
+        except ValueError:
+            messages.error(request, "Invalid date filter; use YYYY-MM-DD.")
+        else:
+            start = timezone.make_aware(day)
+            logs_qs = logs_qs.filter(created_at__gte=start, created_at__lt=start + timedelta(days=1))
     
     paginator = Paginator(logs_qs, 25)
     page_number = request.GET.get('page')
@@ -623,16 +568,15 @@ def audit_logs(request):
 
 # API Views
 @login_required
+@memoize_view('dashboard', timeout=60, stale_timeout=300)
 def api_dashboard_stats(request):
     """Enhanced API endpoint for dashboard statistics"""
     try:
+        statistics = get_dashboard_statistics(get_request_school_id(request))
         stats = {
-            'students': Student.objects.count(),
-            'teachers': Teacher.objects.count(),
-            'attendance_today': Attendance.objects.filter(
-                date=timezone.now().date(),
-                status='PRESENT'
-            ).count(),
+            'students': statistics.students,
+            'teachers': statistics.teachers,
+            'attendance_today': statistics.today_present,
             'fee_collected_today': FeePayment.objects.filter(
                 payment_date=timezone.now().date(),
                 status='PAID'
@@ -642,7 +586,8 @@ def api_dashboard_stats(request):
         }
         return JsonResponse({'success': True, 'data': stats})
     except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)})
+        # A 5xx keeps memoize_view from serving the failure to the whole school
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
 @login_required 
 @require_http_methods(["POST"])
@@ -665,23 +610,23 @@ def data_export(request):
     format_type = request.GET.get('format', 'csv')
     
     if export_type == 'students' and format_type == 'csv':
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="students_{timezone.now().strftime("%Y%m%d")}.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow(['Admission Number', 'Full Name', 'Grade', 'Email', 'Phone', 'Admission Date'])
-        
-        for student in Student.objects.select_related('grade'):
-            writer.writerow([
+        students = Student.objects.select_related('grade__academic_year')
+        rows = (
+            [
                 student.admission_number,
                 student.full_name,
                 str(student.grade),
                 student.email or '',
                 student.phone or '',
                 student.admission_date
-            ])
-        
-        return response
+            ]
+            for student in iterate(students)
+        )
+        return stream_csv(
+            f'students_{timezone.now().strftime("%Y%m%d")}.csv',
+            ['Admission Number', 'Full Name', 'Grade', 'Email', 'Phone', 'Admission Date'],
+            rows,
+        )
     
     return render(request, 'core/data_export.html')
 
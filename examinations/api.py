@@ -5,6 +5,8 @@ from rest_framework.permissions import IsAuthenticated
 from django.db.models import Q, Count, Avg, Sum, Max, Min
 from django.utils import timezone
 from datetime import timedelta, datetime
+from core.aggregation import StatsQuery, percentage
+from core.performance import ConditionalGetMixin
 from .models import (
     Subject, ExamType, ExamSchedule, Exam, QuestionBank, OnlineExam,
     StudentExamAttempt, ExamResult, GradingScheme, HallTicket, ExamReport
@@ -161,23 +163,41 @@ class ExamViewSet(viewsets.ModelViewSet):
         exam = self.get_object()
         results = exam.results.all()
         
-        if not results.exists():
+        stats = (
+            StatsQuery(results)
+            .count('total_students')
+            .count('appeared_students', Q(is_absent=False))
+            .count('absent_students', Q(is_absent=True))
+            .count('passed_students', Q(is_passed=True))
+            .count('failed_students', Q(is_passed=False))
+            .max('highest_marks', 'total_marks_obtained', default=0)
+            .min('lowest_marks', 'total_marks_obtained', default=0)
+            .avg('average_marks', 'total_marks_obtained')
+            .avg('average_percentage', 'percentage')
+            .count('range_90_100', Q(percentage__gte=90))
+            .count('range_80_89', Q(percentage__gte=80, percentage__lt=90))
+            .count('range_70_79', Q(percentage__gte=70, percentage__lt=80))
+            .count('range_60_69', Q(percentage__gte=60, percentage__lt=70))
+            .count('range_50_59', Q(percentage__gte=50, percentage__lt=60))
+            .count('range_below_50', Q(percentage__lt=50))
+            .run()
+        )
+        
+        if not stats['total_students']:
             return Response({'message': 'No results available yet'})
         
         analytics = {
             'basic_stats': {
-                'total_students': results.count(),
-                'appeared_students': results.filter(is_absent=False).count(),
-                'absent_students': results.filter(is_absent=True).count(),
-                'passed_students': results.filter(is_passed=True).count(),
-                'failed_students': results.filter(is_passed=False).count()
+                key: stats[key] for key in (
+                    'total_students', 'appeared_students', 'absent_students', 'passed_students', 'failed_students'
+                )
             },
             'performance_metrics': {
-                'highest_marks': results.aggregate(max=Max('total_marks_obtained'))['max'] or 0,
-                'lowest_marks': results.aggregate(min=Min('total_marks_obtained'))['min'] or 0,
-                'average_marks': results.aggregate(avg=Avg('total_marks_obtained'))['avg'] or 0,
-                'average_percentage': results.aggregate(avg=Avg('percentage'))['avg'] or 0,
-                'pass_percentage': (results.filter(is_passed=True).count() / results.filter(is_absent=False).count() * 100) if results.filter(is_absent=False).count() > 0 else 0
+                'highest_marks': stats['highest_marks'],
+                'lowest_marks': stats['lowest_marks'],
+                'average_marks': stats['average_marks'],
+                'average_percentage': stats['average_percentage'],
+                'pass_percentage': percentage(stats['passed_students'], stats['appeared_students'])
             },
             'grade_distribution': results.values('grade').annotate(count=Count('id')),
             'section_wise_performance': results.values('student__section__name').annotate(
@@ -186,12 +206,12 @@ class ExamViewSet(viewsets.ModelViewSet):
                 pass_count=Count('id', filter=Q(is_passed=True))
             ),
             'mark_ranges': {
-                '90-100': results.filter(percentage__gte=90).count(),
-                '80-89': results.filter(percentage__gte=80, percentage__lt=90).count(),
-                '70-79': results.filter(percentage__gte=70, percentage__lt=80).count(),
-                '60-69': results.filter(percentage__gte=60, percentage__lt=70).count(),
-                '50-59': results.filter(percentage__gte=50, percentage__lt=60).count(),
-                'Below 50': results.filter(percentage__lt=50).count()
+                '90-100': stats['range_90_100'],
+                '80-89': stats['range_80_89'],
+                '70-79': stats['range_70_79'],
+                '60-69': stats['range_60_69'],
+                '50-59': stats['range_50_59'],
+                'Below 50': stats['range_below_50']
             }
         }
         return Response(analytics)
@@ -531,10 +551,11 @@ class ExamResultViewSet(viewsets.ModelViewSet):
         }
         return Response(analytics)
 
-class GradingSchemeViewSet(viewsets.ModelViewSet):
+class GradingSchemeViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """API endpoints for Grading Scheme management"""
     serializer_class = GradingSchemeSerializer
     permission_classes = [IsAuthenticated]
+    version_domain = 'exams'
     
     def get_queryset(self):
         return GradingScheme.objects.filter(school=self.request.user.profile.school)
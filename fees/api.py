@@ -1,4 +1,6 @@
 from rest_framework import serializers, viewsets
+from core.pagination import KeysetPagination
+from core.performance import ConditionalGetMixin
 from .models import (
     FeeCategory, 
     FeeStructure, 
@@ -29,10 +31,20 @@ class FeeCategoryViewSet(viewsets.ModelViewSet):
     queryset = FeeCategory.objects.all()
     serializer_class = FeeCategorySerializer
 
-class FeeStructureViewSet(viewsets.ModelViewSet):
+class FeeStructureViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = FeeStructure.objects.all()
     serializer_class = FeeStructureSerializer
+    # Not limited to one school: the version stamp is recomputed per request
+    version_domain = 'fees'
+    version_per_school = False
 
 class FeePaymentViewSet(viewsets.ModelViewSet):
     queryset = FeePayment.objects.all()
-    serializer_class = FeePaymentSerializer 
\ No newline at end of file
+    serializer_class = FeePaymentSerializer
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        # Only the payments of the user's own school
+        if not hasattr(self.request.user, 'profile'):
+            return FeePayment.objects.none()
+        return FeePayment.objects.filter(student__school=self.request.user.profile.school)
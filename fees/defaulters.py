@@ -0,0 +1,218 @@
+"""
+Materialized fee defaulters
+
+refresh_fee_defaulters() rebuilds the open FeeDefaulter rows from unpaid
+installments in one grouped pass: a single query computes every overdue
+installment's outstanding amount (net amount plus unwaived late fee, less
+what was paid), the rows are upserted in batches, and defaulters whose
+installments are no longer overdue are marked resolved with one UPDATE.
+Notice and recovery fields on existing rows are left untouched.
+
+The nightly refresh_fee_defaulters command refreshes everything (overdue
+days grow every day); fee payment and installment changes refresh their
+own installment through signals connected in core.signals.
+
+Aging buckets and risk tiers are derived from the stored amounts and days
+when reading, so changing the thresholds needs no refresh:
+
+    defaulter_summary()        totals, aging buckets, risk tiers, per grade
+    student_defaulters()       one row per student, worst first
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, CharField, Count, DecimalField, F, Max, Q, QuerySet, Sum, Value, When
+from django.utils import timezone
+
+from core.aggregation import StatsQuery
+
+from .models import FeeDefaulter, FeeInstallment
+
+FEE_DEFAULTER_DEFAULTS = {
+    # Days past the due date before an unpaid installment counts as defaulted
+    'MIN_OVERDUE_DAYS': 1,
+    # Upper bounds (days) of the aging buckets; older rows fall in the last, open bucket
+    'AGING_BUCKETS': [30, 60, 90],
+    # A student is high/medium risk above either threshold
+    'HIGH_RISK_AMOUNT': 50000,
+    'MEDIUM_RISK_AMOUNT': 20000,
+    'HIGH_RISK_DAYS': 90,
+    'MEDIUM_RISK_DAYS': 60,
+    'BATCH_SIZE': 1000,
+}
+
+MONEY = DecimalField(max_digits=12, decimal_places=2)
+
+
+def get_defaulter_setting(name):
+    return getattr(settings, 'FEE_DEFAULTERS', {}).get(name, FEE_DEFAULTER_DEFAULTS[name])
+
+
+def installment_outstanding():
+    """Amount still owed on an installment, including an unwaived late fee"""
+    late_fee = Case(When(late_fee_waived=True, then=Value(0)), default=F('late_fee_amount'), output_field=MONEY)
+    return F('net_amount') + late_fee - F('paid_amount')
+
+
+def overdue_installments(today=None):
+    today = today or timezone.now().date()
+    return FeeInstallment.objects.filter(
+        is_paid=False,
+        due_date__lte=today - timedelta(days=get_defaulter_setting('MIN_OVERDUE_DAYS')),
+    ).annotate(outstanding=installment_outstanding()).filter(outstanding__gt=0).order_by()
+
+
+def refresh_fee_defaulters(installments=None, today=None):
+    """Upsert open defaulter rows and resolve settled ones
+
+    `installments` limits the refresh to those installment ids (as after a
+    payment); by default every installment is considered. Returns
+    (open rows written, rows resolved).
+    """
+    today = today or timezone.now().date()
+    overdue = overdue_installments(today)
+    existing = FeeDefaulter.objects.filter(is_resolved=False)
+    if installments is not None:
+        overdue = overdue.filter(pk__in=installments)
+        existing = existing.filter(installment__in=installments)
+
+    batch_size = get_defaulter_setting('BATCH_SIZE')
+    rows = (
+        FeeDefaulter(
+            student_id=student_id,
+            installment_id=installment_id,
+            overdue_amount=outstanding,
+            overdue_days=(today - due_date).days,
+            is_resolved=False,
+            resolved_date=None,
+        )
+        for installment_id, student_id, due_date, outstanding in overdue.values_list(
+            'pk', 'student_fee_assignment__student_id', 'due_date', 'outstanding'
+        ).iterator(chunk_size=batch_size)
+    )
+
+    written = 0
+    with transaction.atomic():
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == batch_size:
+                written += _upsert(batch)
+                batch = []
+        if batch:
+            written += _upsert(batch)
+        resolved = existing.exclude(installment__in=overdue.values('pk')).update(
+            is_resolved=True, resolved_date=today, updated_at=timezone.now()
+        )
+    return written, resolved
+
+
+def _upsert(rows):
+    FeeDefaulter.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['student', 'installment'],
+        update_fields=['overdue_amount', 'overdue_days', 'is_resolved', 'resolved_date', 'updated_at'],
+    )
+    return len(rows)
+
+
+# Reading -----------------------------------------------------------------
+
+def aging_buckets():
+    """[(label, lower, upper)] with upper None for the open-ended last bucket"""
+    bounds = get_defaulter_setting('AGING_BUCKETS')
+    buckets = []
+    lower = 0
+    for upper in bounds:
+        buckets.append((f'{lower}-{upper}', lower, upper))
+        lower = upper + 1
+    buckets.append((f'{bounds[-1]}+', lower, None))
+    return buckets
+
+
+def _bucket_condition(lower, upper):
+    condition = Q(overdue_days__gte=lower)
+    if upper is not None:
+        condition &= Q(overdue_days__lte=upper)
+    return condition
+
+
+def risk_tier(amount_field, days_field):
+    """Case expression for the risk tier of an (amount, days) pair"""
+    return Case(
+        When(Q(**{f'{amount_field}__gt': get_defaulter_setting('HIGH_RISK_AMOUNT')})
+             | Q(**{f'{days_field}__gte': get_defaulter_setting('HIGH_RISK_DAYS')}), then=Value('High')),
+        When(Q(**{f'{amount_field}__gt': get_defaulter_setting('MEDIUM_RISK_AMOUNT')})
+             | Q(**{f'{days_field}__gte': get_defaulter_setting('MEDIUM_RISK_DAYS')}), then=Value('Medium')),
+        default=Value('Low'),
+        output_field=CharField(),
+    )
+
+
+def open_defaulters():
+    return FeeDefaulter.objects.filter(is_resolved=False)
+
+
+def student_defaulters(queryset=None):
+    """Open defaults grouped per student with totals and a risk tier, worst first"""
+    queryset = open_defaulters() if queryset is None else queryset
+    return queryset.order_by().values(
+        'student', 'student__first_name', 'student__last_name', 'student__admission_number',
+        'student__current_class__name',
+    ).annotate(
+        total_overdue_amount=Sum('overdue_amount'),
+        overdue_installments=Count('id'),
+        days_overdue=Max('overdue_days'),
+        risk_category=risk_tier('total_overdue_amount', 'days_overdue'),
+    ).order_by('-total_overdue_amount')
+
+
+def defaulter_summary(queryset=None):
+    """Totals, aging buckets, risk tiers and grade-wise rollup of open defaults"""
+    queryset = open_defaulters() if queryset is None else queryset
+    stats = StatsQuery(queryset).count('students', field='student', distinct=True).sum(
+        'total_overdue_amount', 'overdue_amount'
+    )
+    buckets = aging_buckets()
+    for index, (_, lower, upper) in enumerate(buckets):
+        condition = _bucket_condition(lower, upper)
+        stats.count(f'aging_{index}_count', condition).sum(f'aging_{index}_amount', 'overdue_amount', condition)
+    totals = stats.run()
+
+    tiers = Counter(student_defaulters(queryset).values_list('risk_category', flat=True))
+
+    return {
+        'total_defaulters': totals['students'],
+        'total_overdue_amount': totals['total_overdue_amount'],
+        'aging': [
+            {'bucket': label, 'count': totals[f'aging_{index}_count'], 'amount': totals[f'aging_{index}_amount']}
+            for index, (label, _, _) in enumerate(buckets)
+        ],
+        'risk_tiers': {tier: tiers[tier] for tier in ('High', 'Medium', 'Low')},
+        'grade_wise': list(
+            StatsQuery(queryset)
+            .count('count', field='student', distinct=True)
+            .sum('total_amount', 'overdue_amount')
+            .run_grouped('student__current_class__name')
+        ),
+    }
+
+
+# Signal handlers (connected in core.signals)
+
+def refresh_for_installment(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    refresh_fee_defaulters([instance.pk])
+
+
+def refresh_for_payment(sender, instance, raw=False, **kwargs):
+    origin = kwargs.get('origin', instance)
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    # Payments deleted along with their installment or student need no refresh
+    if raw or instance.installment_id is None or origin_model is not sender:
+        return
+    refresh_fee_defaulters([instance.installment_id])
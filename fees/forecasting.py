@@ -0,0 +1,300 @@
+"""
+Fee collection forecasting
+
+build_forecast() turns successful FeePayment rows into a monthly
+collection series (TruncMonth, one grouped query, months without payments
+filled with zero) ending at the last complete month, and projects the
+next HORIZON_MONTHS months, starting with the current one, with three
+models:
+
+    seasonal_naive         each month repeats the same month a season ago
+    exponential_smoothing  additive Holt-Winters (Holt's linear trend when
+                           the history is shorter than two seasons), its
+                           smoothing parameters chosen by a grid search
+                           run for the whole grid at once with NumPy
+    installments           outstanding FeeInstallment dues falling in each
+                           month times the historical collection rate of
+                           dues
+
+Every projection carries a prediction interval at INTERVAL percent. The
+series model with the lowest one-step-ahead mean absolute error over the
+months both models predicted is reported as `best_model`.
+
+Both the payment history and the installment dues come from the fees
+app, so with a school they cover the same students: that school's
+payments and the dues of its fee structures. NumPy is optional: without
+it only the installment expectation is produced. get_forecast() caches the result per school and day with
+single-flight recomputation, so the page costs no fitting once warm.
+"""
+import statistics
+from datetime import date
+
+from django.conf import settings
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from core.performance import CacheNamespace, get_or_compute
+
+from .defaulters import installment_outstanding
+from .models import FeeInstallment, FeePayment
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+FORECAST_DEFAULTS = {
+    'HORIZON_MONTHS': 12,
+    'HISTORY_MONTHS': 36,
+    'SEASON_LENGTH': 12,
+    # Coverage of the prediction intervals, in percent
+    'INTERVAL': 80,
+    # Smoothing parameter values tried for alpha, beta and gamma
+    'SMOOTHING_GRID': [0.05, 0.1, 0.2, 0.35, 0.5, 0.7, 0.9],
+    'CACHE_TIMEOUT': 6 * 60 * 60,
+}
+
+CACHE_DOMAIN = 'fee_forecast'
+MIN_HISTORY_MONTHS = 3
+
+
+def get_forecast_setting(name):
+    return getattr(settings, 'FEE_FORECAST', {}).get(name, FORECAST_DEFAULTS[name])
+
+
+def _z_score():
+    return statistics.NormalDist().inv_cdf(0.5 + get_forecast_setting('INTERVAL') / 200)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+# Series ------------------------------------------------------------------
+
+def monthly_collections(today=None, school_id=None):
+    """[{'month', 'total_collected', 'transaction_count'}] up to the last complete month
+
+    Starts at the first month with payments inside the HISTORY_MONTHS
+    window; later months without payments are included with zeros. With
+    `school_id` only the payments of that school's students count.
+    """
+    today = today or timezone.now().date()
+    end = today.replace(day=1)
+    start = add_months(end, -get_forecast_setting('HISTORY_MONTHS'))
+    payments = FeePayment.objects.filter(status='SUCCESS')
+    if school_id is not None:
+        payments = payments.filter(student__school_id=school_id)
+    totals = {
+        row['month']: row for row in payments.filter(
+            payment_date__gte=start, payment_date__lt=end,
+        ).annotate(month=TruncMonth('payment_date')).order_by().values('month').annotate(
+            total_collected=Sum('amount_paid'), transaction_count=Count('id'),
+        )
+    }
+    if not totals:
+        return []
+
+    series = []
+    month = min(totals)
+    while month < end:
+        row = totals.get(month, {})
+        series.append({
+            'month': month,
+            'total_collected': float(row.get('total_collected') or 0),
+            'transaction_count': row.get('transaction_count', 0),
+        })
+        month = add_months(month, 1)
+    return series
+
+
+def seasonality(series, season=None):
+    """Average collection of each calendar month relative to the overall average"""
+    season = season or get_forecast_setting('SEASON_LENGTH')
+    if len(series) < season:
+        return []
+    overall = statistics.fmean(row['total_collected'] for row in series)
+    if not overall:
+        return []
+    by_month = {}
+    for row in series:
+        by_month.setdefault(row['month'].month, []).append(row['total_collected'])
+    return [
+        {'month': month, 'multiplier': round(statistics.fmean(values) / overall, 2)}
+        for month, values in sorted(by_month.items())
+    ]
+
+
+# Series models (NumPy) -----------------------------------------------------
+
+def _projection(point, width):
+    return {
+        'amount': max(float(point), 0.0),
+        'lower': max(float(point - width), 0.0),
+        'upper': max(float(point + width), 0.0),
+    }
+
+
+def seasonal_naive(values, horizon, season):
+    """Fit on the `values` array; None when it is shorter than two seasons"""
+    if len(values) < season + 2:
+        return None
+    residuals = values[season:] - values[:-season]
+    sigma = float(np.sqrt(np.mean(residuals ** 2)))
+    z = _z_score()
+    projections = []
+    for step in range(horizon):
+        point = values[len(values) - season + step % season]
+        projections.append(_projection(point, z * sigma * np.sqrt(step // season + 1)))
+    return {'residuals': residuals, 'parameters': {'season': season}, 'projections': projections}
+
+
+def exponential_smoothing(values, horizon, season):
+    """Additive Holt-Winters, or Holt's linear trend below two seasons of history"""
+    if len(values) < MIN_HISTORY_MONTHS:
+        return None
+    seasonal = len(values) >= 2 * season
+    period = season if seasonal else 1
+    grid = get_forecast_setting('SMOOTHING_GRID')
+    alpha, beta, gamma = (
+        axis.ravel() for axis in np.meshgrid(grid, grid, grid if seasonal else [0.0], indexing='ij')
+    )
+
+    # One row of state per parameter combination, updated together
+    level = np.full(alpha.shape, values[:period].mean())
+    trend = np.full(alpha.shape, (values[period:2 * period].mean() - values[:period].mean()) / period)
+    seasons = np.tile(values[:period] - values[:period].mean(), (alpha.size, 1))
+    errors = np.empty((alpha.size, len(values)))
+    for t, value in enumerate(values):
+        season_component = seasons[:, t % period]
+        errors[:, t] = value - (level + trend + season_component)
+        new_level = alpha * (value - season_component) + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        seasons[:, t % period] = gamma * (value - new_level) + (1 - gamma) * season_component
+        level = new_level
+
+    # The first period only reproduces the initial state
+    errors = errors[:, period:]
+    best = int(np.argmin((errors ** 2).sum(axis=1)))
+    a, b, g = float(alpha[best]), float(beta[best]), float(gamma[best])
+    residuals = errors[best]
+    sigma = float(np.sqrt(np.mean(residuals ** 2)))
+    z = _z_score()
+
+    projections = []
+    variance_factor = 1.0
+    for step in range(horizon):
+        if step:
+            weight = a * (1 + step * b) + (g if seasonal and step % period == 0 else 0.0)
+            variance_factor += weight ** 2
+        point = level[best] + (step + 1) * trend[best] + seasons[best, (len(values) + step) % period]
+        projections.append(_projection(point, z * sigma * np.sqrt(variance_factor)))
+    parameters = {'alpha': a, 'beta': b, 'seasonal': seasonal}
+    if seasonal:
+        parameters['gamma'] = g
+    return {'residuals': residuals, 'parameters': parameters, 'projections': projections}
+
+
+SERIES_MODELS = {
+    'seasonal_naive': seasonal_naive,
+    'exponential_smoothing': exponential_smoothing,
+}
+
+
+def fit_series_models(series, horizon=None, season=None):
+    """{name: fit} of the series models that the history is long enough for"""
+    horizon = horizon or get_forecast_setting('HORIZON_MONTHS')
+    season = season or get_forecast_setting('SEASON_LENGTH')
+    values = np.array([row['total_collected'] for row in series], dtype=float)
+    fits = {}
+    for name, model in SERIES_MODELS.items():
+        fit = model(values, horizon, season)
+        if fit is not None:
+            fits[name] = fit
+
+    # Compare on the months every model predicted
+    compared = min((len(fit['residuals']) for fit in fits.values()), default=0)
+    for fit in fits.values():
+        residuals = fit.pop('residuals')
+        fit['mae'] = float(np.mean(np.abs(residuals[-compared:])))
+    return fits
+
+
+# Installment expectation ---------------------------------------------------
+
+def installment_expectation(months, today=None, school_id=None):
+    """Expected collections of the dues falling in `months`
+
+    Two grouped queries: the outstanding dues per future month, and the
+    share of past months' dues that was paid. The spread of that monthly
+    share gives the interval. With `school_id` only that school's dues count.
+    """
+    today = today or timezone.now().date()
+    first, end = months[0], add_months(months[-1], 1)
+    installments = FeeInstallment.objects.all()
+    if school_id is not None:
+        installments = installments.filter(student_fee_assignment__fee_structure__school_id=school_id)
+    outstanding = dict(
+        installments.filter(is_paid=False, due_date__gte=first, due_date__lt=end)
+        .annotate(month=TruncMonth('due_date')).order_by().values('month')
+        .annotate(due=Sum(installment_outstanding())).values_list('month', 'due')
+    )
+
+    history_start = add_months(today.replace(day=1), -get_forecast_setting('HISTORY_MONTHS'))
+    rates = [
+        float(paid) / float(due)
+        for due, paid in installments.filter(due_date__gte=history_start, due_date__lt=first)
+        .annotate(month=TruncMonth('due_date')).order_by().values('month')
+        .annotate(due=Sum('net_amount'), paid=Sum('paid_amount')).values_list('due', 'paid')
+        if due
+    ]
+    rate = statistics.fmean(rates) if rates else 1.0
+    spread = _z_score() * statistics.pstdev(rates) if len(rates) > 1 else 0.0
+
+    projections = []
+    for month in months:
+        due = float(outstanding.get(month) or 0)
+        projections.append({
+            'amount': due * min(rate, 1.0),
+            'lower': due * min(max(rate - spread, 0.0), 1.0),
+            'upper': due * min(rate + spread, 1.0),
+        })
+    return {'parameters': {'collection_rate': rate, 'months_observed': len(rates)}, 'projections': projections}
+
+
+# Forecast ----------------------------------------------------------------
+
+def build_forecast(today=None, school_id=None):
+    """History, fitted models and their projections for the coming months"""
+    today = today or timezone.now().date()
+    series = monthly_collections(today, school_id)
+    months = [add_months(today.replace(day=1), step) for step in range(get_forecast_setting('HORIZON_MONTHS'))]
+
+    models = fit_series_models(series, len(months)) if NUMPY_AVAILABLE and series else {}
+    best_model = min(models, key=lambda name: models[name]['mae']) if models else None
+    models['installments'] = installment_expectation(months, today, school_id)
+    for fit in models.values():
+        for month, projection in zip(months, fit['projections']):
+            projection['month'] = month
+
+    return {
+        'generated_on': today,
+        'history': series,
+        'seasonality': seasonality(series),
+        'months': months,
+        'models': models,
+        'best_model': best_model,
+        'interval': get_forecast_setting('INTERVAL'),
+    }
+
+
+def get_forecast(school_id=None, today=None):
+    """build_forecast() cached per school and day"""
+    today = today or timezone.now().date()
+    return get_or_compute(
+        CacheNamespace(CACHE_DOMAIN, school_id), f'forecast:{today.isoformat()}',
+        lambda: build_forecast(today, school_id), timeout=get_forecast_setting('CACHE_TIMEOUT'),
+    )
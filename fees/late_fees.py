@@ -0,0 +1,124 @@
+"""
+Bulk late-fee calculation and posting
+
+calculate_late_fees() evaluates every unpaid, unwaived installment that
+is past its due date in one query, using the late-fee rules of the
+installment's fee structure:
+
+* nothing within the structure's grace_period_days;
+* then the flat late_fee_amount, or late_fee_percentage of the
+  installment's net amount when no flat amount is set;
+* with ACCRUE_MONTHLY, that charge once per started 30-day period past the
+  grace period;
+* capped at MAX_PERCENTAGE of the net amount and at MAX_AMOUNT.
+
+post_late_fees() writes the results with bulk_update inside a
+transaction. The late fee is a function of the run date, not an
+increment, so running twice for the same date changes nothing and only
+installments whose late fee changed are written.
+"""
+import math
+from dataclasses import dataclass
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .defaulters import refresh_fee_defaulters
+from .models import FeeInstallment
+
+LATE_FEE_DEFAULTS = {
+    'ACCRUE_MONTHLY': False,
+    # Caps; None disables
+    'MAX_PERCENTAGE': None,
+    'MAX_AMOUNT': None,
+    'BATCH_SIZE': 1000,
+}
+
+CENT = Decimal('0.01')
+ACCRUAL_PERIOD_DAYS = 30
+
+
+def get_late_fee_setting(name):
+    return getattr(settings, 'LATE_FEES', {}).get(name, LATE_FEE_DEFAULTS[name])
+
+
+@dataclass
+class LateFee:
+    installment: FeeInstallment
+    days_overdue: int
+    amount: Decimal
+
+    @property
+    def changed(self):
+        return self.amount != self.installment.late_fee_amount
+
+
+def late_fee_for(installment, structure, days_overdue):
+    """Late fee owed on `installment` when it is `days_overdue` days late"""
+    if not structure.late_fee_applicable or days_overdue <= structure.grace_period_days:
+        return Decimal('0.00')
+
+    if structure.late_fee_amount:
+        charge = Decimal(structure.late_fee_amount)
+    else:
+        charge = installment.net_amount * Decimal(str(structure.late_fee_percentage or 0)) / 100
+    if get_late_fee_setting('ACCRUE_MONTHLY'):
+        charge *= math.ceil((days_overdue - structure.grace_period_days) / ACCRUAL_PERIOD_DAYS)
+
+    max_percentage = get_late_fee_setting('MAX_PERCENTAGE')
+    if max_percentage is not None:
+        charge = min(charge, installment.net_amount * Decimal(str(max_percentage)) / 100)
+    max_amount = get_late_fee_setting('MAX_AMOUNT')
+    if max_amount is not None:
+        charge = min(charge, Decimal(str(max_amount)))
+    return charge.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def overdue_installments(run_date, installments=None):
+    queryset = FeeInstallment.objects.filter(
+        is_paid=False, late_fee_waived=False, due_date__lt=run_date,
+    ).select_related('student_fee_assignment__fee_structure').only(
+        'pk', 'net_amount', 'due_date', 'late_fee_amount', 'student_fee_assignment__student',
+        'student_fee_assignment__fee_structure__late_fee_applicable',
+        'student_fee_assignment__fee_structure__late_fee_amount',
+        'student_fee_assignment__fee_structure__late_fee_percentage',
+        'student_fee_assignment__fee_structure__grace_period_days',
+    ).order_by('pk')
+    if installments is not None:
+        queryset = queryset.filter(pk__in=installments)
+    return queryset
+
+
+def calculate_late_fees(run_date=None, installments=None):
+    """LateFee for every overdue installment as of `run_date` (no writes)"""
+    run_date = run_date or timezone.now().date()
+    calculations = []
+    for installment in overdue_installments(run_date, installments).iterator(
+        chunk_size=get_late_fee_setting('BATCH_SIZE')
+    ):
+        days_overdue = (run_date - installment.due_date).days
+        structure = installment.student_fee_assignment.fee_structure
+        calculations.append(LateFee(installment, days_overdue, late_fee_for(installment, structure, days_overdue)))
+    return calculations
+
+
+def post_late_fees(run_date=None, installments=None):
+    """Calculate and store late fees; returns (calculations, installments updated)"""
+    run_date = run_date or timezone.now().date()
+    with transaction.atomic():
+        calculations = calculate_late_fees(run_date, installments)
+        changed = [calculation for calculation in calculations if calculation.changed]
+        now = timezone.now()
+        for calculation in changed:
+            calculation.installment.late_fee_amount = calculation.amount
+            calculation.installment.updated_at = now
+        FeeInstallment.objects.bulk_update(
+            [calculation.installment for calculation in changed], ['late_fee_amount', 'updated_at'],
+            batch_size=get_late_fee_setting('BATCH_SIZE'),
+        )
+        if changed:
+            # bulk_update sends no signals; the outstanding amounts changed
+            refresh_fee_defaulters([calculation.installment.pk for calculation in changed], today=run_date)
+    return calculations, len(changed)
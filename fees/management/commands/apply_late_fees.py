@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from fees.late_fees import calculate_late_fees, post_late_fees
+
+
+class Command(BaseCommand):
+    help = 'Calculate late fees for every overdue installment and post them (idempotent per run date)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=str, help='Run date YYYY-MM-DD (default: today)')
+        parser.add_argument('--dry-run', action='store_true', help='Report the late fees without posting them')
+
+    def handle(self, *args, **options):
+        run_date = None
+        if options['date']:
+            run_date = parse_date(options['date'])
+            if run_date is None:
+                raise CommandError(f'Invalid date: {options["date"]}')
+
+        if options['dry_run']:
+            calculations = calculate_late_fees(run_date)
+            updated = sum(1 for calculation in calculations if calculation.changed)
+            verb = 'would change'
+        else:
+            calculations, updated = post_late_fees(run_date)
+            verb = 'changed'
+
+        total = sum(calculation.amount for calculation in calculations)
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(calculations)} overdue installments, late fees total {total}; {updated} {verb}'
+        ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.fee_ledger import rebuild_fee_ledgers
+
+
+class Command(BaseCommand):
+    help = 'Recompute every student fee ledger row from fee structures and payments (corrects any drift)'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rows = rebuild_fee_ledgers()
+        self.stdout.write(self.style.SUCCESS(f'Fee ledger rebuilt: {rows} students'))
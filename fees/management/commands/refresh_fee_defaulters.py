@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from fees.defaulters import defaulter_summary, refresh_fee_defaulters
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the fee defaulter rows from overdue installments (run nightly, e.g. from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=str, help='Evaluate overdue days as of YYYY-MM-DD (default: today)')
+
+    def handle(self, *args, **options):
+        today = None
+        if options['date']:
+            today = parse_date(options['date'])
+            if today is None:
+                raise CommandError(f'Invalid date: {options["date"]}')
+
+        written, resolved = refresh_fee_defaulters(today=today)
+        summary = defaulter_summary()
+        self.stdout.write(self.style.SUCCESS(
+            f'Fee defaulters refreshed: {written} overdue installments, {resolved} resolved, '
+            f'{summary["total_defaulters"]} students owing {summary["total_overdue_amount"]}'
+        ))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from fees.reminders import send_fee_reminders
+
+
+class Command(BaseCommand):
+    help = 'Send one overdue-fee reminder per parent covering all their children (throttled per parent)'
+
+    def handle(self, *args, **options):
+        summary = send_fee_reminders()
+        self.stdout.write(self.style.SUCCESS(
+            f'Reminded {summary["sent"]} parents about {summary["installments"]} overdue installments of '
+            f'{summary["students"]} students; {summary["throttled"]} parents throttled, '
+            f'{summary["students_without_parent"]} students without a parent account'
+        ))
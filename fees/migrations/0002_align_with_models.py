@@ -0,0 +1,515 @@
+# Generated by Django 5.0.6 on 2026-10-18 05:50
+
+import django.core.validators
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_auditlog_created_at_default'),
+        ('fees', '0001_initial'),
+        ('students', '0002_align_with_models'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeeConcession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('concession_type', models.CharField(choices=[('MERIT', 'Merit Based'), ('NEED', 'Need Based'), ('SPORTS', 'Sports Quota'), ('STAFF_WARD', 'Staff Ward'), ('SIBLING', 'Sibling Discount'), ('HANDICAPPED', 'Handicapped'), ('MINORITY', 'Minority'), ('BPL', 'Below Poverty Line'), ('GOVERNMENT', 'Government Scholarship'), ('OTHER', 'Other')], max_length=20)),
+                ('concession_name', models.CharField(max_length=200)),
+                ('concession_percentage', models.FloatField(validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)])),
+                ('concession_amount', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('approval_date', models.DateField()),
+                ('approval_remarks', models.TextField(blank=True, null=True)),
+                ('supporting_documents', models.TextField(blank=True, help_text='List of supporting documents', null=True)),
+                ('valid_from', models.DateField()),
+                ('valid_till', models.DateField()),
+                ('is_active', models.BooleanField(default=True)),
+                ('academic_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fee_concessions', to='core.academicyear')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='FeeDefaulter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('overdue_amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('overdue_days', models.IntegerField()),
+                ('first_notice_sent', models.BooleanField(default=False)),
+                ('first_notice_date', models.DateField(blank=True, null=True)),
+                ('second_notice_sent', models.BooleanField(default=False)),
+                ('second_notice_date', models.DateField(blank=True, null=True)),
+                ('final_notice_sent', models.BooleanField(default=False)),
+                ('final_notice_date', models.DateField(blank=True, null=True)),
+                ('parent_meeting_scheduled', models.BooleanField(default=False)),
+                ('parent_meeting_date', models.DateField(blank=True, null=True)),
+                ('tc_hold', models.BooleanField(default=False, help_text='Transfer Certificate on hold')),
+                ('exam_debarred', models.BooleanField(default=False)),
+                ('is_resolved', models.BooleanField(default=False)),
+                ('resolved_date', models.DateField(blank=True, null=True)),
+                ('resolution_remarks', models.TextField(blank=True, null=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fee_defaults', to='students.student')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='FeeDiscount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(max_length=200)),
+                ('code', models.CharField(max_length=20)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('discount_type', models.CharField(choices=[('PERCENTAGE', 'Percentage'), ('FIXED_AMOUNT', 'Fixed Amount'), ('WAIVER', 'Complete Waiver')], max_length=20)),
+                ('discount_percentage', models.FloatField(default=0, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)])),
+                ('discount_amount', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('minimum_marks_required', models.FloatField(blank=True, null=True)),
+                ('maximum_family_income', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('is_need_based', models.BooleanField(default=False)),
+                ('is_merit_based', models.BooleanField(default=False)),
+                ('is_sports_quota', models.BooleanField(default=False)),
+                ('is_staff_ward', models.BooleanField(default=False)),
+                ('is_sibling_discount', models.BooleanField(default=False)),
+                ('is_early_payment', models.BooleanField(default=False)),
+                ('is_rte_scheme', models.BooleanField(default=False)),
+                ('is_pmcare_scheme', models.BooleanField(default=False)),
+                ('is_state_scholarship', models.BooleanField(default=False)),
+                ('valid_from', models.DateField()),
+                ('valid_till', models.DateField()),
+                ('is_active', models.BooleanField(default=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='FeeInstallment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('installment_number', models.IntegerField()),
+                ('installment_type', models.CharField(choices=[('FIRST_TERM', 'First Term'), ('SECOND_TERM', 'Second Term'), ('THIRD_TERM', 'Third Term'), ('FOURTH_TERM', 'Fourth Term'), ('ANNUAL', 'Annual'), ('ADMISSION', 'Admission Fee'), ('DEVELOPMENT', 'Development Fee'), ('EXAMINATION', 'Examination Fee'), ('TRANSPORT', 'Transport Fee'), ('HOSTEL', 'Hostel Fee')], max_length=20)),
+                ('installment_name', models.CharField(max_length=100)),
+                ('total_amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('discount_amount', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('tax_amount', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('net_amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('due_date', models.DateField()),
+                ('is_paid', models.BooleanField(default=False)),
+                ('paid_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('balance_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('late_fee_amount', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('late_fee_waived', models.BooleanField(default=False)),
+                ('late_fee_waiver_reason', models.CharField(blank=True, max_length=200, null=True)),
+            ],
+            options={
+                'ordering': ['installment_number'],
+            },
+        ),
+        migrations.CreateModel(
+            name='FeeItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(max_length=200)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('is_one_time', models.BooleanField(default=False)),
+                ('is_monthly', models.BooleanField(default=False)),
+                ('is_quarterly', models.BooleanField(default=False)),
+                ('is_annual', models.BooleanField(default=True)),
+                ('due_date', models.DateField(blank=True, null=True)),
+                ('is_optional', models.BooleanField(default=False)),
+                ('is_active', models.BooleanField(default=True)),
+            ],
+            options={
+                'ordering': ['fee_category__name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='FeePayment',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('receipt_number', models.CharField(max_length=50, unique=True)),
+                ('payment_date', models.DateField()),
+                ('amount_paid', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('late_fee_paid', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('processing_fee', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('total_amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('reference_number', models.CharField(blank=True, max_length=100, null=True)),
+                ('bank_name', models.CharField(blank=True, max_length=200, null=True)),
+                ('branch_name', models.CharField(blank=True, max_length=200, null=True)),
+                ('gateway_transaction_id', models.CharField(blank=True, max_length=200, null=True)),
+                ('gateway_payment_id', models.CharField(blank=True, max_length=200, null=True)),
+                ('gateway_order_id', models.CharField(blank=True, max_length=200, null=True)),
+                ('gateway_signature', models.CharField(blank=True, max_length=500, null=True)),
+                ('gateway_response', models.JSONField(blank=True, default=dict)),
+                ('upi_id', models.CharField(blank=True, max_length=100, null=True)),
+                ('upi_reference', models.CharField(blank=True, max_length=100, null=True)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('PROCESSING', 'Processing'), ('SUCCESS', 'Success'), ('FAILED', 'Failed'), ('CANCELLED', 'Cancelled'), ('REFUNDED', 'Refunded'), ('PARTIALLY_REFUNDED', 'Partially Refunded')], default='PENDING', max_length=20)),
+                ('remarks', models.TextField(blank=True, null=True)),
+                ('failure_reason', models.TextField(blank=True, null=True)),
+                ('verified_at', models.DateTimeField(blank=True, null=True)),
+                ('receipt_printed', models.BooleanField(default=False)),
+                ('receipt_printed_at', models.DateTimeField(blank=True, null=True)),
+                ('collected_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='collected_payments', to=settings.AUTH_USER_MODEL)),
+                ('installment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='payments', to='fees.feeinstallment')),
+                ('receipt_printed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='printed_receipts', to=settings.AUTH_USER_MODEL)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fee_payments', to='students.student')),
+                ('verified_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='verified_payments', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-payment_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='FeeRefund',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('refund_type', models.CharField(choices=[('WITHDRAWAL', 'Student Withdrawal'), ('OVERPAYMENT', 'Overpayment'), ('DUPLICATE', 'Duplicate Payment'), ('CANCELLED_ADMISSION', 'Cancelled Admission'), ('CLASS_CHANGE', 'Class Change'), ('TRANSFER', 'School Transfer'), ('SCHOLARSHIP_ADJUSTMENT', 'Scholarship Adjustment'), ('OTHER', 'Other')], max_length=25)),
+                ('refund_amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('reason', models.TextField()),
+                ('requested_date', models.DateField(auto_now_add=True)),
+                ('approved_date', models.DateField(blank=True, null=True)),
+                ('processed_date', models.DateField(blank=True, null=True)),
+                ('expected_refund_date', models.DateField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('REQUESTED', 'Requested'), ('APPROVED', 'Approved'), ('REJECTED', 'Rejected'), ('PROCESSED', 'Processed'), ('COMPLETED', 'Completed')], default='REQUESTED', max_length=20)),
+                ('admin_remarks', models.TextField(blank=True, null=True)),
+                ('refund_reference', models.CharField(blank=True, max_length=100, null=True)),
+                ('refund_mode', models.CharField(blank=True, max_length=50, null=True)),
+                ('refund_account_number', models.CharField(blank=True, max_length=30, null=True)),
+                ('refund_ifsc_code', models.CharField(blank=True, max_length=11, null=True)),
+                ('approved_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='approved_refunds', to=settings.AUTH_USER_MODEL)),
+                ('payment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='refunds', to='fees.feepayment')),
+                ('processed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='processed_refunds', to=settings.AUTH_USER_MODEL)),
+                ('requested_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='requested_refunds', to=settings.AUTH_USER_MODEL)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fee_refunds', to='students.student')),
+            ],
+            options={
+                'ordering': ['-requested_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='FeeReport',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('report_type', models.CharField(choices=[('DAILY', 'Daily Collection'), ('WEEKLY', 'Weekly Collection'), ('MONTHLY', 'Monthly Collection'), ('CLASS_WISE', 'Class-wise Collection'), ('DEFAULTER', 'Fee Defaulters'), ('OUTSTANDING', 'Outstanding Fees'), ('PAYMENT_MODE', 'Payment Mode wise'), ('SCHOLARSHIP', 'Scholarship Report'), ('REFUND', 'Refund Report'), ('TAX', 'Tax Report'), ('RTE', 'RTE Student Report'), ('CATEGORY_WISE', 'Category-wise Collection')], max_length=20)),
+                ('from_date', models.DateField()),
+                ('to_date', models.DateField()),
+                ('report_data', models.JSONField(default=dict)),
+                ('report_file', models.FileField(blank=True, null=True, upload_to='fee_reports/')),
+                ('total_collection', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('total_outstanding', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('total_refunds', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('category_filter', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='students.category')),
+                ('class_filter', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='students.schoolclass')),
+                ('generated_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='generated_fee_reports', to=settings.AUTH_USER_MODEL)),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fee_reports', to='core.schoolsettings')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='FeeStructure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(max_length=200)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('is_installment_allowed', models.BooleanField(default=True)),
+                ('number_of_installments', models.IntegerField(default=4)),
+                ('installment_gap_days', models.IntegerField(default=90)),
+                ('late_fee_applicable', models.BooleanField(default=True)),
+                ('late_fee_amount', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('late_fee_percentage', models.FloatField(default=0)),
+                ('grace_period_days', models.IntegerField(default=7)),
+                ('early_payment_discount', models.FloatField(default=0, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)])),
+                ('sibling_discount', models.FloatField(default=0, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)])),
+                ('staff_ward_discount', models.FloatField(default=0, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)])),
+                ('rte_fee_waiver', models.BooleanField(default=False, help_text='RTE students fee waiver')),
+                ('is_active', models.BooleanField(default=True)),
+                ('academic_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fee_structures', to='core.academicyear')),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fee_structures', to='core.schoolsettings')),
+                ('school_class', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fee_structures', to='students.schoolclass')),
+                ('student_category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fee_structures', to='students.category')),
+            ],
+            options={
+                'unique_together': {('school', 'academic_year', 'school_class', 'student_category')},
+            },
+        ),
+        migrations.CreateModel(
+            name='PaymentMethod',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(max_length=100)),
+                ('payment_type', models.CharField(choices=[('CASH', 'Cash'), ('CHEQUE', 'Cheque'), ('DD', 'Demand Draft'), ('BANK_TRANSFER', 'Bank Transfer'), ('UPI', 'UPI'), ('CARD', 'Credit/Debit Card'), ('NET_BANKING', 'Net Banking'), ('MOBILE_WALLET', 'Mobile Wallet'), ('RAZORPAY', 'Razorpay'), ('PAYU', 'PayU'), ('PAYTM', 'Paytm'), ('PHONEPE', 'PhonePe'), ('GPAY', 'Google Pay')], max_length=20)),
+                ('is_online', models.BooleanField(default=False)),
+                ('is_active', models.BooleanField(default=True)),
+                ('processing_fee_percentage', models.FloatField(default=0)),
+                ('processing_fee_amount', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('gateway_name', models.CharField(blank=True, max_length=100, null=True)),
+                ('merchant_id', models.CharField(blank=True, max_length=200, null=True)),
+                ('api_key', models.CharField(blank=True, max_length=500, null=True)),
+                ('secret_key', models.CharField(blank=True, max_length=500, null=True)),
+                ('is_test_mode', models.BooleanField(default=True)),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payment_methods', to='core.schoolsettings')),
+            ],
+            options={
+                'unique_together': {('school', 'name')},
+            },
+        ),
+        migrations.CreateModel(
+            name='StudentFeeAssignment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('discount_percentage', models.FloatField(default=0, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)])),
+                ('discount_amount', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('discount_reason', models.CharField(blank=True, max_length=200, null=True)),
+                ('scholarship_name', models.CharField(blank=True, max_length=200, null=True)),
+                ('scholarship_amount', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('scholarship_percentage', models.FloatField(default=0, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)])),
+                ('scholarship_reference', models.CharField(blank=True, max_length=100, null=True)),
+                ('is_pmcare_beneficiary', models.BooleanField(default=False, help_text='PM CARES scholarship')),
+                ('is_state_scholarship', models.BooleanField(default=False)),
+                ('state_scholarship_name', models.CharField(blank=True, max_length=200, null=True)),
+                ('state_scholarship_amount', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('is_active', models.BooleanField(default=True)),
+                ('academic_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='student_fee_assignments', to='core.academicyear')),
+                ('assigned_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('fee_structure', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='student_assignments', to='fees.feestructure')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fee_assignments', to='students.student')),
+            ],
+            options={
+                'unique_together': {('student', 'academic_year')},
+            },
+        ),
+        migrations.DeleteModel(
+            name='Discount',
+        ),
+        migrations.DeleteModel(
+            name='FeeMaster',
+        ),
+        migrations.RemoveField(
+            model_name='feetype',
+            name='category',
+        ),
+        migrations.RemoveField(
+            model_name='studentfee',
+            name='fee_type',
+        ),
+        migrations.DeleteModel(
+            name='Transaction',
+        ),
+        migrations.AlterModelOptions(
+            name='feecategory',
+            options={'verbose_name_plural': 'Fee Categories'},
+        ),
+        migrations.AddField(
+            model_name='feecategory',
+            name='account_code',
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name='feecategory',
+            name='code',
+            field=models.CharField(default='', max_length=20),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='feecategory',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='feecategory',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='feecategory',
+            name='is_activity_fee',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='feecategory',
+            name='is_annual_fee',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='feecategory',
+            name='is_development_fee',
+            field=models.BooleanField(default=False, help_text='One-time development fee'),
+        ),
+        migrations.AddField(
+            model_name='feecategory',
+            name='is_examination_fee',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='feecategory',
+            name='is_hostel_fee',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='feecategory',
+            name='is_library_fee',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='feecategory',
+            name='is_mandatory',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='feecategory',
+            name='is_refundable',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='feecategory',
+            name='is_transport_fee',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='feecategory',
+            name='refund_percentage',
+            field=models.FloatField(default=0, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)]),
+        ),
+        migrations.AddField(
+            model_name='feecategory',
+            name='school',
+            field=models.ForeignKey(default=0, on_delete=django.db.models.deletion.CASCADE, related_name='fee_categories', to='core.schoolsettings'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='feecategory',
+            name='tax_applicable',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='feecategory',
+            name='tax_percentage',
+            field=models.FloatField(default=0, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)]),
+        ),
+        migrations.AddField(
+            model_name='feecategory',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterField(
+            model_name='feecategory',
+            name='name',
+            field=models.CharField(max_length=200),
+        ),
+        migrations.AlterUniqueTogether(
+            name='feecategory',
+            unique_together={('school', 'code')},
+        ),
+        migrations.AddField(
+            model_name='feeconcession',
+            name='applicable_categories',
+            field=models.ManyToManyField(related_name='concessions', to='fees.feecategory'),
+        ),
+        migrations.AddField(
+            model_name='feeconcession',
+            name='approved_by',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='approved_concessions', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='feeconcession',
+            name='student',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fee_concessions', to='students.student'),
+        ),
+        migrations.AddField(
+            model_name='feediscount',
+            name='applicable_categories',
+            field=models.ManyToManyField(blank=True, related_name='discounts', to='fees.feecategory'),
+        ),
+        migrations.AddField(
+            model_name='feediscount',
+            name='applicable_classes',
+            field=models.ManyToManyField(blank=True, related_name='fee_discounts', to='students.schoolclass'),
+        ),
+        migrations.AddField(
+            model_name='feediscount',
+            name='school',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fee_discounts', to='core.schoolsettings'),
+        ),
+        migrations.AddField(
+            model_name='feedefaulter',
+            name='installment',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='defaults', to='fees.feeinstallment'),
+        ),
+        migrations.AddField(
+            model_name='feeitem',
+            name='fee_category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fee_items', to='fees.feecategory'),
+        ),
+        migrations.AddField(
+            model_name='feeitem',
+            name='fee_structure',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fee_items', to='fees.feestructure'),
+        ),
+        migrations.AddField(
+            model_name='feereport',
+            name='payment_method_filter',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='fees.paymentmethod'),
+        ),
+        migrations.AddField(
+            model_name='feepayment',
+            name='payment_method',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payments', to='fees.paymentmethod'),
+        ),
+        migrations.AddField(
+            model_name='feeinstallment',
+            name='student_fee_assignment',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='installments', to='fees.studentfeeassignment'),
+        ),
+        migrations.DeleteModel(
+            name='FeeType',
+        ),
+        migrations.DeleteModel(
+            name='StudentFee',
+        ),
+        migrations.AlterUniqueTogether(
+            name='feeconcession',
+            unique_together={('student', 'concession_type', 'academic_year')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='feediscount',
+            unique_together={('school', 'code')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='feedefaulter',
+            unique_together={('student', 'installment')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='feeitem',
+            unique_together={('fee_structure', 'fee_category')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='feeinstallment',
+            unique_together={('student_fee_assignment', 'installment_number')},
+        ),
+    ]
@@ -0,0 +1,171 @@
+"""
+Bulk fee reminders
+
+send_fee_reminders() reminds parents about overdue installments in a
+fixed number of queries, however many installments are overdue:
+
+1. the overdue installments with their outstanding amounts (one query);
+2. the active parent accounts of those students (one query);
+3. the parents already reminded within THROTTLE_DAYS (one query);
+4. one SmartNotification per remaining parent, covering all of their
+   children's overdue installments, written with bulk_create;
+5. the notice stages of the matching FeeDefaulter rows (first, second,
+   final) advanced with one UPDATE per stage.
+
+The FEE_REMINDER notifications are the reminder history: each records the
+students and installments it covered in personalization_data, and the
+throttle in step 3 reads them back, so a parent gets at most one reminder
+a day (THROTTLE_DAYS >= 1) whatever triggers the run.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from core.models import SmartNotification
+from students.models import StudentParent
+
+from .defaulters import overdue_installments
+from .models import FeeDefaulter, FeeInstallment
+
+FEE_REMINDER_DEFAULTS = {
+    # Days before the same parent can be reminded again
+    'THROTTLE_DAYS': 7,
+    # Only remind each student's primary contact
+    'PRIMARY_CONTACT_ONLY': False,
+    'CHANNELS': ['IN_APP', 'EMAIL'],
+    'BATCH_SIZE': 500,
+}
+
+TRIGGER_TYPE = 'FEE_REMINDER'
+
+
+def get_reminder_setting(name):
+    return getattr(settings, 'FEE_REMINDERS', {}).get(name, FEE_REMINDER_DEFAULTS[name])
+
+
+def _overdue_by_student(overdue, today):
+    by_student = defaultdict(list)
+    names = {}
+    for pk, student_id, first_name, last_name, name, due_date, outstanding in overdue.values_list(
+        'pk', 'student_fee_assignment__student_id', 'student_fee_assignment__student__first_name',
+        'student_fee_assignment__student__last_name', 'installment_name', 'due_date', 'outstanding',
+    ):
+        by_student[student_id].append({
+            'installment': pk, 'name': name, 'days_overdue': (today - due_date).days, 'outstanding': outstanding,
+        })
+        names[student_id] = f'{first_name} {last_name}'
+    return by_student, names
+
+
+def _reminder(parent_id, children, names, today):
+    lines = []
+    installment_ids = []
+    total = 0
+    for student_id, dues in children.items():
+        amount = sum(due['outstanding'] for due in dues)
+        oldest = max(due['days_overdue'] for due in dues)
+        total += amount
+        installment_ids.extend(due['installment'] for due in dues)
+        lines.append(
+            f'{names[student_id]}: ₹{amount} overdue ({", ".join(due["name"] for due in dues)}; '
+            f'up to {oldest} days)'
+        )
+    return SmartNotification(
+        trigger_type=TRIGGER_TYPE,
+        recipient_id=parent_id,
+        title='Fee Payment Reminder',
+        message='The following fees are overdue:\n' + '\n'.join(lines),
+        action_items=['Pay the overdue fees through the parent payment portal'],
+        priority_score=min(1.0, 0.5 + 0.1 * len(installment_ids)),
+        preferred_channels=get_reminder_setting('CHANNELS'),
+        personalization_data={
+            'reminder_date': today.isoformat(),
+            'students': [str(student_id) for student_id in children],
+            'installments': installment_ids,
+            'total_overdue': str(total),
+        },
+    )
+
+
+def _advance_notices(installment_ids, today):
+    """Move open defaulter rows of reminded installments to their next notice stage"""
+    rows = FeeDefaulter.objects.filter(installment__in=installment_ids, is_resolved=False)
+    # Latest stage first, and only from notices sent on an earlier day, so
+    # one run never skips a row through several stages
+    final = rows.filter(second_notice_sent=True, final_notice_sent=False, second_notice_date__lt=today).update(
+        final_notice_sent=True, final_notice_date=today
+    )
+    second = rows.filter(first_notice_sent=True, second_notice_sent=False, first_notice_date__lt=today).update(
+        second_notice_sent=True, second_notice_date=today
+    )
+    first = rows.filter(first_notice_sent=False).update(first_notice_sent=True, first_notice_date=today)
+    return first + second + final
+
+
+def installments_for_payments(payments):
+    """The installments a selection of core FeePayment records stands for
+
+    Parents are linked to the students app record, so each payment is
+    matched to the installment of the student with the same admission
+    number that falls due on the payment's fee structure due date.
+    """
+    return FeeInstallment.objects.filter(Exists(payments.filter(
+        student__admission_number=OuterRef('student_fee_assignment__student__admission_number'),
+        fee_structure__due_date=OuterRef('due_date'),
+    ))).values('pk')
+
+
+def send_fee_reminders(installments=None, today=None):
+    """Remind parents of overdue installments; returns a summary dict
+
+    `installments` limits the run to those installment ids; by default
+    every overdue installment is covered.
+    """
+    today = today or timezone.now().date()
+    overdue = overdue_installments(today)
+    if installments is not None:
+        overdue = overdue.filter(pk__in=installments)
+    by_student, names = _overdue_by_student(overdue, today)
+
+    parents = StudentParent.objects.filter(
+        student__in=overdue.values('student_fee_assignment__student'), is_active=True,
+    )
+    if get_reminder_setting('PRIMARY_CONTACT_ONLY'):
+        parents = parents.filter(is_primary_contact=True)
+    children_by_parent = defaultdict(dict)
+    reached_students = set()
+    for student_id, parent_id in parents.values_list('student_id', 'parent_user_id'):
+        children_by_parent[parent_id][student_id] = by_student[student_id]
+        reached_students.add(student_id)
+
+    throttle_start = timezone.now() - timedelta(days=get_reminder_setting('THROTTLE_DAYS'))
+    throttled = set(SmartNotification.objects.filter(
+        trigger_type=TRIGGER_TYPE, recipient__in=parents.values('parent_user'), created_at__gte=throttle_start,
+    ).values_list('recipient_id', flat=True).distinct())
+
+    notifications = [
+        _reminder(parent_id, children, names, today)
+        for parent_id, children in children_by_parent.items()
+        if parent_id not in throttled
+    ]
+    reminded_installments = sorted({
+        installment for notification in notifications
+        for installment in notification.personalization_data['installments']
+    })
+    with transaction.atomic():
+        SmartNotification.objects.bulk_create(notifications, batch_size=get_reminder_setting('BATCH_SIZE'))
+        notices = _advance_notices(reminded_installments, today) if reminded_installments else 0
+
+    return {
+        'installments': sum(len(dues) for dues in by_student.values()),
+        'students': len(by_student),
+        'students_without_parent': len(by_student) - len(reached_students),
+        'parents': len(children_by_parent),
+        'sent': len(notifications),
+        'throttled': len(throttled),
+        'notices_advanced': notices,
+    }
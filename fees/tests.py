@@ -1,3 +1,362 @@
-from django.test import TestCase
+import datetime
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import path
+from django.utils import timezone
+
+from authentication.models import UserProfile
+from core.models import (
+    AcademicYear, FeeCategory, FeePayment as CoreFeePayment, FeeStructure as CoreFeeStructure, Grade,
+    SmartNotification, Student as CoreStudent,
+)
+from core.tests import create_school
+from students.models import Category, SchoolClass, Student, StudentParent
+
+from .defaulters import aging_buckets, defaulter_summary, refresh_fee_defaulters, student_defaulters
+from .forecasting import add_months, build_forecast, fit_series_models, monthly_collections
+from .late_fees import late_fee_for, post_late_fees
+from .models import FeeDefaulter, FeeInstallment, FeePayment, FeeStructure, PaymentMethod, StudentFeeAssignment
+from .reminders import _advance_notices, _reminder, installments_for_payments, send_fee_reminders
+from .views import late_fee_automation
+
+# The late fee view is not routed by the project, so the tests mount it here
+urlpatterns = [path('late-fees/', late_fee_automation)]
+
+
+def create_fee_installment(school, amount, due_date, admission_number='F1', year=None, **kwargs):
+    """An installment of `amount` on a fees.FeeStructure of `school`, with its student"""
+    year = year or AcademicYear.objects.create(
+        name=f'{due_date.year}-{admission_number}', start_date=datetime.date(due_date.year, 1, 1),
+        end_date=datetime.date(due_date.year, 12, 31),
+    )
+    school_class = SchoolClass.objects.get_or_create(school=school, code='5', defaults={'name': 'Class 5'})[0]
+    category = Category.objects.get_or_create(school=school, code='GEN', defaults={'name': 'General'})[0]
+    structure = FeeStructure.objects.get_or_create(
+        school=school, academic_year=year, school_class=school_class, student_category=category,
+        defaults={'name': 'Annual'},
+    )[0]
+    student = Student.objects.create(
+        school=school, academic_year=year, admission_number=admission_number, first_name='Asha',
+        last_name='Rao', date_of_birth=datetime.date(2015, 1, 1), gender='F', admission_date=year.start_date,
+        current_class=school_class, current_address='1 Road', city='City', state='State', postal_code='000000',
+        father_name='Father', mother_name='Mother', emergency_contact_name='Mother',
+        emergency_contact_phone='1', emergency_contact_relation='Mother',
+    )
+    assignment = StudentFeeAssignment.objects.create(student=student, fee_structure=structure, academic_year=year)
+    fields = dict(installment_number=1, installment_type='FIRST_TERM', installment_name='Term 1',
+                  total_amount=amount, net_amount=amount, due_date=due_date)
+    fields.update(kwargs)
+    return FeeInstallment.objects.create(student_fee_assignment=assignment, **fields)
+
+
+
+def create_fee_payment(installment, payment_date, amount, status='SUCCESS'):
+    """A fees.FeePayment of `amount` towards `installment`"""
+    student = installment.student_fee_assignment.student
+    method = PaymentMethod.objects.get_or_create(school=student.school, name='Cash', payment_type='CASH')[0]
+    return FeePayment.objects.create(
+        student=student, installment=installment, payment_method=method, receipt_number=f'R-{installment.pk}',
+        payment_date=payment_date, amount_paid=amount, total_amount=amount, status=status,
+    )
+
+
+class FeeDefaulterTests(TestCase):
+    """Tests for the materialized fee defaulters"""
+
+    def setUp(self):
+        self.today = timezone.now().date()
+        school = create_school()
+        self.installments = {
+            admission_number: create_fee_installment(
+                school, amount, self.today - datetime.timedelta(days=days), admission_number=admission_number,
+            )
+            for admission_number, amount, days in [
+                ('MEDIUM', 30000, 10), ('HIGH', 60000, 45), ('OLD', 1000, 100), ('LOW', 500, 5), ('DUE', 5000, -1),
+            ]
+        }
+
+    def open_rows(self):
+        return {
+            row.student.admission_number: row
+            for row in FeeDefaulter.objects.filter(is_resolved=False).select_related('student')
+        }
+
+    def test_refresh_upserts_overdue_and_resolves_settled(self):
+        self.assertEqual(refresh_fee_defaulters(today=self.today), (4, 0))
+        rows = self.open_rows()
+        self.assertEqual(sorted(rows), ['HIGH', 'LOW', 'MEDIUM', 'OLD'])
+        self.assertEqual((rows['HIGH'].overdue_amount, rows['HIGH'].overdue_days), (60000, 45))
+
+        # Queryset updates skip the signals, leaving the work to the refresh
+        FeeInstallment.objects.filter(pk=self.installments['OLD'].pk).update(paid_amount=1000, is_paid=True)
+        FeeInstallment.objects.filter(pk=self.installments['MEDIUM'].pk).update(late_fee_amount=500)
+
+        self.assertEqual(refresh_fee_defaulters(today=self.today), (3, 1))
+        rows = self.open_rows()
+        self.assertEqual(rows['MEDIUM'].overdue_amount, 30500)
+        self.assertEqual(FeeDefaulter.objects.filter(student__admission_number='MEDIUM').count(), 1)
+        resolved = FeeDefaulter.objects.get(student__admission_number='OLD')
+        self.assertEqual((resolved.is_resolved, resolved.resolved_date), (True, self.today))
+
+    def test_risk_tier_by_amount_or_days(self):
+        refresh_fee_defaulters(today=self.today)
+
+        tiers = {
+            row['student__admission_number']: row['risk_category'] for row in student_defaulters()
+        }
+
+        self.assertEqual(tiers, {'HIGH': 'High', 'OLD': 'High', 'MEDIUM': 'Medium', 'LOW': 'Low'})
+        summary = defaulter_summary()
+        self.assertEqual(summary['risk_tiers'], {'High': 2, 'Medium': 1, 'Low': 1})
+        self.assertEqual([bucket['count'] for bucket in summary['aging']], [2, 1, 0, 1])
+
+    @override_settings(FEE_DEFAULTERS={'AGING_BUCKETS': [15, 45]})
+    def test_aging_buckets_follow_the_setting(self):
+        self.assertEqual(aging_buckets(), [('0-15', 0, 15), ('16-45', 16, 45), ('45+', 46, None)])
+
+
+class LateFeeTests(TestCase):
+    """Tests for late fee calculation and posting"""
+
+    def late_fee(self, days_overdue, net_amount=1000, **structure):
+        fields = dict(late_fee_applicable=True, grace_period_days=5, late_fee_amount=100, late_fee_percentage=0)
+        fields.update(structure)
+        return late_fee_for(FeeInstallment(net_amount=Decimal(net_amount)), FeeStructure(**fields), days_overdue)
+
+    def test_nothing_within_the_grace_period(self):
+        self.assertEqual(self.late_fee(5), Decimal('0.00'))
+        self.assertEqual(self.late_fee(6), Decimal('100.00'))
+        self.assertEqual(self.late_fee(60, late_fee_applicable=False), Decimal('0.00'))
+
+    def test_flat_amount_wins_over_percentage(self):
+        self.assertEqual(self.late_fee(10, late_fee_percentage=2.5), Decimal('100.00'))
+        self.assertEqual(self.late_fee(10, late_fee_amount=0, late_fee_percentage=2.5), Decimal('25.00'))
+
+    @override_settings(LATE_FEES={'ACCRUE_MONTHLY': True})
+    def test_monthly_accrual_per_started_period(self):
+        self.assertEqual(self.late_fee(35), Decimal('100.00'))
+        self.assertEqual(self.late_fee(36), Decimal('200.00'))
+
+    @override_settings(LATE_FEES={'ACCRUE_MONTHLY': True, 'MAX_PERCENTAGE': 15, 'MAX_AMOUNT': 120})
+    def test_capped_by_percentage_and_amount(self):
+        # 7 periods of 100 capped at 15% of 1000, then at 120
+        self.assertEqual(self.late_fee(200), Decimal('120.00'))
+        self.assertEqual(self.late_fee(200, net_amount=500), Decimal('75.00'))
+
+    def test_posting_twice_for_the_same_date_changes_nothing(self):
+        today = timezone.now().date()
+        installment = create_fee_installment(create_school(), 1000, today - datetime.timedelta(days=10))
+        FeeStructure.objects.update(late_fee_amount=100, grace_period_days=5)
+
+        calculations, updated = post_late_fees(run_date=today)
+        self.assertEqual((len(calculations), updated), (1, 1))
+        installment.refresh_from_db()
+        self.assertEqual(installment.late_fee_amount, 100)
+        self.assertEqual(FeeDefaulter.objects.get().overdue_amount, 1100)
+
+        calculations, updated = post_late_fees(run_date=today)
+        self.assertEqual((len(calculations), updated), (1, 0))
+        self.assertEqual(FeeInstallment.objects.get().updated_at, installment.updated_at)
+
+    @override_settings(ROOT_URLCONF='fees.tests')
+    def test_empty_or_malformed_installment_selection_is_rejected(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', None))
+
+        with mock.patch('fees.views.post_late_fees', return_value=([], 0)) as post:
+            for selection in [['3', 'x'], []]:
+                response = self.client.post(
+                    '/late-fees/', {'action': 'apply_late_fees', 'selected_installments': selection},
+                )
+                self.assertRedirects(response, '/late-fees/', fetch_redirect_response=False)
+            post.assert_not_called()
+
+            self.client.post('/late-fees/', {'action': 'apply_late_fees', 'selected_installments': ['3', '7']})
+        post.assert_called_once_with(installments=[3, 7])
+
+
+class FeeReminderTests(TestCase):
+    """Tests for bulk fee reminders and notice stages"""
+
+    def setUp(self):
+        self.today = timezone.now().date()
+        school = create_school()
+        self.parent = User.objects.create_user('parent')
+        self.installments = []
+        for admission_number, amount in [('S1', 1000), ('S2', 2500)]:
+            installment = create_fee_installment(
+                school, amount, self.today - datetime.timedelta(days=20), admission_number=admission_number,
+            )
+            StudentParent.objects.create(
+                student=installment.student_fee_assignment.student, parent_user=self.parent,
+                relationship_type='MOTHER',
+            )
+            self.installments.append(installment)
+
+    def test_reminder_covers_every_child_of_the_parent(self):
+        children = {
+            1: [{'installment': 10, 'name': 'Term 1', 'days_overdue': 20, 'outstanding': Decimal('1000')}],
+            2: [{'installment': 11, 'name': 'Term 1', 'days_overdue': 40, 'outstanding': Decimal('500')},
+                {'installment': 12, 'name': 'Term 2', 'days_overdue': 5, 'outstanding': Decimal('500')}],
+        }
+
+        reminder = _reminder(self.parent.pk, children, {1: 'Asha Rao', 2: 'Ravi Rao'}, self.today)
+
+        self.assertEqual(reminder.recipient_id, self.parent.pk)
+        self.assertIn('Asha Rao: ₹1000 overdue (Term 1; up to 20 days)', reminder.message)
+        self.assertIn('Ravi Rao: ₹1000 overdue (Term 1, Term 2; up to 40 days)', reminder.message)
+        self.assertEqual(reminder.personalization_data['installments'], [10, 11, 12])
+        self.assertEqual(reminder.personalization_data['total_overdue'], '2000')
+
+    def test_one_reminder_per_parent_then_throttled(self):
+        summary = send_fee_reminders(today=self.today)
+
+        self.assertEqual((summary['students'], summary['parents'], summary['sent']), (2, 1, 1))
+        notification = SmartNotification.objects.get(recipient=self.parent)
+        self.assertEqual(
+            sorted(notification.personalization_data['installments']),
+            [installment.pk for installment in self.installments],
+        )
+        self.assertEqual(FeeDefaulter.objects.filter(first_notice_sent=True).count(), 2)
+
+        summary = send_fee_reminders(today=self.today)
+        self.assertEqual((summary['sent'], summary['throttled']), (0, 1))
+        self.assertEqual(SmartNotification.objects.count(), 1)
+
+    def test_selected_payments_remind_only_their_own_installments(self):
+        first = self.installments[0]
+        FeeInstallment.objects.create(
+            student_fee_assignment=first.student_fee_assignment, installment_number=2,
+            installment_type='SECOND_TERM', installment_name='Term 2', total_amount=500, net_amount=500,
+            due_date=self.today - datetime.timedelta(days=10),
+        )
+        year = first.student_fee_assignment.academic_year
+        grade = Grade.objects.create(name='Grade 5', numeric_value=5, section='A', academic_year=year)
+        structure = CoreFeeStructure.objects.create(
+            grade=grade, category=FeeCategory.objects.create(name='Tuition'), academic_year=year,
+            amount=1000, due_date=first.due_date,
+        )
+        student = CoreStudent.objects.create(
+            admission_number='S1', roll_number='1', first_name='Asha', last_name='Rao',
+            date_of_birth=datetime.date(2015, 1, 1), gender='F', address='1 Road', grade=grade,
+            admission_date=year.start_date, parent_name='Parent', parent_phone='1', emergency_contact='1',
+        )
+        payment = CoreFeePayment.objects.create(student=student, fee_structure=structure, amount_due=1000)
+
+        selected = installments_for_payments(CoreFeePayment.objects.filter(pk=payment.pk))
+
+        self.assertEqual(list(selected.values_list('pk', flat=True)), [first.pk])
+        self.assertEqual(send_fee_reminders(installments=selected, today=self.today)['installments'], 1)
+
+    def test_notices_advance_one_stage_per_earlier_notice(self):
+        earlier = self.today - datetime.timedelta(days=7)
+        first, second = FeeDefaulter.objects.order_by('pk')
+        FeeDefaulter.objects.filter(pk=first.pk).update(first_notice_sent=True, first_notice_date=earlier)
+        FeeDefaulter.objects.filter(pk=second.pk).update(
+            first_notice_sent=True, first_notice_date=earlier, second_notice_sent=True, second_notice_date=self.today,
+        )
+
+        installment_ids = [installment.pk for installment in self.installments]
+        self.assertEqual(_advance_notices(installment_ids, self.today), 1)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.second_notice_sent, first.second_notice_date, first.final_notice_sent),
+                         (True, self.today, False))
+        # Its second notice went out today, so the final one waits
+        self.assertFalse(second.final_notice_sent)
+
+        self.assertEqual(_advance_notices(installment_ids, self.today + datetime.timedelta(days=1)), 2)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertTrue(first.final_notice_sent and second.final_notice_sent)
+
+
+class FeeForecastTests(TestCase):
+    """Tests for monthly collection series and forecasting models"""
+
+    def test_monthly_series_counts_the_school_payments(self):
+        school, other = create_school(), create_school(name='Other School')
+        payments = [
+            (school, 'A1', (2024, 1, 10), 100, 'SUCCESS'), (school, 'A2', (2024, 1, 20), 50, 'SUCCESS'),
+            (school, 'A3', (2024, 3, 5), 200, 'SUCCESS'), (school, 'A4', (2024, 4, 2), 75, 'SUCCESS'),
+            (school, 'A5', (2024, 3, 6), 900, 'FAILED'), (other, 'B1', (2024, 3, 7), 400, 'SUCCESS'),
+        ]
+        for payer_school, admission_number, day, amount, status in payments:
+            installment = create_fee_installment(payer_school, amount, datetime.date(2023, 12, 1),
+                                                 admission_number=admission_number)
+            create_fee_payment(installment, datetime.date(*day), amount, status=status)
+
+        def series(school_id):
+            return [(row['month'], row['total_collected'], row['transaction_count'])
+                    for row in monthly_collections(datetime.date(2024, 4, 15), school_id)]
+
+        # Gaps are filled and the current month is left out
+        self.assertEqual(series(school.pk), [
+            (datetime.date(2024, 1, 1), 150, 2), (datetime.date(2024, 2, 1), 0, 0),
+            (datetime.date(2024, 3, 1), 200, 1),
+        ])
+        self.assertEqual(series(other.pk), [(datetime.date(2024, 3, 1), 400, 1)])
+        self.assertEqual(series(None)[-1], (datetime.date(2024, 3, 1), 600, 2))
+
+    def test_holt_winters_beats_seasonal_naive_on_trending_series(self):
+        series = [
+            {'month': add_months(datetime.date(2021, 1, 1), t),
+             'total_collected': 1000 + 10 * t + (500 if t % 12 == 3 else 0)}
+            for t in range(36)
+        ]
+        fits = fit_series_models(series, horizon=12, season=12)
+
+        self.assertLess(fits['exponential_smoothing']['mae'], fits['seasonal_naive']['mae'])
+        projections = fits['exponential_smoothing']['projections']
+        # April, the fourth month after December, keeps its peak
+        amounts = [projection['amount'] for projection in projections]
+        self.assertEqual(amounts.index(max(amounts)), 3)
+        for projection in projections:
+            self.assertLessEqual(projection['lower'], projection['amount'])
+            self.assertLessEqual(projection['amount'], projection['upper'])
+        self.assertLess(projections[0]['upper'] - projections[0]['lower'],
+                        projections[-1]['upper'] - projections[-1]['lower'])
+
+    def test_installment_expectation_counts_only_the_school_dues(self):
+        today = datetime.date(2024, 4, 15)
+        school, other = create_school(), create_school(name='Other School')
+        create_fee_installment(school, 1000, datetime.date(2024, 5, 10))
+        create_fee_installment(other, 7000, datetime.date(2024, 5, 10), admission_number='F2')
+
+        def may_dues(school_id):
+            projections = build_forecast(today, school_id)['models']['installments']['projections']
+            return projections[1]['amount']
+
+        self.assertEqual(may_dues(school.pk), 1000)
+        self.assertEqual(may_dues(other.pk), 7000)
+        self.assertEqual(may_dues(None), 8000)
+
+
+class FeePaymentApiTests(TestCase):
+    """Tests for the keyset-paginated fee payment list"""
+
+    def setUp(self):
+        school, other = create_school(), create_school(name='Other School')
+        due_date = datetime.date(2024, 4, 1)
+        self.payment = create_fee_payment(create_fee_installment(school, 1000, due_date), due_date, 1000)
+        create_fee_payment(create_fee_installment(other, 500, due_date, admission_number='F2'), due_date, 500)
+        self.user = User.objects.create_user('clerk')
+        UserProfile.objects.create(user=self.user, school=school)
+
+    def test_lists_only_the_school_payments(self):
+        self.client.force_login(self.user)
+
+        response = self.client.get('/api/fees/payments/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.json()['results']], [str(self.payment.pk)])
+        self.assertIsNone(response.json()['next'])
+
+    def test_read_only_and_empty_without_a_profile(self):
+        self.client.force_login(User.objects.create_user('visitor'))
+
+        self.assertEqual(self.client.get('/api/fees/payments/').json()['results'], [])
+        self.assertEqual(self.client.post('/api/fees/payments/', {}).status_code, 405)
+        self.assertEqual(self.client.get('/api/transport/tracking/').status_code, 404)
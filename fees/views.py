@@ -3,6 +3,7 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from django.db.models import Count, Sum, Q, Avg, F
+from django.db.models.functions import ExtractMonth, ExtractYear
 from django.utils import timezone
 from django.urls import reverse_lazy
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView, DetailView
@@ -13,9 +14,14 @@ from django.core.mail import send_mail
 
 # Import models from core.models where they actually exist
 from core.models import (
-    FeeCategory, FeeStructure, FeePayment, SchoolSettings, 
-    Student, Grade, AcademicYear, SmartNotification
+    FeeCategory, FeeStructure, FeePayment, 
+    Student, Grade, AcademicYear, SmartNotification, StudentFeeLedger
 )
+from core.school_config import get_school_settings
+from core.aggregation import StatsQuery, percentage
+from core.performance import get_request_school_id
+from core.exports import iterate, stream_csv
+from core.replicas import use_replica
 
 # Try to import advanced fee models if they exist
 try:
@@ -23,6 +29,10 @@ try:
         FeeInstallment, StudentFeeAssignment, FeeRefund, FeeDiscount,
         PaymentMethod, FeeDefaulter, FeeConcession
     )
+    from fees.defaulters import defaulter_summary, open_defaulters, student_defaulters
+    from fees.late_fees import calculate_late_fees, post_late_fees
+    from fees.reminders import installments_for_payments, send_fee_reminders
+    from fees.forecasting import get_forecast
     ADVANCED_FEE_MODELS_AVAILABLE = True
 except ImportError:
     ADVANCED_FEE_MODELS_AVAILABLE = False
@@ -56,7 +66,7 @@ class FeeCategoryDeleteView(DeleteView):
 
 def fee_dashboard(request):
     """Fee management dashboard with real database connectivity"""
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     
     # Statistics from real database
     total_categories = FeeCategory.objects.filter(is_active=True).count()
@@ -83,7 +93,7 @@ def fee_dashboard(request):
 
 def fee_categories_list(request):
     """Professional Fee Categories List"""
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     categories = FeeCategory.objects.filter(is_active=True).order_by('name')
     
     context = {
@@ -96,7 +106,7 @@ def fee_categories_list(request):
 
 def fee_structures_list(request):
     """Professional Fee Structures List"""
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     structures = FeeStructure.objects.filter(is_active=True).select_related(
         'academic_year', 
         'grade',
@@ -113,7 +123,7 @@ def fee_structures_list(request):
 
 def fee_payments_list(request):
     """Professional Fee Payments List with real database connectivity"""
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     
     # Get filter parameters
     search_query = request.GET.get('search', '')
@@ -166,13 +176,14 @@ def fee_payments_list(request):
     }
     return render(request, 'fees/payments_list.html', context)
 
+@use_replica()
 def fee_reports(request):
     """Fee reports and analytics with real data"""
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     
     # Monthly collection data
-    monthly_collections = FeePayment.objects.extra(
-        select={'month': "EXTRACT(month FROM payment_date)"}
+    monthly_collections = FeePayment.objects.annotate(
+        month=ExtractMonth('payment_date')
     ).values('month').annotate(total=Sum('amount_paid')).order_by('month')
     
     # Category-wise collection  
@@ -199,7 +210,7 @@ def fee_reports(request):
 def student_fee_profile(request, student_id):
     """Comprehensive student fee profile and payment history"""
     student = get_object_or_404(Student, id=student_id)
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     
     # Get all fee structures applicable to this student
     applicable_structures = FeeStructure.objects.filter(
@@ -219,8 +230,8 @@ def student_fee_profile(request, student_id):
     outstanding_amount = total_fees_due - total_paid
     
     # Monthly payment breakdown
-    monthly_payments = payment_history.extra(
-        select={'month': "EXTRACT(month FROM payment_date)"}
+    monthly_payments = payment_history.annotate(
+        month=ExtractMonth('payment_date')
     ).values('month').annotate(total=Sum('amount_paid')).order_by('month')
     
     # Payment status by category
@@ -247,9 +258,10 @@ def student_fee_profile(request, student_id):
     return render(request, 'fees/student_fee_profile.html', context)
 
 @login_required
+@use_replica()
 def fee_collection_report(request):
     """Comprehensive fee collection report with analytics"""
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     
     # Date range filters
     start_date = request.GET.get('start_date')
@@ -343,7 +355,7 @@ def generate_fee_receipts(request):
         # Generate PDF or return receipt data
         context = {
             'payments': payments,
-            'school_settings': SchoolSettings.objects.first(),
+            'school_settings': get_school_settings(request),
             'generated_on': timezone.now()
         }
         
@@ -354,45 +366,22 @@ def generate_fee_receipts(request):
     return redirect('fee-payments-list')
 
 @login_required
+@use_replica()
 def outstanding_fees_report(request):
     """Report of students with outstanding fees"""
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     
-    # Get all active students with their fee obligations
-    students_with_dues = []
+    # Current-year ledger rows of active students, highest balance first
+    ledgers = StudentFeeLedger.objects.filter(
+        student__is_active=True,
+        academic_year=F('student__grade__academic_year'),
+        balance__gt=0,
+    )
+    summary = ledgers.aggregate(total=Sum('balance'), count=Count('id'))
+    students_with_dues = ledgers.select_related('student__grade', 'academic_year').order_by('-balance')
     
-    for student in Student.objects.filter(is_active=True).select_related('grade', 'academic_year'):
-        # Get applicable fee structures
-        applicable_structures = FeeStructure.objects.filter(
-            grade=student.grade,
-            academic_year=student.academic_year,
-            is_active=True
-        )
-        
-        total_due = applicable_structures.aggregate(total=Sum('amount'))['total'] or 0
-        
-        # Get total paid
-        total_paid = FeePayment.objects.filter(student=student).aggregate(
-            total=Sum('amount_paid')
-        )['total'] or 0
-        
-        outstanding = total_due - total_paid
-        
-        if outstanding > 0:
-            students_with_dues.append({
-                'student': student,
-                'total_due': total_due,
-                'total_paid': total_paid,
-                'outstanding': outstanding,
-                'percentage_paid': round((total_paid / total_due * 100), 1) if total_due > 0 else 0
-            })
-    
-    # Sort by outstanding amount (highest first)
-    students_with_dues.sort(key=lambda x: x['outstanding'], reverse=True)
-    
-    # Calculate summary statistics
-    total_outstanding = sum([item['outstanding'] for item in students_with_dues])
-    total_students_with_dues = len(students_with_dues)
+    total_outstanding = summary['total'] or 0
+    total_students_with_dues = summary['count']
     average_outstanding = total_outstanding / total_students_with_dues if total_students_with_dues > 0 else 0
     
     context = {
@@ -407,15 +396,14 @@ def outstanding_fees_report(request):
     return render(request, 'fees/outstanding_fees_report.html', context)
 
 @login_required
+@use_replica()
 def fee_analytics_api(request):
     """API endpoint for fee analytics charts"""
     
     # Monthly collection trends
-    monthly_trends = FeePayment.objects.extra(
-        select={
-            'month': "EXTRACT(month FROM payment_date)",
-            'year': "EXTRACT(year FROM payment_date)"
-        }
+    monthly_trends = FeePayment.objects.annotate(
+        month=ExtractMonth('payment_date'),
+        year=ExtractYear('payment_date')
     ).values('month', 'year').annotate(
         total_amount=Sum('amount_paid'),
         payment_count=Count('id')
@@ -467,32 +455,23 @@ def bulk_fee_operations(request):
         elif action == 'generate_receipts':
             return generate_fee_receipts(request)
         elif action == 'send_reminders':
-            # Send payment reminders (implementation needed)
-            messages.info(request, f'Reminder system not yet implemented for {len(payment_ids)} payments.')
+            # Only the installments the selected payments stand for
+            summary = send_fee_reminders(installments=installments_for_payments(payments))
+            messages.success(request, f'Reminders sent to {summary["sent"]} parents.')
     
     return redirect('fee-payments-list')
 
 @login_required
 def export_fee_data(request):
-    """Export comprehensive fee data to CSV"""
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="comprehensive_fee_data.csv"'
-    
-    writer = csv.writer(response)
-    writer.writerow([
-        'Student Name', 'Admission Number', 'Grade', 'Fee Category',
-        'Fee Structure Amount', 'Amount Paid', 'Amount Due', 'Outstanding',
-        'Payment Date', 'Status', 'Payment Method', 'Academic Year'
-    ])
-    
+    """Export comprehensive fee data to CSV (streamed)"""
     payments = FeePayment.objects.select_related(
         'student', 'student__grade', 'fee_structure__category', 'fee_structure__academic_year'
+    ).annotate(
+        outstanding=F('amount_due') - F('amount_paid')
     ).order_by('student__admission_number', '-payment_date')
     
-    for payment in payments:
-        outstanding = payment.amount_due - payment.amount_paid
-        
-        writer.writerow([
+    rows = (
+        [
             payment.student.full_name,
             payment.student.admission_number,
             payment.student.grade.name if payment.student.grade else '',
@@ -500,19 +479,25 @@ def export_fee_data(request):
             payment.fee_structure.amount,
             payment.amount_paid,
             payment.amount_due,
-            outstanding,
+            payment.outstanding,
             payment.payment_date,
             payment.status,
-            payment.payment_method if hasattr(payment, 'payment_method') else 'N/A',
-            payment.fee_structure.academic_year.year if payment.fee_structure.academic_year else ''
-        ])
+            payment.payment_method or 'N/A',
+            payment.fee_structure.academic_year.name if payment.fee_structure.academic_year else '',
+        ]
+        for payment in iterate(payments)
+    )
     
-    return response
+    return stream_csv('comprehensive_fee_data.csv', [
+        'Student Name', 'Admission Number', 'Grade', 'Fee Category',
+        'Fee Structure Amount', 'Amount Paid', 'Amount Due', 'Outstanding',
+        'Payment Date', 'Status', 'Payment Method', 'Academic Year'
+    ], rows)
 
 @login_required
 def fee_installment_management(request):
     """Advanced fee installment management system"""
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     
     if not ADVANCED_FEE_MODELS_AVAILABLE:
         messages.warning(request, 'Advanced fee models not available. Using basic fee system.')
@@ -586,7 +571,7 @@ def fee_installment_management(request):
 @login_required
 def scholarship_discount_management(request):
     """Comprehensive scholarship and discount management"""
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     
     if not ADVANCED_FEE_MODELS_AVAILABLE:
         return render(request, 'fees/basic_discount_management.html', {
@@ -643,7 +628,7 @@ def scholarship_discount_management(request):
 @login_required
 def fee_refund_processing(request):
     """Complete fee refund processing system"""
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     
     if not ADVANCED_FEE_MODELS_AVAILABLE:
         messages.warning(request, 'Advanced refund system not available.')
@@ -710,7 +695,7 @@ def fee_refund_processing(request):
 @login_required
 def payment_gateway_integration(request):
     """Payment gateway integration and management"""
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     
     if not ADVANCED_FEE_MODELS_AVAILABLE:
         payment_methods = [
@@ -749,8 +734,8 @@ def payment_gateway_integration(request):
     ).select_related('student').order_by('-payment_date')[:20]
     
     # Monthly payment trends by gateway
-    monthly_gateway_trends = FeePayment.objects.extra(
-        select={'month': "EXTRACT(month FROM payment_date)"}
+    monthly_gateway_trends = FeePayment.objects.annotate(
+        month=ExtractMonth('payment_date')
     ).values('month', 'payment_method').annotate(
         amount=Sum('amount_paid')
     ).order_by('month')
@@ -771,90 +756,56 @@ def payment_gateway_integration(request):
 @login_required
 def late_fee_automation(request):
     """Automated late fee calculation and management"""
-    school_settings = SchoolSettings.objects.first()
-    
-    # Get overdue payments
-    overdue_payments = FeePayment.objects.filter(
-        status__in=['PENDING', 'PARTIAL'],
-        fee_structure__due_date__lt=date.today()
-    ).select_related('student', 'fee_structure')
-    
-    # Calculate late fees for each overdue payment
-    late_fee_calculations = []
-    total_late_fees = 0
-    
-    for payment in overdue_payments:
-        days_overdue = (date.today() - payment.fee_structure.due_date).days
-        
-        # Get fee structure for late fee calculation
-        fee_structure = payment.fee_structure
-        late_fee_amount = 0
-        
-        if hasattr(fee_structure, 'late_fee_applicable') and fee_structure.late_fee_applicable:
-            if hasattr(fee_structure, 'late_fee_amount') and fee_structure.late_fee_amount:
-                late_fee_amount = fee_structure.late_fee_amount
-            elif hasattr(fee_structure, 'late_fee_percentage') and fee_structure.late_fee_percentage:
-                late_fee_amount = (payment.amount_due * fee_structure.late_fee_percentage) / 100
-            
-            # Apply grace period
-            grace_period = getattr(fee_structure, 'grace_period_days', 7)
-            if days_overdue <= grace_period:
-                late_fee_amount = 0
-        
-        late_fee_calculations.append({
-            'payment': payment,
-            'days_overdue': days_overdue,
-            'late_fee_amount': late_fee_amount,
-            'total_amount_due': payment.amount_due + late_fee_amount
-        })
-        
-        total_late_fees += late_fee_amount
+    school_settings = get_school_settings(request)
     
     # Automation actions
     if request.method == 'POST':
         action = request.POST.get('action')
+        # Only the selected installments; the management commands cover all overdue ones
+        try:
+            selected_installments = [int(pk) for pk in request.POST.getlist('selected_installments')]
+        except ValueError:
+            messages.error(request, 'Invalid installment selection.')
+            return redirect(request.path)
+        if not selected_installments:
+            messages.error(request, 'Select at least one installment.')
+            return redirect(request.path)
         
         if action == 'apply_late_fees':
-            # Apply late fees to selected payments
-            selected_payments = request.POST.getlist('selected_payments')
+            calculations, updated = post_late_fees(installments=selected_installments)
             
-            for payment_id in selected_payments:
-                payment = FeePayment.objects.get(id=payment_id)
-                # Apply late fee logic here
-                # This would update the payment record with late fees
-                
-            messages.success(request, f'Late fees applied to {len(selected_payments)} payments')
+            messages.success(
+                request, f'Late fees evaluated for {len(calculations)} installments; {updated} updated'
+            )
             
         elif action == 'send_reminders':
-            # Send automated reminders
-            selected_payments = request.POST.getlist('selected_payments')
-            
-            for payment_id in selected_payments:
-                payment = FeePayment.objects.get(id=payment_id)
-                # Send reminder notification
-                SmartNotification.objects.create(
-                    trigger_type='FEE_REMINDER',
-                    recipient_id=payment.student.parent_user_id if hasattr(payment.student, 'parent_user_id') else None,
-                    title=f'Fee Payment Reminder - {payment.student.full_name}',
-                    message=f'Fee payment of ₹{payment.amount_due} is overdue by {(date.today() - payment.fee_structure.due_date).days} days.',
-                    priority_score=0.8
-                )
+            # One reminder per parent covering all their children's overdue installments
+            summary = send_fee_reminders(installments=selected_installments)
             
-            messages.success(request, f'Reminders sent for {len(selected_payments)} payments')
+            messages.success(
+                request, f'Reminders sent to {summary["sent"]} parents for {summary["installments"]} overdue '
+                         f'installments ({summary["throttled"]} recently reminded parents skipped)'
+            )
         
-        return redirect('late-fee-automation')
+        return redirect(request.path)
+    
+    # Late fees as of today for every overdue installment (not yet posted)
+    late_fee_calculations = calculate_late_fees()
+    days_overdue = [calculation.days_overdue for calculation in late_fee_calculations]
     
     # Late fee statistics
     late_fee_stats = {
-        'total_overdue_payments': overdue_payments.count(),
-        'total_late_fees': total_late_fees,
-        'average_days_overdue': sum([calc['days_overdue'] for calc in late_fee_calculations]) / len(late_fee_calculations) if late_fee_calculations else 0,
-        'students_affected': overdue_payments.values('student').distinct().count()
+        'total_overdue_installments': len(late_fee_calculations),
+        'total_late_fees': sum(calculation.amount for calculation in late_fee_calculations),
+        'pending_changes': sum(1 for calculation in late_fee_calculations if calculation.changed),
+        'average_days_overdue': sum(days_overdue) / len(days_overdue) if days_overdue else 0,
+        'students_affected': len({
+            calculation.installment.student_fee_assignment.student_id for calculation in late_fee_calculations
+        }),
     }
     
     context = {
         'school_settings': school_settings,
-        'overdue_payments': overdue_payments,
         'late_fee_calculations': late_fee_calculations,
         'late_fee_stats': late_fee_stats,
         'page_title': 'Late Fee Automation'
@@ -865,73 +816,40 @@ def late_fee_automation(request):
 @login_required
 def fee_defaulter_tracking(request):
     """Comprehensive fee defaulter tracking and management"""
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     
-    # Identify fee defaulters
-    defaulter_criteria_days = 30  # Students with fees overdue by more than 30 days
-    
-    fee_defaulters = Student.objects.filter(
-        fee_payments__status__in=['PENDING', 'OVERDUE'],
-        fee_payments__fee_structure__due_date__lt=date.today() - timedelta(days=defaulter_criteria_days)
-    ).distinct().select_related('grade')
-    
-    # Defaulter analytics
-    defaulter_analytics = []
-    
-    for student in fee_defaulters:
-        overdue_payments = FeePayment.objects.filter(
-            student=student,
-            status__in=['PENDING', 'OVERDUE'],
-            fee_structure__due_date__lt=date.today()
-        )
-        
-        total_overdue = overdue_payments.aggregate(total=Sum('amount_due'))['total'] or 0
-        oldest_overdue = overdue_payments.order_by('fee_structure__due_date').first()
-        days_overdue = (date.today() - oldest_overdue.fee_structure.due_date).days if oldest_overdue else 0
-        
-        defaulter_analytics.append({
-            'student': student,
-            'total_overdue_amount': total_overdue,
-            'overdue_payments_count': overdue_payments.count(),
-            'days_overdue': days_overdue,
-            'risk_category': 'High' if total_overdue > 50000 else 'Medium' if total_overdue > 20000 else 'Low'
-        })
-    
-    # Sort by overdue amount
-    defaulter_analytics.sort(key=lambda x: x['total_overdue_amount'], reverse=True)
-    
-    # Defaulter categories
-    high_risk_defaulters = [d for d in defaulter_analytics if d['risk_category'] == 'High']
-    medium_risk_defaulters = [d for d in defaulter_analytics if d['risk_category'] == 'Medium']
-    low_risk_defaulters = [d for d in defaulter_analytics if d['risk_category'] == 'Low']
+    # Precomputed by refresh_fee_defaulters (nightly and on payment events)
+    summary = defaulter_summary()
+    defaulter_analytics = student_defaulters()
     
     # Recovery actions tracking
-    recovery_actions = {
-        'notices_sent': 0,
-        'parent_meetings_scheduled': 0,
-        'payment_plans_offered': 0,
-        'legal_notices_issued': 0
-    }
+    recovery_actions = (
+        StatsQuery(open_defaulters())
+        .count('notices_sent', Q(first_notice_sent=True))
+        .count('parent_meetings_scheduled', Q(parent_meeting_scheduled=True))
+        .count('tc_holds', Q(tc_hold=True))
+        .count('legal_notices_issued', Q(final_notice_sent=True))
+        .run()
+    )
     
     # Grade-wise defaulter distribution
-    grade_wise_defaulters = {}
-    for analytics in defaulter_analytics:
-        grade = analytics['student'].grade.name if analytics['student'].grade else 'Unknown'
-        if grade not in grade_wise_defaulters:
-            grade_wise_defaulters[grade] = {'count': 0, 'total_amount': 0}
-        grade_wise_defaulters[grade]['count'] += 1
-        grade_wise_defaulters[grade]['total_amount'] += analytics['total_overdue_amount']
+    grade_wise_defaulters = {
+        row['student__current_class__name'] or 'Unknown': {'count': row['count'], 'total_amount': row['total_amount']}
+        for row in summary['grade_wise']
+    }
     
     context = {
         'school_settings': school_settings,
         'defaulter_analytics': defaulter_analytics[:50],  # Show top 50
-        'high_risk_defaulters': high_risk_defaulters,
-        'medium_risk_defaulters': medium_risk_defaulters,
-        'low_risk_defaulters': low_risk_defaulters,
+        'high_risk_defaulters': defaulter_analytics.filter(risk_category='High'),
+        'medium_risk_defaulters': defaulter_analytics.filter(risk_category='Medium'),
+        'low_risk_defaulters': defaulter_analytics.filter(risk_category='Low'),
+        'risk_tiers': summary['risk_tiers'],
+        'aging_buckets': summary['aging'],
         'recovery_actions': recovery_actions,
         'grade_wise_defaulters': grade_wise_defaulters,
-        'total_defaulters': len(defaulter_analytics),
-        'total_overdue_amount': sum([d['total_overdue_amount'] for d in defaulter_analytics]),
+        'total_defaulters': summary['total_defaulters'],
+        'total_overdue_amount': summary['total_overdue_amount'],
         'page_title': 'Fee Defaulter Tracking'
     }
     
@@ -940,7 +858,7 @@ def fee_defaulter_tracking(request):
 @login_required
 def parent_payment_portal(request):
     """Dedicated parent payment portal"""
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     
     # This would typically be accessed by parents with their login
     # For admin view, show portal statistics
@@ -1017,20 +935,18 @@ def parent_payment_portal(request):
     return render(request, 'fees/parent_payment_portal.html', context)
 
 @login_required
+@use_replica()
 def fee_collection_forecasting(request):
-    """Advanced fee collection forecasting with AI"""
-    school_settings = SchoolSettings.objects.first()
-    
-    # Historical fee collection data
-    historical_data = FeePayment.objects.extra(
-        select={
-            'month': "EXTRACT(month FROM payment_date)",
-            'year': "EXTRACT(year FROM payment_date)"
-        }
-    ).values('month', 'year').annotate(
-        total_collected=Sum('amount_paid'),
-        transaction_count=Count('id')
-    ).order_by('year', 'month')
+    """Fee collection forecasting from the monthly collection history"""
+    school_settings = get_school_settings(request)
+    
+    if not ADVANCED_FEE_MODELS_AVAILABLE:
+        messages.warning(request, 'Advanced fee models not available. Using basic fee system.')
+        return redirect('fee-dashboard')
+    
+    today = timezone.now().date()
+    forecast = get_forecast(get_request_school_id(request), today)
+    historical_data = forecast['history']
     
     # Current academic year collection
     current_year = AcademicYear.objects.filter(is_current=True).first()
@@ -1040,20 +956,42 @@ def fee_collection_forecasting(request):
         total_collected=Sum('amount_paid'),
         total_due=Sum('amount_due')
     ) if current_year else {'total_collected': 0, 'total_due': 0}
+    collected = float(current_year_collection['total_collected'] or 0)
+    
+    # The best series model, or the installment dues when the history is too short
+    model = forecast['best_model'] or 'installments'
+    projections = forecast['models'][model]['projections']
+    expected_from_dues = forecast['models']['installments']['projections']
+    current_month_actual = float(FeePayment.objects.filter(
+        payment_date__gte=today.replace(day=1), payment_date__lte=today
+    ).aggregate(total=Sum('amount_paid'))['total'] or 0)
+    projected_end_of_month = max(current_month_actual, projections[0]['amount'])
+    remaining_months = [
+        projection for projection in projections[1:]
+        if current_year is None or projection['month'] <= current_year.end_date
+    ]
     
-    # Forecasting models
     forecasting_data = {
-        'current_month_target': 2500000,  # Monthly collection target
-        'current_month_actual': 2150000,  # Actual collection this month
-        'projected_end_of_month': 2400000,  # AI-predicted end of month collection
-        'annual_target': 25000000,  # Annual fee collection target
-        'annual_projected': 23500000,  # AI-projected annual collection
-        'collection_efficiency': 85.2,  # Current collection efficiency %
+        'model': model,
+        'current_month_target': expected_from_dues[0]['amount'],
+        'current_month_actual': current_month_actual,
+        'projected_end_of_month': projected_end_of_month,
+        'projected_end_of_month_range': (
+            max(current_month_actual, projections[0]['lower']), max(current_month_actual, projections[0]['upper'])
+        ),
+        'annual_target': current_year_collection['total_due'] or 0,
+        'annual_projected': (
+            collected + projected_end_of_month - current_month_actual
+            + sum(projection['amount'] for projection in remaining_months)
+        ),
+        'collection_efficiency': percentage(collected, current_year_collection['total_due'], 1),
         'seasonal_trends': [
-            {'month': 'April', 'multiplier': 1.2, 'reason': 'New academic year'},
-            {'month': 'July', 'multiplier': 1.1, 'reason': 'Quarterly payments'},
-            {'month': 'December', 'multiplier': 0.8, 'reason': 'Holiday season'},
-            {'month': 'March', 'multiplier': 1.3, 'reason': 'Year-end payments'}
+            {
+                'month': date(2000, trend['month'], 1).strftime('%B'),
+                'multiplier': trend['multiplier'],
+                'reason': 'Above average collections' if trend['multiplier'] > 1 else 'Below average collections',
+            }
+            for trend in forecast['seasonality'] if abs(trend['multiplier'] - 1) >= 0.1
         ]
     }
     
@@ -1098,33 +1036,27 @@ def fee_collection_forecasting(request):
         }
     ]
     
-    # Monthly projections for next 12 months
-    monthly_projections = []
-    base_amount = 2000000
-    
-    for month in range(1, 13):
-        seasonal_factor = 1.0
-        if month in [4, 7, 10, 1]:  # Quarterly payment months
-            seasonal_factor = 1.15
-        elif month == 12:  # December holiday impact
-            seasonal_factor = 0.85
-        
-        projected_amount = base_amount * seasonal_factor
-        monthly_projections.append({
-            'month': month,
-            'month_name': [
-                'Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
-                'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'
-            ][month-1],
-            'projected_amount': projected_amount,
-            'confidence_level': 87 if seasonal_factor > 1 else 82
-        })
+    # Monthly projections with prediction intervals
+    monthly_projections = [
+        {
+            'month': projection['month'].month,
+            'month_name': projection['month'].strftime('%b'),
+            'year': projection['month'].year,
+            'projected_amount': projection['amount'],
+            'lower_bound': projection['lower'],
+            'upper_bound': projection['upper'],
+            'expected_from_dues': dues['amount'],
+            'confidence_level': forecast['interval']
+        }
+        for projection, dues in zip(projections, expected_from_dues)
+    ]
     
     context = {
         'school_settings': school_settings,
         'historical_data': historical_data,
         'current_year_collection': current_year_collection,
         'forecasting_data': forecasting_data,
+        'forecast_models': forecast['models'],
         'risk_factors': risk_factors,
         'ai_recommendations': ai_recommendations,
         'monthly_projections': monthly_projections,
@@ -1137,7 +1069,7 @@ def fee_collection_forecasting(request):
 def payment_receipt(request, payment_id):
     """Generate and display payment receipt"""
     payment = get_object_or_404(FeePayment, id=payment_id)
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     
     context = {
         'payment': payment,
@@ -1151,7 +1083,7 @@ def payment_receipt(request, payment_id):
 @login_required
 def advanced_fee_dashboard(request):
     """Advanced fee dashboard with comprehensive analytics"""
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     
     # Enhanced statistics
     today = timezone.now().date()
@@ -1204,7 +1136,7 @@ def advanced_fee_dashboard(request):
 @login_required
 def payment_receipt(request, payment_id):
     payment = get_object_or_404(FeePayment, id=payment_id)
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     
     context = {
         'payment': payment,
@@ -13,7 +13,8 @@ from .models import (
     FeeCategory, FeeStructure, FeePayment, Expense, ExpenseCategory,
     Voucher, Invoice, FinancialTransaction, ScholarshipRecord
 )
-from core.models import Student, Grade, SchoolSettings, AcademicYear
+from core.models import Student, Grade, AcademicYear
+from core.school_config import get_school_settings
 import csv
 import json
 
@@ -21,7 +22,7 @@ import json
 @login_required
 def finance_dashboard(request):
     """Advanced Financial Management Dashboard"""
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     current_academic_year = AcademicYear.objects.filter(is_current=True).first()
     
     # Current Month Statistics
@@ -236,7 +237,7 @@ def fee_collection(request):
 def fee_payment_receipt(request, pk):
     """Generate fee payment receipt"""
     payment = get_object_or_404(FeePayment, pk=pk)
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     
     context = {
         'payment': payment,
@@ -14,7 +14,8 @@ from .models import (
     HostelFee, Warden, HostelExpense, RoomMaintenance, HostelVisitor,
     HostelInventory, OutpassRequest, HostelComplaint
 )
-from core.models import SchoolSettings, Student, Grade
+from core.models import Student, Grade
+from core.school_config import get_school_settings
 import csv
 import json
 
@@ -22,7 +23,7 @@ import json
 @login_required
 def hostel_dashboard(request):
     """Advanced Hostel Management Dashboard"""
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     
     # Hostel Overview Statistics
     hostel_stats = {
@@ -14,6 +14,8 @@ from core.models import (
     EmployeePayroll, HRAnalytics, PayrollStructure
 )
 from django.contrib.auth.models import User
+from core.exports import iterate, stream_csv
+from core.replicas import use_replica
 import csv
 from decimal import Decimal
 
@@ -235,22 +237,13 @@ class EmployeeUpdateView(LoginRequiredMixin, PermissionRequiredMixin, UpdateView
 
 @login_required
 def export_employees(request):
-    """Export employee data to CSV"""
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="employees_report.csv"'
-    
-    writer = csv.writer(response)
-    writer.writerow([
-        'Employee ID', 'Name', 'Department', 'Designation', 'Employment Type',
-        'Date of Joining', 'Basic Salary', 'Phone', 'Email'
-    ])
-    
+    """Export employee data to CSV (streamed)"""
     employees = Employee.objects.select_related('user', 'department').filter(
         employment_status='ACTIVE'
     ).order_by('employee_id')
     
-    for emp in employees:
-        writer.writerow([
+    rows = (
+        [
             emp.employee_id,
             emp.full_name,
             emp.department.name if emp.department else '',
@@ -260,9 +253,14 @@ def export_employees(request):
             emp.basic_salary,
             emp.phone,
             emp.user.email if emp.user else '',
-        ])
+        ]
+        for emp in iterate(employees)
+    )
     
-    return response
+    return stream_csv('employees_report.csv', [
+        'Employee ID', 'Name', 'Department', 'Designation', 'Employment Type',
+        'Date of Joining', 'Basic Salary', 'Phone', 'Email'
+    ], rows)
 
 # ===== LEAVE MANAGEMENT =====
 class LeaveApplicationListView(LoginRequiredMixin, ListView):
@@ -456,6 +454,7 @@ def generate_payroll(request):
 
 # ===== HR ANALYTICS =====
 @login_required
+@use_replica()
 def hr_analytics(request):
     """Advanced HR Analytics Dashboard"""
     current_year = timezone.now().year
@@ -504,6 +503,7 @@ def hr_analytics(request):
 
 # ===== REPORTS =====
 @login_required
+@use_replica()
 def payroll_report(request):
     """Monthly payroll report"""
     month = request.GET.get('month', timezone.now().month)
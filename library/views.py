@@ -8,13 +8,14 @@ from django.db.models import Q, Count, Sum, Avg
 from django.utils import timezone
 from datetime import datetime, timedelta
 from .models import Book, Author, Subject, LibraryMember
-from core.models import SchoolSettings
+from core.school_config import get_school_settings
+from core.exports import iterate, stream_csv
 import csv
 
 @login_required
 def library_dashboard(request):
     """Professional Library Management Dashboard"""
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     
     # Core Statistics
     total_books = Book.objects.count()
@@ -115,15 +116,10 @@ def library_reports(request):
 
 @login_required
 def export_books(request):
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename=\"library_books_export.csv\"'
-    
-    writer = csv.writer(response)
-    writer.writerow(['Title', 'Authors', 'ISBN', 'Total Copies', 'Available'])
-    
-    books = Book.objects.prefetch_related('authors')
-    for book in books:
-        authors = ', '.join([author.name for author in book.authors.all()])
-        writer.writerow([book.title, authors, book.isbn or '', book.total_copies, book.available_copies])
-    
-    return response
+    books = Book.objects.prefetch_related('authors').order_by('title')
+    rows = (
+        [book.title, ', '.join(author.name for author in book.authors.all()), book.isbn or '',
+         book.total_copies, book.available_copies]
+        for book in iterate(books)
+    )
+    return stream_csv('library_books_export.csv', ['Title', 'Authors', 'ISBN', 'Total Copies', 'Available'], rows)
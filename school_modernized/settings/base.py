@@ -59,6 +59,9 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.performance.PerformanceMiddleware',
+    'core.audit.AuditContextMiddleware',
+    'core.replicas.ReplicaPinningMiddleware',
 ]
 
 ROOT_URLCONF = 'school_modernized.urls'
@@ -74,6 +77,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'core.context_processors.school_context',
             ],
         },
     },
@@ -89,6 +93,10 @@ DATABASES = {
     }
 }
 
+# Reads inside core.replicas.use_replica() go to DATABASES['replica'] when the
+# settings module defines it; without it the router changes nothing
+DATABASE_ROUTERS = ['core.replicas.ReplicaRouter']
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -151,6 +159,119 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 20,
 }
 
+# Query profiler (core.performance.PerformanceMiddleware)
+PERFORMANCE_PROFILER = {
+    'ENABLED': config('PROFILER_ENABLED', default=True, cast=bool),
+    # Low by default: a profiled request wraps and fingerprints every query;
+    # settings/local.py profiles everything
+    'SAMPLE_RATE': config('PROFILER_SAMPLE_RATE', default=0.05, cast=float),
+    'SLOW_REQUEST_LOG_SIZE': 50,
+    'N_PLUS_ONE_THRESHOLD': 10,
+    'SLOW_REQUEST_SECONDS': 2.0,
+    'HIGH_QUERY_COUNT': 50,
+    # JSONL file of per-request query shapes for `manage.py advise_indexes`.
+    # It holds literal query parameters (student and parent details): keep it
+    # out of shared or web-served directories and delete it after analysis.
+    'QUERY_CAPTURE_FILE': config('PROFILER_QUERY_CAPTURE_FILE', default=None),
+    'QUERY_CAPTURE_MAX_BYTES': 50 * 1024 * 1024,
+    'QUERY_CAPTURE_EXCLUDED_TABLES': ['django_session', 'auth_', 'authentication_', 'core_auditlog'],
+}
+
+# Buffered audit trail (core.audit)
+AUDIT_LOG = {
+    'ENABLED': True,
+    'ASYNC': config('AUDIT_LOG_ASYNC', default=True, cast=bool),
+    'BATCH_SIZE': 200,
+    'FLUSH_INTERVAL': 2.0,
+    'SPILL_DIR': BASE_DIR / 'audit_spill',
+    # Models whose saves and deletes are audited with field-level diffs,
+    # with the risk level of their entries
+    'MODELS': {
+        'auth.User': 'MEDIUM',
+        'core.SchoolSettings': 'HIGH',
+        'core.SystemConfiguration': 'HIGH',
+        'core.FeeStructure': 'MEDIUM',
+        'core.FeePayment': 'MEDIUM',
+        'core.Student': 'LOW',
+        'core.Teacher': 'LOW',
+    },
+    'EXCLUDE_FIELDS': ['created_at', 'updated_at', 'last_login'],
+    'MASKED_FIELDS': ['password'],
+    # Days entries stay in the table per risk level (None keeps them forever);
+    # older entries are moved to ARCHIVE_DIR by the archive_audit_log command
+    'RETENTION_DAYS': {'LOW': 90, 'MEDIUM': 180, 'HIGH': 365, 'CRITICAL': None},
+    'ARCHIVE_DIR': BASE_DIR / 'audit_archive',
+}
+
+# Rows the dashboard counter deltas are spread over, so concurrent saves
+# (e.g. morning attendance marking) do not queue on a single row
+DASHBOARD_COUNTER_SHARDS = 16
+
+# Endpoint benchmark budgets (run_benchmarks command); a run fails when an
+# endpoint needs more queries than its baseline plus QUERY_TOLERANCE, or its
+# p95 exceeds baseline * (1 + LATENCY_TOLERANCE) + LATENCY_SLACK_MS
+BENCHMARKS = {
+    'BASELINE_FILE': BASE_DIR / 'benchmarks' / 'baseline.json',
+    'SCALES': [0.02, 0.1],
+    'ITERATIONS': 10,
+    'WARMUP': 2,
+    'LATENCY_TOLERANCE': 0.25,
+    'LATENCY_SLACK_MS': 5.0,
+    'QUERY_TOLERANCE': 0,
+}
+
+# Columnar analytics snapshots (write_snapshots command / AcademicYear admin
+# action); needs the optional pyarrow package
+SNAPSHOTS = {
+    'DIR': BASE_DIR / 'snapshots',
+    'FORMAT': 'parquet',
+    'COMPRESSION': 'zstd',
+    'CHUNK_SIZE': 50000,
+}
+
+# Read replica for analytics and report views (core.replicas)
+READ_REPLICA = {
+    'ALIAS': 'replica',
+    'MAX_LAG_SECONDS': config('REPLICA_MAX_LAG_SECONDS', default=10.0, cast=float),
+    'LAG_CHECK_INTERVAL': 5.0,
+    'PIN_SECONDS': config('REPLICA_PIN_SECONDS', default=10.0, cast=float),
+    'PIN_COOKIE': 'replica_pin',
+    'IGNORED_MODELS': ['sessions.session', 'core.auditlog'],
+}
+
+# Materialized fee defaulters (fees.defaulters / refresh_fee_defaulters command)
+FEE_DEFAULTERS = {
+    'MIN_OVERDUE_DAYS': 1,
+    'AGING_BUCKETS': [30, 60, 90],
+    'HIGH_RISK_AMOUNT': 50000,
+    'MEDIUM_RISK_AMOUNT': 20000,
+    'HIGH_RISK_DAYS': 90,
+    'MEDIUM_RISK_DAYS': 60,
+}
+
+# Late-fee posting (fees.late_fees / apply_late_fees command); rules come
+# from each fee structure, these cap them
+LATE_FEES = {
+    'ACCRUE_MONTHLY': False,
+    'MAX_PERCENTAGE': None,
+    'MAX_AMOUNT': None,
+}
+
+# Overdue fee reminders to parents (fees.reminders / send_fee_reminders command)
+FEE_REMINDERS = {
+    'THROTTLE_DAYS': 7,
+    'PRIMARY_CONTACT_ONLY': False,
+    'CHANNELS': ['IN_APP', 'EMAIL'],
+}
+
+# Fee collection forecasting (fees.forecasting); NumPy enables the series models
+FEE_FORECAST = {
+    'HORIZON_MONTHS': 12,
+    'HISTORY_MONTHS': 36,
+    'INTERVAL': 80,
+    'CACHE_TIMEOUT': 6 * 60 * 60,
+}
+
 # Logging
 LOGGING = {
     'version': 1,
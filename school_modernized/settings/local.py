@@ -16,6 +16,15 @@ DATABASES = {
     }
 }
 
+# Optional replica for trying read routing locally: a copy of db.sqlite3
+REPLICA_DATABASE_NAME = config('REPLICA_DATABASE_NAME', default='')
+if REPLICA_DATABASE_NAME:
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': REPLICA_DATABASE_NAME,
+        'TEST': {'MIRROR': 'default'},
+    }
+
 # Email Backend for Development
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
@@ -24,4 +33,14 @@ CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
     }
-} 
\ No newline at end of file
+}
+
+# Write audit entries inline: SQLite allows one writer at a time, so a
+# background flusher would contend with requests for the database lock
+AUDIT_LOG = {**AUDIT_LOG, 'ASYNC': False}
+
+# Profile every request while developing
+PERFORMANCE_PROFILER = {
+    **PERFORMANCE_PROFILER,
+    'SAMPLE_RATE': config('PROFILER_SAMPLE_RATE', default=1.0, cast=float),
+}
@@ -49,6 +49,15 @@ DATABASES = {
     )
 }
 
+# Streaming replica for analytics and report reads (core.replicas)
+if os.environ.get('REPLICA_DATABASE_URL'):
+    DATABASES['replica'] = dj_database_url.parse(
+        os.environ['REPLICA_DATABASE_URL'],
+        conn_max_age=600,
+        conn_health_checks=True,
+    )
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
 # Static files (whitenoise)
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
@@ -85,6 +94,10 @@ SECURE_REFERRER_POLICY = 'strict-origin-when-cross-origin'
 SECURE_CROSS_ORIGIN_OPENER_POLICY = 'same-origin'
 
 # Performance optimizations
+PERFORMANCE_PROFILER = {
+    **PERFORMANCE_PROFILER,
+    'SAMPLE_RATE': float(os.environ.get('PROFILER_SAMPLE_RATE', '0.05')),
+}
 USE_TZ = True
 USE_I18N = False  # Disable if not using internationalization
 
@@ -5,6 +5,15 @@ from django.conf.urls.static import static
 from django.contrib.auth import views as auth_views
 from django.views.generic import RedirectView
 
+from fees.api import FeePaymentViewSet
+
+# High-volume API lists, paged with core.pagination.KeysetPagination. Only
+# the read-only list action is routed, and only for models the migrations
+# create tables for (not yet academics.Attendance or transport.VehicleTracking).
+api_urlpatterns = [
+    path('fees/payments/', FeePaymentViewSet.as_view({'get': 'list'}), name='api-fee-payment-list'),
+]
+
 # Professional URL Configuration for Ultra-Professional Educational ERP Platform
 urlpatterns = [
     # Core system URLs - Professional Dashboard and Features
@@ -30,6 +39,9 @@ urlpatterns = [
     path('inventory/', RedirectView.as_view(url='/', permanent=False)),
     path('communication/', RedirectView.as_view(url='/', permanent=False)),
     
+    # REST API
+    path('api/', include(api_urlpatterns)),
+    
     # Admin panel - moved to end and optional
     path('admin/', admin.site.urls),
 ]
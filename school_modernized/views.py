@@ -7,10 +7,11 @@ from django.db.models import Count
 def landing_page(request):
     """Landing page with school management dashboard"""
     # Import models locally to avoid module-level import failures
-    from core.models import SchoolSettings, AcademicYear, Campus, Department, Building, Room
+    from core.models import AcademicYear, Campus, Department, Building, Room
+    from core.school_config import get_school_settings
     
     # Get school settings
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     
     context = {
         'school_settings': school_settings,
@@ -68,9 +69,9 @@ def simple_logout(request):
 
 def school_settings_view(request):
     """School settings view"""
-    from core.models import SchoolSettings
+    from core.school_config import get_school_settings
     
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     context = {
         'school_settings': school_settings,
         'page_title': 'School Settings'
@@ -0,0 +1,1029 @@
+# Generated by Django 5.0.6 on 2026-10-18 05:50
+
+import django.core.validators
+import django.db.models.deletion
+import django.utils.timezone
+import phonenumber_field.modelfields
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_auditlog_created_at_default'),
+        ('students', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentAttendance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('date', models.DateField()),
+                ('status', models.CharField(choices=[('PRESENT', 'Present'), ('ABSENT', 'Absent'), ('LATE', 'Late'), ('HALF_DAY', 'Half Day'), ('SICK', 'Sick Leave'), ('EXCUSED', 'Excused Absence')], max_length=15)),
+                ('check_in_time', models.TimeField(blank=True, null=True)),
+                ('check_out_time', models.TimeField(blank=True, null=True)),
+                ('remarks', models.TextField(blank=True, null=True)),
+                ('parent_notified', models.BooleanField(default=False)),
+                ('notification_sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StudentDocument',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('document_type', models.CharField(choices=[('BIRTH_CERTIFICATE', 'Birth Certificate'), ('AADHAR_CARD', 'Aadhar Card'), ('PAN_CARD', 'PAN Card'), ('PASSPORT', 'Passport'), ('TRANSFER_CERTIFICATE', 'Transfer Certificate'), ('MARK_SHEET', 'Mark Sheet'), ('MIGRATION_CERTIFICATE', 'Migration Certificate'), ('CASTE_CERTIFICATE', 'Caste Certificate'), ('INCOME_CERTIFICATE', 'Income Certificate'), ('DOMICILE_CERTIFICATE', 'Domicile Certificate'), ('BPL_CERTIFICATE', 'BPL Certificate'), ('DISABILITY_CERTIFICATE', 'Disability Certificate'), ('MINORITY_CERTIFICATE', 'Minority Certificate'), ('MEDICAL_CERTIFICATE', 'Medical Certificate'), ('VACCINATION_CARD', 'Vaccination Card'), ('PHOTO', 'Photograph'), ('FATHER_AADHAR', "Father's Aadhar"), ('MOTHER_AADHAR', "Mother's Aadhar"), ('PARENT_INCOME_PROOF', 'Parent Income Proof'), ('BANK_PASSBOOK', 'Bank Passbook Copy'), ('OTHER', 'Other')], max_length=30)),
+                ('document_name', models.CharField(max_length=200)),
+                ('file', models.FileField(upload_to='student_documents/')),
+                ('file_size', models.BigIntegerField()),
+                ('is_verified', models.BooleanField(default=False)),
+                ('verified_at', models.DateTimeField(blank=True, null=True)),
+                ('expiry_date', models.DateField(blank=True, null=True)),
+                ('notes', models.TextField(blank=True, null=True)),
+                ('is_mandatory', models.BooleanField(default=False)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StudentParent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('relationship_type', models.CharField(choices=[('FATHER', 'Father'), ('MOTHER', 'Mother'), ('GUARDIAN', 'Guardian'), ('STEP_FATHER', 'Step Father'), ('STEP_MOTHER', 'Step Mother'), ('GRANDFATHER', 'Grandfather'), ('GRANDMOTHER', 'Grandmother'), ('UNCLE', 'Uncle'), ('AUNT', 'Aunt'), ('OTHER', 'Other')], max_length=20)),
+                ('is_primary_contact', models.BooleanField(default=False)),
+                ('is_emergency_contact', models.BooleanField(default=False)),
+                ('can_pickup', models.BooleanField(default=True)),
+                ('receive_sms', models.BooleanField(default=True)),
+                ('receive_email', models.BooleanField(default=True)),
+                ('is_active', models.BooleanField(default=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StudentPromotion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('promotion_date', models.DateField()),
+                ('result_status', models.CharField(choices=[('PROMOTED', 'Promoted'), ('DETAINED', 'Detained'), ('PASSED', 'Passed'), ('FAILED', 'Failed')], max_length=20)),
+                ('remarks', models.TextField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-promotion_date'],
+            },
+        ),
+        migrations.AlterModelOptions(
+            name='category',
+            options={'verbose_name_plural': 'Categories'},
+        ),
+        migrations.AlterModelOptions(
+            name='schoolclass',
+            options={'ordering': ['code'], 'verbose_name_plural': 'Classes'},
+        ),
+        migrations.AlterModelOptions(
+            name='section',
+            options={'ordering': ['school_class', 'name']},
+        ),
+        migrations.AlterModelOptions(
+            name='student',
+            options={'ordering': ['first_name', 'last_name']},
+        ),
+        migrations.RemoveField(
+            model_name='student',
+            name='guardian_occupation',
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='caste_verification_required',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='code',
+            field=models.CharField(default='', max_length=20),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='description',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='fee_discount_percentage',
+            field=models.FloatField(default=0, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)]),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='government_scholarship_eligible',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='is_reserved_category',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='is_rte_category',
+            field=models.BooleanField(default=False, help_text='Right to Education quota'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='reservation_percentage',
+            field=models.FloatField(default=0, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)]),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='school',
+            field=models.ForeignKey(default=0, on_delete=django.db.models.deletion.CASCADE, related_name='student_categories', to='core.schoolsettings'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='schoolclass',
+            name='board_type',
+            field=models.CharField(choices=[('CBSE', 'Central Board of Secondary Education'), ('ICSE', 'Indian Certificate of Secondary Education'), ('STATE', 'State Board'), ('IB', 'International Baccalaureate'), ('CAMBRIDGE', 'Cambridge International')], default='CBSE', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='schoolclass',
+            name='class_teacher_required',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='schoolclass',
+            name='code',
+            field=models.CharField(default='', max_length=10),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='schoolclass',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='schoolclass',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='schoolclass',
+            name='is_higher_secondary',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='schoolclass',
+            name='is_pre_primary',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='schoolclass',
+            name='is_primary',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='schoolclass',
+            name='is_secondary',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='schoolclass',
+            name='is_upper_primary',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='schoolclass',
+            name='maximum_students',
+            field=models.IntegerField(default=40),
+        ),
+        migrations.AddField(
+            model_name='schoolclass',
+            name='minimum_attendance_required',
+            field=models.FloatField(default=75.0),
+        ),
+        migrations.AddField(
+            model_name='schoolclass',
+            name='promotion_criteria',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='schoolclass',
+            name='school',
+            field=models.ForeignKey(default=0, on_delete=django.db.models.deletion.CASCADE, related_name='classes', to='core.schoolsettings'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='schoolclass',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='section',
+            name='academic_year',
+            field=models.ForeignKey(default=0, on_delete=django.db.models.deletion.CASCADE, related_name='sections', to='core.academicyear'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='section',
+            name='class_teacher',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='assigned_sections', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='section',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='section',
+            name='current_strength',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='section',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='section',
+            name='maximum_students',
+            field=models.IntegerField(default=40),
+        ),
+        migrations.AddField(
+            model_name='section',
+            name='school',
+            field=models.ForeignKey(default=0, on_delete=django.db.models.deletion.CASCADE, related_name='sections', to='core.schoolsettings'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='section',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RenameField(
+            model_name='student',
+            old_name='adhar_no',
+            new_name='aadhar_number',
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='aadhar_number',
+            field=models.CharField(blank=True, max_length=12, null=True, validators=[django.core.validators.RegexValidator('^\\d{12}$', 'Aadhar number must be 12 digits')]),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='academic_year',
+            field=models.ForeignKey(default=0, on_delete=django.db.models.deletion.CASCADE, related_name='students', to='core.academicyear'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='achievements',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.RenameField(
+            model_name='student',
+            old_name='admission_no',
+            new_name='admission_number',
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='admission_number',
+            field=models.CharField(default='', max_length=50, unique=True),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='admission_type',
+            field=models.CharField(choices=[('REGULAR', 'Regular Admission'), ('RTE', 'RTE Quota'), ('MANAGEMENT', 'Management Quota'), ('SPORTS', 'Sports Quota'), ('NRI', 'NRI Quota'), ('STAFF_WARD', 'Staff Ward'), ('TRANSFER', 'Transfer Admission')], default='REGULAR', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='allergies',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.RenameField(
+            model_name='student',
+            old_name='bank_account_no',
+            new_name='bank_account_number',
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='bank_account_number',
+            field=models.CharField(blank=True, max_length=30, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='bank_branch',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='birth_certificate_number',
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='blood_group',
+            field=models.CharField(blank=True, choices=[('A+', 'A+'), ('A-', 'A-'), ('B+', 'B+'), ('B-', 'B-'), ('AB+', 'AB+'), ('AB-', 'AB-'), ('O+', 'O+'), ('O-', 'O-')], max_length=3, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='bpl_card_number',
+            field=models.CharField(blank=True, max_length=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='bpl_status',
+            field=models.BooleanField(default=False, help_text='Below Poverty Line'),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='bus_fee',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='bus_route',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='caste',
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='country',
+            field=models.CharField(default='India', max_length=50),
+        ),
+        migrations.RenameField(
+            model_name='student',
+            old_name='class_enrolled',
+            new_name='current_class',
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='current_class',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='current_students', to='students.schoolclass'),
+        ),
+        migrations.RenameField(
+            model_name='student',
+            old_name='section_enrolled',
+            new_name='current_section',
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='current_section',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='current_students', to='students.section'),
+        ),
+        migrations.RenameField(
+            model_name='student',
+            old_name='dob',
+            new_name='date_of_birth',
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='date_of_birth',
+            field=models.DateField(default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='disciplinary_actions',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='district',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='drop_time',
+            field=models.TimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='emergency_contact_address',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='emergency_contact_name',
+            field=models.CharField(default='', max_length=200),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='emergency_contact_phone',
+            field=phonenumber_field.modelfields.PhoneNumberField(default='', max_length=128, region=None),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='emergency_contact_relation',
+            field=models.CharField(default='', max_length=50),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='extracurricular_activities',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='family_annual_income',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='father_aadhar',
+            field=models.CharField(blank=True, max_length=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='father_annual_income',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='father_designation',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='father_email',
+            field=models.EmailField(blank=True, max_length=254, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='father_office_address',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='father_pan',
+            field=models.CharField(blank=True, max_length=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='father_qualification',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.RenameField(
+            model_name='student',
+            old_name='firstname',
+            new_name='first_name',
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='first_name',
+            field=models.CharField(default='', max_length=100),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='graduation_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='guardian_aadhar',
+            field=models.CharField(blank=True, max_length=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='guardian_email',
+            field=models.EmailField(blank=True, max_length=254, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='height',
+            field=models.FloatField(blank=True, help_text='Height in cm', null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='hobbies',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='hostel_fee',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='hostel_room_number',
+            field=models.CharField(blank=True, max_length=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='house',
+            field=models.CharField(blank=True, help_text='House name (Red, Blue, Green, Yellow)', max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='is_alumni',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='is_detained',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='is_hosteller',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='is_minority',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='is_promoted',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='is_transferred',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RenameField(
+            model_name='student',
+            old_name='lastname',
+            new_name='last_name',
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='last_name',
+            field=models.CharField(default='', max_length=100),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='medical_conditions',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='medications',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='middle_name',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='mother_aadhar',
+            field=models.CharField(blank=True, max_length=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='mother_annual_income',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='mother_designation',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='mother_email',
+            field=models.EmailField(blank=True, max_length=254, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='mother_office_address',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='mother_pan',
+            field=models.CharField(blank=True, max_length=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='mother_qualification',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='mother_tongue',
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='nationality',
+            field=models.CharField(default='Indian', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='pen_number',
+            field=models.CharField(blank=True, help_text='Permanent Education Number', max_length=20, null=True),
+        ),
+        migrations.RenameField(
+            model_name='student',
+            old_name='mobileno',
+            new_name='phone_number',
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='phone_number',
+            field=phonenumber_field.modelfields.PhoneNumberField(blank=True, max_length=128, null=True, region=None),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='pickup_point',
+            field=models.CharField(blank=True, max_length=200, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='pickup_time',
+            field=models.TimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='place_of_birth',
+            field=models.CharField(blank=True, max_length=200, null=True),
+        ),
+        migrations.RenameField(
+            model_name='student',
+            old_name='pincode',
+            new_name='postal_code',
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='postal_code',
+            field=models.CharField(default='', max_length=10),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='previous_class',
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='previous_school_address',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='previous_school_board',
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='previous_school_marks',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='previous_school_name',
+            field=models.CharField(blank=True, max_length=200, null=True),
+        ),
+        migrations.RenameField(
+            model_name='student',
+            old_name='image',
+            new_name='profile_photo',
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='profile_photo',
+            field=models.ImageField(blank=True, null=True, upload_to='student_photos/'),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='remarks',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.RenameField(
+            model_name='student',
+            old_name='roll_no',
+            new_name='roll_number',
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='roll_number',
+            field=models.CharField(blank=True, max_length=20, null=True),
+        ),
+        migrations.RenameField(
+            model_name='student',
+            old_name='rte',
+            new_name='rte_student',
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='rte_student',
+            field=models.BooleanField(default=False, help_text='RTE 25% quota student'),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='scholarship_eligible',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='school',
+            field=models.ForeignKey(default=0, on_delete=django.db.models.deletion.CASCADE, related_name='students', to='core.schoolsettings'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='special_needs',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='special_talents',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='sub_caste',
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='tc_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='tc_issued_by',
+            field=models.CharField(blank=True, max_length=200, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='tc_number',
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='transfer_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='transport_mode',
+            field=models.CharField(choices=[('BUS', 'School Bus'), ('PRIVATE', 'Private Vehicle'), ('WALKING', 'Walking'), ('BICYCLE', 'Bicycle'), ('PUBLIC', 'Public Transport'), ('AUTO', 'Auto Rickshaw')], default='WALKING', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='udise_number',
+            field=models.CharField(blank=True, help_text='UDISE Student ID', max_length=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='vaccination_status',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='weight',
+            field=models.FloatField(blank=True, help_text='Weight in kg', null=True),
+        ),
+        migrations.AlterField(
+            model_name='section',
+            name='name',
+            field=models.CharField(max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='city',
+            field=models.CharField(default='', max_length=100),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='current_address',
+            field=models.TextField(default=''),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='father_name',
+            field=models.CharField(default='', max_length=200),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='father_phone',
+            field=phonenumber_field.modelfields.PhoneNumberField(blank=True, max_length=128, null=True, region=None),
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='gender',
+            field=models.CharField(choices=[('M', 'Male'), ('F', 'Female'), ('O', 'Other')], default='', max_length=1),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='guardian_name',
+            field=models.CharField(blank=True, max_length=200, null=True),
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='guardian_phone',
+            field=phonenumber_field.modelfields.PhoneNumberField(blank=True, max_length=128, null=True, region=None),
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='id',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='ifsc_code',
+            field=models.CharField(blank=True, max_length=11, null=True),
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='mother_name',
+            field=models.CharField(default='', max_length=200),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='mother_phone',
+            field=phonenumber_field.modelfields.PhoneNumberField(blank=True, max_length=128, null=True, region=None),
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='samagra_id',
+            field=models.CharField(blank=True, help_text='Samagra ID (MP)', max_length=15, null=True),
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='state',
+            field=models.CharField(default='', max_length=100),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='user',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='student_profile', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterUniqueTogether(
+            name='category',
+            unique_together={('school', 'code')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='schoolclass',
+            unique_together={('school', 'code')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='section',
+            unique_together={('school_class', 'name', 'academic_year')},
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['school', 'admission_number'], name='students_st_school__252cfa_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['current_class', 'current_section'], name='students_st_current_58a272_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['aadhar_number'], name='students_st_aadhar__06c740_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['pen_number'], name='students_st_pen_num_9f0214_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['is_active'], name='students_st_is_acti_c00e81_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['rte_student'], name='students_st_rte_stu_1a0ccc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['admission_type'], name='students_st_admissi_378989_idx'),
+        ),
+        migrations.AddField(
+            model_name='studentattendance',
+            name='marked_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='studentattendance',
+            name='student',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_records', to='students.student'),
+        ),
+        migrations.AddField(
+            model_name='studentdocument',
+            name='student',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='documents', to='students.student'),
+        ),
+        migrations.AddField(
+            model_name='studentdocument',
+            name='uploaded_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='studentdocument',
+            name='verified_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='verified_documents', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='studentparent',
+            name='parent_user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='child_relationships', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='studentparent',
+            name='student',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='parent_relationships', to='students.student'),
+        ),
+        migrations.AddField(
+            model_name='studentpromotion',
+            name='academic_year_from',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='promotions_from', to='core.academicyear'),
+        ),
+        migrations.AddField(
+            model_name='studentpromotion',
+            name='academic_year_to',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='promotions_to', to='core.academicyear'),
+        ),
+        migrations.AddField(
+            model_name='studentpromotion',
+            name='from_class',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='promoted_from', to='students.schoolclass'),
+        ),
+        migrations.AddField(
+            model_name='studentpromotion',
+            name='from_section',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='promoted_from', to='students.section'),
+        ),
+        migrations.AddField(
+            model_name='studentpromotion',
+            name='student',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='promotions', to='students.student'),
+        ),
+        migrations.AddField(
+            model_name='studentpromotion',
+            name='to_class',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='promoted_to', to='students.schoolclass'),
+        ),
+        migrations.AddField(
+            model_name='studentpromotion',
+            name='to_section',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='promoted_to', to='students.section'),
+        ),
+        migrations.AddIndex(
+            model_name='studentattendance',
+            index=models.Index(fields=['student', 'date'], name='students_st_student_8ce0c9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentattendance',
+            index=models.Index(fields=['date', 'status'], name='students_st_date_397d70_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='studentattendance',
+            unique_together={('student', 'date')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='studentparent',
+            unique_together={('student', 'parent_user')},
+        ),
+    ]
@@ -1,7 +1,7 @@
 ﻿from django.shortcuts import render, get_object_or_404, redirect
 from django.views.generic import ListView, DetailView, CreateView, UpdateView
 from django.http import HttpResponse, JsonResponse
-from django.db.models import Q, Count, Avg, Sum
+from django.db.models import Q, Count, Avg, Sum, DecimalField
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
@@ -11,9 +11,11 @@ from django.utils import timezone
 from django.template.loader import render_to_string
 from core.models import (
     Student, Grade, Attendance, ExamResult, FeePayment, AcademicYear, 
-    SchoolSettings, Employee, BiometricAttendance, VirtualClassroom,
+    Employee, BiometricAttendance, VirtualClassroom,
     SmartNotification, ParentPortal, MobileAppSession
 )
+from core.school_config import get_school_settings
+from core.exports import correlated_aggregate, iterate, stream_csv
 import csv
 import json
 from datetime import datetime, timedelta
@@ -83,7 +85,7 @@ class StudentListView(LoginRequiredMixin, ListView):
         context['gender_filter'] = self.request.GET.get('gender', '')
         
         context['page_title'] = 'Students Management'
-        context['school_settings'] = SchoolSettings.objects.first()
+        context['school_settings'] = get_school_settings(self.request)
         return context
 
 class StudentDetailView(LoginRequiredMixin, DetailView):
@@ -191,7 +193,7 @@ class StudentDetailView(LoginRequiredMixin, DetailView):
         ] if hasattr(student, 'father_phone') else []
         
         context['page_title'] = f'Student Profile - {student.full_name}'
-        context['school_settings'] = SchoolSettings.objects.first()
+        context['school_settings'] = get_school_settings(self.request)
         return context
 
 class StudentCreateView(LoginRequiredMixin, CreateView):
@@ -225,7 +227,7 @@ class StudentUpdateView(LoginRequiredMixin, UpdateView):
 @login_required
 def student_dashboard(request):
     """Comprehensive Student Dashboard"""
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     
     # Student Statistics
     total_students = Student.objects.filter(is_active=True).count()
@@ -295,74 +297,53 @@ def student_dashboard(request):
 
 @login_required
 def export_students(request):
-    """Enhanced CSV Export with comprehensive data"""
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="students_comprehensive_export.csv"'
-    
-    writer = csv.writer(response)
-    writer.writerow([
-        'Admission Number', 'Full Name', 'Grade', 'Gender', 'Date of Birth',
-        'Father Name', 'Mother Name', 'Contact Number', 'Email', 'Address',
-        'Admission Date', 'Blood Group', 'Religion', 'Category', 'Status',
-        'Academic Year', 'Overall Percentage', 'Attendance Percentage'
-    ])
-    
-    students = Student.objects.select_related('grade', 'academic_year').filter(
+    """Enhanced CSV Export with comprehensive data (streamed, one query per chunk)"""
+    decimal_field = DecimalField(max_digits=12, decimal_places=2)
+    students = Student.objects.select_related('grade__academic_year').filter(
         is_active=True
+    ).annotate(
+        marks_obtained=correlated_aggregate(
+            ExamResult.objects.all(), 'student', Sum('marks_obtained'), output_field=decimal_field
+        ),
+        marks_total=correlated_aggregate(
+            ExamResult.objects.all(), 'student', Sum('total_marks'), output_field=decimal_field
+        ),
+        attendance_days=correlated_aggregate(Attendance.objects.all(), 'student', Count('pk')),
+        present_days=correlated_aggregate(Attendance.objects.filter(status='PRESENT'), 'student', Count('pk')),
     ).order_by('admission_number')
     
-    for student in students:
-        # Calculate performance metrics
-        try:
-            exam_results = ExamResult.objects.filter(student=student)
-            if exam_results.exists():
-                total_marks = exam_results.aggregate(
-                    total_obtained=Sum('marks_obtained'),
-                    total_max=Sum('max_marks')
-                )
-                overall_percentage = round(
-                    (total_marks['total_obtained'] / total_marks['total_max']) * 100, 1
-                ) if total_marks['total_max'] else 0
-            else:
-                overall_percentage = 0
-        except:
-            overall_percentage = 0
-        
-        # Calculate attendance percentage
-        try:
-            attendance_records = Attendance.objects.filter(student=student)
-            if attendance_records.exists():
-                present_count = attendance_records.filter(status='PRESENT').count()
-                attendance_percentage = round(
-                    (present_count / attendance_records.count()) * 100, 1
-                )
-            else:
-                attendance_percentage = 0
-        except:
-            attendance_percentage = 0
-        
-        writer.writerow([
-            student.admission_number,
-            student.full_name,
-            student.grade.name if student.grade else '',
-            student.get_gender_display(),
-            student.date_of_birth,
-            student.father_name,
-            student.mother_name,
-            student.contact_number,
-            student.email,
-            student.address,
-            student.admission_date,
-            student.blood_group,
-            student.religion,
-            student.category,
-            'Active' if student.is_active else 'Inactive',
-            student.academic_year.year if student.academic_year else '',
-            overall_percentage,
-            attendance_percentage,
-        ])
-    
-    return response
+    def rows():
+        for student in iterate(students):
+            overall_percentage = round(
+                float(student.marks_obtained) / float(student.marks_total) * 100, 1
+            ) if student.marks_total else 0
+            attendance_percentage = round(
+                student.present_days / student.attendance_days * 100, 1
+            ) if student.attendance_days else 0
+            
+            yield [
+                student.admission_number,
+                student.full_name,
+                student.grade.name if student.grade else '',
+                student.get_gender_display(),
+                student.date_of_birth,
+                student.parent_name,
+                student.parent_phone,
+                student.phone or '',
+                student.email or '',
+                student.address,
+                student.admission_date,
+                'Active' if student.is_active else 'Inactive',
+                student.grade.academic_year.name if student.grade else '',
+                overall_percentage,
+                attendance_percentage,
+            ]
+    
+    return stream_csv('students_comprehensive_export.csv', [
+        'Admission Number', 'Full Name', 'Grade', 'Gender', 'Date of Birth',
+        'Parent Name', 'Parent Phone', 'Contact Number', 'Email', 'Address',
+        'Admission Date', 'Status', 'Academic Year', 'Overall Percentage', 'Attendance Percentage'
+    ], rows())
 
 @login_required
 def student_analytics_api(request):
@@ -449,7 +430,7 @@ def export_selected_students(student_ids):
 def student_document_management(request, student_id):
     """Comprehensive student document management system"""
     student = get_object_or_404(Student, id=student_id)
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     
     # Get all documents for the student
     from core.models import Attachment
@@ -493,7 +474,7 @@ def student_document_management(request, student_id):
 def student_medical_records(request, student_id):
     """Comprehensive medical records management"""
     student = get_object_or_404(Student, id=student_id)
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     
     # Medical history and records
     medical_data = {
@@ -547,7 +528,7 @@ def student_medical_records(request, student_id):
 def student_parent_portal(request, student_id):
     """Advanced parent portal with real-time updates"""
     student = get_object_or_404(Student, id=student_id)
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     
     # Get parent portal data
     try:
@@ -611,7 +592,7 @@ def student_parent_portal(request, student_id):
 def student_transfer_withdrawal(request, student_id):
     """Student transfer and withdrawal management system"""
     student = get_object_or_404(Student, id=student_id)
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     
     if request.method == 'POST':
         action_type = request.POST.get('action_type')
@@ -701,7 +682,7 @@ def student_transfer_withdrawal(request, student_id):
 def student_id_card_generation(request, student_id):
     """Generate student ID card with QR code"""
     student = get_object_or_404(Student, id=student_id)
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     
     # Generate QR code data
     qr_data = {
@@ -736,7 +717,7 @@ def student_id_card_generation(request, student_id):
 def biometric_attendance_management(request, student_id):
     """Biometric attendance system integration"""
     student = get_object_or_404(Student, id=student_id)
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     
     # Get biometric data for student
     try:
@@ -777,7 +758,7 @@ def biometric_attendance_management(request, student_id):
 def virtual_classroom_integration(request, student_id):
     """Virtual classroom management for student"""
     student = get_object_or_404(Student, id=student_id)
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     
     # Get virtual classrooms for student's grade
     virtual_classrooms = VirtualClassroom.objects.filter(
@@ -827,7 +808,7 @@ def virtual_classroom_integration(request, student_id):
 def student_alumni_management(request, student_id):
     """Alumni management and tracking system"""
     student = get_object_or_404(Student, id=student_id)
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     
     # Check if student is alumni (graduated)
     is_alumni = not student.is_active and hasattr(student, 'graduation_date')
@@ -881,7 +862,7 @@ def student_alumni_management(request, student_id):
 def comprehensive_student_analytics(request, student_id):
     """Advanced student analytics with AI insights"""
     student = get_object_or_404(Student, id=student_id)
-    school_settings = SchoolSettings.objects.first()
+    school_settings = get_school_settings(request)
     
     # Academic performance analytics
     exam_results = ExamResult.objects.filter(student=student).select_related('exam', 'subject')
@@ -1,9 +1,11 @@
 from rest_framework import serializers, viewsets
+from core.pagination import KeysetPagination
 from .models import (
     TransportVendor,
     Vehicle,
     TransportRoute,
-    StudentTransport
+    StudentTransport,
+    VehicleTracking
 )
 
 # Serializers
@@ -27,6 +29,16 @@ class StudentTransportSerializer(serializers.ModelSerializer):
         model = StudentTransport
         fields = '__all__'
 
+class VehicleTrackingSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = VehicleTracking
+        fields = '__all__'
+
+# Pagination
+class VehicleTrackingPagination(KeysetPagination):
+    """Newest pings first, along the gps_timestamp index"""
+    ordering = ('-gps_timestamp', '-id')
+
 # ViewSets
 class TransportVendorViewSet(viewsets.ModelViewSet):
     queryset = TransportVendor.objects.all()
@@ -42,4 +54,9 @@ class TransportRouteViewSet(viewsets.ModelViewSet):
 
 class StudentTransportViewSet(viewsets.ModelViewSet):
     queryset = StudentTransport.objects.all()
-    serializer_class = StudentTransportSerializer 
\ No newline at end of file
+    serializer_class = StudentTransportSerializer
+
+class VehicleTrackingViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = VehicleTracking.objects.all()
+    serializer_class = VehicleTrackingSerializer
+    pagination_class = VehicleTrackingPagination
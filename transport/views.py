@@ -6,13 +6,15 @@ from django.utils import timezone
 from django.views.generic import ListView, DetailView
 from django.http import HttpResponse
 from .models import TransportVendor, Vehicle, Driver, TransportRoute, StudentTransport, BusStop
-from core.models import SchoolSettings, Student
+from core.models import Student
+from core.school_config import get_school_settings
+from core.exports import iterate, stream_csv
 import csv
 
 @login_required
 def transport_dashboard(request):
-    \"\"\"Transport Management Dashboard\"\"\"
-    school_settings = SchoolSettings.objects.first()
+    """Transport Management Dashboard"""
+    school_settings = get_school_settings(request)
     
     # Core Statistics
     total_vehicles = Vehicle.objects.count()
@@ -121,7 +123,7 @@ class StudentTransportListView(ListView):
 
 @login_required
 def assign_transport(request):
-    \"\"\"Assign transport to students\"\"\"
+    """Assign transport to students"""
     if request.method == 'POST':
         student_id = request.POST.get('student_id')
         route_id = request.POST.get('route_id')
@@ -168,26 +170,21 @@ def assign_transport(request):
 
 @login_required
 def transport_reports(request):
-    \"\"\"Transport Reports\"\"\"
+    """Transport Reports"""
     return render(request, 'transport/reports.html', {'page_title': 'Transport Reports'})
 
 @login_required
 def export_transport_data(request):
-    \"\"\"Export transport data to CSV\"\"\"
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename=\"transport_data_export.csv\"'
-    
-    writer = csv.writer(response)
-    writer.writerow(['Student Name', 'Route', 'Subscription Type', 'Monthly Fee', 'Status'])
-    
-    assignments = StudentTransport.objects.select_related('student', 'route').filter(is_active=True)
-    for assignment in assignments:
-        writer.writerow([
-            f\"{assignment.student.first_name} {assignment.student.last_name}\",
+    """Export transport data to CSV (streamed)"""
+    assignments = StudentTransport.objects.select_related('student', 'route').filter(is_active=True).order_by('pk')
+    rows = (
+        [
+            f"{assignment.student.first_name} {assignment.student.last_name}",
             assignment.route.route_name,
             assignment.get_subscription_type_display(),
             assignment.monthly_fee,
             'Active' if assignment.is_active else 'Inactive'
-        ])
-    
-    return response
+        ]
+        for assignment in iterate(assignments)
+    )
+    return stream_csv('transport_data_export.csv', ['Student Name', 'Route', 'Subscription Type', 'Monthly Fee', 'Status'], rows)